@@ -19,11 +19,15 @@
 #
 """Test runner for ceph/s3-tests nosetests based tests."""
 import argparse
+import configparser
 import datetime
 import logging
 import os
 import subprocess # nosec
+from concurrent.futures import ThreadPoolExecutor
 from core import runner
+from core.sharded_runner import ResultPublisher
+from core.sharded_runner import ShardedTestRunner
 from commons import params
 from commons.utils import system_utils
 from commons.utils.jira_utils import JiraTask
@@ -50,6 +54,15 @@ def parse_args():
                              "WARNING = 30 WARN = WARNING" +
                              "INFO = 20 DEBUG = 10"
                         )
+    parser.add_argument("-w", "--workers", type=int, default=4,
+                        help="Test processes run in parallel, 0 runs one process per test "
+                             "serially")
+    parser.add_argument("-bs", "--batch_size", type=int, default=20,
+                        help="Tests run by one test process")
+    parser.add_argument("-r", "--runner", choices=["nose", "pytest"], default="nose",
+                        help="Test framework running the s3-tests")
+    parser.add_argument("-bt", "--batch_timeout", type=int, default=3600,
+                        help="Seconds after which a test process is killed")
     return parser.parse_args()
 
 
@@ -88,26 +101,28 @@ def run_nose_cmd(test_to_run=None, log_file='nosetest.log'):
     return "PASS" if prc.returncode == 0 else "FAIL"
 
 
-# pylint: disable-msg=too-many-locals
-def trigger_tests_from_te(args):
-    """Trigger tests from the provided test execution."""
-    LOGGER.info("Starting test execution")
-    jira_id, jira_pwd = runner.get_jira_credential()
-    jira_obj = JiraTask(jira_id, jira_pwd)
-    test_list = get_tests_from_te(jira_obj, args, args.test_type)
-
-    timestamp = datetime.datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
-    reports = "reports_" + str(args.test_plan) + "_" + args.te_ticket + "_" + str(timestamp)
-    reports_dir = os.path.join(params.S3TESTS_DIR, params.REPORTS_DIR, reports)
-    if not system_utils.path_exists(reports_dir):
-        system_utils.make_dirs(reports_dir)
-
-    tp_details = jira_obj.get_issue_details(args.test_plan)
-    tp_build = tp_details.fields.customfield_22980
-    build_number = tp_build[0] if tp_build else 0
-
-    os.environ[params.S3TESTS_CONF_ENV] = params.S3TESTS_CONF_FILE
-
+def worker_conf_files(conf_file, reports_dir, workers):
+    """
+    Copy of the s3-tests configuration per worker with its own bucket prefix, so tests
+    running in parallel never list or clean up the buckets of another worker.
+    """
+    conf_files = []
+    for slot in range(workers):
+        conf = configparser.RawConfigParser()
+        conf.read(conf_file)
+        if not conf.has_section("fixtures"):
+            conf.add_section("fixtures")
+        prefix = conf.get("fixtures", "bucket prefix", fallback="s3tests-{random}-")
+        conf.set("fixtures", "bucket prefix", f"w{slot}-{prefix}")
+        worker_conf = os.path.join(reports_dir, f"s3tests_w{slot}.conf")
+        with open(worker_conf, "w") as conf_obj:
+            conf.write(conf_obj)
+        conf_files.append(worker_conf)
+    return conf_files
+
+
+def trigger_serial_tests_from_te(args, jira_obj, test_list, reports_dir, build_number):
+    """Run one nosetests process per test, one after the other."""
     for test in test_list:
         test_id = str(test[0])
         LOGGER.info("TEST ID : %s", test_id)
@@ -139,6 +154,81 @@ def trigger_tests_from_te(args):
         jira_obj.update_test_jira_status(args.te_ticket, test_id, test_status, remote_path)
 
 
+# pylint: disable-msg=too-many-locals
+def trigger_sharded_tests_from_te(args, jira_obj, test_list, reports_dir, build_number):
+    """
+    Run tests in batches on parallel test processes, each with its own bucket prefix.
+
+    Results are read from the xunit report of every batch. Logs of finished batches are
+    uploaded and Jira is updated in bulk on a publisher thread while other batches run.
+    """
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        infos = list(executor.map(lambda test: collect_test_info(jira_obj, test), test_list))
+    test_ids = {}
+    for test, (_, _, test_to_run) in zip(test_list, infos):
+        test_ids.setdefault(test_to_run, []).append(str(test[0]))
+    jira_obj.update_test_jira_statuses(args.te_ticket, [
+        (test_id, "EXECUTING", "") for ids in test_ids.values() for test_id in ids])
+
+    remote_dir = os.path.join(params.NFS_BASE_DIR, build_number, args.test_plan, args.te_ticket)
+
+    def publish(batches):
+        statuses = []
+        for batch in batches:
+            remote_path = os.path.join(remote_dir, f"batch_{batch['index']:04d}")
+            for local_path in (batch["log"], batch["xunit"]):
+                if os.path.exists(local_path):
+                    resp = system_utils.mount_upload_to_server(
+                        host_dir=params.NFS_SERVER_DIR, mnt_dir=params.MOUNT_DIR,
+                        remote_path=remote_path, local_path=local_path)
+                    LOGGER.info("Log file upload to %s: %s", resp[1], resp[0])
+            for spec, result in batch["results"].items():
+                statuses.extend((test_id, result["status"], remote_path)
+                                for test_id in test_ids[spec])
+        jira_obj.update_test_jira_statuses(args.te_ticket, statuses)
+
+    conf_files = worker_conf_files(os.path.join(params.S3TESTS_DIR, params.S3TESTS_CONF_FILE),
+                                   reports_dir, args.workers)
+    publisher = ResultPublisher(publish)
+    shard_runner = ShardedTestRunner(
+        params.S3TESTS_DIR, reports_dir, workers=args.workers, batch_size=args.batch_size,
+        runner=args.runner, nosetests=f"{params.VIRTUALENV_DIR}/bin/nosetests",
+        timeout=args.batch_timeout, publisher=publisher,
+        env_factory=lambda slot: {params.S3TESTS_CONF_ENV: os.path.abspath(conf_files[slot])})
+    try:
+        report = shard_runner.run(list(test_ids))
+    finally:
+        publisher.close()
+    LOGGER.info("Speedup versus one process per test: %.1fx (%.1fs instead of about %.1fs)",
+                report["speedup"], report["elapsed"], report["serial_estimate"])
+    return report
+
+
+def trigger_tests_from_te(args):
+    """Trigger tests from the provided test execution."""
+    LOGGER.info("Starting test execution")
+    jira_id, jira_pwd = runner.get_jira_credential()
+    jira_obj = JiraTask(jira_id, jira_pwd)
+    test_list = get_tests_from_te(jira_obj, args, args.test_type)
+
+    timestamp = datetime.datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
+    reports = "reports_" + str(args.test_plan) + "_" + args.te_ticket + "_" + str(timestamp)
+    reports_dir = os.path.join(params.S3TESTS_DIR, params.REPORTS_DIR, reports)
+    if not system_utils.path_exists(reports_dir):
+        system_utils.make_dirs(reports_dir)
+
+    tp_details = jira_obj.get_issue_details(args.test_plan)
+    tp_build = tp_details.fields.customfield_22980
+    build_number = tp_build[0] if tp_build else 0
+
+    os.environ[params.S3TESTS_CONF_ENV] = params.S3TESTS_CONF_FILE
+
+    if args.workers:
+        trigger_sharded_tests_from_te(args, jira_obj, test_list, reports_dir, build_number)
+    else:
+        trigger_serial_tests_from_te(args, jira_obj, test_list, reports_dir, build_number)
+
+
 def initialize_loghandler(level=logging.DEBUG):
     """Initialize ceph s3tests runner logging."""
     logging.basicConfig(level=level)
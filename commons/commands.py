@@ -128,6 +128,7 @@ SIMULATE_FAULT_CTRL_CMD = "simulatefrufault -enclId {} -pos {} -fruIndex " \
 COPY_LOGS_BACKUP = "cat {} >> {}"
 EMPTY_FILE_CMD = "truncate -s 0 {}"
 EXTRACT_LOG_CMD = "cat {} | grep '{}' > '/root/extracted_alert.log'"
+TAIL_FOLLOW_FILE_CMD = "tail -c +{} -F {}"
 SEL_INFO_CMD = "ipmitool sel info"
 SEL_LIST_CMD = "ipmitool sel list"
 IEM_LOGGER_CMD = "logger -i -p local3.err {}"
@@ -186,6 +187,7 @@ SYSTEM_CTL_RELOAD_CMD = "systemctl reload {}"
 GET_PID_CMD = "systemctl status {}.service | grep PID"
 KILL_CMD = "kill -9 {}"
 PIDOF_CMD = "pidof {}"
+PROC_START_CMD = "ps -o pid=,lstart= -C {}"
 
 # CORTXCLI Commands
 CMD_LOGIN_CORTXCLI = "cortxcli"
@@ -405,6 +407,7 @@ M0CP_G = "m0cp -G -l $ep -H $hax_ep -P $fid -p $prof_fid -s $bsize -c $count -o
 M0CP_U = "m0cp -G -l $ep -H $hax_ep -P $fid -p $prof_fid -s $bsize -c $count -o $obj -L" \
          " $layout -O $off -u $file"
 M0TRACE = "m0trace -i $trace > $file"
+M0TRACE_PRINT = "m0trace -i $trace"
 LIST_M0TRACE = "ls -ltr| grep m0|awk '{print $9}'"
 GREP_DP_BLOCK_FID = "grep -E \"prepare io fops|UTyp\" $file| cut -d , -f2"
 EMAP_LIST = "python3 /root/error_injection.py -list_emap -m $path -parse_size $size 2>$file"
@@ -538,6 +541,8 @@ GET_MAX_USERS = "consul kv get -recurse csm/config/CSM_USERS"
 KUBECTL_CMD = "kubectl {} {} -n {} {}"
 KUBECTL_GET_DEPLOYMENT = "kubectl get deployment"
 KUBECTL_GET_POD_CONTAINERS = "kubectl get pods {} -o jsonpath='{{.spec.containers[*].name}}'"
+KUBECTL_GET_CONTAINER_RESTARTS = "-o jsonpath='{{.status.containerStatuses" \
+                                 "[?(@.name==\"{}\")].restartCount}}'"
 KUBECTL_GET_POD_IPS = 'kubectl get pods --no-headers -o ' \
                       'custom-columns=":metadata.name,:.status.podIP"'
 KUBECTL_GET_POD_NAMES = 'kubectl get pods --no-headers -o custom-columns=":metadata.name"'
@@ -40,6 +40,22 @@ PROD_FAMILY_LR = "LR"
 PROD_TYPE_K8S = "k8s"
 PROD_TYPE_NODE = "node"
 
+# Per test cluster health check, overridden by health_check in common config.
+HEALTH_CHECK_DEFAULTS = {"ttl": 300, "storage_threshold": 98.0, "storage_margin": 5.0,
+                         "storage_ttl": 3600,
+                         "destructive_marks": ("ha", "comp_ha", "node_restart", "disk_failure",
+                                               "cluster_management_ops", "data_durability")}
+
+# Background test log shipping, overridden by log_shipping in common config.
+LOG_SHIPPING_DEFAULTS = {"batch_size": 50, "batch_seconds": 30.0, "max_retries": 5,
+                         "backoff": 1.0, "close_timeout": 600}
+S3_POOL_DEFAULTS = {"size": 0, "buckets_per_account": 3, "workers": 8, "lease_timeout": 0}
+METRICS_DEFAULTS = {"interval": 5, "capacity": 3600, "parquet": False}
+# Disk budget of the session test file cache
+FILE_CACHE_BUDGET = 20 * 1024 ** 3
+# Read buffer of the in process checksum service
+CHECKSUM_BUFFER = 4 * 1024 ** 2
+
 # S3 Engine Type and versions
 S3_ENGINE = "MGW"
 S3_ENGINE_CORTX = 1
@@ -222,6 +238,12 @@ class Rest:
     FORBIDDEN = 403
     METHOD_NOT_FOUND = 404
     SUCCESS_STATUS_FOR_POST = 201
+    TOKEN_CACHE_TTL = 300
+    SESSION_POOL_SIZE = 10
+    BULK_WORKERS = 16
+    BULK_MAX_RETRIES = 5
+    BULK_BACKOFF = 0.5
+    BULK_MAX_RETRY_AFTER = 60
     USER_DATA = "{\"username\": \"testusername\", \"password\": \"Testuser@123\"," \
                 " \"role\": \"user_role\",\"email\":\"testmonitoruser@seagate.com\"," \
                 "\"alert_notification\":true}"
@@ -25,7 +25,9 @@ import re
 import shutil
 import socket
 import stat
+import threading
 import time
+from collections import deque
 from typing import Any
 from typing import List
 from typing import Tuple
@@ -234,6 +236,37 @@ class Host(AbsHost):
 
         return stdout.read(read_nbytes)
 
+    def stream_cmd(self, cmd: str, timeout: int = 400, **kwargs):
+        """
+        Execute a command on its own connection and yield its output lines as they arrive.
+        The output is never held in memory as a whole, so it suits commands printing very large
+        outputs processed in one pass.
+        :param cmd: command user wants to execute on host.
+        :param timeout: connect timeout in seconds.
+        :param kwargs: Optional keyword arguments for SSHClient.connect func call.
+        :return: generator of decoded output lines, raising IOError on a non zero exit status.
+        """
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        LOGGER.debug("Streaming %s", cmd)
+        client.connect(hostname=self.hostname, username=self.username, password=self.password,
+                       timeout=timeout, allow_agent=False, look_for_keys=False, **kwargs)
+        try:
+            _, stdout, stderr = client.exec_command(cmd)  # nosec
+            # Drain stderr meanwhile, a full stderr window would stall the command and stdout.
+            errors = deque(maxlen=100)
+            drain = threading.Thread(target=lambda: errors.extend(
+                line.strip() for line in stderr), name="stream_cmd_stderr", daemon=True)
+            drain.start()
+            for line in stdout:
+                yield line
+            exit_status = stdout.channel.recv_exit_status()
+            drain.join()
+            if exit_status != 0:
+                raise IOError(list(errors) or exit_status)
+        finally:
+            client.close()
+
     def path_exists(self, path: str) -> bool:
         """
         Check if file exists.
@@ -0,0 +1,339 @@
+#!/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Extract the lines of a time window from remote logs, transferring only the bytes needed."""
+
+import gzip
+import logging
+import os
+import posixpath
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from commons.helpers.host import Host
+
+LOGGER = logging.getLogger(__name__)
+
+# Leading timestamp patterns of log lines and their strptime formats.
+TIMESTAMP_FORMATS = (
+    (re.compile(rb"^\[?(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}:\d{2})"), "%Y-%m-%d %H:%M:%S"),
+    (re.compile(rb"^\[?([A-Z][a-z]{2}) +(\d{1,2} \d{2}:\d{2}:\d{2})"), "%b %d %H:%M:%S"),
+)
+
+
+class CountingReader:
+    """Readable wrapper counting the bytes read from a file object."""
+
+    def __init__(self, fobj):
+        self.fobj = fobj
+        self.count = 0
+
+    def read(self, size=-1):
+        """Read and count."""
+        data = self.fobj.read(size)
+        self.count += len(data)
+        return data
+
+
+class LogWindowExtractor:
+    """
+    Lines of a log between a start and an end time.
+
+    Plain logs are seeked: the first line at or after the start is found by a binary search on
+    the line timestamps, then only the byte range up to the first line after the end is read.
+    Lines without a timestamp, such as stack traces, belong to the window of the line above.
+    gzip logs can not be seeked, they are decompressed as a stream that stops after the end.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, start: datetime, end: datetime, formats: tuple = TIMESTAMP_FORMATS,
+                 block_size: int = 4096, chunk_size: int = 1024 ** 2):
+        """
+        Initialize the extractor.
+
+        :param start: first time of the window.
+        :param end: last time of the window.
+        :param formats: (compiled bytes regex, strptime format) of line timestamps.
+        :param block_size: bytes first read per binary search probe, doubled until a line is found.
+        :param chunk_size: bytes read per request while streaming the window.
+        """
+        self.start = start
+        self.end = end
+        self.formats = formats
+        self.block_size = block_size
+        self.chunk_size = chunk_size
+
+    def timestamp(self, line: bytes):
+        """Leading timestamp of a line, None when it has none."""
+        for regex, fmt in self.formats:
+            match = regex.match(line)
+            if match:
+                try:
+                    stamp = datetime.strptime(" ".join(group.decode() for group in
+                                                       match.groups()), fmt)
+                except ValueError:
+                    continue
+                if "%Y" not in fmt:
+                    # syslog timestamps have no year.
+                    stamp = stamp.replace(year=self.start.year)
+                return stamp
+        return None
+
+    def _read(self, fobj, offset: int, size: int) -> bytes:
+        """Read a byte range, pipelining the requests on SFTP files."""
+        if hasattr(fobj, "readv"):
+            return b"".join(fobj.readv([(offset, size)]))
+        fobj.seek(offset)
+        return fobj.read(size)
+
+    def _line_at(self, fobj, offset: int, size: int) -> tuple:
+        """
+        First timestamped line starting at or after offset.
+
+        :return: line start offset or None, its timestamp, bytes read
+        """
+        # Read from the byte before offset so a line starting at offset is not skipped.
+        skip = offset > 0
+        pos, pending, read, block_size = offset - skip, b"", 0, self.block_size
+        while pos < size:
+            block = self._read(fobj, pos, min(block_size, size - pos))
+            block_size = min(block_size * 2, self.chunk_size)
+            if not block:
+                break
+            read += len(block)
+            data = pending + block
+            line_start = pos - len(pending)
+            pos += len(block)
+            lines = data.split(b"\n")
+            pending = lines.pop() if pos < size else b""
+            for line in lines:
+                if skip:
+                    skip = False
+                else:
+                    stamp = self.timestamp(line)
+                    if stamp is not None:
+                        return line_start, stamp, read
+                line_start += len(line) + 1
+        return None, None, read
+
+    def find_start(self, fobj, size: int) -> tuple:
+        """
+        Offset of the first line at or after the window start by binary search.
+
+        :return: offset or None when every line is before the start, bytes read
+        """
+        line_start, stamp, read = self._line_at(fobj, 0, size)
+        if line_start is None or stamp >= self.start:
+            return line_start, read
+        low, high = line_start + 1, size
+        while low < high:
+            mid = (low + high) // 2
+            line_start, stamp, probe = self._line_at(fobj, mid, size)
+            read += probe
+            if line_start is None or stamp >= self.start:
+                high = mid
+            else:
+                low = line_start + 1
+        line_start, _, probe = self._line_at(fobj, low, size)
+        return line_start, read + probe
+
+    def _write_window(self, lines, out) -> tuple:
+        """Write lines from the start of the window until the first line after its end."""
+        written, count, started = 0, 0, False
+        for line in lines:
+            stamp = self.timestamp(line)
+            if stamp is not None:
+                if stamp > self.end:
+                    break
+                started = started or stamp >= self.start
+            if started:
+                out.write(line)
+                written += len(line)
+                count += 1
+        return written, count
+
+    def extract(self, fobj, size: int, out) -> dict:
+        """
+        Write the window of a seekable plain log.
+
+        :param fobj: binary file object with seek and read, or an SFTP file.
+        :param size: file size.
+        :param out: binary file object receiving the lines.
+        :return: dict of size, transferred and written bytes, lines and start offset.
+        """
+        # A log read in one request is not worth searching.
+        offset, transferred = (0, 0) if size <= self.chunk_size else self.find_start(fobj, size)
+        stats = {"size": size, "start_offset": offset, "written": 0, "lines": 0}
+        if offset is not None:
+            state = {"pos": offset, "read": 0}
+
+            def chunks():
+                pending = b""
+                while state["pos"] < size:
+                    chunk = self._read(fobj, state["pos"], min(self.chunk_size,
+                                                               size - state["pos"]))
+                    if not chunk:
+                        break
+                    state["pos"] += len(chunk)
+                    state["read"] += len(chunk)
+                    lines = (pending + chunk).split(b"\n")
+                    pending = lines.pop()
+                    yield from (line + b"\n" for line in lines)
+                if pending:
+                    yield pending
+
+            stats["written"], stats["lines"] = self._write_window(chunks(), out)
+            transferred += state["read"]
+        stats["transferred"] = transferred
+        return stats
+
+    def extract_gzip(self, fobj, size: int, out) -> dict:
+        """
+        Write the window of a gzip log, decompressing until the first line after the end.
+
+        :param fobj: readable binary file object of the compressed log.
+        :param size: compressed file size.
+        :param out: binary file object receiving the lines.
+        :return: dict of size, transferred and written bytes and lines.
+        """
+        reader = CountingReader(fobj)
+        with gzip.GzipFile(fileobj=reader, mode="rb") as lines:
+            written, count = self._write_window(lines, out)
+        return {"size": size, "start_offset": None, "written": written, "lines": count,
+                "transferred": reader.count}
+
+
+def sftp_session(hostname: str, username: str, password: str) -> tuple:
+    """Open one SFTP session to a node, return it and a callable closing it."""
+    host = Host(hostname=hostname, username=username, password=password)
+    host.connect()
+    sftp = host.host_obj.open_sftp()
+
+    def close():
+        sftp.close()
+        host.disconnect()
+    return sftp, close
+
+
+class RemoteLogCollector:
+    """Collect the time window of logs and their rotated copies from many nodes in parallel."""
+
+    def __init__(self, extractor: LogWindowExtractor, dest_dir: str, workers: int = 8,
+                 session_factory=sftp_session):
+        """
+        Initialize the collector.
+
+        :param extractor: LogWindowExtractor of the window.
+        :param dest_dir: local directory of the extracted logs.
+        :param workers: nodes collected in parallel, one SFTP session each.
+        :param session_factory: callable(hostname, username, password) returning an SFTP client
+            and a callable closing it.
+        """
+        self.extractor = extractor
+        self.dest_dir = dest_dir
+        self.workers = workers
+        self.session_factory = session_factory
+        self.results = []
+        self._lock = threading.Lock()
+
+    def rotated(self, sftp, path: str) -> list:
+        """
+        The log and its rotated copies which may hold lines of the window, oldest first.
+
+        A file last modified before the window start only holds older lines.
+        """
+        directory, name = posixpath.split(path)
+        start = self.extractor.start.timestamp()
+        files = [attr for attr in sftp.listdir_attr(directory)
+                 if attr.filename == name or attr.filename.startswith(name + ".") or
+                 attr.filename.startswith(name + "-")]
+        files = [attr for attr in files if attr.st_mtime >= start]
+        return [(posixpath.join(directory, attr.filename), attr.st_size)
+                for attr in sorted(files, key=lambda attr: attr.st_mtime)]
+
+    def _extract_file(self, sftp, node: str, path: str, size: int, prefix: str) -> dict:
+        """Extract the window of one remote file to dest_dir."""
+        name = posixpath.basename(path)
+        compressed = name.endswith(".gz")
+        local = os.path.join(self.dest_dir, f"{prefix}{node}_{name[:-3] if compressed else name}")
+        with sftp.open(path, "rb") as fobj, open(local, "wb") as out:
+            if compressed:
+                stats = self.extractor.extract_gzip(fobj, size, out)
+            else:
+                stats = self.extractor.extract(fobj, size, out)
+        if not stats["lines"]:
+            os.remove(local)
+            local = None
+        return dict(stats, node=node, path=path, local=local)
+
+    def collect_node(self, node: str, username: str, password: str, paths: list,
+                     prefix: str = "") -> list:
+        """
+        Extract the window of logs of one node over a single SFTP session.
+
+        :param node: hostname of the node.
+        :param username: user name.
+        :param password: password.
+        :param paths: remote log paths, their rotated copies are included.
+        :param prefix: prefix of the local file names.
+        :return: list of per file statistics.
+        """
+        sftp, close = self.session_factory(node, username, password)
+        results = []
+        try:
+            for path in paths:
+                for remote, size in self.rotated(sftp, path):
+                    results.append(self._extract_file(sftp, node, remote, size, prefix))
+        finally:
+            close()
+        with self._lock:
+            self.results.extend(results)
+        return results
+
+    def collect(self, nodes: list, paths: list, prefix: str = "") -> dict:
+        """
+        Extract the window of logs of many nodes in parallel.
+
+        :param nodes: list of (hostname, username, password).
+        :param paths: remote log paths on every node.
+        :param prefix: prefix of the local file names.
+        :return: report of per file statistics and totals.
+        """
+        os.makedirs(self.dest_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(nodes)) or 1,
+                                thread_name_prefix="log_collect") as executor:
+            futures = [executor.submit(self.collect_node, node, username, password, paths,
+                                       prefix) for node, username, password in nodes]
+        files = [stats for future in futures for stats in future.result()]
+        return self.report(files)
+
+    @staticmethod
+    def report(files: list) -> dict:
+        """Totals of bytes transferred against file sizes."""
+        size = sum(stats["size"] for stats in files)
+        transferred = sum(stats["transferred"] for stats in files)
+        report = {"files": files, "size": size, "transferred": transferred,
+                  "written": sum(stats["written"] for stats in files),
+                  "saved_pct": 100.0 * (size - transferred) / size if size else 0.0}
+        LOGGER.info("Extracted %s lines from %s files: transferred %s of %s bytes, %.1f%% saved",
+                    sum(stats["lines"] for stats in files), len(files), transferred, size,
+                    report["saved_pct"])
+        return report
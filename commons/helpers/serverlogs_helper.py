@@ -19,8 +19,10 @@
 
 """ This helper file is used to collect logs from Nodes for the given time stamps """
 
+import os
 from datetime import datetime
 from commons.helpers import host
+from commons.helpers import log_extractor
 from commons.utils import config_utils
 
 fileconf_yaml = config_utils.read_yaml("config/serverlogs_helper.yaml")
@@ -36,120 +38,50 @@ class node_data:
         self.passwd = "seagate"
 
 def get_node_details(node_name):
-    node_obj = node_data
+    node_obj = node_data()
     node_obj.ip = fileconf["node_ip_dict"][node_name]
     node_obj.uname = fileconf['node_username']
     node_obj.passwd = fileconf['node_password']
     return node_obj
 
-def split_file_for_timestamp(st_time, end_time, filename, filepath, test_id):
-    # split file for give time stamps and create new file with test_id
-    # appended to it
-    path = "{}/{}".format(filepath, filename)
-    logfile = open(path, 'r')
-
-    newname = "{}_{}".format(test_id, filename)
-    newpath = "{}/{}".format(fileconf['log_destination'], newname)
-    newfile = open(newpath, 'w')
-
+def parse_log_time(timestamp):
     # timestamp format ('%b %#d %H:%M:%S') -> "Dec 12 16:06:01"
-    st_t = st_time.split()
-    en_t = end_time.split()
-    start_time = "{} {} {}".format(st_t[0], st_t[1], st_t[2])
-    end_time = "{} {} {}".format(en_t[0], en_t[1], en_t[2])
-
-    for line in logfile:
-        ls = line.split(' ')
-        # PLEASE CHECK TIMESTAMP IN LOG FILES FIRST, For every file it might be
-        # different
-        timestamp = "{} {} {}".format(ls[0], ls[1], ls[2])
-        if timestamp >= start_time and timestamp <= end_time:
-            newfile.write(line)
-
-    newfile.close()  # close it if done writing into it
-    logfile.close()
-
-    return newpath
-
-def process_and_copy_file(
-        st_time,
-        end_time,
-        file_name,
-        file_path,
-        localpath,
-        test_id,
-        sftp):
-    # Copy file from node to test client
-    nodepath = "{}/{}".format(file_path, file_name)
-    dest_path = "{}/{}".format(fileconf['log_destination'], file_name)
-    # @TODO - check sftp.get(), this call might be wrong
-    sftp.get(remotepath=nodepath, localpath=dest_path)
-
-    # 1. Fetch give file from node and Split file for given time stamp
-    newfilepath = split_file_for_timestamp(
-        st_time,
-        end_time,
-        file_name,
-        fileconf['log_destination'],
-        test_id)
-
-    # 2. Copy file from node to remote server <<< @TODO need new connection
-    # here !! MISSING !!!
-    logserver = fileconf['logserver']
-    lg_uname = fileconf['logserver_username']
-    lg_passwd = fileconf['logserver_password']
-    remote_path = fileconf['logserver_path']
-    filename = "{}_{}".format(test_id, file_name)
-    rm_path = "{}/{}".format(remote_path, filename)
+    return datetime.strptime(" ".join(timestamp.split()[:3]),
+                             "%b %d %H:%M:%S").replace(year=now.year)
 
+def upload_to_logserver(local_files):
+    # Copy extracted files to the log server over a single session
     hostobj = host.Host(
-        hostname=logserver,
-        username=lg_uname,
-        password=lg_passwd)
+        hostname=fileconf['logserver'],
+        username=fileconf['logserver_username'],
+        password=fileconf['logserver_password'])
     hostobj.connect()
     sftp = hostobj.host_obj.open_sftp()
-    sftp.put(localpath=newfilepath, remotepath=rm_path)
+    try:
+        for local_file in local_files:
+            rm_path = "{}/{}".format(fileconf['logserver_path'],
+                                     os.path.basename(local_file))
+            sftp.put(localpath=local_file, remotepath=rm_path)
+    finally:
+        sftp.close()
+        hostobj.disconnect()
 
 def collect_logs(st_time, end_time, file, node, test_id):
-    # error = False #@ TODO - error handling to be done, connection retry
-    # 1. Connect to node
-    node_det = get_node_details(node)
-    hostobj = host.Host(
-        hostname=node_det.ip,
-        username=node_det.uname,
-        password=node_det.passwd)
-    hostobj.connect()
-    sftp = hostobj.host_obj.open_sftp()
-    localpath = "{}_{}".format(fileconf['log_destination'], test_id)
-
-    if file is "all":
-        for fname in fileconf['file_list']:
-            file_name = "{}{}".format(file, fileconf['file_exention'])
-            file_path = fileconf['file_path_dict'][fname]
-            process_and_copy_file(
-                st_time,
-                end_time,
-                file_name,
-                file_path,
-                localpath,
-                test_id,
-                sftp)
-    else:
-        file_name = "{}{}".format(file, fileconf['file_exention'])
-        file_path = fileconf['file_path_dict'][file]
-        process_and_copy_file(
-            st_time,
-            end_time,
-            file_name,
-            file_path,
-            localpath,
-            test_id,
-            sftp)
-
-    # Close connection once all file transfers are done
-    sftp.close
-
-    # @TODO Error handling
+    # Extract the time window of the logs of the given nodes, only the
+    # byte range of the window is transferred, rotated logs are included
+    names = fileconf['file_list'] if file == "all" else [file]
+    paths = ["{}/{}{}".format(fileconf['file_path_dict'][name], name,
+                              fileconf['file_exention']) for name in names]
+    nodes = [(details.ip, details.uname, details.passwd) for details in
+             (get_node_details(node_name) for node_name in node)]
+    extractor = log_extractor.LogWindowExtractor(parse_log_time(st_time),
+                                                 parse_log_time(end_time))
+    collector = log_extractor.RemoteLogCollector(extractor,
+                                                 fileconf['log_destination'])
+    report = collector.collect(nodes, paths, prefix="{}_".format(test_id))
+    upload_to_logserver([stats["local"] for stats in report["files"]
+                         if stats["local"]])
+    return report
 
 def collect_logs_fromserver(
         st_time,
@@ -157,17 +89,6 @@ def collect_logs_fromserver(
         end_time=current_time,
         file_type='all',
         node='all'):
-    # Collect logs for all nodes
-
-    if node is 'all':
-        for node_name in fileconf['node_list']:
-            response = collect_logs(
-                st_time, end_time, file_type, node, test_suffix)
-    # collect from one node only
-    else:
-        response = collect_logs(
-            st_time,
-            end_time,
-            file_type,
-            node,
-            test_suffix)
+    # Collect logs for all nodes in parallel, or from one node only
+    nodes = fileconf['node_list'] if node == 'all' else [node]
+    return collect_logs(st_time, end_time, file_type, nodes, test_suffix)
@@ -20,28 +20,44 @@
 """ Module to configure s3 dns"""
 import threading
 
-import pytest
-
 from commons.utils import system_utils
+from commons.utils.endpoint_balancer import EndpointBalancer
+
+_LOCK = threading.Lock()
+_BALANCERS = {}
+
 
+def get_endpoint_balancer(setup_details, node_count: int = None, policy: str = None):
+    """
+    Balancer shared by every S3 and IAM client of the s3_dns names of a setup.
 
-def dns_rr_counter():
-    """Increments round robin global counter """
-    with threading.Lock():
-        pytest.dns_rr_counter += 1
-        return pytest.dns_rr_counter
+    :param setup_details: setup database
+    :param node_count: Number of nodes in cluster, all s3_dns names by default
+    :param policy: round_robin, least_outstanding or p2c, p2c by default
+    :return: EndpointBalancer
+    """
+    hosts = tuple(setup_details["s3_dns"][:node_count])
+    with _LOCK:
+        key = (hosts, policy)
+        if key not in _BALANCERS:
+            _BALANCERS[key] = EndpointBalancer(list(hosts), **({"policy": policy}
+                                                              if policy else {}))
+        return _BALANCERS[key]
 
 
 def dns_rr(S3_CFG, node_count, setup_details):
     """Method to configure s3 and iam_url
 
+    The node is chosen by the endpoint balancer of the setup, S3_CFG["endpoint_policy"]
+    selects its policy, round_robin by default.
     :param S3_CFG: S3 configure files
     :param node_count: Number of nodes in cluster
     :param setup_details: setup database
     :return: None
     """
-    node_index = dns_rr_counter()
-    counter = int(node_index) % node_count
+    balancer = get_endpoint_balancer(setup_details, node_count,
+                                     S3_CFG.get("endpoint_policy", "round_robin"))
+    counter = setup_details["s3_dns"].index(balancer.choose())
     res_url = system_utils.get_s3_url(setup_details, counter)
     if "s3_url" in S3_CFG.keys():
         S3_CFG["s3_url"] = res_url["s3_url"]
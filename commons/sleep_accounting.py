@@ -0,0 +1,146 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Pytest plugin accounting the time every test spends in time.sleep."""
+
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Sleeps inside these modules are charged to their caller.
+WRAPPER_MODULES = ("wait_utils.py", "sleep_accounting.py")
+
+
+class SleepAccounting:
+    """
+    Wraps time.sleep to record, per test and per call site, the seconds spent sleeping.
+
+    Sleeps of threads started by a test are charged to the running test, so the sleep total of
+    a test with parallel workers can exceed its duration.
+    """
+
+    def __init__(self, report_path: str = None, top: int = 20):
+        """
+        Initialize the plugin.
+
+        :param report_path: JSON report written at the end of the session
+        :param top: rows of the ranked terminal report
+        """
+        self.report_path = report_path
+        self.top = top
+        self.tests = {}
+        self.sites = {}
+        self.current = None
+        self._real_sleep = None
+        self._lock = threading.Lock()
+
+    def install(self) -> None:
+        """Replace time.sleep with the accounting wrapper."""
+        if self._real_sleep is None:
+            self._real_sleep = time.sleep
+            time.sleep = self.sleep
+
+    def uninstall(self) -> None:
+        """Restore time.sleep."""
+        if self._real_sleep is not None:
+            time.sleep = self._real_sleep
+            self._real_sleep = None
+
+    @staticmethod
+    def call_site() -> str:
+        """file:line (function) of the code that asked to sleep."""
+        frame = sys._getframe(2)  # pylint: disable=protected-access
+        while frame.f_back and os.path.basename(frame.f_code.co_filename) in WRAPPER_MODULES:
+            frame = frame.f_back
+        return "{}:{} ({})".format(os.path.relpath(frame.f_code.co_filename),
+                                   frame.f_lineno, frame.f_code.co_name)
+
+    def sleep(self, seconds: float) -> None:
+        """time.sleep replacement recording the time slept."""
+        site = self.call_site()
+        start = time.perf_counter()
+        try:
+            self._real_sleep(seconds)
+        finally:
+            slept = time.perf_counter() - start
+            with self._lock:
+                entry = self.sites.setdefault(site, {"seconds": 0.0, "count": 0})
+                entry["seconds"] += slept
+                entry["count"] += 1
+                if self.current in self.tests:
+                    record = self.tests[self.current]
+                    record["sleep"] += slept
+                    record["count"] += 1
+                    record["sites"][site] = record["sites"].get(site, 0.0) + slept
+
+    def pytest_configure(self, config):  # pylint: disable=unused-argument
+        """Start accounting."""
+        self.install()
+
+    def pytest_unconfigure(self, config):  # pylint: disable=unused-argument
+        """Stop accounting."""
+        self.uninstall()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):  # pylint: disable=unused-argument
+        """Charge the sleeps of setup, call and teardown to the test."""
+        with self._lock:
+            self.tests[item.nodeid] = {"sleep": 0.0, "count": 0, "duration": 0.0, "sites": {}}
+            self.current = item.nodeid
+        start = time.perf_counter()
+        yield
+        with self._lock:
+            self.tests[item.nodeid]["duration"] = time.perf_counter() - start
+            self.current = None
+
+    def report(self) -> dict:
+        """Tests and call sites ranked by seconds slept."""
+        with self._lock:
+            tests = sorted(({"nodeid": nodeid, "sleep": rec["sleep"], "count": rec["count"],
+                             "duration": rec["duration"],
+                             "work": max(rec["duration"] - rec["sleep"], 0.0),
+                             "sites": dict(sorted(rec["sites"].items(),
+                                                  key=lambda site: -site[1]))}
+                            for nodeid, rec in self.tests.items()),
+                           key=lambda test: -test["sleep"])
+            sites = sorted(({"site": site, **entry} for site, entry in self.sites.items()),
+                           key=lambda site: -site["seconds"])
+        return {"total_sleep": sum(test["sleep"] for test in tests),
+                "total_duration": sum(test["duration"] for test in tests),
+                "tests": tests, "sites": sites}
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """Print the worst sleepers and write the JSON report."""
+        report = self.report()
+        write = terminalreporter.write_line
+        terminalreporter.section("sleep accounting")
+        write(f"{report['total_sleep']:.1f}s of {report['total_duration']:.1f}s test time "
+              f"spent in time.sleep")
+        for test in report["tests"][:self.top]:
+            write(f"{test['sleep']:9.1f}s sleep {test['work']:9.1f}s work  {test['nodeid']}")
+        write("worst sleep call sites:")
+        for site in report["sites"][:self.top]:
+            write(f"{site['seconds']:9.1f}s {site['count']:6d}x  {site['site']}")
+        if self.report_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.report_path)), exist_ok=True)
+            with open(self.report_path, "w", encoding="utf-8") as report_file:
+                json.dump(report, report_file, indent=2)
+            write(f"sleep report written to {self.report_path}")
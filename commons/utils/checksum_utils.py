@@ -0,0 +1,267 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""In process checksum service: several digests per read pass, file pool and digest cache."""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+
+from commons import constants as const
+
+try:
+    import crc32c as crc32c_lib
+except ImportError:
+    crc32c_lib = None
+
+LOGGER = logging.getLogger(__name__)
+
+# Names used by the *sum tools and by calculate_checksum callers.
+ALGO_ALIASES = {"SHA-1": "sha1", "SHA-224": "sha224", "SHA-256": "sha256", "SHA-384": "sha384",
+                "SHA-512": "sha512", "MD5": "md5"}
+# A file modified this recently may change again within the timestamp granularity, its digest
+# is not cached.
+RACY_SECONDS = 2
+
+
+class _Crc:
+    """hashlib like wrapper of a running CRC."""
+
+    def __init__(self, func):
+        self.func = func
+        self.value = 0
+
+    def update(self, data) -> None:
+        """Add data to the CRC."""
+        self.value = self.func(data, self.value)
+
+    def digest(self) -> bytes:
+        """Big endian CRC bytes."""
+        return self.value.to_bytes(4, "big")
+
+    def hexdigest(self) -> str:
+        """CRC as 8 hex digits."""
+        return f"{self.value:08x}"
+
+
+def new_hasher(algo: str):
+    """
+    Hasher object of an algorithm.
+
+    :param algo: md5, sha1, sha224, sha256, sha384, sha512, crc32, crc32c or a *sum tool name.
+    :return: object with update, digest and hexdigest.
+    """
+    algo = ALGO_ALIASES.get(algo, algo).lower()
+    if algo == "crc32":
+        return _Crc(zlib.crc32)
+    if algo == "crc32c":
+        if crc32c_lib is None:
+            raise ValueError("crc32c needs the crc32c package")
+        return _Crc(crc32c_lib.crc32c)
+    if algo == "md5":
+        return hashlib.md5()  # nosec - checksums of test data.
+    if algo not in hashlib.algorithms_guaranteed:
+        raise ValueError(f"Unsupported checksum algorithm {algo}")
+    return hashlib.new(algo)
+
+
+def hash_file(path: str, algos: tuple = ("md5",), buf_size: int = const.CHECKSUM_BUFFER,
+              binary: bool = False) -> dict:
+    """
+    Digest a file in one read pass.
+
+    :param path: file to read.
+    :param algos: algorithms to compute.
+    :param buf_size: read buffer size, reused across reads.
+    :param binary: return digest bytes instead of hex strings.
+    :return: dict of algorithm to digest.
+    """
+    hashers = {algo: new_hasher(algo) for algo in algos}
+    with open(path, "rb", buffering=0) as file_obj:
+        buf = bytearray(min(buf_size, os.fstat(file_obj.fileno()).st_size or 1))
+        view = memoryview(buf)
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(file_obj.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while True:
+            size = file_obj.readinto(buf)
+            if not size:
+                break
+            for hasher in hashers.values():
+                hasher.update(view[:size])
+    return {algo: hasher.digest() if binary else hasher.hexdigest()
+            for algo, hasher in hashers.items()}
+
+
+def hash_stream(stream, algos: tuple = ("md5",), buf_size: int = const.CHECKSUM_BUFFER) -> dict:
+    """
+    Digest a readable stream, such as a botocore StreamingBody, in one pass.
+
+    :param stream: object with a read(amt) method.
+    :param algos: algorithms to compute.
+    :param buf_size: bytes read per call.
+    :return: dict of algorithm to hex digest.
+    """
+    hashers = {algo: new_hasher(algo) for algo in algos}
+    for chunk in iter(lambda: stream.read(buf_size), b""):
+        for hasher in hashers.values():
+            hasher.update(chunk)
+    return {algo: hasher.hexdigest() for algo, hasher in hashers.items()}
+
+
+def _hash_files(paths: list, algos: tuple, buf_size: int) -> list:
+    """Digest a batch of files, run by pool workers."""
+    return [hash_file(path, algos, buf_size) for path in paths]
+
+
+class ChecksumService:
+    """
+    Digest files in process with a cache keyed by device, inode, size and change times.
+
+    Several files are digested in parallel by a process pool, small files are sent to the
+    workers in batches so per file overhead stays low.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, workers: int = None, buf_size: int = const.CHECKSUM_BUFFER,
+                 cache_size: int = 10000, processes: bool = True, batch_bytes: int = 64 << 20):
+        """
+        Initialize the service.
+
+        :param workers: parallel workers, defaults to the CPU count.
+        :param buf_size: read buffer size.
+        :param cache_size: digests kept in the cache, 0 disables it.
+        :param processes: use a process pool, threads otherwise.
+        :param batch_bytes: file bytes sent to a worker in one batch.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.buf_size = buf_size
+        self.cache_size = cache_size
+        self.processes = processes
+        self.batch_bytes = batch_bytes
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat_key(path: str) -> tuple:
+        """Identity of the file content as far as stat can tell."""
+        stat = os.stat(path)
+        return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns
+
+    def _lookup(self, key: tuple, algos: tuple):
+        """Cached digests of every algorithm, None on a miss."""
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and all(algo in cached for algo in algos):
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return {algo: cached[algo] for algo in algos}
+            self.misses += 1
+        return None
+
+    def _store(self, key: tuple, digests: dict) -> None:
+        """Cache digests unless the file was modified too recently to trust its mtime."""
+        if not self.cache_size or time.time() - max(key[3], key[4]) / 1e9 < RACY_SECONDS:
+            return
+        with self._lock:
+            self._cache.setdefault(key, {}).update(digests)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def digest(self, path: str, algos: tuple = ("md5",)) -> dict:
+        """
+        Digests of one file.
+
+        :param path: file to digest.
+        :param algos: algorithms to compute in the same pass.
+        :return: dict of algorithm to hex digest.
+        """
+        key = self._stat_key(path)
+        digests = self._lookup(key, algos)
+        if digests is None:
+            digests = hash_file(path, algos, self.buf_size)
+            self._store(key, digests)
+        return digests
+
+    def _batches(self, todo: list) -> list:
+        """Group (path, size) pairs into batches of about batch_bytes."""
+        batches, batch, size = [], [], 0
+        for path, file_size in todo:
+            batch.append(path)
+            size += file_size
+            if size >= self.batch_bytes:
+                batches.append(batch)
+                batch, size = [], 0
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def digest_files(self, paths: list, algos: tuple = ("md5",)) -> dict:
+        """
+        Digests of many files, in parallel.
+
+        :param paths: files to digest.
+        :param algos: algorithms to compute in the same pass.
+        :return: dict of path to dict of algorithm to hex digest.
+        """
+        results, keys, todo = {}, {}, []
+        for path in paths:
+            keys[path] = self._stat_key(path)
+            cached = self._lookup(keys[path], algos)
+            if cached is None:
+                todo.append((path, keys[path][2]))
+            else:
+                results[path] = cached
+        if len(todo) == 1 or self.workers == 1:
+            computed = _hash_files([path for path, _ in todo], algos, self.buf_size)
+            digests = zip([path for path, _ in todo], computed)
+        elif todo:
+            batches = self._batches(todo)
+            workers = min(self.workers, len(batches))
+            # Spawned workers, forking a process running threads can deadlock on held locks
+            executor = ProcessPoolExecutor(max_workers=workers,
+                                           mp_context=multiprocessing.get_context("spawn")) \
+                if self.processes else ThreadPoolExecutor(max_workers=workers)
+            with executor:
+                computed = executor.map(_hash_files, batches, [algos] * len(batches),
+                                        [self.buf_size] * len(batches))
+                digests = list(zip([path for batch in batches for path in batch],
+                                   [digest for batch in computed for digest in batch]))
+        else:
+            digests = []
+        for path, digest in digests:
+            self._store(keys[path], digest)
+            results[path] = digest
+        return {path: results[path] for path in paths}
+
+    def stats(self) -> dict:
+        """Cache hits, misses and size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "cached": len(self._cache)}
+
+
+CHECKSUM_SERVICE = ChecksumService()
@@ -0,0 +1,263 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Client side, latency aware selection of the S3 and IAM endpoint of every request."""
+
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+
+LOGGER = logging.getLogger(__name__)
+
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+POWER_OF_TWO = "p2c"
+POLICIES = (ROUND_ROBIN, LEAST_OUTSTANDING, POWER_OF_TWO)
+# Context key of the endpoint serving a botocore request attempt.
+CONTEXT_KEY = "endpoint_balancer"
+
+_BALANCERS = weakref.WeakSet()
+
+
+def _reset_after_fork() -> None:
+    """Give every balancer of a forked child its own lock and counters."""
+    for balancer in list(_BALANCERS):
+        balancer.reset_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class EndpointStats:
+    """Request counters, in flight requests, latency and error rate of one endpoint."""
+
+    def __init__(self, host: str):
+        """
+        Initialize the statistics.
+
+        :param host: endpoint host, optionally with a port.
+        """
+        self.host = host
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0
+        self.ewma = None
+        self.error_rate = 0.0
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+    def cost(self, penalty: float) -> float:
+        """Expected wait of a new request: latency times queued requests, errors penalized."""
+        return (self.ewma or 0.0) * (self.in_flight + 1) * (1 + penalty * self.error_rate)
+
+    def as_dict(self, now: float) -> dict:
+        """Statistics as a dict."""
+        return {"host": self.host, "requests": self.requests, "errors": self.errors,
+                "in_flight": self.in_flight, "error_rate": round(self.error_rate, 4),
+                "ewma_ms": round(self.ewma * 1000, 3) if self.ewma is not None else None,
+                "ejected": self.ejected_until > now, "ejections": self.ejections}
+
+
+class EndpointBalancer:
+    """
+    Choose an endpoint per request among the nodes of a cluster.
+
+    Every request attempt is accounted to its endpoint: in flight requests, an exponentially
+    weighted moving average of the latency and of the error rate. An endpoint failing
+    eject_after times in a row is left out for eject_seconds. A boto3 client attached with
+    attach() gets the endpoint of every request, retries included, rewritten before signing.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, hosts: list, policy: str = POWER_OF_TWO, alpha: float = 0.3,
+                 eject_after: int = 3, eject_seconds: float = 30.0,
+                 error_penalty: float = 10.0):
+        """
+        Initialize the balancer.
+
+        :param hosts: endpoint hosts such as the s3_dns names of the nodes, "host[:port]".
+        :param policy: round_robin, least_outstanding or p2c, power of two random choices.
+        :param alpha: weight of the last sample in the latency and error rate averages.
+        :param eject_after: consecutive failures ejecting an endpoint.
+        :param eject_seconds: time an ejected endpoint receives no requests.
+        :param error_penalty: cost multiplier of an endpoint failing every request.
+        """
+        if not hosts:
+            raise ValueError("EndpointBalancer needs at least one host")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy}, expected one of {POLICIES}")
+        self.policy = policy
+        self.alpha = alpha
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self.error_penalty = error_penalty
+        self.endpoints = [EndpointStats(host) for host in dict.fromkeys(hosts)]
+        self._next = 0
+        self._lock = threading.Lock()
+        self._random = random.Random()  # nosec - load spreading, not security.
+        _BALANCERS.add(self)
+
+    def reset_after_fork(self) -> None:
+        """Drop the lock and the in flight requests inherited from the parent process."""
+        self._lock = threading.Lock()
+        self._random.seed()
+        for endpoint in self.endpoints:
+            endpoint.in_flight = 0
+
+    def _candidates(self, now: float) -> list:
+        """Endpoints not ejected, every endpoint when all of them are."""
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.ejected_until <= now]
+        return healthy or self.endpoints
+
+    def _choose(self, now: float) -> EndpointStats:
+        """Endpoint of the next request by policy, called with the lock held."""
+        candidates = self._candidates(now)
+        if self.policy == ROUND_ROBIN or len(candidates) == 1:
+            self._next += 1
+            return candidates[self._next % len(candidates)]
+        if self.policy == LEAST_OUTSTANDING:
+            return min(candidates, key=lambda endpoint: (endpoint.in_flight,
+                                                         endpoint.cost(self.error_penalty),
+                                                         self._random.random()))
+        first, second = self._random.sample(candidates, 2)
+        return min(first, second, key=lambda endpoint: endpoint.cost(self.error_penalty))
+
+    def choose(self) -> str:
+        """Host of the next request, not accounted as in flight."""
+        with self._lock:
+            return self._choose(time.monotonic()).host
+
+    def acquire(self) -> tuple:
+        """
+        Choose the endpoint of a request and account it as in flight.
+
+        :return: token to give to release() once the request completes.
+        """
+        now = time.monotonic()
+        with self._lock:
+            endpoint = self._choose(now)
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+        return endpoint, now, os.getpid()
+
+    def release(self, token: tuple, success: bool = True) -> None:
+        """
+        Account a completed request.
+
+        :param token: value returned by acquire().
+        :param success: False for connection errors and server side failures.
+        """
+        endpoint, start, pid = token
+        now = time.monotonic()
+        latency = now - start
+        with self._lock:
+            if pid == os.getpid():
+                endpoint.in_flight = max(endpoint.in_flight - 1, 0)
+            endpoint.error_rate += self.alpha * ((not success) - endpoint.error_rate)
+            if success:
+                endpoint.failures = 0
+                endpoint.ewma = latency if endpoint.ewma is None else \
+                    endpoint.ewma + self.alpha * (latency - endpoint.ewma)
+                return
+            endpoint.errors += 1
+            endpoint.failures += 1
+            if endpoint.failures >= self.eject_after and endpoint.ejected_until <= now:
+                endpoint.ejected_until = now + self.eject_seconds
+                endpoint.ejections += 1
+                LOGGER.warning("Ejecting endpoint %s for %ss after %s failures", endpoint.host,
+                               self.eject_seconds, endpoint.failures)
+
+    @staticmethod
+    def replace_host(url: str, base_host: str, host: str) -> str:
+        """
+        Point a URL to another endpoint.
+
+        :param url: request URL.
+        :param base_host: host the client was created with, kept as suffix of virtual host
+            style bucket names.
+        :param host: endpoint "host[:port]", the port of the URL is kept when it has none.
+        """
+        parts = urlsplit(url)
+        hostname, port = host.partition(":")[::2]
+        if parts.hostname != base_host and (parts.hostname or "").endswith("." + base_host):
+            hostname = parts.hostname[:-len(base_host)] + hostname
+        port = port or (str(parts.port) if parts.port else "")
+        return urlunsplit(parts._replace(netloc=f"{hostname}:{port}" if port else hostname))
+
+    def attach(self, client):
+        """
+        Route every request of a boto3 client through the balancer.
+
+        :param client: boto3 client, or resource whose meta.client is used.
+        :return: the client.
+        """
+        client = getattr(client.meta, "client", client)
+        base_host = urlsplit(client.meta.endpoint_url).hostname
+
+        def before_sign(request, **_):
+            context = request.context
+            if context.get("is_presign_request"):
+                return
+            token = self.acquire()
+            context[CONTEXT_KEY] = token
+            request.url = self.replace_host(request.url, base_host, token[0].host)
+
+        def response_received(context, response_dict=None, exception=None, **_):
+            token = context.pop(CONTEXT_KEY, None)
+            if token is not None:
+                status = response_dict.get("status_code", 0) if response_dict else 0
+                self.release(token, exception is None and status < 500)
+
+        client.meta.events.register("before-sign", before_sign,
+                                    unique_id=f"{CONTEXT_KEY}-sign-{id(self)}")
+        client.meta.events.register("response-received", response_received,
+                                    unique_id=f"{CONTEXT_KEY}-response-{id(self)}")
+        return client
+
+    def stats(self) -> list:
+        """Per endpoint statistics."""
+        now = time.monotonic()
+        with self._lock:
+            return [endpoint.as_dict(now) for endpoint in self.endpoints]
+
+    def distribution(self) -> dict:
+        """
+        Share of the requests served by every endpoint and the hot spot ratio.
+
+        :return: dict with per host request percentages and the ratio of the busiest
+            endpoint requests to the mean, 1.0 when perfectly even.
+        """
+        stats = self.stats()
+        total = sum(endpoint["requests"] for endpoint in stats)
+        mean = total / len(stats)
+        report = {"requests": total,
+                  "share_pct": {endpoint["host"]: 100.0 * endpoint["requests"] / total
+                                if total else 0.0 for endpoint in stats},
+                  "hot_spot_ratio": max(endpoint["requests"] for endpoint in stats) / mean
+                  if total else 0.0}
+        LOGGER.info("Endpoint distribution of %s requests: %s, hot spot ratio %.2f", total,
+                    {host: round(pct, 1) for host, pct in report["share_pct"].items()},
+                    report["hot_spot_ratio"])
+        return report
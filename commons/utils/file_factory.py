@@ -0,0 +1,268 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""In process test file factory backed by a content addressed session cache."""
+
+import errno
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+
+from cryptography.hazmat.primitives.ciphers import Cipher
+from cryptography.hazmat.primitives.ciphers import algorithms
+from cryptography.hazmat.primitives.ciphers import modes
+
+from commons import constants as const
+from commons import params
+
+LOGGER = logging.getLogger(__name__)
+
+PATTERNS = ("random", "zero")
+CHUNK_SIZE = 8 * 1024 * 1024
+FILE_FACTORY = None
+# md5 states after every CHUNK_SIZE bytes of zeros, shared by all zero file sizes
+ZERO_MD5 = [hashlib.md5()]
+ZERO_MD5_LOCK = threading.Lock()
+# ioctl cloning a file on copy on write file systems (btrfs, xfs)
+FICLONE = 0x40049409
+
+
+def random_chunks(size: int, seed: int = None, chunk_size: int = CHUNK_SIZE):
+    """
+    Yield size bytes of pseudo random data, AES-CTR keystream of the seed.
+
+    :param size: bytes to generate
+    :param seed: same seed gives the same data, None gives unique data
+    :param chunk_size: bytes per chunk
+    """
+    key = os.urandom(16) if seed is None else hashlib.md5(str(seed).encode()).digest()
+    encryptor = Cipher(algorithms.AES(key), modes.CTR(bytes(16))).encryptor()
+    zeros = bytes(chunk_size)
+    while size > 0:
+        chunk = encryptor.update(zeros[:min(size, chunk_size)])
+        size -= len(chunk)
+        yield chunk
+
+
+def zero_md5(size: int) -> str:
+    """
+    md5 hexdigest of size zero bytes, resumed from the largest hashed prefix.
+
+    :param size: number of zero bytes
+    """
+    full, rest = divmod(size, CHUNK_SIZE)
+    with ZERO_MD5_LOCK:
+        if len(ZERO_MD5) <= full:
+            zeros = bytes(CHUNK_SIZE)
+            while len(ZERO_MD5) <= full:
+                checksum = ZERO_MD5[-1].copy()
+                checksum.update(zeros)
+                ZERO_MD5.append(checksum)
+        checksum = ZERO_MD5[full].copy()
+    checksum.update(bytes(rest))
+    return checksum.hexdigest()
+
+
+def clone_file(src: str, dst: str) -> None:
+    """
+    Private writable copy of src, a reflink where the file system supports it.
+
+    :param src: source file
+    :param dst: destination file, created
+    """
+    with open(src, "rb") as in_file, open(dst, "wb") as out_file:
+        try:
+            fcntl.ioctl(out_file.fileno(), FICLONE, in_file.fileno())
+            return
+        except OSError as error:
+            if error.errno not in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL,
+                                   errno.EPERM):
+                raise
+        shutil.copyfileobj(in_file, out_file, CHUNK_SIZE)
+
+
+def write_file(fpath: str, size: int, seed: int = None, pattern: str = "random") -> str:
+    """
+    Write a random or sparse zero file.
+
+    :param fpath: file path
+    :param size: size in bytes
+    :param seed: seed of random data, None gives unique data
+    :param pattern: random or zero
+    :return: md5 hexdigest of the content
+    """
+    with open(fpath, "wb") as out_file:
+        if pattern == "zero":
+            out_file.truncate(size)
+            return zero_md5(size)
+        checksum = hashlib.md5()
+        for chunk in random_chunks(size, seed):
+            out_file.write(chunk)
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+class FileFactory:
+    """
+    Create test files in process and cache them by (size, seed, pattern).
+
+    Cached files are made read only and handed out as private reflinks, or copies where the file
+    system can not clone. Zero files are written sparse in place. An entry whose size or mtime
+    changed is regenerated. The least recently used entries are evicted beyond the disk budget.
+    """
+
+    def __init__(self, cache_dir: str, budget: int = const.FILE_CACHE_BUDGET):
+        """
+        Initialize the factory.
+
+        :param cache_dir: directory of the cached files
+        :param budget: bytes of disk the cached files may use
+        """
+        self.cache_dir = cache_dir
+        self.budget = budget
+        self.entries = {}
+        self.counters = {"hits": 0, "misses": 0, "generated_bytes": 0, "evictions": 0,
+                         "generate_seconds": 0.0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(size: int, seed: int, pattern: str) -> str:
+        """Cache file name of a content."""
+        if pattern not in PATTERNS:
+            raise ValueError(f"Unsupported pattern {pattern}, expected one of {PATTERNS}")
+        return f"{pattern}-{size}-{seed}" if pattern == "random" else f"{pattern}-{size}"
+
+    @staticmethod
+    def disk_usage(path: str) -> int:
+        """Bytes of disk used by a file, sparse files only count written blocks."""
+        return os.stat(path).st_blocks * 512
+
+    def _valid(self, name: str):
+        """Checksum of an unchanged cache entry, None if missing or modified."""
+        path = os.path.join(self.cache_dir, name)
+        entry = self.entries.get(name)
+        if entry is None:
+            try:
+                with open(path + ".md5", encoding="utf-8") as sidecar:
+                    checksum, size, mtime = sidecar.read().split()
+                entry = {"checksum": checksum, "size": int(size), "mtime": int(mtime)}
+            except (OSError, ValueError):
+                return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if (stat.st_size, stat.st_mtime_ns) != (entry["size"], entry["mtime"]):
+            LOGGER.warning("Cached file %s was modified, regenerating it", path)
+            return None
+        entry["used"] = time.monotonic()
+        self.entries[name] = entry
+        return entry["checksum"]
+
+    def get(self, size: int, seed: int = 0, pattern: str = "random") -> tuple:
+        """
+        Read only cached file of the content, generated on first use.
+
+        :param size: size in bytes
+        :param seed: seed of random data
+        :param pattern: random or zero
+        :return: cached file path, md5 hexdigest
+        """
+        name = self.key(size, seed, pattern)
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            checksum = self._valid(name)
+            if checksum:
+                self.counters["hits"] += 1
+                return path, checksum
+            self.counters["misses"] += 1
+            self._evict(size if pattern == "random" else 0)
+            start = time.perf_counter()
+            part = f"{path}.{os.getpid()}.part"
+            checksum = write_file(part, size, seed, pattern)
+            os.chmod(part, 0o444)
+            stat = os.stat(part)
+            with open(part + ".md5", "w", encoding="utf-8") as sidecar:
+                sidecar.write(f"{checksum} {stat.st_size} {stat.st_mtime_ns}")
+            os.replace(part + ".md5", path + ".md5")
+            os.replace(part, path)
+            self.entries[name] = {"checksum": checksum, "size": stat.st_size,
+                                  "mtime": stat.st_mtime_ns, "used": time.monotonic()}
+            self.counters["generated_bytes"] += size
+            self.counters["generate_seconds"] += time.perf_counter() - start
+        return path, checksum
+
+    def create(self, fpath: str, size: int, seed: int = 0, pattern: str = "random") -> tuple:
+        """
+        Place a private writable file of the content at fpath.
+
+        :param fpath: destination path, replaced if it exists
+        :param size: size in bytes
+        :param seed: seed of random data, None writes unique uncached data
+        :param pattern: random or zero
+        :return: fpath, md5 hexdigest
+        """
+        if os.path.lexists(fpath):
+            os.remove(fpath)
+        if pattern == "zero" or seed is None:
+            self.key(size, seed, pattern)  # rejects unknown patterns
+            return fpath, write_file(fpath, size, seed, pattern)
+        path, checksum = self.get(size, seed, pattern)
+        clone_file(path, fpath)
+        return fpath, checksum
+
+    def _evict(self, incoming: int) -> None:
+        """Remove least recently used entries until incoming bytes fit the budget."""
+        usage = {}
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if not name.endswith((".md5", ".part")) and os.path.isfile(path):
+                usage[name] = self.disk_usage(path)
+        used = sum(usage.values())
+        for name in sorted(usage, key=lambda name: self.entries.get(name, {}).get("used", 0)):
+            if used + incoming <= self.budget:
+                break
+            path = os.path.join(self.cache_dir, name)
+            for stale in (path, path + ".md5"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            self.entries.pop(name, None)
+            used -= usage[name]
+            self.counters["evictions"] += 1
+            LOGGER.debug("Evicted %s from the file cache", name)
+
+    def stats(self) -> dict:
+        """Cache counters and disk usage."""
+        with self._lock:
+            return dict(self.counters, entries=len(self.entries),
+                        disk_usage=sum(self.disk_usage(os.path.join(self.cache_dir, name))
+                                       for name in self.entries
+                                       if os.path.exists(os.path.join(self.cache_dir, name))))
+
+
+def get_file_factory() -> FileFactory:
+    """Session file factory caching under the log directory."""
+    global FILE_FACTORY  # pylint: disable=global-statement
+    if FILE_FACTORY is None:
+        FILE_FACTORY = FileFactory(os.path.join(params.LOG_DIR, "FileCache"))
+    return FILE_FACTORY
@@ -0,0 +1,125 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Session wide cache of the cluster health verdict used by the per test health check."""
+
+import logging
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+
+class HealthOracle:
+    """
+    Caches the last healthy verdict for a TTL and the last storage occupancy.
+
+    The verdict is dropped after tests that disrupt the cluster (destructive marks) or fail,
+    storage is re-checked only when the last occupancy was close to the threshold, unknown or
+    older than storage_ttl.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, health_check, storage_check, ttl: float = 300,
+                 storage_threshold: float = 98.0, storage_margin: float = 5.0,
+                 storage_ttl: float = 3600, destructive_marks: tuple = ()):
+        """
+        Initialize the oracle.
+
+        :param health_check: callable raising AssertionError when the cluster is unhealthy
+        :param storage_check: callable asserting the occupancy and returning the used percent
+        :param ttl: seconds a healthy verdict is trusted, 0 checks before every test
+        :param storage_threshold: used percent considered full
+        :param storage_margin: storage is re-checked when within this percent of the threshold
+        :param storage_ttl: seconds the last occupancy is trusted
+        :param destructive_marks: test marks invalidating the verdict
+        """
+        self.health_check = health_check
+        self.storage_check = storage_check
+        self.ttl = ttl
+        self.storage_threshold = storage_threshold
+        self.storage_margin = storage_margin
+        self.storage_ttl = storage_ttl
+        self.destructive_marks = set(destructive_marks)
+        self.healthy_at = None
+        self.used_percent = None
+        self.storage_at = None
+        self.counters = {"performed": 0, "skipped": 0, "storage_performed": 0,
+                         "storage_skipped": 0, "invalidated": 0, "seconds": 0.0}
+
+    def invalidate(self, reason: str = None) -> None:
+        """Forget the cached verdict and occupancy."""
+        if self.healthy_at is not None:
+            LOGGER.info("Health verdict invalidated: %s", reason)
+            self.counters["invalidated"] += 1
+        self.healthy_at = None
+        self.storage_at = None
+
+    def observe(self, marks, failed: bool = False) -> None:
+        """
+        Invalidate the verdict after a destructive or failed test.
+
+        :param marks: names of the marks of the finished test
+        :param failed: whether the test failed
+        """
+        destructive = self.destructive_marks.intersection(marks)
+        if destructive or failed:
+            self.invalidate(f"destructive marks {sorted(destructive)}" if destructive else
+                            "test failed")
+
+    def _storage_due(self, now: float) -> bool:
+        """Whether the storage occupancy has to be checked again."""
+        if self.used_percent is None or self.storage_at is None:
+            return True
+        if now - self.storage_at >= self.storage_ttl:
+            return True
+        return self.used_percent >= self.storage_threshold - self.storage_margin
+
+    def check(self) -> bool:
+        """
+        Check the cluster health unless the cached verdict is still fresh.
+
+        Health failures are raised, storage failures are logged as before.
+        :return: True if a check was performed, False if the cached verdict was used
+        """
+        now = time.monotonic()
+        if self.healthy_at is not None and now - self.healthy_at < self.ttl:
+            self.counters["skipped"] += 1
+            LOGGER.debug("Using cached healthy verdict from %.0fs ago", now - self.healthy_at)
+            return False
+        start = time.perf_counter()
+        self.counters["performed"] += 1
+        try:
+            self.health_check()
+            self.healthy_at = time.monotonic()
+            if self._storage_due(now):
+                self.counters["storage_performed"] += 1
+                try:
+                    self.used_percent = self.storage_check()
+                    self.storage_at = time.monotonic()
+                except (AssertionError, Exception) as fault:  # pylint: disable=broad-except
+                    LOGGER.error("Cluster Storage %s", fault)
+                    self.used_percent = None
+            else:
+                self.counters["storage_skipped"] += 1
+        finally:
+            self.counters["seconds"] += time.perf_counter() - start
+        return True
+
+    def stats(self) -> dict:
+        """Counters of checks performed and skipped and the seconds spent checking."""
+        return dict(self.counters, used_percent=self.used_percent)
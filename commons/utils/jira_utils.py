@@ -278,6 +278,26 @@ class JiraTask:
                                     params=None)
         return response
 
+    def update_test_jira_statuses(self, test_exe_id, statuses):
+        """
+        Update status of many tests of a test execution in one xray import request.
+        :param test_exe_id: test execution ID
+        :param statuses: list of (test_id, test_status, log_path)
+        """
+        now = datetime.datetime.now().astimezone().isoformat(timespec='seconds')
+        tests = []
+        for test_id, test_status, log_path in statuses:
+            if test_status.upper() == 'EXECUTING':
+                tests.append({"testKey": test_id, "status": test_status, "start": now})
+            else:
+                tests.append({"testKey": test_id, "status": test_status, "finish": now,
+                              "comment": log_path})
+        data = json.dumps({"testExecutionKey": test_exe_id, "tests": tests})
+        jira_url = self.jira_url + "/rest/raven/1.0/import/execution"
+        return self.http.request("POST", jira_url, data=data,
+                                 auth=(self.jira_id, self.jira_password),
+                                 headers=self.headers)
+
     def get_test_details(self, test_exe_id: str) -> list:
         """
         Get details of the test cases in a test execution ticket.
@@ -0,0 +1,239 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Background service shipping finished test logs in compressed per run batch archives."""
+
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+from collections import deque
+from collections import namedtuple
+
+from commons.utils.perf_utils import latency_stats
+
+LOGGER = logging.getLogger(__name__)
+
+ShipItem = namedtuple("ShipItem", ["local_path", "arcname", "remove", "queued_at"])
+
+
+class LogShipper:
+    """
+    Queue logs and ship them from a background thread.
+
+    Logs are grouped into batches of batch_size or batch_seconds, each batch is written as one
+    tar.gz archive under target_dir/run_path. The archive of a log is known when it is queued,
+    so its URL is returned right away while the copy happens off the test critical path.
+    """
+
+    # pylint: disable=too-many-instance-attributes, too-many-arguments
+    def __init__(self, target_dir: str, run_path: str = "", url_prefix: str = None,
+                 mount=None, fallback_dir: str = None, batch_size: int = 50,
+                 batch_seconds: float = 30.0, max_retries: int = 5, backoff: float = 1.0):
+        """
+        Initialize the shipper.
+
+        :param target_dir: directory the archives are shipped to, e.g. the NFS mount point
+        :param run_path: directory of the run archives relative to target_dir
+        :param url_prefix: prefix of the returned log URLs, defaults to target_dir
+        :param mount: callable returning (bool, response), run before every transfer attempt
+        :param fallback_dir: local directory used once all transfer retries failed
+        :param batch_size: logs per archive
+        :param batch_seconds: seconds a partial batch waits for more logs
+        :param max_retries: transfer retries of an archive
+        :param backoff: initial retry delay in seconds, doubled per retry
+        """
+        self.target_dir = target_dir
+        self.run_path = run_path
+        self.url_prefix = url_prefix or target_dir
+        self.mount = mount
+        self.fallback_dir = fallback_dir
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.counters = {"queued": 0, "shipped": 0, "batches": 0, "bytes_shipped": 0,
+                         "retries": 0, "failed_batches": 0}
+        self.latencies = []
+        self._batches = deque()
+        self._next_seq = 0
+        self._done_seq = -1
+        self._flush = False
+        self._stop = False
+        self._cond = threading.Condition()
+        self._staging = tempfile.mkdtemp(prefix="log_shipper_")
+        self._thread = None
+
+    def archive_name(self, seq: int) -> str:
+        """Name of the archive of a batch."""
+        return f"batch-{seq:05d}.tar.gz"
+
+    def start(self):
+        """Start the shipping thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="log_shipper", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, local_path: str, remote_path: str = "", remove: bool = False) -> str:
+        """
+        Queue a log file or directory without blocking.
+
+        :param local_path: file or directory to ship
+        :param remote_path: directory of the log inside the archive
+        :param remove: delete the local file once shipped
+        :return: URL of the log, <archive>#<member>
+        """
+        arcname = os.path.join(remote_path, os.path.basename(local_path.rstrip(os.sep)))
+        with self._cond:
+            if not self._batches or len(self._batches[-1][2]) >= self.batch_size:
+                self._batches.append((self._next_seq, time.monotonic(), []))
+                self._next_seq += 1
+            seq, _, items = self._batches[-1]
+            items.append(ShipItem(local_path, arcname, remove, time.monotonic()))
+            self.counters["queued"] += 1
+            self._cond.notify_all()
+        self.start()
+        return "{}#{}".format(os.path.join(self.url_prefix, self.run_path,
+                                           self.archive_name(seq)), arcname)
+
+    def _next_batch(self):
+        """Wait for a full, expired or flushed batch, None once stopped and drained."""
+        with self._cond:
+            while True:
+                if self._batches:
+                    seq, opened_at, items = self._batches[0]
+                    age = time.monotonic() - opened_at
+                    if self._flush or self._stop or len(self._batches) > 1 or \
+                            len(items) >= self.batch_size or age >= self.batch_seconds:
+                        self._batches.popleft()
+                        return seq, items
+                elif self._stop:
+                    return None
+                else:
+                    self._flush = False
+                self._cond.wait(self.batch_seconds - age if self._batches else None)
+
+    def _run(self):
+        """Ship batches until stopped."""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._ship(*batch)
+            except Exception as error:  # pylint: disable=broad-except
+                LOGGER.exception("Shipping batch %s failed: %s", batch[0], error)
+                self.counters["failed_batches"] += 1
+            with self._cond:
+                self._done_seq = batch[0]
+                self._cond.notify_all()
+
+    def _transfer(self, archive: str, dest_dir: str) -> None:
+        """Copy the archive atomically into dest_dir."""
+        os.makedirs(dest_dir, exist_ok=True)
+        name = os.path.basename(archive)
+        part = os.path.join(dest_dir, f".{name}.part")
+        shutil.copyfile(archive, part)
+        os.replace(part, os.path.join(dest_dir, name))
+
+    def _ship(self, seq: int, batch: list) -> None:
+        """Archive a batch and transfer it with retries, falling back to fallback_dir."""
+        archive = os.path.join(self._staging, self.archive_name(seq))
+        with tarfile.open(archive, "w:gz", compresslevel=6) as tar:
+            for item in batch:
+                if os.path.exists(item.local_path):
+                    tar.add(item.local_path, arcname=item.arcname)
+                else:
+                    LOGGER.warning("Log %s vanished before shipping", item.local_path)
+        size = os.path.getsize(archive)
+        shipped = False
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self.mount:
+                    resp = self.mount()
+                    if not resp[0]:
+                        raise OSError(f"Mount failed: {resp[1]}")
+                self._transfer(archive, os.path.join(self.target_dir, self.run_path))
+                shipped = True
+                break
+            except OSError as error:
+                LOGGER.warning("Shipping %s attempt %s failed: %s", archive, attempt + 1, error)
+                if attempt < self.max_retries:
+                    self.counters["retries"] += 1
+                    time.sleep(self.backoff * 2 ** attempt)
+        if not shipped:
+            self.counters["failed_batches"] += 1
+            if self.fallback_dir:
+                LOGGER.error("Keeping %s in %s", archive, self.fallback_dir)
+                self._transfer(archive, os.path.join(self.fallback_dir, self.run_path))
+        os.remove(archive)
+        now = time.monotonic()
+        with self._cond:
+            self.counters["batches"] += 1
+            if shipped:
+                self.counters["shipped"] += len(batch)
+                self.counters["bytes_shipped"] += size
+            self.latencies.extend(now - item.queued_at for item in batch)
+        for item in batch:
+            if item.remove and os.path.isfile(item.local_path):
+                os.remove(item.local_path)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Ship the queued logs now and wait for them.
+
+        :param timeout: seconds to wait at most, None waits until shipped
+        :return: True if every queued log was handled
+        """
+        with self._cond:
+            target = self._next_seq - 1
+            self._flush = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._done_seq >= target, timeout)
+
+    def close(self, timeout: float = None) -> dict:
+        """
+        Ship the queued logs and stop the thread.
+
+        :param timeout: seconds to wait at most, the thread is left shipping on timeout
+        :return: shipping statistics
+        """
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+        stats = self.stats()
+        if self._thread and self._thread.is_alive():
+            LOGGER.error("Log shipping timed out after %ss, %s logs still queued, staging "
+                         "kept in %s", timeout, stats["queue_depth"], self._staging)
+            return stats
+        shutil.rmtree(self._staging, ignore_errors=True)
+        LOGGER.info("Log shipping stats: %s", stats)
+        return stats
+
+    def stats(self) -> dict:
+        """Queue depth, bytes shipped and per log shipping latency."""
+        with self._cond:
+            return dict(self.counters,
+                        queue_depth=sum(len(batch[2]) for batch in self._batches),
+                        latency=latency_stats(self.latencies))
@@ -0,0 +1,445 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Time series of node, process and pod CPU, memory, disk and network usage read from /proc."""
+
+import csv
+import json
+import logging
+import math
+import re
+import subprocess  # nosec
+import threading
+from array import array
+
+from commons import constants as const
+from commons.utils.perf_utils import percentile
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+LOGGER = logging.getLogger(__name__)
+
+NODE = "node"
+PROCESS = "process"
+POD = "pod"
+NODE_FIELDS = ("cpu_pct", "mem_used_pct", "mem_used_bytes", "disk_read_bps", "disk_write_bps",
+               "net_rx_bps", "net_tx_bps")
+PROCESS_FIELDS = ("cpu_pct", "rss_bytes", "read_bps", "write_bps")
+FIELDS = {NODE: NODE_FIELDS, PROCESS: PROCESS_FIELDS, POD: PROCESS_FIELDS}
+# Whole disks of /proc/diskstats, partitions and device mapper volumes would count twice.
+DISK_PATTERN = re.compile(r"^(sd[a-z]+|vd[a-z]+|xvd[a-z]+|hd[a-z]+|nvme\d+n\d+|mmcblk\d+)$")
+POD_UID_PATTERN = re.compile(r"pod([0-9a-f]{8}[-_][0-9a-f]{4}[-_][0-9a-f]{4}[-_][0-9a-f]{4}"
+                             r"[-_][0-9a-f]{12})")
+SECTOR = 512
+
+# Prints one frame of raw /proc data per interval on a single long running shell, the
+# processes whose name matches the pattern are sampled with their I/O and pod cgroup.
+SAMPLER_SCRIPT = r"""
+echo "@hz $(getconf CLK_TCK) $(getconf PAGESIZE)"
+while :; do
+  echo "@frame $(date +%s.%N)"
+  head -1 /proc/stat
+  grep -E '^(MemTotal|MemAvailable):' /proc/meminfo
+  echo @disk; cat /proc/diskstats
+  echo @net; tail -n +3 /proc/net/dev
+  for p in $(pgrep '{pattern}'); do
+    echo "@proc $(cat /proc/$p/stat 2>/dev/null)"
+    echo "@io $(grep -E '^(read|write)_bytes' /proc/$p/io 2>/dev/null | tr '\n' ' ')"
+    echo "@cg $(grep -o -m1 'pod[0-9a-f_-]\{{36\}}' /proc/$p/cgroup 2>/dev/null | head -1)"
+  done
+  echo @end
+  sleep {interval}
+done
+"""
+
+
+def sampler_script(pattern: str, interval: float) -> str:
+    """Shell script printing a frame of /proc data every interval seconds."""
+    return SAMPLER_SCRIPT.format(pattern=pattern.replace("'", ""), interval=interval)
+
+
+class LocalShell:
+    """Sampler script running on the local host."""
+
+    def __init__(self, script: str):
+        self._proc = subprocess.Popen(["sh", "-c", script], stdout=subprocess.PIPE,  # nosec
+                                      stderr=subprocess.DEVNULL, universal_newlines=True)
+
+    def lines(self):
+        """Output lines until the script ends."""
+        return iter(self._proc.stdout.readline, "")
+
+    def close(self) -> None:
+        """Stop the script."""
+        self._proc.kill()
+        self._proc.wait()
+        self._proc.stdout.close()
+
+
+class SshShell:
+    """Sampler script running on a node over one SSH channel kept open for the whole run."""
+
+    def __init__(self, node, script: str):
+        """
+        :param node: LogicalNode or Host of the node.
+        :param script: sampler script.
+        """
+        self.node = node
+        node.connect()
+        _, self._stdout, _ = node.host_obj.exec_command(script, get_pty=True)  # nosec
+
+    def lines(self):
+        """Output lines until the channel closes."""
+        return iter(self._stdout.readline, "")
+
+    def close(self) -> None:
+        """Close the channel, hanging up the script, and the connection."""
+        self._stdout.channel.close()
+        self.node.disconnect()
+
+
+class Frame:
+    """Raw counters of one sample."""
+
+    def __init__(self, stamp: float):
+        self.stamp = stamp
+        self.cpu = None
+        self.mem = {}
+        self.disk = [0, 0]
+        self.net = [0, 0]
+        self.procs = {}
+
+
+def parse_stat(line: str) -> tuple:
+    """pid, comm, CPU ticks and RSS pages of a /proc/<pid>/stat line."""
+    head, _, rest = line.rpartition(")")
+    pid, _, comm = head.partition(" (")
+    fields = rest.split()
+    return int(pid), comm, int(fields[11]) + int(fields[12]), int(fields[21])
+
+
+class FrameParser:
+    """Turn the sampler script output into frames."""
+
+    def __init__(self):
+        self.hertz = 100
+        self.page_size = 4096
+        self._frame = None
+        self._section = None
+        self._proc = None
+
+    # pylint: disable=too-many-branches
+    def feed(self, line: str):
+        """
+        Parse an output line.
+
+        :return: the frame completed by the line, else None.
+        """
+        line = line.strip()
+        if not line:
+            return None
+        if line.startswith("@hz "):
+            self.hertz, self.page_size = (int(val) for val in line.split()[1:3])
+        elif line.startswith("@frame "):
+            self._frame, self._section, self._proc = Frame(float(line.split()[1])), None, None
+        elif self._frame is None:
+            return None
+        elif line == "@end":
+            frame, self._frame = self._frame, None
+            return frame
+        elif line in ("@disk", "@net"):
+            self._section = line
+        elif line.startswith("@proc"):
+            self._section, self._proc = None, None
+            if len(line) > 6:
+                pid, comm, ticks, rss = parse_stat(line[6:])
+                self._proc = {"pid": pid, "comm": comm, "ticks": ticks, "rss": rss,
+                              "io": None, "pod": None}
+                self._frame.procs[pid] = self._proc
+        elif line.startswith("@io") and self._proc:
+            values = line[3:].split()
+            if len(values) >= 4:
+                self._proc["io"] = (int(values[1]), int(values[3]))
+        elif line.startswith("@cg") and self._proc:
+            match = POD_UID_PATTERN.search(line)
+            if match:
+                self._proc["pod"] = match.group(1).replace("_", "-")
+        elif line.startswith("cpu "):
+            values = [int(val) for val in line.split()[1:9]]
+            self._frame.cpu = (sum(values), values[3] + values[4])
+        elif line.startswith(("MemTotal:", "MemAvailable:")):
+            name, value = line.split()[:2]
+            self._frame.mem[name[:-1]] = int(value) * 1024
+        elif self._section == "@disk":
+            fields = line.split()
+            if len(fields) > 9 and DISK_PATTERN.match(fields[2]):
+                self._frame.disk[0] += int(fields[5]) * SECTOR
+                self._frame.disk[1] += int(fields[9]) * SECTOR
+        elif self._section == "@net":
+            name, _, values = line.partition(":")
+            values = values.split()
+            if name.strip() != "lo" and len(values) > 8:
+                self._frame.net[0] += int(values[0])
+                self._frame.net[1] += int(values[8])
+        return None
+
+
+class RingSeries:
+    """Fixed capacity columnar buffer of float samples, the oldest overwritten when full."""
+
+    def __init__(self, fields: tuple, capacity: int):
+        self.fields = fields
+        self.capacity = capacity
+        self.columns = {name: array("d", bytes(8 * capacity))
+                        for name in ("time",) + tuple(fields)}
+        self.count = 0
+        self._next = 0
+
+    def append(self, stamp: float, values: dict) -> None:
+        """Add a sample, None values stored as NaN."""
+        self.columns["time"][self._next] = stamp
+        for name in self.fields:
+            value = values.get(name)
+            self.columns[name][self._next] = math.nan if value is None else value
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def column(self, name: str) -> list:
+        """Samples of a column, oldest first."""
+        data = self.columns[name]
+        if self.count < self.capacity:
+            return data[:self.count].tolist()
+        return (data[self._next:] + data[:self._next]).tolist()
+
+    def aggregate(self) -> dict:
+        """p50, p95, max and mean of every field, NaN samples left out."""
+        result = {}
+        for name in self.fields:
+            values = sorted(val for val in self.column(name) if not math.isnan(val))
+            result[name] = {"p50": percentile(values, 50), "p95": percentile(values, 95),
+                            "max": values[-1] if values else 0.0,
+                            "mean": sum(values) / len(values) if values else 0.0}
+        return result
+
+
+def rate(current, previous, elapsed: float):
+    """Per second increase of a counter, None if unknown or reset."""
+    if current is None or previous is None or current < previous or elapsed <= 0:
+        return None
+    return (current - previous) / elapsed
+
+
+class NodeSampler:
+    """Read the frames of one node and keep node, process and pod series."""
+
+    def __init__(self, name: str, shell, capacity: int, pod_names: dict = None):
+        """
+        :param name: node name.
+        :param shell: LocalShell, SshShell or any object with lines() and close().
+        :param capacity: samples kept per series.
+        :param pod_names: pod name by pod UID, pods without a name keep their UID.
+        """
+        self.name = name
+        self.shell = shell
+        self.capacity = capacity
+        self.pod_names = pod_names or {}
+        self.parser = FrameParser()
+        self.series = {}
+        self.frames = 0
+        self._previous = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"metrics_{name}", daemon=True)
+
+    def _store(self, scope: str, entity: str, stamp: float, values: dict) -> None:
+        """Append a sample to the series of an entity."""
+        with self._lock:
+            series = self.series.get((scope, entity))
+            if series is None:
+                series = self.series[(scope, entity)] = RingSeries(FIELDS[scope],
+                                                                   self.capacity)
+            series.append(stamp, values)
+
+    def process_frame(self, frame: Frame) -> None:
+        """Derive the rates between the previous frame and this one and store them."""
+        previous, self._previous = self._previous, frame
+        self.frames += 1
+        if previous is None:
+            return
+        elapsed = frame.stamp - previous.stamp
+        node = {"mem_used_bytes": None, "mem_used_pct": None}
+        if frame.cpu and previous.cpu and frame.cpu[0] > previous.cpu[0]:
+            total, idle = frame.cpu[0] - previous.cpu[0], frame.cpu[1] - previous.cpu[1]
+            node["cpu_pct"] = 100.0 * (total - idle) / total
+        if "MemTotal" in frame.mem and "MemAvailable" in frame.mem:
+            node["mem_used_bytes"] = frame.mem["MemTotal"] - frame.mem["MemAvailable"]
+            node["mem_used_pct"] = 100.0 * node["mem_used_bytes"] / frame.mem["MemTotal"]
+        node.update(disk_read_bps=rate(frame.disk[0], previous.disk[0], elapsed),
+                    disk_write_bps=rate(frame.disk[1], previous.disk[1], elapsed),
+                    net_rx_bps=rate(frame.net[0], previous.net[0], elapsed),
+                    net_tx_bps=rate(frame.net[1], previous.net[1], elapsed))
+        self._store(NODE, self.name, frame.stamp, node)
+        pods = {}
+        for pid, proc in frame.procs.items():
+            before = previous.procs.get(pid)
+            if before is None or before["comm"] != proc["comm"]:
+                continue
+            ticks = rate(proc["ticks"], before["ticks"], elapsed)
+            io_now, io_before = proc["io"] or (None, None), before["io"] or (None, None)
+            values = {"cpu_pct": None if ticks is None else 100.0 * ticks / self.parser.hertz,
+                      "rss_bytes": proc["rss"] * self.parser.page_size,
+                      "read_bps": rate(io_now[0], io_before[0], elapsed),
+                      "write_bps": rate(io_now[1], io_before[1], elapsed)}
+            self._store(PROCESS, f"{proc['comm']}:{pid}", frame.stamp, values)
+            if proc["pod"]:
+                pod = pods.setdefault(self.pod_names.get(proc["pod"], proc["pod"]), {})
+                for name, value in values.items():
+                    if value is not None:
+                        pod[name] = pod.get(name, 0.0) + value
+        for pod, values in pods.items():
+            self._store(POD, pod, frame.stamp, values)
+
+    def _run(self) -> None:
+        """Parse the output of the shell until it ends."""
+        try:
+            for line in self.shell.lines():
+                frame = self.parser.feed(line)
+                if frame:
+                    self.process_frame(frame)
+        except (IOError, OSError, ValueError) as error:
+            LOGGER.warning("Metrics sampling of %s stopped: %s", self.name, error)
+
+    def start(self):
+        """Start reading frames."""
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the shell and the reader."""
+        self.shell.close()
+        self._thread.join(timeout=10)
+
+    def snapshot(self) -> dict:
+        """Series by (scope, entity)."""
+        with self._lock:
+            return dict(self.series)
+
+
+class MetricsCollector:
+    """
+    Sample CPU, memory, disk and network usage of nodes, of processes and of their pods.
+
+    Every node runs one sampler shell, locally or over one SSH channel, printing raw /proc
+    counters each interval. The output is parsed as it streams in, and rates are kept in
+    fixed size columnar ring buffers, so nothing is written on the nodes or copied back.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, nodes: list = None, pattern: str = "|".join(const.PID_WATCH_LIST),
+                 interval: float = 5, capacity: int = 3600, pod_names: dict = None):
+        """
+        :param nodes: LogicalNode objects to sample, None for the local host.
+        :param pattern: pgrep pattern of the process names sampled.
+        :param interval: seconds between samples.
+        :param capacity: samples kept per series, older ones are dropped.
+        :param pod_names: pod name by pod UID, see get_pod_names.
+        """
+        self.nodes = nodes
+        self.pattern = pattern
+        self.interval = interval
+        self.capacity = capacity
+        self.pod_names = pod_names or {}
+        self.samplers = []
+
+    @staticmethod
+    def get_pod_names(master_node) -> dict:
+        """Pod name by pod UID of all pods, read with kubectl on the master node."""
+        output = master_node.execute_cmd(
+            "kubectl get pods -A --no-headers -o custom-columns=UID:.metadata.uid,"
+            "NAME:.metadata.name", read_lines=True)
+        return dict(line.split()[:2] for line in output if len(line.split()) >= 2)
+
+    def start(self):
+        """Start sampling every node."""
+        script = sampler_script(self.pattern, self.interval)
+        if self.nodes is None:
+            self.samplers = [NodeSampler("localhost", LocalShell(script), self.capacity,
+                                         self.pod_names)]
+        else:
+            self.samplers = [NodeSampler(node.hostname, SshShell(node, script), self.capacity,
+                                         self.pod_names) for node in self.nodes]
+        for sampler in self.samplers:
+            sampler.start()
+        LOGGER.info("Sampling metrics of %s every %ss", [smp.name for smp in self.samplers],
+                    self.interval)
+        return self
+
+    def stop(self) -> dict:
+        """Stop sampling and return the aggregates."""
+        for sampler in self.samplers:
+            sampler.stop()
+        return self.aggregates()
+
+    def series(self) -> dict:
+        """RingSeries by (node, scope, entity)."""
+        return {(sampler.name,) + key: series for sampler in self.samplers
+                for key, series in sampler.snapshot().items()}
+
+    def aggregates(self) -> dict:
+        """p50, p95, max and mean of every metric by node, scope and entity."""
+        result = {}
+        for (node, scope, entity), series in self.series().items():
+            result.setdefault(node, {}).setdefault(scope, {})[entity] = dict(
+                series.aggregate(), samples=series.count)
+        return result
+
+    def rows(self) -> list:
+        """All samples as dicts of node, scope, entity, time and the metrics."""
+        rows = []
+        for (node, scope, entity), series in self.series().items():
+            columns = {name: series.column(name) for name in series.columns}
+            for index in range(series.count):
+                row = {"node": node, "scope": scope, "entity": entity}
+                row.update({name: None if math.isnan(values[index]) else values[index]
+                            for name, values in columns.items()})
+                rows.append(row)
+        return rows
+
+    def to_csv(self, path: str) -> str:
+        """Save every sample as CSV."""
+        fields = ["node", "scope", "entity", "time"] + sorted(set(NODE_FIELDS + PROCESS_FIELDS))
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.rows())
+        return path
+
+    def to_parquet(self, path: str) -> str:
+        """Save every sample as Parquet, needs pandas and a Parquet engine such as pyarrow."""
+        if pandas is None:
+            raise ImportError("Parquet export needs pandas")
+        pandas.DataFrame(self.rows()).to_parquet(path, index=False)
+        return path
+
+    def to_json(self, path: str) -> str:
+        """Save the aggregates as JSON."""
+        with open(path, "w") as json_file:
+            json.dump(self.aggregates(), json_file, indent=2)
+        return path
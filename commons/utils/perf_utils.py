@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Performance measurement utility library: latency statistics, histograms and rate limiting."""
+
+import bisect
+import logging
+import math
+import threading
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds of the latency histogram buckets, the last one is unbounded.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+
+def percentile(sorted_samples: list, pct: float) -> float:
+    """
+    Nearest rank percentile of already sorted samples.
+
+    :param sorted_samples: samples in ascending order.
+    :param pct: percentile in range 0-100.
+    :return: sample at the percentile, 0 for no samples.
+    """
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_samples)), 1)
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def latency_stats(samples: list) -> dict:
+    """
+    Summarize latency samples.
+
+    :param samples: latencies in seconds.
+    :return: dict of count, min, mean, p50, p95, p99 and max.
+    """
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {"count": count,
+            "min": ordered[0] if count else 0.0,
+            "mean": sum(ordered) / count if count else 0.0,
+            "p50": percentile(ordered, 50),
+            "p95": percentile(ordered, 95),
+            "p99": percentile(ordered, 99),
+            "max": ordered[-1] if count else 0.0}
+
+
+def latency_histogram(samples: list, bounds_ms: tuple = LATENCY_BUCKETS_MS) -> dict:
+    """
+    Count latency samples per bucket.
+
+    :param samples: latencies in seconds.
+    :param bounds_ms: ascending bucket upper bounds in milliseconds.
+    :return: dict of "<=bound ms" or ">last ms" label to count in bucket order, empty buckets
+        included.
+    """
+    counts = [0] * (len(bounds_ms) + 1)
+    for sample in samples:
+        counts[bisect.bisect_left(bounds_ms, sample * 1000.0)] += 1
+    labels = [f"<={bound}ms" for bound in bounds_ms] + [f">{bounds_ms[-1]}ms"]
+    return dict(zip(labels, counts))
+
+
+class RateLimiter:
+    """Token bucket limiting the rate of operations shared by many threads."""
+
+    def __init__(self, rate: float = 0, burst: int = 1):
+        """
+        Initialize the limiter.
+
+        :param rate: operations allowed per second, 0 disables limiting.
+        :param burst: operations allowed back to back before throttling.
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Block until an operation may proceed.
+
+        :return: seconds spent waiting.
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
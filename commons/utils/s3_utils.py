@@ -21,11 +21,15 @@ import base64
 import datetime
 import hashlib
 import hmac
+import io
 import json
 import logging
+import mmap
 import os
+import threading
 import time
 import urllib
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import md5
 from hashlib import sha256
 from random import shuffle
@@ -248,21 +252,230 @@ def calc_contentmd5(data) -> str:
     return base64.b64encode(md5(data).digest()).decode('utf-8')  # nosec - s3 ETag based on md5.
 
 
+class PartReader(io.RawIOBase):
+    """Seekable read-only file object over a memoryview, used as S3 request body."""
+
+    def __init__(self, view):
+        """Wrap the view without copying it."""
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Move the read position."""
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = min(max(base + offset, 0), len(self._view))
+        return self._pos
+
+    def read(self, size=-1):
+        """Copy at most size bytes out of the view, the whole remainder by default."""
+        end = len(self._view) if size is None or size < 0 else min(self._pos + size,
+                                                                    len(self._view))
+        data = self._view[self._pos:end].tobytes()
+        self._pos = end
+        return data
+
+    def readinto(self, buffer):
+        """Read into a pre-allocated buffer."""
+        end = min(self._pos + len(buffer), len(self._view))
+        count = end - self._pos
+        buffer[:count] = self._view[self._pos:end]
+        self._pos = end
+        return count
+
+    def __len__(self):
+        return len(self._view)
+
+
+class LazyPart:
+    """
+    Multipart part described by offset and length in the file of a MultipartFileSource.
+
+    Indexing keeps compatibility with the eager [data, content_md5] part lists: part[0] is a
+    fresh PartReader body and part[1] the Content-MD5, computed on first use and cached.
+    """
+
+    def __init__(self, source, offset, length):
+        """
+        Initialize the part descriptor.
+
+        :param source: MultipartFileSource of the file.
+        :param offset: offset of the part in the file.
+        :param length: length of the part in bytes.
+        """
+        self.source = source
+        self.offset = offset
+        self.length = length
+        self._digest = None
+
+    @property
+    def data(self):
+        """Memoryview of the part bytes, zero-copy when the source is mapped."""
+        return self.source.read(self.offset, self.length)
+
+    def body(self):
+        """File object streaming the part, suitable as upload_part Body."""
+        return PartReader(self.data)
+
+    def md5_digest(self):
+        """Raw MD5 digest of the part, computed once."""
+        if self._digest is None:
+            self._digest = md5(self.data).digest()  # nosec - s3 ETag based on md5.
+        return self._digest
+
+    @property
+    def content_md5(self):
+        """Content-MD5 header value of the part."""
+        return base64.b64encode(self.md5_digest()).decode('utf-8')
+
+    def __getitem__(self, index):
+        if index in (0, -2):
+            return self.body()
+        if index in (1, -1):
+            return self.content_md5
+        raise IndexError(index)
+
+    def __repr__(self):
+        return f"LazyPart(offset={self.offset}, length={self.length})"
+
+
+class MultipartFileSource:
+    """
+    File handing out LazyPart descriptors, read through a memory mapping or part by part.
+
+    A mapped source holds the mapping until closed, use it as a context manager. An unmapped
+    source holds no resource: every part read opens the file and reads only that part.
+    """
+
+    def __init__(self, file_path, mapped=True):
+        """
+        Map the file.
+
+        :param file_path: Path of object file.
+        :param mapped: Memory map the file, else open it on every part read.
+        """
+        self.file_path = file_path
+        self.size = os.stat(file_path).st_size
+        self._mmap = None
+        if mapped and self.size:
+            with open(file_path, "rb") as fobj:
+                # The mapping keeps its own descriptor, released by close().
+                self._mmap = mmap.mmap(fobj.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self._mmap) if self._mmap else None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def read(self, offset, length):
+        """Memoryview of length bytes at offset."""
+        if self.view is not None:
+            return self.view[offset:offset + length]
+        if not length:
+            return memoryview(b"")
+        with open(self.file_path, "rb") as fobj:
+            fobj.seek(offset)
+            return memoryview(fobj.read(length))
+
+    def part(self, offset, length):
+        """Part descriptor of length bytes at offset, truncated at the end of file."""
+        return LazyPart(self, offset, max(min(length, self.size - offset), 0))
+
+    def split(self, lengths):
+        """
+        Consecutive part descriptors of the given lengths, stopping at end of file.
+
+        :param lengths: iterable of part lengths in bytes.
+        :return: dict of {part_number: LazyPart}.
+        """
+        parts = {}
+        offset = 0
+        for part_number, length in enumerate(lengths, 1):
+            if offset >= self.size or length <= 0:
+                break
+            parts[part_number] = self.part(offset, length)
+            offset += parts[part_number].length
+        return parts
+
+    def prefetch_md5(self, parts, workers=4):
+        """
+        Compute part MD5s in a background pool, hashlib releases the GIL while hashing.
+
+        :param parts: dict of LazyPart.
+        :param workers: hashing threads.
+        :return: list of futures.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=workers)
+        return [self._executor.submit(part.md5_digest) for part in parts.values()]
+
+    def close(self):
+        """Release the mapping and hashing pool, parts read afterwards open the file."""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.view is not None:
+            self.view.release()
+            self.view = None
+        try:
+            if self._mmap:
+                self._mmap.close()
+        except BufferError:
+            # Part views still referenced by callers, the mapping goes away with them.
+            LOGGER.debug("Part views of %s still in use", self.file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _shuffle_parts(parts):
+    """Return the parts dict in random part number order."""
+    keys = list(parts.keys())
+    shuffle(keys)
+    return {k: parts[k] for k in keys}
+
+
 def get_multipart_etag(parts):
     """
     Calculate expected ETag for a multipart upload.
 
     :param parts: List of dict with the format {part_number: (data_bytes, content_md5), ...}
+        or {part_number: LazyPart, ...}
     """
-    md5_digests = []
-    for part_number in sorted(parts.keys()):
+    md5_digests = {}
+    for part_number, part in parts.items():
+        if isinstance(part, LazyPart):
+            md5_digests[part_number] = part.md5_digest()
+            continue
         # comparing ETag with s3 response so calculating it based on md5.
-        md5_digests.append(md5(parts[part_number][0]).digest())  # nosec
-    multipart_etag = md5(b''.join(md5_digests)).hexdigest() + '-' + str(len(md5_digests))  # nosec
+        md5_digests[part_number] = md5(part[0]).digest()  # nosec
+    return get_multipart_etag_from_digests(md5_digests)
+
+
+def get_multipart_etag_from_digests(md5_digests):
+    """
+    Calculate expected ETag for a multipart upload from raw part MD5 digests.
+
+    :param md5_digests: dict of {part_number: md5_digest_bytes, ...}
+    """
+    ordered = [md5_digests[part_number] for part_number in sorted(md5_digests)]
+    multipart_etag = md5(b''.join(ordered)).hexdigest() + '-' + str(len(ordered))  # nosec
     return f'"{multipart_etag}"'
 
 
-def get_aligned_parts(file_path, total_parts=1, chunk_size=5242880, random=False) -> dict:
+def get_aligned_parts(file_path, total_parts=1, chunk_size=5242880, random=False,
+                      lazy=False) -> dict:
     r"""
     Get aligned parts.
 
@@ -275,12 +488,19 @@ def get_aligned_parts(file_path, total_parts=1, chunk_size=5242880, random=False
     :param file_path: Path of object file.
     :param chunk_size: chunk size used to read each check default is 5MB.
     :param random: Generate random else sequential part order.
+    :param lazy: Return LazyPart descriptors instead of part bytes, no size limit, each part
+        is read from the file when used.
     :return: Parts details with data, checksum.
     """
     try:
         obj_size = os.stat(file_path).st_size
         parts = {}
         part_size = int(int(obj_size) / int(chunk_size)) // int(total_parts)
+        if lazy:
+            length = chunk_size * part_size
+            parts = MultipartFileSource(file_path, mapped=False).split(
+                [length] * (-(-obj_size // length) if length else 0))
+            return _shuffle_parts(parts) if random else parts
         with open(file_path, "rb") as fptr:
             i = 1
             while True:
@@ -300,7 +520,8 @@ def get_aligned_parts(file_path, total_parts=1, chunk_size=5242880, random=False
         raise error from OSError
 
 
-def get_unaligned_parts(file_path, total_parts=1, chunk_size=5242880, random=False) -> dict:
+def get_unaligned_parts(file_path, total_parts=1, chunk_size=5242880, random=False,
+                        lazy=False) -> dict:
     """
     Create the upload parts dict with unaligned part size(limitation: not supported more than 10G).
 
@@ -315,6 +536,8 @@ def get_unaligned_parts(file_path, total_parts=1, chunk_size=5242880, random=Fal
     :param file_path: Path of object file.
     :param chunk_size: chunk size used to read each check default is 5MB.
     :param random: Generate random else sequential part order.
+    :param lazy: Return LazyPart descriptors instead of part bytes, no size limit, each part
+        is read from the file when used.
     :return: Parts details with data, checksum.
     """
     try:
@@ -323,6 +546,15 @@ def get_unaligned_parts(file_path, total_parts=1, chunk_size=5242880, random=Fal
         part_size = int(int(obj_size) / int(chunk_size)) // int(total_parts)
         unaligned = [104857, 209715, 314572, 419430, 524288,
                      629145, 734003, 838860, 943718, 1048576]
+        if lazy:
+            lengths = []
+            total = 0
+            while part_size and total < obj_size:
+                shuffle(unaligned)
+                lengths.append((chunk_size + unaligned[0]) * part_size)
+                total += lengths[-1]
+            parts = MultipartFileSource(file_path, mapped=False).split(lengths)
+            return _shuffle_parts(parts) if random else parts
         with open(file_path, "rb") as file_pointer:
             j = 1
             while True:
@@ -343,13 +575,15 @@ def get_unaligned_parts(file_path, total_parts=1, chunk_size=5242880, random=Fal
         raise error from OSError
 
 
-def get_precalculated_parts(file_path, part_list, chunk_size=1048576) -> dict:
+def get_precalculated_parts(file_path, part_list, chunk_size=1048576, lazy=False) -> dict:
     """
     Split the source file into the specified part sizes.
 
     :param file_path: Path of object file.
     :param part_list: List of dict with keys 'part_size' (in bytes) and 'count'
     :param chunk_size: chunk size used to read each check default is 1MB.
+    :param lazy: Return LazyPart descriptors instead of part bytes, each part is read from the
+        file when used.
     :return: Parts details with data, checksum.
     """
     total_part_list = []
@@ -358,6 +592,13 @@ def get_precalculated_parts(file_path, part_list, chunk_size=1048576) -> dict:
     shuffle(total_part_list)
     parts = {}
     try:
+        if lazy:
+            source = MultipartFileSource(file_path, mapped=False)
+            offset = 0
+            for i, part_size in enumerate(total_part_list, 1):
+                parts[i] = source.part(offset, int(part_size * chunk_size))
+                offset += parts[i].length
+            return parts
         with open(file_path, "rb") as file_pointer:
             for i, part_size in enumerate(total_part_list, 1):
                 data = file_pointer.read(int(part_size * chunk_size))
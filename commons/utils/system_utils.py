@@ -19,6 +19,7 @@
 #
 """Module to maintain system utils."""
 
+import base64
 import logging
 import os
 import secrets
@@ -34,12 +35,13 @@ import glob
 from typing import Tuple
 from subprocess import Popen, PIPE
 from hashlib import md5
-from pathlib import Path
 from botocore.response import StreamingBody
 from paramiko import SSHClient, AutoAddPolicy
 from commons import commands
 from commons import params
 from commons.constants import AWS_CLI_ERROR
+from commons.utils import checksum_utils
+from commons.utils import file_factory
 
 if sys.platform == 'win32':
     try:
@@ -153,23 +155,7 @@ def run_local_cmd(cmd: str = None, flg: bool = False, chk_stderr: bool = False)
     try:
         proc = Popen(cmd, shell=True, stdout=PIPE, stderr=PIPE)  # nosec (B603)
         output, error = proc.communicate()
-        LOGGER.debug("output = %s", str(output))
-        LOGGER.debug("error = %s", str(error))
-        if flg:
-            return True, str((output, error))
-        if chk_stderr:
-            if error and check_aws_cli_error(str(error)):
-                return False, str(error)
-            return True, str(output)
-        if proc.returncode != 0:
-            return False, str(error)
-        if b"Number of key(s) added: 1" in output:
-            return True, str(output)
-        if b"command not found" in error or \
-                b"not recognized as an internal or external command" in error or error:
-            return False, str(error)
-
-        return True, str(output)
+        return local_cmd_response(proc.returncode, output, error, flg, chk_stderr)
     except RuntimeError as ex:
         LOGGER.exception(ex)
         return False, ex
@@ -178,6 +164,36 @@ def run_local_cmd(cmd: str = None, flg: bool = False, chk_stderr: bool = False)
             proc.terminate()
 
 
+def local_cmd_response(returncode: int, output: bytes, error: bytes, flg: bool = False,
+                       chk_stderr: bool = False) -> tuple:
+    """
+    Interpret the result of a local command the way run_local_cmd reports it.
+    :param returncode: exit code of the command
+    :param output: captured stdout
+    :param error: captured stderr
+    :param flg: To get str(proc.communicate())
+    :param chk_stderr: Check if stderr is none.
+    :return: bool, response.
+    """
+    LOGGER.debug("output = %s", str(output))
+    LOGGER.debug("error = %s", str(error))
+    if flg:
+        return True, str((output, error))
+    if chk_stderr:
+        if error and check_aws_cli_error(str(error)):
+            return False, str(error)
+        return True, str(output)
+    if returncode != 0:
+        return False, str(error)
+    if b"Number of key(s) added: 1" in output:
+        return True, str(output)
+    if b"command not found" in error or \
+            b"not recognized as an internal or external command" in error or error:
+        return False, str(error)
+
+    return True, str(output)
+
+
 def check_aws_cli_error(str_error: str):
     """Validate error string from aws cli command."""
     err_check = True
@@ -287,30 +303,56 @@ def calculate_checksum(file_path: str, binary_bz64: bool = True, options: str =
     hash_algo = kwargs.get("hash_algo", "md5")
     if not os.path.exists(file_path):
         return False, "Please pass proper file path"
-    if hash_algo == "md5":
-        if binary_bz64:
-            cmd = "openssl md5 -binary {} | base64".format(file_path)
-        else:
-            cmd = "md5sum {} {}".format(options, file_path)
-    if hash_algo == "SHA-1":
-        cmd = "sha1sum {}".format(file_path)
-    if hash_algo == "SHA-224":
-        cmd = "sha224sum {}".format(file_path)
-    if hash_algo == "SHA-256":
-        cmd = "sha256sum {}".format(file_path)
-    if hash_algo == "SHA-384":
-        cmd = "sha384sum {}".format(file_path)
-    if hash_algo == "SHA-512":
-        cmd = "sha512sum {}".format(file_path)
-
-    LOGGER.debug("Executing cmd: %s", cmd)
-    result = run_local_cmd(cmd)
+    result = in_process_checksum(file_path, binary_bz64, options, hash_algo)
+    if result is None:
+        if hash_algo == "md5":
+            if binary_bz64:
+                cmd = "openssl md5 -binary {} | base64".format(file_path)
+            else:
+                cmd = "md5sum {} {}".format(options, file_path)
+        if hash_algo == "SHA-1":
+            cmd = "sha1sum {}".format(file_path)
+        if hash_algo == "SHA-224":
+            cmd = "sha224sum {}".format(file_path)
+        if hash_algo == "SHA-256":
+            cmd = "sha256sum {}".format(file_path)
+        if hash_algo == "SHA-384":
+            cmd = "sha384sum {}".format(file_path)
+        if hash_algo == "SHA-512":
+            cmd = "sha512sum {}".format(file_path)
+
+        LOGGER.debug("Executing cmd: %s", cmd)
+        result = run_local_cmd(cmd)
     LOGGER.debug("Output: %s", str(result))
     if kwargs.get("filter_resp", None) and binary_bz64:
         result = (result[0], filter_bin_md5(result[1]))
     return result
 
 
+def in_process_checksum(file_path: str, binary_bz64: bool, options: str, hash_algo: str):
+    """
+    Checksum of calculate_checksum computed in process, formatted as the tools print it.
+    :param file_path: Name of the file with path
+    :param binary_bz64: base64 of the binary MD5 as "openssl md5 -binary | base64" prints it
+    :param options: option for md5sum tool
+    :param hash_algo: md5 or a SHA-* name
+    :return: bool, response as run_local_cmd returns it or None if the tool is still needed
+    """
+    if hash_algo not in ("md5", "SHA-1", "SHA-224", "SHA-256", "SHA-384", "SHA-512"):
+        return None
+    if hash_algo == "md5" and binary_bz64:
+        digest = checksum_utils.CHECKSUM_SERVICE.digest(file_path)["md5"]
+        return True, str(base64.b64encode(bytes.fromhex(digest)) + b"\n")
+    if hash_algo == "md5" and options.strip() not in ("", "-t", "--text", "-b", "--binary"):
+        return None
+    if "\\" in file_path or "\n" in file_path:
+        # The tools escape such names.
+        return None
+    digest = checksum_utils.CHECKSUM_SERVICE.digest(file_path, (hash_algo,))[hash_algo]
+    mode = "*" if hash_algo == "md5" and options.strip() in ("-b", "--binary") else " "
+    return True, str(f"{digest} {mode}".encode() + os.fsencode(file_path) + b"\n")
+
+
 def calc_checksum(object_ref: object, hash_algo: str = 'md5'):
     """
     Calculate checksum of file or stream
@@ -318,29 +360,13 @@ def calc_checksum(object_ref: object, hash_algo: str = 'md5'):
     :param hash_algo: md5 or sha1
     :return:
     """
-    read_sz = 8192
     csum = None
-    file_hash = md5()  # nosec
     if hash_algo != 'md5':
         raise NotImplementedError('Only md5 supported')
     if isinstance(object_ref, StreamingBody):
-        chunk = object_ref.read(amt=read_sz)
-        while chunk:
-            file_hash.update(chunk)
-            chunk = object_ref.read(amt=read_sz)
-        return file_hash.hexdigest()
+        return checksum_utils.hash_stream(object_ref)["md5"]
     if os.path.exists(object_ref):
-        size = Path(object_ref).stat().st_size
-
-        with open(object_ref, 'rb') as file_ptr:
-            if size < read_sz:
-                buf = file_ptr.read(size)
-            else:
-                buf = file_ptr.read(read_sz)
-            while buf:
-                file_hash.update(buf)
-                buf = file_ptr.read(read_sz)
-            csum = file_hash.hexdigest()
+        csum = checksum_utils.CHECKSUM_SERVICE.digest(object_ref)["md5"]
 
     return csum
 
@@ -578,15 +604,50 @@ def get_host_name():
     return socket.gethostname()
 
 
-def create_file(fpath: str, count: int, dev: str = "/dev/zero", b_size: str = "1M") -> tuple:
+def parse_block_size(b_size) -> int:
     """
-    Create file using dd command
+    Bytes of a dd block size such as 512, 4K, 1M, 1G or 1MB.
+
+    :param b_size: block size
+    :return: size in bytes, None if not understood
+    """
+    units = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4,
+             "KB": 1000, "MB": 1000 ** 2, "GB": 1000 ** 3, "TB": 1000 ** 4}
+    value = str(b_size).strip().upper()
+    digits = value.rstrip(string.ascii_uppercase)
+    unit = value[len(digits):]
+    if not digits.isdigit() or unit not in units:
+        return None
+    return int(digits) * units[unit]
+
+
+def create_file(fpath: str, count: int, dev: str = "/dev/zero", b_size: str = "1M",
+                seed: int = None) -> tuple:
+    """
+    Create file of count blocks of b_size.
+
+    /dev/zero and /dev/urandom content is generated in process, zero files and seeded random
+    files come from the session file cache; other devices are copied with dd.
     :param fpath: File path
     :param count: size of the file in MB
     :param dev: Input file used
     :param b_size: block size
+    :param seed: seed of /dev/urandom content to reuse cached data, None for unique data
     :return:
     """
+    block = parse_block_size(b_size)
+    if dev in ("/dev/zero", "/dev/urandom") and block is not None:
+        pattern = "zero" if dev == "/dev/zero" else "random"
+        try:
+            _, checksum = file_factory.get_file_factory().create(fpath, int(count) * block,
+                                                                 seed, pattern)
+        except (OSError, ValueError) as error:
+            if os.path.isfile(fpath):
+                os.remove(fpath)
+            raise IOError(f"Unable to create file {fpath}: {error}") from error
+        LOGGER.debug("Created %s of %s x %s from %s, md5 %s", fpath, count, b_size, dev,
+                     checksum)
+        return os.path.exists(fpath), checksum
     proc = None
     try:
         cmd = commands.CREATE_FILE.format(dev, fpath, b_size, count)
@@ -966,6 +1027,24 @@ def insert_into_builtins(name, obj):
         builtins.obj = obj
 
 
+def mount_dir(host_dir: str = None, mnt_dir: str = None) -> tuple:
+    """Mount NFS directory unless it is already mounted
+    :param host_dir: Link of NFS server directory
+    :param mnt_dir: Path of directory to be mounted
+    :return: Bool, response"""
+    if not os.path.ismount(mnt_dir):
+        if not os.path.exists(mnt_dir):
+            LOGGER.info("Creating a mount directory to share")
+            make_dirs(dpath=mnt_dir)
+
+        cmd = commands.CMD_MOUNT.format(host_dir, mnt_dir)
+        resp = run_local_cmd(cmd=cmd)
+        if not resp[0]:
+            return resp
+
+    return True, mnt_dir
+
+
 def mount_upload_to_server(host_dir: str = None, mnt_dir: str = None,
                            remote_path: str = None, local_path: str = None) \
         -> tuple:
@@ -976,15 +1055,9 @@ def mount_upload_to_server(host_dir: str = None, mnt_dir: str = None,
     :param local_path: Local path of the file to be uploaded
     :return: Bool, response"""
     try:
-        if not os.path.ismount(mnt_dir):
-            if not os.path.exists(mnt_dir):
-                LOGGER.info("Creating a mount directory to share")
-                make_dirs(dpath=mnt_dir)
-
-            cmd = commands.CMD_MOUNT.format(host_dir, mnt_dir)
-            resp = run_local_cmd(cmd=cmd)
-            if not resp[0]:
-                return resp
+        resp = mount_dir(host_dir=host_dir, mnt_dir=mnt_dir)
+        if not resp[0]:
+            return resp
 
         new_path = os.path.join(mnt_dir, remote_path)
         LOGGER.info("Creating directory on server")
@@ -0,0 +1,110 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Condition based waits to use instead of fixed time.sleep delays."""
+
+import logging
+import secrets
+import time
+
+LOGGER = logging.getLogger(__name__)
+SYSTEM_RANDOM = secrets.SystemRandom()
+
+
+class WaitTimeoutError(TimeoutError):
+    """The condition was not met before the deadline."""
+
+    def __init__(self, message: str, last=None):
+        super().__init__(message)
+        self.last = last
+
+
+class WaitAbortedError(RuntimeError):
+    """The fail fast check reported the condition can not be met any more."""
+
+    def __init__(self, message: str, last=None):
+        super().__init__(message)
+        self.last = last
+
+
+def backoff_delays(interval: float = 1.0, backoff: float = 1.5, max_interval: float = 30.0,
+                   jitter: float = 0.1):
+    """
+    Endless delays growing exponentially up to max_interval, randomized by +/- jitter.
+
+    :param interval: first delay in seconds
+    :param backoff: multiplier applied after every delay
+    :param max_interval: upper bound of a delay before jitter
+    :param jitter: fraction of the delay added or removed at random
+    """
+    delay = interval
+    while True:
+        yield max(delay * (1 + SYSTEM_RANDOM.uniform(-jitter, jitter)), 0.0)
+        delay = min(delay * backoff, max_interval)
+
+
+# pylint: disable=too-many-arguments
+def wait_until(func, timeout: float = None, interval: float = 1.0, backoff: float = 1.5,
+               max_interval: float = 30.0, jitter: float = 0.1, success=bool, fail_fast=None,
+               retry_exceptions: tuple = (), raise_on_timeout: bool = True, name: str = None):
+    """
+    Call func until success(result) holds, sleeping with exponential jittered backoff.
+
+    :param func: callable without arguments, polled at once and then after every delay
+    :param timeout: seconds to wait at most, None waits forever
+    :param interval: first delay in seconds
+    :param backoff: multiplier applied to the delay after every poll
+    :param max_interval: upper bound of a delay
+    :param jitter: fraction of the delay added or removed at random
+    :param success: callable(result) telling whether the wait is over, default truthiness
+    :param fail_fast: callable(result) telling the condition can not be met any more
+    :param retry_exceptions: exceptions of func treated as "not yet", others are raised
+    :param raise_on_timeout: raise WaitTimeoutError/WaitAbortedError, else return last result
+    :param name: name of the condition used in logs
+    :return: the successful (or last) result of func
+    """
+    name = name or getattr(func, "__name__", "condition")
+    start = time.monotonic()
+    deadline = None if timeout is None else start + timeout
+    delays = backoff_delays(interval, backoff, max_interval, jitter)
+    polls = 0
+    while True:
+        polls += 1
+        try:
+            result = func()
+        except retry_exceptions as error:  # pylint: disable=catching-non-exception
+            LOGGER.debug("Waiting for %s: %s", name, error)
+            result = error
+        else:
+            if success(result):
+                LOGGER.debug("%s met after %.1fs and %s polls", name,
+                             time.monotonic() - start, polls)
+                return result
+            if fail_fast and fail_fast(result):
+                LOGGER.error("%s can not be met any more: %s", name, result)
+                if raise_on_timeout:
+                    raise WaitAbortedError(f"{name} aborted: {result}", result)
+                return result
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            LOGGER.error("%s not met within %ss, last result: %s", name, timeout, result)
+            if raise_on_timeout:
+                raise WaitTimeoutError(f"{name} not met within {timeout}s", result)
+            return result
+        delay = next(delays)
+        time.sleep(delay if remaining is None else min(delay, remaining))
@@ -21,12 +21,14 @@
 import ast
 import csv
 import datetime
+import functools
 import glob
 import json
 import logging
 import os
 import pathlib
 import random
+import re
 import shutil
 import string
 import tempfile
@@ -47,24 +49,32 @@ from commons import cortxlogging
 from commons import params
 from commons import report_client
 from commons import constants as const
+from commons.sleep_accounting import SleepAccounting
 from commons.helpers.health_helper import Health
+from commons.helpers.pods_helper import LogicalNode
+from commons.utils.health_oracle import HealthOracle
+from commons.utils.log_shipper import LogShipper
+from commons.utils.metrics_collector import MetricsCollector
 from commons.utils import assert_utils
 from commons.utils import config_utils
 from commons.utils import jira_utils
 from commons.utils import system_utils
 from config import CMN_CFG
+from config import DI_CFG
 from core.runner import LRUCache
 from core.runner import get_db_credential
 from core.runner import get_jira_credential
 from libs.di.di_mgmt_ops import ManagementOPs
 from libs.di.di_run_man import RunDataCheckManager
 from libs.di.fi_adapter import S3FailureInjection
+from libs.s3.s3_resource_pool import S3ResourcePool
 
 FAILURES_FILE = "failures.txt"
 LOG_DIR = 'log'
 CACHE = LRUCache(1024 * 10)
 CACHE_JSON = 'nodes-cache.yaml'
 REPORT_CLIENT = None
+LOG_SHIPPER = None
 DT_PATTERN = '%Y-%m-%d_%H:%M:%S'
 
 LOGGER = logging.getLogger(__name__)
@@ -231,6 +241,10 @@ def pytest_addoption(parser):
         "--csm_checks", action="store", default=False,
         help="Execute tests with error code & msg check enabled."
     )
+    parser.addoption(
+        "--sleep_report", action="store", default=None,
+        help="Account time spent in time.sleep per test and write the ranked JSON report here."
+    )
     parser.addoption(
         "--health_check", action="store", default=True,
         help="Decide whether to do health check in local mode."
@@ -287,6 +301,11 @@ def read_dist_test_list_csv() -> List:
 def pytest_sessionfinish(session, exitstatus):
     """Remove handlers from all loggers."""
     # todo add html hook file = session.config._htmlfile
+    if getattr(Globals, "HEALTH_CHK", False):
+        LOGGER.info("Health check stats: %s", HEALTH_ORACLE.stats())
+    if LOG_SHIPPER is not None:
+        cfg = dict(const.LOG_SHIPPING_DEFAULTS, **CMN_CFG.get("log_shipping", {}))
+        LOG_SHIPPER.close(timeout=cfg["close_timeout"])
     loggers = [logging.getLogger()] + list(logging.Logger.manager.loggerDict.values())
     for _logger in loggers:
         handlers = getattr(_logger, 'handlers', [])
@@ -418,6 +437,9 @@ def create_report_payload(item, call, final_result, d_u, d_pass):
 @pytest.hookimpl(tryfirst=True)
 def pytest_configure(config):
     """pytest configure hook runs before collection."""
+    if config.option.sleep_report and not config.pluginmanager.has_plugin("sleep_accounting"):
+        config.pluginmanager.register(SleepAccounting(config.option.sleep_report),
+                                      "sleep_accounting")
     if not config.option.nodes:
         config.option.nodes = []  # CMN_CFG.nodes
     if not config.option.local:
@@ -442,7 +464,6 @@ def pytest_configure_node(node):
         else:
             Globals.JIRA_UPDATE = False
     node.workerinput['shared_dir'] = node.config.shared_directory
-    pytest.dns_rr_counter = 0
 
 
 def pytest_sessionstart(session: Session) -> None:
@@ -755,20 +776,61 @@ def upload_supporting_logs(test_id: str, remote_path: str, log: str):
     elif log == 's3bench':
         support_logs = glob.glob(f"{LOG_DIR}/latest/{test_id}_{log}_*")
     else:
-        support_logs = glob.glob(f"{LOG_DIR}/latest/logs-cortx-cloud-*")
+        support_logs = claim_support_logs(
+            test_id, glob.glob(f"{LOG_DIR}/latest/logs-cortx-cloud-*"))
     LOGGER.debug("support logs is %s", support_logs)
     for support_log in support_logs:
-        resp = system_utils.mount_upload_to_server(host_dir=params.NFS_SERVER_DIR,
-                                                   mnt_dir=params.MOUNT_DIR,
-                                                   remote_path=remote_path,
-                                                   local_path=support_log)
-        if resp[0]:
-            LOGGER.info("Supporting log files are uploaded at location : %s", resp[1])
-            if os.path.isfile(support_log):
-                os.remove(support_log)
-                LOGGER.info("Removed the files from local path after uploading to NFS share")
-        else:
-            LOGGER.error("Failed to supporting log file at location %s", resp[1])
+        log_url = get_log_shipper().submit(support_log, remote_path, remove=True)
+        LOGGER.info("Supporting log files are uploaded at location : %s", log_url)
+
+
+def claim_support_logs(test_id: str, support_logs: list) -> list:
+    """
+    Move support bundles into a per test directory before they are queued.
+
+    The bundles are not named after the test, moving them synchronously keeps a later failing
+    test from queueing them again while the shipper still holds them.
+    :param test_id: test number the bundles belong to
+    :param support_logs: bundle paths
+    :return: paths of the moved bundles
+    """
+    if not support_logs:
+        return []
+    claim_dir = os.path.join(LOG_DIR, "latest", f"{test_id}_support_logs")
+    os.makedirs(claim_dir, exist_ok=True)
+    claimed = []
+    for support_log in support_logs:
+        dest = os.path.join(claim_dir, os.path.basename(support_log))
+        try:
+            shutil.move(support_log, dest)
+        except OSError as error:
+            LOGGER.warning("Could not claim support log %s: %s", support_log, error)
+            continue
+        claimed.append(dest)
+    return claimed
+
+
+def get_log_shipper():
+    """
+    Session log shipper uploading logs to the NFS share in the background.
+    :return: started LogShipper
+    """
+    global LOG_SHIPPER
+    if LOG_SHIPPER is None:
+        cfg = dict(const.LOG_SHIPPING_DEFAULTS, **CMN_CFG.get("log_shipping", {}))
+        run_path = os.path.join(params.NFS_BASE_DIR, str(Globals.BUILD), str(Globals.TP_TKT),
+                                str(Globals.TE_TKT))
+        LOG_SHIPPER = LogShipper(params.MOUNT_DIR, run_path=run_path,
+                                 url_prefix=params.NFS_SERVER_DIR,
+                                 mount=functools.partial(system_utils.mount_dir,
+                                                         host_dir=params.NFS_SERVER_DIR,
+                                                         mnt_dir=params.MOUNT_DIR),
+                                 fallback_dir=params.LOCAL_LOG_PATH,
+                                 batch_size=cfg["batch_size"],
+                                 batch_seconds=cfg["batch_seconds"],
+                                 max_retries=cfg["max_retries"],
+                                 backoff=cfg["backoff"]).start()
+    return LOG_SHIPPER
 
 
 def check_cortx_cluster_health():
@@ -791,9 +853,13 @@ def check_cortx_cluster_health():
 
 
 def check_cluster_storage():
-    """Checks nodes storage and accepts till 98 % occupancy."""
+    """
+    Checks nodes storage and accepts till 98 % occupancy.
+    :return: highest used percent of the nodes
+    """
     LOGGER.info("Check cluster storage for all nodes.")
     nodes = CMN_CFG["nodes"]
+    used_percent = 0.0
     for node in nodes:
         if CMN_CFG.get("product_family") == const.PROD_FAMILY_LC:
             if node["node_type"].lower() != "master":
@@ -804,8 +870,27 @@ def check_cluster_storage():
                         password=node['password'])
         ha_total, ha_avail, ha_used = health.get_sys_capacity()
         ha_used_percent = round((ha_used / ha_total) * 100, 1)
-        assert ha_used_percent < 98.0, f'Cluster Node {hostname} failed space check.'
         health.disconnect()
+        assert ha_used_percent < HEALTH_CFG["storage_threshold"], \
+            f'Cluster Node {hostname} failed space check.'
+        used_percent = max(used_percent, ha_used_percent)
+    return used_percent
+
+
+HEALTH_CFG = dict(const.HEALTH_CHECK_DEFAULTS, **CMN_CFG.get("health_check", {}))
+HEALTH_ORACLE = HealthOracle(check_cortx_cluster_health, check_cluster_storage,
+                             ttl=HEALTH_CFG["ttl"],
+                             storage_threshold=HEALTH_CFG["storage_threshold"],
+                             storage_margin=HEALTH_CFG["storage_margin"],
+                             storage_ttl=HEALTH_CFG["storage_ttl"],
+                             destructive_marks=HEALTH_CFG["destructive_marks"])
+
+
+def pytest_runtest_teardown(item, nextitem):
+    """Drop the cached health verdict after tests which disrupt the cluster or fail."""
+    failed = any(getattr(getattr(item, "rep_" + when, None), "failed", False)
+                 for when in ("setup", "call"))
+    HEALTH_ORACLE.observe([mark.name for mark in item.iter_markers()], failed=failed)
 
 
 def pytest_runtest_logstart(nodeid, location):
@@ -854,11 +939,7 @@ def pytest_runtest_logstart(nodeid, location):
 
 def check_health(target):
     try:
-        check_cortx_cluster_health()
-        try:
-            check_cluster_storage()
-        except (AssertionError, Exception) as fault:
-            LOGGER.error(f"Cluster Storage {fault}")
+        HEALTH_ORACLE.check()
     except AssertionError as fault:
         LOGGER.error(f"Health check failed for setup with exception {fault}")
         pytest.exit(f'Health check failed for cluster {target}', 3)
@@ -911,21 +992,15 @@ def pytest_runtest_logreport(report: "TestReport") -> None:
         with open(test_log, 'w') as fp:
             for rec in logs:
                 fp.write(rec + '\n')
-        LOGGER.info("Uploading test log file to NFS server")
+        LOGGER.info("Queueing test log file for upload to NFS server")
         remote_path = getattr(report, 'logpath').replace(":", "_")
-        resp = system_utils.mount_upload_to_server(host_dir=params.NFS_SERVER_DIR,
-                                                   mnt_dir=params.MOUNT_DIR,
-                                                   remote_path=remote_path,
-                                                   local_path=test_log)
-        if resp[0]:
-            LOGGER.info("Log file is uploaded at location : %s", resp[1])
-        else:
-            LOGGER.error("Failed to upload log file at location %s", resp[1])
+        log_url = get_log_shipper().submit(test_log, remote_path)
+        LOGGER.info("Log file is uploaded at location : %s", log_url)
         upload_supporting_logs(test_id, remote_path, "s3bench")
         upload_supporting_logs(test_id, remote_path, "")
         upload_supporting_logs(test_id, remote_path, "csm_gui")
         LOGGER.info("Adding log file path to %s", test_id)
-        comment = "Log file path: {}".format(os.path.join(resp[1], name))
+        comment = "Log file path: {}".format(log_url)
         if Globals.JIRA_UPDATE:
             jira_id, jira_pwd = get_jira_credential()
             task = jira_utils.JiraTask(jira_id, jira_pwd)
@@ -979,6 +1054,66 @@ def get_test_status(request, obj, max_timeout=5000):
                 break
 
 
+@pytest.fixture(scope="session")
+def s3_account_pool():
+    """
+    Session pool of S3 accounts with empty buckets, pre-created in parallel.
+    Size and buckets per account come from the s3_pool section of common config.
+    """
+    cfg = dict(const.S3_POOL_DEFAULTS, **CMN_CFG.get("s3_pool", {}))
+    pool = S3ResourcePool(cfg["size"], buckets_per_account=cfg["buckets_per_account"],
+                          workers=cfg["workers"], prefix="s3pool",
+                          password=DI_CFG["DiUserConfig"]["s3_account"]["password"],
+                          lease_timeout=cfg["lease_timeout"]).start()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="function")
+def s3_pool_account(s3_account_pool):
+    """
+    Lease an S3 account with empty buckets from the session pool.
+    The account is scrubbed and returned to the pool after the test.
+    """
+    account = s3_account_pool.lease()
+    yield account
+    s3_account_pool.release(account)
+
+
+@pytest.fixture(scope="function")
+def system_metrics(request):
+    """
+    Sample CPU, memory, disk and network usage of the worker nodes, of their watched processes
+    and pods while the test runs.
+    Aggregates and samples are saved in the metrics folder of the latest logs.
+    """
+    cfg = dict(const.METRICS_DEFAULTS, **CMN_CFG.get("metrics", {}))
+    nodes = {"master": [], "worker": []}
+    for node in CMN_CFG["nodes"]:
+        nodes.setdefault(node["node_type"].lower(), []).append(
+            LogicalNode(hostname=node["hostname"], username=node["username"],
+                        password=node["password"]))
+    if not nodes["worker"]:
+        # Without worker nodes the collector would sample the client running the tests.
+        LOGGER.warning("No worker nodes, system metrics of %s not collected",
+                       request.node.name)
+        yield None
+        return
+    pod_names = MetricsCollector.get_pod_names(nodes["master"][0]) if nodes["master"] else {}
+    collector = MetricsCollector(nodes["worker"], interval=cfg["interval"],
+                                 capacity=cfg["capacity"], pod_names=pod_names).start()
+    yield collector
+    collector.stop()
+    metrics_dir = os.path.join(params.LOG_DIR_NAME, params.LATEST_LOG_FOLDER, "metrics")
+    os.makedirs(metrics_dir, exist_ok=True)
+    name = re.sub(r"[^\w.-]", "_", request.node.name)
+    collector.to_json(os.path.join(metrics_dir, f"{name}.json"))
+    collector.to_csv(os.path.join(metrics_dir, f"{name}.csv"))
+    if cfg["parquet"]:
+        collector.to_parquet(os.path.join(metrics_dir, f"{name}.parquet"))
+    LOGGER.info("System metrics of %s saved in %s", request.node.name, metrics_dir)
+
+
 @pytest.fixture(scope='function', autouse=False)
 def run_io_async(request):
     if request.config.option.data_integrity_chk:
@@ -995,8 +1130,17 @@ def run_io_async(request):
             nbuckets = request.param["buckets"]
             file_counts = request.param["files_count"]
             prefs_dict = request.param["prefs"]
-        users = mgm_ops.create_account_users(nusers=nuser, use_cortx_cli=False)
-        users_buckets = mgm_ops.create_buckets(nbuckets=nbuckets, users=users)
+        pool = request.getfixturevalue("s3_account_pool")
+        leases = []
+        if nbuckets <= pool.buckets_per_account:
+            leases = [pool.lease() for _ in range(nuser)]
+            users_buckets = {acc.account_name: {
+                "user_name": acc.account_name, "password": pool.password,
+                "accesskey": acc.access_key, "secretkey": acc.secret_key,
+                "buckets": acc.buckets[:nbuckets]} for acc in leases}
+        else:
+            users = mgm_ops.create_account_users(nusers=nuser, use_cortx_cli=False)
+            users_buckets = mgm_ops.create_buckets(nbuckets=nbuckets, users=users)
         run_data_check_obj = RunDataCheckManager(users=users_buckets)
         p = Thread(
             target=get_test_status, args=(request, run_data_check_obj))
@@ -1010,6 +1154,8 @@ def run_io_async(request):
             users=users_buckets,
             di_check=request.config.option.data_integrity_chk,
         )
+        for account in leases:
+            pool.release(account)
     else:
         yield
 
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Run nosetests or pytest test cases in batches on parallel worker processes."""
+import logging
+import os
+import queue
+import subprocess  # nosec
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET  # nosec - reports written by the local test runner.
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+NOSE = "nose"
+PYTEST = "pytest"
+
+
+def spec_key(spec: str) -> str:
+    """
+    Dotted name of a test given as a nose or pytest selector.
+
+    "pkg.mod:Class.test", "pkg/mod.py::Class::test" and the xunit classname "pkg.mod.Class"
+    with name "test" all give "pkg.mod.Class.test".
+    """
+    if "::" in spec or spec.endswith(".py"):
+        path, _, rest = spec.partition("::")
+        module = path[:-3] if path.endswith(".py") else path
+        spec = module.replace("/", ".") + (":" + rest.replace("::", ".") if rest else "")
+    return spec.replace(":", ".")
+
+
+def pytest_selector(spec: str) -> str:
+    """pytest node id of a nose selector."""
+    if "::" in spec or spec.endswith(".py"):
+        return spec
+    module, _, rest = spec.partition(":")
+    path = module.replace(".", "/") + ".py"
+    return path + ("::" + rest.replace(".", "::") if rest else "")
+
+
+def parse_xunit(path: str) -> dict:
+    """
+    Test case results of a nosetests or pytest xunit report.
+
+    :param path: xunit XML file.
+    :return: ordered dict of dotted test name to dict of status PASS, FAIL or SKIP, time and
+        message.
+    """
+    results = OrderedDict()
+    for case in ET.parse(path).getroot().iter("testcase"):  # nosec
+        key = f"{case.get('classname')}.{case.get('name')}" if case.get("classname") \
+            else case.get("name")
+        status, message = "PASS", ""
+        for child in case:
+            if child.tag in ("failure", "error"):
+                status, message = "FAIL", child.get("message") or child.text or ""
+                break
+            if child.tag == "skipped":
+                status, message = "SKIP", child.get("message") or ""
+        results[key] = {"status": status, "time": float(case.get("time") or 0.0),
+                        "message": message}
+    return results
+
+
+def make_batches(specs: list, batch_size: int) -> list:
+    """Split tests in batches of at most batch_size, tests of a module kept together."""
+    modules = OrderedDict()
+    for spec in specs:
+        modules.setdefault(spec_key(spec).rsplit(".", 1)[0], []).append(spec)
+    ordered = [spec for module in modules.values() for spec in module]
+    return [ordered[start:start + batch_size] for start in range(0, len(ordered), batch_size)]
+
+
+class ResultPublisher:
+    """
+    Hand finished batches to a slow callback, such as Jira and DB updates, on a thread.
+
+    Workers never wait for the callback: batches are queued and the callback receives every
+    batch finished since its previous call.
+    """
+
+    def __init__(self, callback):
+        """
+        :param callback: callable receiving a list of batch results.
+        """
+        self.callback = callback
+        self.errors = []
+        self.calls = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="result_publisher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Publish queued batches until None is queued."""
+        done = False
+        while not done:
+            batches = [self._queue.get()]
+            while not self._queue.empty():
+                batches.append(self._queue.get())
+            done = batches[-1] is None
+            batches = [batch for batch in batches if batch is not None]
+            if batches:
+                self.calls += 1
+                try:
+                    self.callback(batches)
+                except Exception as error:  # pylint: disable=broad-except
+                    LOGGER.exception("Publishing %s batches failed", len(batches))
+                    self.errors.append(error)
+
+    def put(self, batch: dict) -> None:
+        """Queue a finished batch."""
+        self._queue.put(batch)
+
+    def close(self) -> None:
+        """Publish the remaining batches and stop."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class ShardedTestRunner:
+    """
+    Run tests in batches, one nosetests or pytest process per batch and several in parallel.
+
+    Every process writes an xunit report parsed for per test results, and gets the environment
+    of its worker slot so parallel workers can be isolated, e.g. by their bucket prefix.
+    """
+
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
+    def __init__(self, test_dir: str, reports_dir: str, workers: int = 4, batch_size: int = 20,
+                 runner: str = NOSE, nosetests: str = "nosetests", timeout: float = None,
+                 env_factory=None, publisher: ResultPublisher = None):
+        """
+        :param test_dir: working directory of the test processes.
+        :param reports_dir: directory of batch logs and xunit reports.
+        :param workers: test processes run in parallel.
+        :param batch_size: tests per process.
+        :param runner: nose or pytest.
+        :param nosetests: nosetests executable.
+        :param timeout: seconds after which a batch process is killed, tests without a result
+            are failed.
+        :param env_factory: callable(slot) returning extra environment of a worker slot.
+        :param publisher: ResultPublisher receiving every finished batch.
+        """
+        self.test_dir = test_dir
+        self.reports_dir = os.path.abspath(reports_dir)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.runner = runner
+        self.nosetests = nosetests
+        self.timeout = timeout
+        self.env_factory = env_factory
+        self.publisher = publisher
+        self._slots = queue.Queue()
+        for slot in range(workers):
+            self._slots.put(slot)
+
+    def command(self, batch: list, xunit_file: str) -> list:
+        """Command line running a batch."""
+        if self.runner == PYTEST:
+            return [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                    f"--junitxml={xunit_file}"] + [pytest_selector(spec) for spec in batch]
+        return [self.nosetests, "--with-xunit", f"--xunit-file={xunit_file}"] + batch
+
+    def startup_time(self, spec: str) -> float:
+        """Time of a test process collecting one test without running it."""
+        if self.runner == PYTEST:
+            cmd = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                   "--collect-only", pytest_selector(spec)]
+        else:
+            cmd = [self.nosetests, "--collect-only", spec]
+        env = dict(os.environ, **(self.env_factory(0) if self.env_factory else {}))
+        start = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,  # nosec
+                       cwd=self.test_dir, env=env, check=False, timeout=self.timeout)
+        return time.perf_counter() - start
+
+    def run_batch(self, index: int, batch: list) -> dict:
+        """
+        Run one batch on a free worker slot.
+
+        :return: dict of index, slot, elapsed time, log, xunit file and results by spec.
+        """
+        slot = self._slots.get()
+        try:
+            log_file = os.path.join(self.reports_dir, f"batch_{index:04d}.log")
+            xunit_file = os.path.join(self.reports_dir, f"batch_{index:04d}.xml")
+            if os.path.exists(xunit_file):
+                # A report left by an earlier run would pass for the results of this one.
+                os.remove(xunit_file)
+            env = dict(os.environ, **(self.env_factory(slot) if self.env_factory else {}))
+            start = time.perf_counter()
+            with open(log_file, "w") as log:
+                LOGGER.info("Batch %s on worker %s: %s tests", index, slot, len(batch))
+                prc = subprocess.Popen(self.command(batch, xunit_file), stdout=log,  # nosec
+                                       stderr=subprocess.STDOUT, cwd=self.test_dir, env=env)
+                try:
+                    prc.wait(timeout=self.timeout)
+                except subprocess.TimeoutExpired:
+                    LOGGER.error("Batch %s timed out after %ss", index, self.timeout)
+                    prc.kill()
+                    prc.wait()
+            elapsed = time.perf_counter() - start
+        finally:
+            self._slots.put(slot)
+        cases = parse_xunit(xunit_file) if os.path.exists(xunit_file) else {}
+        results = {}
+        for spec in batch:
+            key = spec_key(spec)
+            matched = [case for name, case in cases.items()
+                       if name == key or name.startswith(key + ".")]
+            failed = [case for case in matched if case["status"] == "FAIL"]
+            skipped = matched and all(case["status"] == "SKIP" for case in matched)
+            results[spec] = {
+                "status": "FAIL" if failed or not matched else "SKIP" if skipped else "PASS",
+                "time": sum(case["time"] for case in matched),
+                "message": failed[0]["message"] if failed else
+                matched[0]["message"] if skipped else
+                "" if matched else f"No result in xunit report, exit code {prc.returncode}"}
+        batch_result = {"index": index, "slot": slot, "elapsed": elapsed, "log": log_file,
+                        "xunit": xunit_file, "results": results}
+        if self.publisher:
+            self.publisher.put(batch_result)
+        return batch_result
+
+    def run(self, specs: list) -> dict:
+        """
+        Run tests and estimate the time the serial one process per test runner would take.
+
+        The estimate adds the time of a lone process collecting one test to every test time.
+
+        :param specs: nose "module:function" or pytest "path::function" selectors.
+        :return: dict of results by spec, batches and timing statistics.
+        """
+        os.makedirs(self.reports_dir, exist_ok=True)
+        batches = make_batches(specs, self.batch_size)
+        startup = self.startup_time(specs[0]) if specs else 0.0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shard") as pool:
+            batch_results = list(pool.map(self.run_batch, range(len(batches)), batches))
+        elapsed = time.perf_counter() - start
+        results = {spec: result for batch in batch_results
+                   for spec, result in batch["results"].items()}
+        # Process start and collection cost, paid once per test when run serially.
+        serial = sum(result["time"] for result in results.values()) + startup * len(results)
+        report = {"results": results, "batches": batch_results, "elapsed": elapsed,
+                  "serial_estimate": serial, "speedup": serial / elapsed if elapsed else 0.0,
+                  "passed": sum(res["status"] == "PASS" for res in results.values()),
+                  "failed": sum(res["status"] == "FAIL" for res in results.values()),
+                  "skipped": sum(res["status"] == "SKIP" for res in results.values())}
+        LOGGER.info("Ran %s tests in %s batches on %s workers in %.1fs: %s passed, %s failed, "
+                    "%s skipped, serial estimate %.1fs, speedup %.1fx", len(results),
+                    len(batches), self.workers, elapsed, report["passed"], report["failed"],
+                    report["skipped"], serial, report["speedup"])
+        return report
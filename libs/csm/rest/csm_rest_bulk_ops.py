@@ -0,0 +1,290 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Bulk CSM/IAM user provisioning with bounded concurrency, rate limiting and retries."""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from string import Template
+
+from commons.constants import Rest as const
+from commons.constants import S3_ENGINE_RGW
+from commons.utils.perf_utils import RateLimiter
+from commons.utils.perf_utils import latency_stats
+from config import CMN_CFG
+from libs.csm.rest.csm_rest_test_lib import RestTestLib
+
+RETRY_STATUS = (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE)
+
+
+def retry_after_seconds(retry_after, default, maximum=const.BULK_MAX_RETRY_AFTER):
+    """
+    Seconds to wait before a retry as told by a Retry-After header.
+    :param retry_after: header value, delay in seconds or HTTP-date (RFC 7231)
+    :param default: seconds returned when the header is missing or invalid
+    :param maximum: upper bound of the returned delay
+    :return: delay in seconds between 0 and maximum
+    """
+    if not retry_after:
+        return min(default, maximum)
+    try:
+        delay = float(retry_after)
+    except ValueError:
+        try:
+            date = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return min(default, maximum)
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        delay = (date - datetime.now(timezone.utc)).total_seconds()
+    return min(max(delay, 0.0), maximum)
+
+
+class BulkOpsResult:
+    """Outcome and latency statistics of one bulk operation."""
+
+    def __init__(self, operation):
+        """
+        Initialize empty result.
+        :param operation: name of the bulk operation
+        """
+        self.operation = operation
+        self.succeeded = {}
+        self.failed = {}
+        self.latencies = []
+        self.retries = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency, retried=False):
+        """
+        Record one request attempt, thread safe.
+        :param latency: seconds taken by the attempt
+        :param retried: whether the attempt is going to be retried
+        """
+        with self._lock:
+            self.latencies.append(latency)
+            self.retries += int(retried)
+
+    @property
+    def ok(self):
+        """True when every item succeeded."""
+        return not self.failed
+
+    def stats(self):
+        """
+        Summary of the bulk operation.
+        :return: dict of counts, throughput and per request latency statistics
+        """
+        total = len(self.succeeded) + len(self.failed)
+        return {"operation": self.operation, "total": total,
+                "succeeded": len(self.succeeded), "failed": len(self.failed),
+                "retries": self.retries, "elapsed": self.elapsed,
+                "ops_per_sec": total / self.elapsed if self.elapsed else 0.0,
+                "latency": latency_stats(self.latencies)}
+
+
+# pylint: disable-msg=unexpected-keyword-arg
+class RestBulkOps(RestTestLib):
+    """RestBulkOps creates, lists and deletes many CSM/IAM users concurrently"""
+
+    def __init__(self):
+        super(RestBulkOps, self).__init__()
+        self.bulk_workers = self.config.get("bulk_workers", const.BULK_WORKERS)
+        self.bulk_rate = self.config.get("bulk_rate", 0)
+        self.bulk_max_retries = self.config.get("bulk_max_retries", const.BULK_MAX_RETRIES)
+        self.bulk_backoff = self.config.get("bulk_backoff", const.BULK_BACKOFF)
+
+    def _bulk_request(self, request, headers, limiter, result):
+        """
+        Send one request, retrying throttled or unavailable answers with backoff.
+        :param request: tuple of key, request type, endpoint and rest_call kwargs
+        :param headers: authenticated request headers
+        :param limiter: RateLimiter shared by the workers
+        :param result: BulkOpsResult collecting the outcome
+        :return: response of the last attempt
+        """
+        key, request_type, endpoint, kwargs = request
+        response = None
+        for attempt in range(self.bulk_max_retries + 1):
+            limiter.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.restapi.rest_call(request_type, endpoint=endpoint,
+                                                  headers=headers, **kwargs)
+            except Exception as error:  # pylint: disable=broad-except
+                self.log.warning("%s %s attempt %s failed: %s", request_type, endpoint,
+                                 attempt + 1, error)
+                response = error
+            latency = time.perf_counter() - start
+            status = getattr(response, "status_code", None)
+            retry = (status is None or status in RETRY_STATUS) and \
+                attempt < self.bulk_max_retries
+            result.record(latency, retried=retry)
+            if retry:
+                retry_after = getattr(response, "headers", {}).get("Retry-After")
+                time.sleep(retry_after_seconds(retry_after, self.bulk_backoff * 2 ** attempt))
+            else:
+                break
+        return key, response
+
+    def run_bulk_requests(self, operation, requests, expect_status, workers=None, rate=None):
+        """
+        Run requests concurrently with the current authentication headers.
+        :param operation: name of the operation used in logs and stats
+        :param requests: list of (key, request type, endpoint, rest_call kwargs)
+        :param expect_status: status codes treated as success
+        :param workers: max requests in flight, defaults to bulk_workers config
+        :param rate: max requests per second, 0 for unlimited, defaults to bulk_rate config
+        :return: BulkOpsResult
+        """
+        result = BulkOpsResult(operation)
+        headers = dict(self.headers)
+        headers.update(const.CONTENT_TYPE)
+        limiter = RateLimiter(self.bulk_rate if rate is None else rate)
+        workers = min(workers or self.bulk_workers, max(len(requests), 1))
+        self.log.info("Running %s for %s items with %s workers", operation, len(requests),
+                      workers)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._bulk_request, request, headers, limiter, result)
+                       for request in requests]
+            for future in futures:
+                key, response = future.result()
+                if getattr(response, "status_code", None) in expect_status:
+                    result.succeeded[key] = response
+                else:
+                    result.failed[key] = response
+        result.elapsed = time.perf_counter() - start
+        self.log.info("%s stats: %s", operation, result.stats())
+        for key, response in result.failed.items():
+            self.log.error("%s failed for %s: %s", operation, key,
+                           getattr(response, "text", response))
+        return result
+
+    @RestTestLib.authenticate_and_login
+    def bulk_create_csm_users(self, users, role="manage", password=None, **kwargs):
+        """
+        Create CSM users concurrently.
+        :param users: count of users to create or list of usernames
+        :param role: role of the new users
+        :param password: password of the new users, defaults to test_csmuser_password
+        :keyword workers: max requests in flight
+        :keyword rate: max requests per second
+        :return: BulkOpsResult keyed by username
+        """
+        if isinstance(users, int):
+            prefix = "csm{}".format(int(time.time_ns()))
+            users = ["{}{}".format(prefix, index) for index in range(users)]
+        password = password or self.config["test_csmuser_password"]
+        requests = []
+        for user in users:
+            payload = {"username": user, "password": password, "role": role,
+                       "email": user + "@seagate.com", "alert_notification": "true"}
+            requests.append((user, "post", self.config["csmuser_endpoint"],
+                             {"data": json.dumps(payload)}))
+        return self.run_bulk_requests("bulk_create_csm_users", requests,
+                                      (HTTPStatus.CREATED,), **kwargs)
+
+    @RestTestLib.authenticate_and_login
+    def bulk_delete_csm_users(self, users, **kwargs):
+        """
+        Delete CSM users concurrently.
+        :param users: list of user ids or usernames
+        :keyword workers: max requests in flight
+        :keyword rate: max requests per second
+        :return: BulkOpsResult keyed by user
+        """
+        requests = [(user, "delete", "{}/{}".format(self.config["csmuser_endpoint"], user), {})
+                    for user in users]
+        return self.run_bulk_requests("bulk_delete_csm_users", requests,
+                                      (HTTPStatus.OK,), **kwargs)
+
+    @RestTestLib.authenticate_and_login
+    def bulk_create_iam_users(self, users, password=None, **kwargs):
+        """
+        Create IAM users concurrently.
+        :param users: count of users to create or list of user ids
+        :param password: password of the new users for non RGW engines
+        :keyword workers: max requests in flight
+        :keyword rate: max requests per second
+        :return: BulkOpsResult keyed by user id
+        """
+        if isinstance(users, int):
+            prefix = "{}{}".format(const.IAM_USER, int(time.time_ns()))
+            users = ["{}{}".format(prefix, index) for index in range(users)]
+        requests = []
+        for user in users:
+            if S3_ENGINE_RGW == CMN_CFG["s3_engine"]:
+                requests.append((user, "post", self.config["s3_iam_user_endpoint"],
+                                 {"json_dict": {"uid": user, "display_name": user}}))
+            else:
+                payload = Template(const.IAM_USER_DATA_PAYLOAD).substitute(
+                    iamuser=user, iampassword=password or self.config["iam_user"]["password"],
+                    requireresetval="true")
+                requests.append((user, "post", self.config["iam_users_endpoint"],
+                                 {"data": payload}))
+        return self.run_bulk_requests("bulk_create_iam_users", requests,
+                                      (HTTPStatus.OK, HTTPStatus.CREATED), **kwargs)
+
+    @RestTestLib.authenticate_and_login
+    def bulk_delete_iam_users(self, users, purge_data=None, **kwargs):
+        """
+        Delete IAM users concurrently.
+        :param users: list of user ids
+        :param purge_data: if True, deletes user created data
+        :keyword workers: max requests in flight
+        :keyword rate: max requests per second
+        :return: BulkOpsResult keyed by user id
+        """
+        if S3_ENGINE_RGW == CMN_CFG["s3_engine"]:
+            endpoint = self.config["s3_iam_user_endpoint"]
+            extra = {"json_dict": {"purge_data": purge_data}} if purge_data is not None else {}
+        else:
+            endpoint = self.config["iam_users_endpoint"]
+            extra = {}
+        requests = [(user, "delete", "{}/{}".format(endpoint, user), extra) for user in users]
+        return self.run_bulk_requests("bulk_delete_iam_users", requests,
+                                      (HTTPStatus.OK, HTTPStatus.NO_CONTENT), **kwargs)
+
+    @RestTestLib.authenticate_and_login
+    def bulk_list_users(self, user_type="csm"):
+        """
+        List the names of all users of a type.
+        :param user_type: csm or iam
+        :return: list of usernames / user ids
+        """
+        if user_type == "csm":
+            endpoint, list_key, name_key = self.config["csmuser_endpoint"], "users", "username"
+        elif S3_ENGINE_RGW == CMN_CFG["s3_engine"]:
+            endpoint, list_key, name_key = self.config["iam_users_endpoint"], "users", "uid"
+        else:
+            endpoint, list_key, name_key = self.config["iam_users_endpoint"], "iam_users", \
+                                           "user_name"
+        response = self.restapi.rest_call("get", endpoint=endpoint, headers=self.headers)
+        if response.status_code != HTTPStatus.OK:
+            self.log.error("Listing %s users failed: %s", user_type, response.text)
+            return []
+        return [user[name_key] if isinstance(user, dict) else user
+                for user in response.json().get(list_key, [])]
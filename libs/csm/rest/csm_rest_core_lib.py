@@ -21,12 +21,84 @@
 
 import json
 import logging
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 from commons import constants
 from commons.constants import Rest as const
 from config import CMN_CFG
 
+
+class LoginTokenCache:
+    """
+        Thread safe cache of CSM login tokens keyed by user.
+    """
+
+    def __init__(self, ttl=const.TOKEN_CACHE_TTL):
+        """
+        This function will initialize this class
+        :param ttl: seconds a cached token is reused before a fresh login, 0 disables caching
+        """
+        self.ttl = ttl
+        self._tokens = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key_lock(self, key):
+        """
+        Lock serializing logins of one user so concurrent callers share one token.
+        :param key: cache key of the user
+        :return: threading lock for the key
+        """
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, key, payload):
+        """
+        Fetch a live token for the user.
+        :param key: cache key of the user
+        :param payload: login payload, a changed payload (e.g. new password) is a miss
+        :return: cached token or None
+        """
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry and entry[1] == payload and entry[2] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, key, payload, token):
+        """
+        Store the token of a successful login.
+        :param key: cache key of the user
+        :param payload: login payload used for the token
+        :param token: value of the Authorization header
+        """
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._tokens[key] = (token, payload, time.monotonic() + self.ttl)
+
+    def invalidate(self, key=None, token=None):
+        """
+        Drop cached tokens of a user, a token value or everything.
+        :param key: cache key of the user
+        :param token: value of the Authorization header
+        """
+        with self._lock:
+            if key is None and token is None:
+                self._tokens.clear()
+                return
+            for cached_key, entry in list(self._tokens.items()):
+                if cached_key == key or entry[0] == token:
+                    del self._tokens[cached_key]
+
+
 class RestClient:
     """
         This is the class for rest calls
@@ -40,15 +112,50 @@ class RestClient:
         requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
         self.log = logging.getLogger(__name__)
         self._config = config
-        self._request = {"get": requests.get, "post": requests.post,
-                         "patch": requests.patch, "delete": requests.delete,
-                         "put": requests.put}
+        self._session = None
+        requester = requests
+        if self._config.get("session_reuse", True):
+            # Pooled keep-alive connections avoid a TCP+TLS handshake per call
+            pool_size = self._config.get("session_pool_size", const.SESSION_POOL_SIZE)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self._session = requests.Session()
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+            requester = self._session
+        self._request = {"get": requester.get, "post": requester.post,
+                         "patch": requester.patch, "delete": requester.delete,
+                         "put": requester.put}
         self._base_url = "{}:{}".format(
             self._config["mgmt_vip"], str(self._config["port"]))
         self._json_file_path = self._config[
             "jsonfile"] if 'jsonfile' in self._config else const.JOSN_FILE
         self.secure_connection = self._config["secure"]
 
+    @property
+    def base_url(self):
+        """Management endpoint host:port used by this client."""
+        return self._base_url
+
+    def close(self):
+        """
+        This function will release the pooled connections of the session
+        """
+        if self._session is not None:
+            self._session.close()
+
+    def _log_response(self, response_object):
+        """
+        Log the response body, formatted only when debug logging is enabled.
+        :param response_object: response of the request
+        """
+        if not self.log.isEnabledFor(logging.DEBUG):
+            return
+        self.log.debug("Response Object: %s", response_object)
+        try:
+            self.log.debug("Response JSON: %s", response_object.json())
+        except BaseException:
+            self.log.debug("Response Text: %s", response_object.text)
+
     # pylint: disable=too-many-arguments
     def rest_call(self, request_type, endpoint=None,
                   data=None, headers=None, params=None, json_dict=None,
@@ -74,7 +181,8 @@ class RestClient:
         self.log.debug("Request type : %s", request_type.upper())
         self.log.debug("Header : %s", headers)
         self.log.debug("Parameters : %s", params)
-        self.log.debug("json_dict: %s", json.dumps(json_dict))
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug("json_dict: %s", json.dumps(json_dict))
         # TODO: Need to be verified and fix by CSM team. Temporary fix for s3 failures
         if CMN_CFG.get("product_family") == constants.PROD_FAMILY_LC:
             # To Resolve {'error_code': '4099', 'message': 'Invalid request message received.',
@@ -85,11 +193,7 @@ class RestClient:
         response_object = self._request[request_type](
             request_url, headers=headers,
             data=data, params=params, verify=False, json=json_dict)
-        self.log.debug("Response Object: %s", response_object)
-        try:
-            self.log.debug("Response JSON: %s", response_object.json())
-        except BaseException:
-            self.log.debug("Response Text: %s", response_object.text)
+        self._log_response(response_object)
         # Can be used in case of larger response
         if save_json:
             with open(self._json_file_path, 'w+') as json_file:
@@ -122,12 +226,7 @@ class RestClient:
         response_object = self._request[request_type](
             endpoint, headers=headers,
             data=data, params=params, verify=False, json=json_dict)
-        self.log.debug("Response Object: %s", response_object)
-        try:
-            self.log.debug("Response JSON: %s", response_object.json())
-        except BaseException as error:
-            self.log.warning(error)
-            self.log.debug("Response Text: %s", response_object.text)
+        self._log_response(response_object)
         # Can be used in case of larger response
         if save_json:
             with open(self._json_file_path, 'w+') as json_file:
@@ -22,16 +22,18 @@ from commons.constants import NAMESPACE
 from commons.commands import GET_MAX_USERS
 from commons.commands import GET_REQUEST_USAGE
 from libs.jmeter.jmeter_integration import JmeterInt
+from libs.csm.rest.csm_rest_bulk_ops import RestBulkOps
 from libs.csm.rest.csm_rest_test_lib import RestTestLib
 
 # pylint: disable-msg=unexpected-keyword-arg
-class RestParallelOps(RestTestLib):
+class RestParallelOps(RestBulkOps):
     """RestIamUser contains all the Rest API calls for iam user operations"""
 
     def __init__(self):
         super(RestParallelOps, self).__init__()
         self.jmx_obj = JmeterInt()
         self.counter = 0
+        self.parallel_ops_engine = self.config.get("parallel_ops_engine", "native")
 
     def get_request_usage_limit(self):
         """
@@ -122,10 +124,15 @@ class RestParallelOps(RestTestLib):
         if users is None:
             users = self.get_max_csm_user_limit()
         users = users - existing_user
+        request_limit = self.get_request_usage_limit()
+        if self.parallel_ops_engine == "native":
+            result = self.bulk_create_csm_users(
+                [f"newmanageuser{i}" for i in range(users)], role="manage",
+                password="Seagate@1", workers=request_limit)
+            return result.ok
 
         jmx_file = "CSM_Create_N_CSM_Users.jmx"
         self.log.info("Running jmx script: %s", jmx_file)
-        request_limit = self.get_request_usage_limit()
         result = self.execute_max_user_loop(jmx_file, users, request_limit, ops = "create")
         return result
 
@@ -138,10 +145,14 @@ class RestParallelOps(RestTestLib):
         if users is None:
             users = self.get_max_csm_user_limit()
         users = users - existing_user
+        request_limit = self.get_request_usage_limit()
+        if self.parallel_ops_engine == "native":
+            result = self.bulk_delete_csm_users(
+                [f"newmanageuser{i}" for i in range(users)], workers=request_limit)
+            return result.ok
+
         jmx_file = "CSM_Delete_N_CsmUsers.jmx"
         self.log.info("Running jmx script: %s", jmx_file)
-
-        request_limit = self.get_request_usage_limit()
         result = self.execute_max_user_loop(jmx_file, users, request_limit, ops = "delete")
         return result
 
@@ -29,8 +29,13 @@ from commons.constants import Rest as const
 from commons.exceptions import CTException
 from config import CSM_REST_CFG
 from config import CMN_CFG
+from libs.csm.rest.csm_rest_core_lib import LoginTokenCache
 from libs.csm.rest.csm_rest_core_lib import RestClient
 
+# Login tokens shared by all the REST libs of a test session.
+LOGIN_TOKEN_CACHE = LoginTokenCache(
+    ttl=CSM_REST_CFG.get("token_cache_ttl", const.TOKEN_CACHE_TTL))
+
 
 class RestTestLib:
     """
@@ -65,6 +70,15 @@ class RestTestLib:
                 host = node["hostname"]
                 self.worker_list.append(host)
 
+    def _login_payload(self, login_as):
+        """
+        Build the login payload for a config user type or a credentials dict.
+        login_as str/dict: The type of user you desire to login
+        """
+        if isinstance(login_as, dict):
+            return Template(const.LOGIN_PAYLOAD).substitute(login_as)
+        return Template(const.LOGIN_PAYLOAD).substitute(**self.config[login_as])
+
     def rest_login(self, login_as):
         """
         This function will request for login
@@ -76,11 +90,7 @@ class RestTestLib:
             endpoint = self.config["rest_login_endpoint"]
             headers = self.config["Login_headers"]
             self.log.debug("endpoint: %s", endpoint)
-            if isinstance(login_as, dict):
-                payload = Template(const.LOGIN_PAYLOAD).substitute(login_as)
-            else:
-                payload = Template(const.LOGIN_PAYLOAD).substitute(
-                    **self.config[login_as])
+            payload = self._login_payload(login_as)
 
             # Fetch and verify response
             response = self.restapi.rest_call(
@@ -177,6 +187,43 @@ class RestTestLib:
                 err.CSM_REST_AUTHENTICATION_ERROR, error) from error
         return response
 
+    def _log_failed_login(self, response):
+        """
+        Log the details of a rejected login response.
+        :param response: response of the login request
+        """
+        self.log.error("Authentication request failed in %s.\nResponse code : %s",
+                       RestTestLib.authenticate_and_login.__name__, response.status_code)
+        self.log.error("Response content: %s", response.content)
+        self.log.error("Request headers : %s\nRequest body : %s",
+                       response.request.headers, response.request.body)
+
+    def get_login_token(self, login_as, refresh=False):
+        """
+        This function will fetch the login token of the user, reusing the cached one
+        until it expires or refresh is requested.
+        login_as str/dict: The type of user you desire to login
+        :param refresh: discard the cached token and login again
+        :return: tuple of token and whether it was served from the cache
+        """
+        payload = self._login_payload(login_as)
+        user = login_as if isinstance(login_as, dict) else self.config[login_as]
+        key = (self.restapi.base_url, user["username"])
+        with LOGIN_TOKEN_CACHE.key_lock(key):
+            if refresh:
+                LOGIN_TOKEN_CACHE.invalidate(key=key)
+            else:
+                token = LOGIN_TOKEN_CACHE.get(key, payload)
+                if token:
+                    return token, True
+            response = self.rest_login(login_as=login_as)
+            if response.status_code != const.SUCCESS_STATUS:
+                self._log_failed_login(response)
+                raise CTException(err.CSM_REST_AUTHENTICATION_ERROR)
+            token = response.headers['Authorization']
+            LOGIN_TOKEN_CACHE.put(key, payload, token)
+            return token, False
+
     @staticmethod
     def authenticate_and_login(func):
         """
@@ -202,17 +249,20 @@ class RestTestLib:
             authorized = kwargs.pop("authorized") if "authorized" in kwargs else True
             # Fetching the login response
             self.log.debug("user will be logged in as %s", login_type)
-            response = self.rest_login(login_as=login_type)
-            if authorized and response.status_code == const.SUCCESS_STATUS:
-                self.headers = {'Authorization': response.headers['Authorization']}
-            else:
-                self.log.error("Authentication request failed in %s.\nResponse code : %s",
-                               RestTestLib.authenticate_and_login.__name__, response.status_code)
-                self.log.error("Response content: %s", response.content)
-                self.log.error("Request headers : %s\nRequest body : %s",
-                               response.request.headers, response.request.body)
+            if not authorized:
+                response = self.rest_login(login_as=login_type)
+                self._log_failed_login(response)
                 raise CTException(err.CSM_REST_AUTHENTICATION_ERROR)
-            return func(self, *args, **kwargs)
+            token, cached = self.get_login_token(login_type)
+            self.headers = {'Authorization': token}
+            response = func(self, *args, **kwargs)
+            if cached and getattr(response, "status_code", None) == const.UNAUTHORIZED:
+                # Cached session was revoked on the server, login again and retry once
+                self.log.debug("Cached token rejected, logging in again as %s", login_type)
+                token, _ = self.get_login_token(login_type, refresh=True)
+                self.headers = {'Authorization': token}
+                response = func(self, *args, **kwargs)
+            return response
 
         return create_authenticate_header
 
@@ -236,6 +286,7 @@ class RestTestLib:
             # logout session.
             resp = self.restapi.rest_call(
                 "post", endpoint=self.config["rest_logout_endpoint"], headers=self.headers)
+            LOGIN_TOKEN_CACHE.invalidate(token=self.headers.get("Authorization"))
             if resp.status_code != const.SUCCESS_STATUS:
                 raise CTException(err.CSM_REST_AUTHENTICATION_ERROR)
             return response
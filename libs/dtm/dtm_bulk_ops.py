@@ -0,0 +1,269 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+"""
+Parallel object overwrite and server side copy engines for DTM background workloads
+"""
+import abc
+import hashlib
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+from commons.utils.perf_utils import latency_histogram
+from commons.utils.perf_utils import latency_stats
+from libs.dtm.dtm_workload import error_name
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PayloadPool:
+    """
+    Random payloads kept in memory and reused across uploads, with their md5.
+
+    All payloads are views of one random buffer starting at different offsets, so count
+    distinct payloads of up to max_size bytes take max_size plus a few KB of memory.
+    """
+
+    def __init__(self, max_size: int, count: int = 8, min_size: int = 0, stride: int = 4096):
+        """
+        :param max_size: largest payload in bytes.
+        :param count: distinct payloads.
+        :param min_size: smallest payload in bytes.
+        :param stride: offset in bytes between the starts of two payloads.
+        """
+        self._random = random.Random()  # nosec - payload choice, not security.
+        buffer = memoryview(os.urandom(max_size + stride * count))
+        self.payloads = []
+        for index in range(count):
+            size = self._random.randint(min_size, max_size)
+            data = buffer[index * stride:index * stride + size]
+            self.payloads.append((data, hashlib.md5(data).hexdigest()))  # nosec - s3 ETag.
+
+    def pick(self) -> tuple:
+        """A payload and its md5 hex digest, chosen at random."""
+        return self._random.choice(self.payloads)
+
+
+class BulkEngine(abc.ABC):
+    """
+    Run object tasks on a pool of worker threads, in the foreground or in the background.
+
+    Workers take tasks from a queue and check the stop event before every request, so setting
+    it ends the run within one request per worker. The latency of every request is kept per
+    operation and reported as statistics and a histogram.
+    """
+
+    def __init__(self, s3_client, workers: int = 8, stop_event: threading.Event = None):
+        """
+        :param s3_client: boto3 S3 client.
+        :param workers: concurrent requests.
+        :param stop_event: event ending the run, default a private one set by stop().
+        """
+        self.s3_client = s3_client
+        self.workers = workers
+        self.stop_event = stop_event or threading.Event()
+        self.latencies = {}
+        self.failed = {}
+        self.mismatches = []
+        self.completed = 0
+        self._tasks = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._started = None
+        self._elapsed = 0.0
+
+    def _request(self, op: str, func):
+        """Run a request, keeping its latency under op."""
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            latency = time.perf_counter() - start
+            with self._lock:
+                self.latencies.setdefault(op, []).append(latency)
+
+    def _mismatch(self, key: str, expected: str, actual: str, op: str) -> None:
+        """Record data differing from what was written or copied."""
+        LOGGER.error("%s of %s: expected %s, got %s", op, key, expected, actual)
+        with self._lock:
+            self.mismatches.append({"key": key, "op": op, "expected": expected,
+                                    "actual": actual})
+
+    @abc.abstractmethod
+    def run_task(self, task) -> None:
+        """Process one task, raising on failure."""
+
+    def _worker(self) -> None:
+        """Process tasks until the queue is empty or the stop event is set."""
+        while not self.stop_event.is_set():
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                self.run_task(task)
+            except Exception as error:  # pylint: disable=broad-except
+                LOGGER.error("%s of %s failed: %s", type(self).__name__, task, error)
+                with self._lock:
+                    self.failed[str(task)] = error_name(error)
+            else:
+                with self._lock:
+                    self.completed += 1
+
+    def start(self, tasks: list):
+        """Start processing tasks in the background."""
+        for task in tasks:
+            self._tasks.put(task)
+        self._started = time.perf_counter()
+        self._threads = [threading.Thread(target=self._worker, daemon=True,
+                                          name=f"{type(self).__name__}_{index}")
+                         for index in range(min(self.workers, max(len(tasks), 1)))]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def wait(self) -> dict:
+        """Wait for the workers to finish and return the report."""
+        for thread in self._threads:
+            thread.join()
+        self._elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return self.report()
+
+    def stop(self) -> dict:
+        """Stop after the requests in flight and return the report."""
+        self.stop_event.set()
+        return self.wait()
+
+    def run(self, tasks: list) -> dict:
+        """Process tasks in the foreground and return the report."""
+        return self.start(tasks).wait()
+
+    def report(self) -> dict:
+        """Counts, failures, mismatches and per operation latency statistics and histograms."""
+        with self._lock:
+            latencies = {op: list(samples) for op, samples in self.latencies.items()}
+            report = {"completed": self.completed, "failed": dict(self.failed),
+                      "mismatches": list(self.mismatches), "pending": self._tasks.qsize(),
+                      "stopped": self.stop_event.is_set(), "elapsed": self._elapsed}
+        report["ops"] = {op: {"latency": latency_stats(samples),
+                              "histogram": latency_histogram(samples)}
+                         for op, samples in latencies.items()}
+        LOGGER.info("%s: %s completed, %s failed, %s mismatches, %s pending in %.1fs, p99 %s",
+                    type(self).__name__, report["completed"], len(report["failed"]),
+                    len(report["mismatches"]), report["pending"], report["elapsed"],
+                    {op: round(stats["latency"]["p99"] * 1000, 1)
+                     for op, stats in report["ops"].items()})
+        return report
+
+
+class OverwriteEngine(BulkEngine):
+    """
+    Overwrite objects again and again with payloads of a PayloadPool.
+
+    Each key is overwritten iterations times by one worker in turn, so its ETag and read back
+    checksum can be verified after every write; different keys are overwritten in parallel.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, s3_client, bucket: str, payloads: PayloadPool, iterations: int = 1,
+                 verify_read: bool = True, **kwargs):
+        """
+        :param s3_client: boto3 S3 client.
+        :param bucket: existing bucket of the objects.
+        :param payloads: payloads written.
+        :param iterations: overwrites of every key.
+        :param verify_read: read back every object and compare its md5.
+        :param kwargs: BulkEngine workers and stop_event.
+        """
+        super().__init__(s3_client, **kwargs)
+        self.bucket = bucket
+        self.payloads = payloads
+        self.iterations = iterations
+        self.verify_read = verify_read
+
+    def run_task(self, task) -> None:
+        """Overwrite one key iterations times, verifying every write."""
+        for _ in range(self.iterations):
+            if self.stop_event.is_set():
+                return
+            data, digest = self.payloads.pick()
+            resp = self._request("put", lambda: self.s3_client.put_object(
+                Bucket=self.bucket, Key=task, Body=bytes(data)))
+            etag = resp.get("ETag", "").strip('"')
+            if etag != digest:
+                self._mismatch(task, digest, etag, "put ETag")
+                continue
+            if self.verify_read:
+                body = self._request("get", lambda: self._read(task))
+                actual = hashlib.md5(body).hexdigest()  # nosec - s3 ETag based on md5.
+                if actual != digest:
+                    self._mismatch(task, digest, actual, "get checksum")
+
+    def _read(self, key: str) -> bytes:
+        """Object data."""
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        return body.read() if hasattr(body, "read") else body
+
+
+class CopyEngine(BulkEngine):
+    """
+    Server side copy of objects between buckets, the copies verified against the source.
+
+    A copy must have the ETag of its single part source; the copy of a multipart source, whose
+    ETag depends on the part layout, must have its size.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, s3_client, source_bucket: str, dest_bucket: str, verify: bool = True,
+                 **kwargs):
+        """
+        :param s3_client: boto3 S3 client.
+        :param source_bucket: bucket of the objects copied.
+        :param dest_bucket: existing bucket receiving the copies, under the same keys.
+        :param verify: compare every copy with its source.
+        :param kwargs: BulkEngine workers and stop_event.
+        """
+        super().__init__(s3_client, **kwargs)
+        self.source_bucket = source_bucket
+        self.dest_bucket = dest_bucket
+        self.verify = verify
+
+    def run_task(self, task) -> None:
+        """Copy one key and verify the copy."""
+        source = self._request("head", lambda: self.s3_client.head_object(
+            Bucket=self.source_bucket, Key=task)) if self.verify else None
+        resp = self._request("copy", lambda: self.s3_client.copy_object(
+            Bucket=self.dest_bucket, Key=task,
+            CopySource={"Bucket": self.source_bucket, "Key": task}))
+        if not self.verify:
+            return
+        expected = source["ETag"].strip('"')
+        if "-" not in expected:
+            etag = resp["CopyObjectResult"]["ETag"].strip('"')
+            if etag != expected:
+                self._mismatch(task, expected, etag, "copy ETag")
+            return
+        copy = self._request("head", lambda: self.s3_client.head_object(
+            Bucket=self.dest_bucket, Key=task))
+        if copy["ContentLength"] != source["ContentLength"]:
+            self._mismatch(task, source["ContentLength"], copy["ContentLength"], "copy size")
@@ -23,22 +23,26 @@ Library Methods for DTM recovery testing
 import copy
 import logging
 import os
-import random
 import re
 import secrets
 import time
 
 import yaml
 
+from commons import commands
 from commons import constants as const
 from commons.exceptions import CTException
 from commons.helpers.pods_helper import LogicalNode
-from commons.params import TEST_DATA_FOLDER
-from commons.utils import system_utils
+from commons.utils.wait_utils import WaitTimeoutError
+from commons.utils.wait_utils import wait_until
 from config import CMN_CFG
 from config import DTM_CFG
 from config import HA_CFG
 from config import S3_CFG
+from libs.dtm.dtm_bulk_ops import CopyEngine
+from libs.dtm.dtm_bulk_ops import OverwriteEngine
+from libs.dtm.dtm_bulk_ops import PayloadPool
+from libs.dtm.dtm_workload import StreamingWorkload
 from libs.ha.ha_common_libs_k8s import HAK8s
 from libs.s3 import ACCESS_KEY, SECRET_KEY
 from libs.s3.s3_test_lib import S3TestLib
@@ -209,12 +213,109 @@ class DTMRecoveryTestLib:
         master_node.write_file(local_path, str(delay))
         master_node.copy_file_to_container(local_path, pod, file_path, container)
 
-    # pylint: disable-msg=too-many-locals
+    def streaming_workload(self, bucket_name, **kwargs):
+        """
+        Streaming workload of continuous writes and verified reads on a new bucket
+        The client does not retry, so the timeline shows every request failing during a restart.
+        :param bucket_name: Bucket to be created for the workload
+        :param kwargs: StreamingWorkload arguments such as writers, readers and obj_size
+        :return: StreamingWorkload, started with start() or as a context manager
+        """
+        s3_obj = S3TestLib(access_key=self.access_key, secret_key=self.secret_key,
+                           max_attempts=1)
+        s3_obj.create_bucket(bucket_name)
+        return StreamingWorkload(s3_obj.s3_client, bucket_name, **kwargs)
+
+    @staticmethod
+    def get_process_starts(master_node, pod_name, container_name, process):
+        """
+        Function to get the PIDs and start times of a process running inside a container
+        :param master_node: Object of master node
+        :param pod_name: Name of the pod on which container is residing
+        :param container_name: Name of the container inside which process is running
+        :param process: Name of the process
+        :return: set of "PID start time" entries, empty if the process is not running
+        """
+        cmd = commands.PROC_START_CMD.format(process)
+        try:
+            resp = master_node.send_k8s_cmd(operation="exec", pod=pod_name,
+                                            namespace=const.NAMESPACE,
+                                            command_suffix=f"-c {container_name} -- {cmd}",
+                                            decode=True)
+        except IOError:
+            return set()
+        return {" ".join(line.split()) for line in resp.splitlines() if line.strip()}
+
+    @staticmethod
+    def get_container_restarts(master_node, pod_name, container_name):
+        """
+        Function to get the restart count of a container from the pod status
+        :param master_node: Object of master node
+        :param pod_name: Name of the pod on which container is residing
+        :param container_name: Name of the container
+        :return: restart count, None if it could not be read
+        """
+        try:
+            resp = master_node.send_k8s_cmd(
+                operation="get", pod=f"pod {pod_name}", namespace=const.NAMESPACE,
+                command_suffix=commands.KUBECTL_GET_CONTAINER_RESTARTS.format(container_name),
+                decode=True)
+            return int(resp)
+        except (IOError, ValueError):
+            return None
+
+    def get_restart_state(self, master_node, pod_name, container_name, process) -> tuple:
+        """
+        Restart count of the container and start of the process, changed by a restart
+        :param master_node: Object of master node
+        :param pod_name: Name of the pod on which container is residing
+        :param container_name: Name of the container inside which process is running
+        :param process: Name of the process
+        :return: container restart count, set of "PID start time" entries
+        """
+        return (self.get_container_restarts(master_node, pod_name, container_name),
+                self.get_process_starts(master_node, pod_name, container_name, process))
+
+    def wait_process_restarted(self, master_node, pod_name, container_name, process,
+                               old_state: tuple, timeout: int):
+        """
+        Poll until the process runs again after its container restarted or as a new process.
+        PIDs are reused by a restarted container, so a restart is told by a higher container
+        restart count or by processes with other start times than the killed ones.
+        :param master_node: Object of master node
+        :param pod_name: Name of the pod on which container is residing
+        :param container_name: Name of the container inside which process is running
+        :param process: Name of the process
+        :param old_state: get_restart_state() before the process was killed
+        :param timeout: Poll timeout in seconds
+        :return: bool
+        """
+        old_restarts, old_starts = old_state
+
+        def restarted(state):
+            restarts, starts = state
+            if not starts:
+                return False
+            if None not in (restarts, old_restarts) and restarts > old_restarts:
+                return True
+            return not starts & old_starts
+
+        try:
+            wait_until(lambda: self.get_restart_state(master_node, pod_name, container_name,
+                                                      process),
+                       timeout=timeout, interval=DTM_CFG["proc_ready_interval"],
+                       max_interval=DTM_CFG["proc_ready_interval"] * 4, success=restarted,
+                       name=f"{process} restart in {pod_name}/{container_name}")
+        except WaitTimeoutError:
+            return False
+        return True
+
+    # pylint: disable-msg=too-many-locals, too-many-branches
     def process_restart_with_delay(self, master_node, health_obj, pod_prefix, container_prefix,
                                    process,
                                    check_proc_state: bool = False, proc_state: str =
                                    const.DTM_RECOVERY_STATE, restart_cnt: int = 1,
-                                   proc_restart_delay: int = 600):
+                                   proc_restart_delay: int = 600, timeline=None):
         """
         Restart specified Process of specific pod and container
         :param master_node: Master node object
@@ -227,6 +328,8 @@ class DTMRecoveryTestLib:
         :param restart_cnt: Count to restart process from randomly selected pod (Restart once
         previously restarted process recovers)
         :param proc_restart_delay: Delay in seconds to restart the process after killing it.
+        :param timeline: WorkloadTimeline of a streaming workload, marked with the kill, process
+        restart and cluster online events.
         return : boolean
         """
 
@@ -243,24 +346,38 @@ class DTMRecoveryTestLib:
                                                                               container_prefix)
             self.set_proc_restart_duration(master_node, pod_selected, container, proc_restart_delay)
             try:
+                old_state = self.get_restart_state(master_node, pod_selected, container,
+                                                   process)
                 self.log.info("Kill %s from %s pod %s container ", process, pod_selected, container)
+                if timeline:
+                    timeline.mark(f"kill {process}", fault=True, pod=pod_selected,
+                                  container=container)
                 resp = master_node.kill_process_in_container(pod_name=pod_selected,
                                                              container_name=container,
                                                              process_name=process)
                 self.log.debug("Resp : %s", resp)
-                self.log.info("Sleep till %s", proc_restart_delay)
-                # added 20 seconds delay for container to restart.
-                time.sleep(proc_restart_delay + 20)
+                self.log.info("Poll for %s to restart after %ss", process, proc_restart_delay)
+                resp = self.wait_process_restarted(
+                    master_node, pod_selected, container, process, old_state,
+                    timeout=proc_restart_delay + DTM_CFG["proc_ready_timeout"])
                 self.set_proc_restart_duration(master_node, pod_selected, container, 0)
             except (ValueError, IOError) as ex:
                 self.log.error("Exception Occurred during killing process : %s", ex)
                 self.set_proc_restart_duration(master_node, pod_selected, container, 0)
                 return False
+            if not resp:
+                self.log.error("%s did not restart in %s pod %s container", process,
+                               pod_selected, container)
+                return False
+            if timeline:
+                timeline.mark(f"{process} restarted")
 
             self.log.info("Polling hctl status to check if all services are online")
             resp = self.ha_obj.poll_cluster_status(pod_obj=master_node, timeout=300)
             if not resp[0]:
                 return resp[0]
+            if timeline:
+                timeline.mark("cluster online")
 
             if check_proc_state:
                 self.log.info("Check process states")
@@ -318,27 +435,31 @@ class DTMRecoveryTestLib:
         :param timeout: Poll timeout
         :return: Bool
         """
-        resp = False
-        process_state = None
         self.log.info("Polling process states")
-        start_time = int(time.time())
-        while timeout > int(time.time()) - start_time:
-            time.sleep(60)
-            resp, process_state = self.get_process_state(master_node=master_node, pod_name=pod_name,
-                                                         container_name=container_name,
-                                                         process_ids=process_ids)
-            if not resp:
-                self.log.info("Failed to get process states for process with IDs %s. "
-                              "process_state dict: %s", process_ids, process_state)
-                return resp
-            self.log.debug("Process states: %s", process_state)
-            states = list(process_state.values())
-            resp = all(ele == status for ele in states)
-            if resp:
-                self.log.debug("Time taken by process to recover is %s seconds",
-                               int(time.time()) - start_time)
-                break
-
+        start_time = time.monotonic()
+        try:
+            resp, process_state = wait_until(
+                lambda: self.get_process_state(master_node=master_node, pod_name=pod_name,
+                                               container_name=container_name,
+                                               process_ids=process_ids),
+                timeout=timeout, interval=DTM_CFG["proc_ready_interval"],
+                max_interval=DTM_CFG["proc_ready_interval"] * 4,
+                success=lambda state: state[0] and all(
+                    ele == status for ele in state[1].values()),
+                fail_fast=lambda state: not state[0], raise_on_timeout=False,
+                name=f"process states {status}")
+        except IOError as error:
+            self.log.error("Failed to get process states: %s", error)
+            return False
+        if not resp:
+            self.log.info("Failed to get process states for process with IDs %s. "
+                          "process_state dict: %s", process_ids, process_state)
+            return resp
+        self.log.debug("Process states: %s", process_state)
+        resp = all(ele == status for ele in process_state.values())
+        if resp:
+            self.log.debug("Time taken by process to recover is %s seconds",
+                           int(time.monotonic() - start_time))
         self.log.info("State of process is : %s", process_state)
         return resp
 
@@ -362,80 +483,54 @@ class DTMRecoveryTestLib:
         fids = fids[svc]
         return True, fids, delay
 
-    def perform_object_overwrite(self, bucket_name, object_name, iteration, object_size, queue):
+    # pylint: disable=too-many-arguments
+    def perform_object_overwrite(self, bucket_name, object_name, iteration, object_size, queue,
+                                 workers: int = 1, stop_event=None):
         """
         Function to overwrite same object with random object generated for each iteration
+        Payloads are generated once in memory, every write is verified by its ETag and by the
+        checksum of the object read back.
         :param bucket_name : Pre created Bucket name for creating object
-        :param object_name : object name to create and overwrite
+        :param object_name : object name to create and overwrite, or list of object names
+        overwritten in parallel
         :param iteration: Number of time to overwrite same object
         :param object_size : Maximum object size that can be created (size in MB)
         :param queue: Multiprocessing Queue to be used for returning values (Boolean,str)
+        :param workers: Objects overwritten in parallel
+        :param stop_event: Event ending the overwrites early
         """
-        if not os.path.isdir(TEST_DATA_FOLDER):
-            self.log.debug("File path not exists")
-            system_utils.make_dirs(TEST_DATA_FOLDER)
-
-        self.log.info("Bucket Name : %s",bucket_name)
-        self.log.info("Object Name : %s", object_name)
+        object_names = [object_name] if isinstance(object_name, str) else list(object_name)
+        self.log.info("Bucket Name : %s", bucket_name)
+        self.log.info("Object Names : %s", object_names)
         self.log.info("Total Iteration : %s", iteration)
         self.log.info("Max Object size : %sMB", object_size)
-        ret_resp = True, "Overwrites successful."
-        for i_i in range(iteration):
-            self.log.info("Iteration : %s", i_i+1)
-            file_size = random.SystemRandom().randint(0, object_size)  # in mb
-            file_path = os.path.join(TEST_DATA_FOLDER, object_name)
-
-            self.log.info("Creating a file with name %s", object_name)
-            system_utils.create_file(file_path, file_size, "/dev/urandom", '1M')
-
-            self.log.info("Retrieving checksum of file %s", object_name)
-            resp = system_utils.get_file_checksum(file_path)
-            if not resp[0]:
-                ret_resp = resp
-                break
-            chksm_before_put_obj = resp[1]
-
-            self.log.info("Uploading a object %s to a bucket %s", object_name, bucket_name)
-            _ = self.s3t_obj.put_object(bucket_name, object_name, file_path)
-
-            self.log.info("Removing local file from client and downloading object")
-            system_utils.remove_file(file_path)
-            resp = self.s3t_obj.get_object(bucket=bucket_name, key=object_name)
-            with open(file_path, "wb") as data:
-                data.write(resp[1]['Body'].read())
-
-            self.log.info("Verifying checksum of downloaded file")
-            resp = system_utils.get_file_checksum(file_path)
-            if not resp[0]:
-                ret_resp = resp
-                break
-
-            chksm_after_dwnld_obj = resp[1]
-            if chksm_after_dwnld_obj != chksm_before_put_obj:
-                ret_resp = False, f"Checksum does not match, Expected {chksm_before_put_obj} " \
-                                  f"Received {chksm_after_dwnld_obj}"
-                break
-
-            self.log.info("Delete downloaded file")
-            system_utils.remove_file(file_path)
-        queue.put(ret_resp)
+        payloads = PayloadPool(max_size=object_size * const.MB, count=min(iteration, 8))
+        report = OverwriteEngine(self.s3t_obj.s3_client, bucket_name, payloads,
+                                 iterations=iteration, workers=workers,
+                                 stop_event=stop_event).run(object_names)
+        if report["mismatches"]:
+            mismatch = report["mismatches"][0]
+            queue.put((False, f"Checksum does not match, Expected {mismatch['expected']} "
+                              f"Received {mismatch['actual']}"))
+        elif report["failed"]:
+            queue.put((False, f"Overwrite failed: {report['failed']}"))
+        else:
+            queue.put((True, "Overwrites successful."))
 
-    def perform_copy_objects(self, workload, que):
+    def perform_copy_objects(self, workload, que, workers: int = 8, stop_event=None):
         """
         function to perform copy object for dtm test case in background
+        Objects are copied in parallel and every copy is verified against its source.
         :param workload: Python dict containing source and destination bucket and object
         :param que: Multiprocessing Queue to be used for returning values (Boolean,dict)
+        :param workers: Objects copied in parallel
+        :param stop_event: Event ending the copies early
         """
-        failed_obj_name = list()
-        for obj_name in workload["obj_list"]:
-            try:
-                self.s3t_obj.copy_object(source_bucket=workload["source_bucket"],
-                                         source_object=obj_name,
-                                         dest_bucket=workload["dest_bucket"], dest_object=obj_name)
-
-            except CTException as error:
-                self.log.exception("Error: %s", error)
-                failed_obj_name.append(obj_name)
+        report = CopyEngine(self.s3t_obj.s3_client, workload["source_bucket"],
+                            workload["dest_bucket"], workers=workers,
+                            stop_event=stop_event).run(workload["obj_list"])
+        failed_obj_name = sorted(set(report["failed"]) |
+                                 {mismatch["key"] for mismatch in report["mismatches"]})
         if len(failed_obj_name) > 0:
             que.put([False, f"Copy Object operation failed for {failed_obj_name}"])
         else:
@@ -0,0 +1,327 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+"""
+Streaming S3 workload measuring the unavailability caused by DTM fault injection
+"""
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+
+from botocore.exceptions import ClientError
+
+from commons.utils.perf_utils import RateLimiter
+from commons.utils.perf_utils import latency_stats
+
+LOGGER = logging.getLogger(__name__)
+
+WRITE = "write"
+READ = "read"
+# A read returning data other than the last successful write of the key.
+CHECKSUM_MISMATCH = "ChecksumMismatch"
+
+Span = namedtuple("Span", ["op", "key", "start", "end", "error"])
+
+
+def error_name(error: Exception) -> str:
+    """S3 error code of a ClientError, else the exception class name."""
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code") or type(error).__name__
+    return type(error).__name__
+
+
+class WorkloadTimeline:
+    """
+    Thread safe timeline of request spans and injected events on one monotonic clock.
+
+    Fault events, such as a process kill, start a window closed by the next fault event. The
+    report tells for each of them when clients first failed, when they were served again and
+    how latency behaved before, during and after the outage.
+    """
+
+    def __init__(self):
+        self.origin = time.monotonic()
+        self.spans = []
+        self.events = []
+        self._lock = threading.Lock()
+
+    def record(self, op: str, key: str, start: float, end: float, error: str = None) -> None:
+        """
+        Record a completed request.
+
+        :param op: read or write.
+        :param key: object key.
+        :param start: monotonic start time.
+        :param end: monotonic end time.
+        :param error: error name, None for a successful request.
+        """
+        with self._lock:
+            self.spans.append(Span(op, key, start, end, error))
+
+    def mark(self, name: str, fault: bool = False, **details) -> dict:
+        """
+        Record an event, e.g. a process kill (fault) or the process being ready again.
+
+        :param name: event name.
+        :param fault: whether the event injects a fault whose impact is measured.
+        :param details: extra fields kept with the event, such as pod and container.
+        :return: the event.
+        """
+        event = dict(details, name=name, fault=fault, time=time.monotonic())
+        with self._lock:
+            self.events.append(event)
+        LOGGER.info("Timeline event %s at %.3fs", name, event["time"] - self.origin)
+        return event
+
+    def _relative(self, stamp: float):
+        """Seconds since the timeline origin, None kept."""
+        return None if stamp is None else round(stamp - self.origin, 3)
+
+    @staticmethod
+    def _outage(spans: list, since: float) -> dict:
+        """First failure after since and the first success following the last failure."""
+        failed = [span for span in spans if span.error]
+        if not failed:
+            return {"errors": 0, "first_error": None, "last_error": None, "recovered": since}
+        last = max(failed, key=lambda span: span.start)
+        served = [span.end for span in spans if not span.error and span.start >= last.start]
+        return {"errors": len(failed), "first_error": min(span.start for span in failed),
+                "last_error": max(span.end for span in failed),
+                "recovered": min(served) if served else None}
+
+    def fault_report(self, event: dict, until: float = None) -> dict:
+        """
+        Unavailability and recovery caused by a fault event.
+
+        The unavailability window runs from the start of the first failed request completing
+        after the event, requests in flight included, to the end of the first successful request
+        issued after the last failure.
+        The recovery time is measured from the event to that success.
+
+        :param event: fault event returned by mark().
+        :param until: end of the window, default the next fault event or now.
+        :return: dict of times relative to the timeline origin, durations in seconds and
+            latency statistics before, during and after the outage.
+        """
+        with self._lock:
+            spans = list(self.spans)
+            events = list(self.events)
+        since = event["time"]
+        if until is None:
+            later = [evt["time"] for evt in events if evt["fault"] and evt["time"] > since]
+            until = min(later) if later else time.monotonic()
+        window = [span for span in spans if span.end > since and span.start < until]
+        outage = self._outage(window, since)
+        recovered = outage["recovered"]
+        report = {
+            "event": event["name"], "time": self._relative(since),
+            "errors": outage["errors"], "requests": len(window),
+            "error_names": sorted({span.error for span in window if span.error}),
+            "first_error": self._relative(outage["first_error"]),
+            "recovered": self._relative(recovered),
+            "unavailable_seconds": None if recovered is None else
+            round(recovered - outage["first_error"], 3) if outage["errors"] else 0.0,
+            "recovery_seconds": None if recovered is None else round(recovered - since, 3),
+            "by_op": {},
+            "events": [{"name": evt["name"], "time": self._relative(evt["time"])}
+                       for evt in events if not evt["fault"] and since < evt["time"] < until]}
+        for op in sorted({span.op for span in window}):
+            op_outage = self._outage([span for span in window if span.op == op], since)
+            report["by_op"][op] = {
+                "errors": op_outage["errors"],
+                "first_error": self._relative(op_outage["first_error"]),
+                "recovered": self._relative(op_outage["recovered"])}
+        before = [span.end - span.start for span in spans
+                  if span.end <= since and not span.error]
+        during = [span.end - span.start for span in window
+                  if not span.error and (recovered is None or span.end <= recovered)]
+        after = [span.end - span.start for span in window
+                 if not span.error and recovered is not None and span.start >= recovered]
+        report["latency"] = {"before": latency_stats(before), "during": latency_stats(during),
+                             "after": latency_stats(after)}
+        return report
+
+    def report(self) -> dict:
+        """Request counts, errors and the report of every fault event."""
+        with self._lock:
+            spans = list(self.spans)
+            faults = [event for event in self.events if event["fault"]]
+        errors = {}
+        for span in spans:
+            if span.error:
+                errors[span.error] = errors.get(span.error, 0) + 1
+        return {"requests": len(spans), "errors": errors,
+                "latency": latency_stats([span.end - span.start for span in spans
+                                          if not span.error]),
+                "faults": [self.fault_report(event) for event in faults]}
+
+
+class StreamingWorkload:
+    """
+    Writers and readers issuing S3 requests back to back until stopped.
+
+    Writers overwrite their own set of keys with random data and remember its digest, readers
+    read back keys at random and verify the digest in process, so data is checked while the
+    cluster recovers instead of by a later s3bench validation pass. Every request lands in the
+    timeline, where fault events are marked by the caller.
+    """
+
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
+    def __init__(self, s3_client, bucket: str, writers: int = 2, readers: int = 2,
+                 obj_size: int = 64 * 1024, keys_per_writer: int = 100, rate: float = 0,
+                 key_prefix: str = "dtm-stream", timeline: WorkloadTimeline = None):
+        """
+        :param s3_client: boto3 S3 client, preferably without retries so the outage shows.
+        :param bucket: existing bucket receiving the objects.
+        :param writers: writer threads.
+        :param readers: reader threads.
+        :param obj_size: object size in bytes.
+        :param keys_per_writer: keys overwritten in turn by every writer.
+        :param rate: requests per second over all threads, 0 for no limit.
+        :param key_prefix: object key prefix.
+        :param timeline: timeline shared with other workloads, default a new one.
+        """
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.writers = writers
+        self.readers = readers
+        self.obj_size = obj_size
+        self.keys_per_writer = keys_per_writer
+        self.key_prefix = key_prefix
+        self.timeline = timeline or WorkloadTimeline()
+        self.limiter = RateLimiter(rate, burst=max(writers + readers, 1))
+        # Digest of the last successful write of a key, None while a write is in flight or
+        # after a failed one, since the stored data is then unknown.
+        self.expected = {}
+        self.mismatches = []
+        self._keys = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self._random = random.Random()  # nosec - key choice, not security.
+
+    def _request(self, op: str, key: str, func, check=None):
+        """
+        Run a request and record its span.
+
+        :param func: callable issuing the request.
+        :param check: callable(result) returning an error name when the result is wrong.
+        :return: the result, or the exception raised.
+        """
+        self.limiter.acquire()
+        start = time.monotonic()
+        try:
+            result = func()
+        except Exception as error:  # pylint: disable=broad-except
+            self.timeline.record(op, key, start, time.monotonic(), error_name(error))
+            LOGGER.debug("%s %s failed: %s", op, key, error)
+            return error
+        self.timeline.record(op, key, start, time.monotonic(), check(result) if check else None)
+        return result
+
+    def _write_loop(self, index: int) -> None:
+        """Overwrite the keys of a writer in turn."""
+        seq = 0
+        while not self._stop.is_set():
+            key = f"{self.key_prefix}-w{index}-{seq % self.keys_per_writer}"
+            seq += 1
+            data = os.urandom(self.obj_size)
+            digest = hashlib.md5(data).hexdigest()  # nosec - integrity check, not security.
+            with self._lock:
+                if key not in self.expected:
+                    self._keys.append(key)
+                self.expected[key] = None
+            resp = self._request(WRITE, key, lambda: self.s3_client.put_object(
+                Bucket=self.bucket, Key=key, Body=data))
+            if not isinstance(resp, Exception):
+                with self._lock:
+                    self.expected[key] = digest
+
+    def _get_digest(self, key: str) -> str:
+        """Read an object and return the digest of its data."""
+        body = self.s3_client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        body = body.read() if hasattr(body, "read") else body
+        return hashlib.md5(body).hexdigest()  # nosec - integrity check, not security.
+
+    def _verify(self, key: str, digest: str, actual: str):
+        """Error name of a read whose data is not the last write of the key."""
+        with self._lock:
+            # An overwrite started after the key was chosen may have been read.
+            if actual == digest or self.expected[key] != digest:
+                return None
+        LOGGER.error("Checksum mismatch of %s: expected %s, read %s", key, digest, actual)
+        self.mismatches.append({"key": key, "expected": digest, "actual": actual})
+        return CHECKSUM_MISMATCH
+
+    def _read_loop(self) -> None:
+        """Read back and verify keys with a known digest."""
+        while not self._stop.is_set():
+            with self._lock:
+                keys = [key for key in self._keys if self.expected[key]]
+                key = self._random.choice(keys) if keys else None
+                digest = self.expected[key] if key else None
+            if key is None:
+                self._stop.wait(0.01)
+                continue
+            self._request(READ, key, lambda: self._get_digest(key),
+                          lambda actual: self._verify(key, digest, actual))
+
+    def start(self):
+        """Start the writer and reader threads."""
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._write_loop, args=(index,),
+                                          name=f"dtm_writer_{index}", daemon=True)
+                         for index in range(self.writers)]
+        self._threads += [threading.Thread(target=self._read_loop, name=f"dtm_reader_{index}",
+                                           daemon=True) for index in range(self.readers)]
+        for thread in self._threads:
+            thread.start()
+        LOGGER.info("Started %s writers and %s readers on bucket %s", self.writers,
+                    self.readers, self.bucket)
+        return self
+
+    def stop(self) -> dict:
+        """
+        Stop the threads once their request in flight completes.
+
+        :return: timeline report with the checksum mismatches found by readers.
+        """
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        report = self.timeline.report()
+        report["mismatches"] = list(self.mismatches)
+        report["objects"] = [key for key in self._keys if self.expected[key]]
+        for fault in report["faults"]:
+            LOGGER.info("%s at %ss: %s errors %s, unavailable %ss, recovered %ss after the "
+                        "fault", fault["event"], fault["time"], fault["errors"],
+                        fault["error_names"], fault["unavailable_seconds"],
+                        fault["recovery_seconds"])
+        return report
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        if not self._stop.is_set():
+            self.stop()
@@ -29,6 +29,10 @@ from commons import commands as common_cmd
 from commons import constants as common_const
 from commons.helpers.health_helper import Health
 from commons.helpers.pods_helper import LogicalNode
+from libs.durability.repair_progress import RepairProgressTracker
+from libs.durability.repair_progress import fail_disks_concurrently
+from libs.durability.repair_progress import parse_sns_status
+from libs.durability.repair_progress import resolve_failure_plan
 from libs.ha.ha_common_libs_k8s import HAK8s
 
 LOGGER = logging.getLogger(__name__)
@@ -249,3 +253,69 @@ class DiskFailureRecoveryLib:
             failed_disks_dict['disk' + str(cnt)] = all_disks[selected_disk]
             all_disks.pop(selected_disk)
         return True, failed_disks_dict
+
+    def fail_disks_by_plan(self, master_obj: LogicalNode, worker_obj: list, pod_name: str,
+                           plan: list, workers: int = 8) -> tuple:
+        """
+        Fail disks across nodes and CVGs concurrently according to a failure plan.
+        :param master_obj: Node Object of Master
+        :param worker_obj: list of worker node object
+        :param pod_name: name of the pod
+        :param plan: list of failures, e.g. [{"node": "1059", "cvg": "cvg-01", "count": 2},
+                     {"count": 2, "distinct_cvg": True}], see resolve_failure_plan
+        :param workers: disks failed at the same time
+        :return : tuple(bool,dict) of the failed disks in the format of fail_disk
+        """
+        resp = self.get_all_nodes_disks(master_obj, worker_obj)
+        if not resp[0]:
+            return resp
+        resp = resolve_failure_plan(resp[1], plan)
+        if not resp[0]:
+            LOGGER.error(resp[1])
+            return resp
+        failed_disks = resp[1]
+        LOGGER.info("Disks selected by failure plan %s: %s", plan, failed_disks)
+
+        def fail_disk(node, cvg, device):
+            # Host.execute_cmd reconnects on every call, every thread needs its own node object.
+            node_obj = LogicalNode(hostname=master_obj.hostname, username=master_obj.username,
+                                   password=master_obj.password)
+            try:
+                return self.change_disk_status_hctl(
+                    node_obj, pod_name, common_const.CORTX_DATA_NODE_PREFIX + node, device,
+                    "failed")
+            finally:
+                node_obj.disconnect()
+
+        resp = fail_disks_concurrently(failed_disks, fail_disk, workers=workers)
+        if not resp[0]:
+            return False, f"Failing disks {failed_disks} failed: {resp[1]}"
+        return True, failed_disks
+
+    def get_sns_status(self, pod_obj: LogicalNode, pod_name: str, operation: str = "repair"):
+        """
+        This function returns the state and progress of sns repair or rebalance
+        :param pod_obj: Object for master nodes
+        :param pod_name: name of the pod running hctl
+        :param operation: repair or rebalance
+        :rtype dict of state, progress and per process status, see parse_sns_status
+        """
+        func = self.sns_repair if operation == "repair" else self.sns_rebalance
+        return parse_sns_status(func(pod_obj, "status", pod_name))
+
+    def track_sns_progress(self, pod_obj: LogicalNode, pod_name: str, health_obj: Health,
+                           operation: str = "repair", **kwargs) -> RepairProgressTracker:
+        """
+        This function starts sampling sns repair or rebalance progress and byte counts
+        :param pod_obj: Object for master nodes
+        :param pod_name: name of the pod running hctl
+        :param health_obj: Health object for master nodes
+        :param operation: repair or rebalance
+        :param kwargs: RepairProgressTracker arguments: interval, stall_seconds, window, build
+        :rtype started RepairProgressTracker, wait() returns the summary with the time series
+        """
+        def sample():
+            return (self.get_sns_status(pod_obj, pod_name, operation),
+                    health_obj.hctl_status_json()["bytecount"])
+
+        return RepairProgressTracker(sample, operation=operation, **kwargs).start()
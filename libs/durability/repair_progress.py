@@ -0,0 +1,293 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+"""
+Disk failure plans and SNS repair/rebalance progress tracking
+"""
+import csv
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+LOGGER = logging.getLogger(__name__)
+
+# Byte count types of hctl status not yet healthy, repaired as SNS repair progresses.
+PENDING_BYTE_COUNTS = ("critical", "damaged", "degraded")
+# SNS copy machine states, as reported in the status of hctl repair/rebalance status.
+STATE_IDLE = "IDLE"
+STATE_STARTED = "STARTED"
+STATE_FAILED = "FAILED"
+STATE_PAUSED = "PAUSED"
+SNS_STATES = (STATE_STARTED, STATE_FAILED, STATE_PAUSED, STATE_IDLE)
+SAMPLE_FIELDS = ("time", "state", "progress", "pending_bytes", "healthy_bytes",
+                 "repaired_bytes", "throughput_bps", "eta_seconds", "stalled", "error")
+
+
+def resolve_failure_plan(all_disks: dict, plan: list) -> tuple:
+    """
+    Choose the disks to fail according to a declared failure plan.
+
+    :param all_disks: disks as returned by DiskFailureRecoveryLib.get_all_nodes_disks, e.g.
+        {'disk1': ['ssc-vm-1059.colo.seagate.com', 'cvg-01', '/dev/sdh']}.
+    :param plan: list of failures, each a dict of "count" disks and optionally the "node"
+        (hostname substring) and "cvg" they must belong to. A failure with "distinct_cvg"
+        set takes each of its disks from a different node and CVG pair.
+        e.g. [{"cvg": "cvg-01", "count": 2}, {"count": 2, "distinct_cvg": True}]
+    :return: tuple(bool, dict) of the chosen disks in the format of all_disks, or the error.
+    """
+    available = dict(all_disks)
+    chosen = {}
+    for failure in plan:
+        candidates = [name for name, (node, cvg, _) in available.items()
+                      if failure.get("node", "") in node and
+                      failure.get("cvg", cvg) == cvg]
+        random.shuffle(candidates)  # nosec - disk choice, not security.
+        if failure.get("distinct_cvg"):
+            per_cvg = {}
+            for name in candidates:
+                per_cvg.setdefault(tuple(available[name][:2]), name)
+            candidates = list(per_cvg.values())
+        count = failure.get("count", 1)
+        if len(candidates) < count:
+            return False, f"Failure {failure} needs {count} disks, only " \
+                          f"{len(candidates)} available"
+        for name in candidates[:count]:
+            chosen[name] = available.pop(name)
+    return True, chosen
+
+
+def fail_disks_concurrently(disks: dict, fail_func, workers: int = 8) -> tuple:
+    """
+    Fail disks in parallel.
+
+    :param disks: disks to fail in the format of resolve_failure_plan.
+    :param fail_func: callable(node, cvg, device) failing one disk, returning its response.
+    :param workers: disks failed at the same time.
+    :return: tuple(bool, dict) of the response of every disk, False if any failed.
+    """
+    def fail(item):
+        name, (node, cvg, device) = item
+        try:
+            return name, True, fail_func(node, cvg, device)
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.error("Failing %s %s %s: %s", node, cvg, device, error)
+            return name, False, error
+
+    if not disks:
+        return True, {}
+    with ThreadPoolExecutor(max_workers=min(workers, len(disks))) as executor:
+        results = list(executor.map(fail, disks.items()))
+    LOGGER.info("Failed %s disks concurrently: %s", len(disks),
+                {name: resp for name, _, resp in results})
+    return all(ok for _, ok, _ in results), {name: resp for name, _, resp in results}
+
+
+def parse_sns_status(output) -> dict:
+    """
+    State and progress of an hctl repair/rebalance status output.
+
+    :param output: JSON text or decoded list of {"fid", "status", "progress"} per process.
+    :return: dict of the overall state, mean progress and the per process entries. The state
+        is the most significant one among the processes: STARTED, FAILED, PAUSED then IDLE.
+    """
+    entries = json.loads(output) if isinstance(output, str) else output
+    entries = entries if isinstance(entries, list) else [entries]
+    states = []
+    for entry in entries:
+        status = str(entry.get("status", entry.get("state", ""))).upper()
+        states.append(next((state for state in SNS_STATES if state in status), status))
+    progress = [float(entry["progress"]) for entry in entries
+                if isinstance(entry.get("progress"), (int, float))]
+    return {"state": next((state for state in SNS_STATES if state in states), STATE_IDLE),
+            "progress": sum(progress) / len(progress) if progress else None,
+            "processes": entries}
+
+
+class RepairProgressTracker:
+    """
+    Sample SNS repair or rebalance status and byte counts on an interval.
+
+    Every sample holds the bytes still critical, damaged or degraded, the repair throughput
+    over the throughput window, the ETA at that throughput and whether the operation is
+    stalled, i.e. active without any progress or repaired bytes for stall_seconds. The samples
+    form a time series that can be saved as CSV or JSON to compare builds.
+    """
+
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
+    def __init__(self, sample_func, interval: float = 10, stall_seconds: float = 300,
+                 window: int = 6, operation: str = "repair", build: str = None):
+        """
+        :param sample_func: callable returning a tuple of the parse_sns_status dict and the
+            hctl status byte counts, e.g. {'critical': 0, 'damaged': 0, 'degraded': 10,
+            'healthy': 90}.
+        :param interval: seconds between samples.
+        :param stall_seconds: time without progress after which an active operation stalls.
+        :param window: samples the throughput is computed over.
+        :param operation: repair or rebalance, kept in the summary.
+        :param build: build the series belongs to, kept in the summary.
+        """
+        self.sample_func = sample_func
+        self.interval = interval
+        self.stall_seconds = stall_seconds
+        self.window = max(window, 1)
+        self.operation = operation
+        self.build = build
+        self.samples = []
+        self.stalls = []
+        self._started = None
+        self._progress_at = None
+        self._stop = threading.Event()
+        self._done = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _throughput(self, now: float, pending: int) -> float:
+        """Bytes repaired per second since the oldest sample of the window."""
+        window = [sample for sample in self.samples[-self.window:]
+                  if sample["pending_bytes"] is not None]
+        if not window or pending is None:
+            return None
+        oldest = window[0]
+        elapsed = now - oldest["time"]
+        return max(oldest["pending_bytes"] - pending, 0) / elapsed if elapsed > 0 else None
+
+    def sample(self) -> dict:
+        """Take one sample and append it to the series."""
+        now = time.monotonic() - self._started
+        try:
+            status, byte_count = self.sample_func()
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.warning("SNS %s sample failed: %s", self.operation, error)
+            entry = dict.fromkeys(SAMPLE_FIELDS)
+            entry.update(time=now, stalled=False, error=str(error))
+            with self._lock:
+                self.samples.append(entry)
+            return entry
+        pending = sum(int(byte_count.get(kind, 0)) for kind in PENDING_BYTE_COUNTS)
+        with self._lock:
+            first = next((smp for smp in self.samples if smp["pending_bytes"] is not None),
+                         None)
+            previous = next((smp for smp in reversed(self.samples)
+                             if smp["pending_bytes"] is not None), None)
+            throughput = self._throughput(now, pending)
+            advanced = previous is None or pending < previous["pending_bytes"] or (
+                status["progress"] is not None and
+                status["progress"] != previous["progress"])
+            if advanced or status["state"] != STATE_STARTED:
+                self._progress_at = now
+            stalled = now - self._progress_at >= self.stall_seconds
+            if stalled and not (self.samples and self.samples[-1]["stalled"]):
+                LOGGER.error("SNS %s stalled at %s pending bytes, no progress for %.0fs",
+                             self.operation, pending, now - self._progress_at)
+                self.stalls.append({"time": now, "since": self._progress_at,
+                                    "pending_bytes": pending})
+            entry = {"time": now, "state": status["state"], "progress": status["progress"],
+                     "pending_bytes": pending,
+                     "healthy_bytes": int(byte_count.get("healthy", 0)),
+                     "repaired_bytes": (first["pending_bytes"] if first else pending) - pending,
+                     "throughput_bps": throughput,
+                     "eta_seconds": pending / throughput if throughput else None,
+                     "stalled": stalled, "error": None}
+            self.samples.append(entry)
+        LOGGER.info("SNS %s %s: progress %s, %s bytes pending, %s B/s, ETA %ss",
+                    self.operation, entry["state"], entry["progress"], pending,
+                    None if throughput is None else round(throughput),
+                    None if entry["eta_seconds"] is None else round(entry["eta_seconds"]))
+        return entry
+
+    def _finished(self, entry: dict) -> bool:
+        """Whether the operation is over: idle, or failed, after having started."""
+        started = any(smp["state"] == STATE_STARTED for smp in self.samples)
+        return entry["state"] == STATE_FAILED or started and entry["state"] == STATE_IDLE
+
+    def _run(self):
+        """Sample until stopped or the operation is over."""
+        while not self._stop.is_set():
+            entry = self.sample()
+            if entry["error"] is None and self._finished(entry):
+                self._done.set()
+                return
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start sampling on a thread."""
+        self._started = time.monotonic()
+        self._progress_at = 0.0
+        self._thread = threading.Thread(target=self._run, name=f"sns_{self.operation}_tracker",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        """Stop sampling and return the summary."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        return self.summary()
+
+    def wait(self, timeout: float = None) -> dict:
+        """
+        Wait for the operation to finish, then stop sampling.
+
+        :param timeout: seconds to wait at most.
+        :return: the summary, its "completed" field False on timeout.
+        """
+        self._done.wait(timeout)
+        return self.stop()
+
+    def summary(self) -> dict:
+        """Duration, bytes repaired, mean and peak throughput, stalls and the series."""
+        with self._lock:
+            samples = [dict(sample) for sample in self.samples]
+            stalls = list(self.stalls)
+        valid = [sample for sample in samples if sample["error"] is None]
+        duration = valid[-1]["time"] - valid[0]["time"] if len(valid) > 1 else 0.0
+        repaired = valid[-1]["repaired_bytes"] if valid else 0
+        rates = [sample["throughput_bps"] for sample in valid if sample["throughput_bps"]]
+        report = {"operation": self.operation, "build": self.build,
+                  "completed": self._done.is_set(),
+                  "state": valid[-1]["state"] if valid else None,
+                  "duration_seconds": duration, "repaired_bytes": repaired,
+                  "pending_bytes": valid[-1]["pending_bytes"] if valid else None,
+                  "mean_throughput_bps": repaired / duration if duration else 0.0,
+                  "peak_throughput_bps": max(rates) if rates else 0.0,
+                  "stalls": stalls, "errors": len(samples) - len(valid), "samples": samples}
+        LOGGER.info("SNS %s of build %s: %s after %.0fs, %s bytes repaired at %.0f B/s, "
+                    "%s stalls", self.operation, self.build, report["state"], duration,
+                    repaired, report["mean_throughput_bps"], len(stalls))
+        return report
+
+    def to_csv(self, path: str) -> str:
+        """Save the time series as CSV, one row per sample."""
+        with self._lock:
+            samples = list(self.samples)
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=SAMPLE_FIELDS)
+            writer.writeheader()
+            writer.writerows(samples)
+        return path
+
+    def to_json(self, path: str) -> str:
+        """Save the summary with the time series as JSON."""
+        with open(path, "w") as json_file:
+            json.dump(self.summary(), json_file, indent=2)
+        return path
@@ -42,13 +42,16 @@ from commons.helpers.pods_helper import LogicalNode
 from commons.params import TEST_DATA_FOLDER
 from commons.utils import config_utils
 from commons.utils import system_utils
-from commons.utils.system_utils import run_local_cmd
+from commons.utils.checksum_utils import CHECKSUM_SERVICE
+from commons.utils.wait_utils import wait_until
 from config import CMN_CFG
 from config import HA_CFG
 from config.s3 import S3_BLKBOX_CFG
 from config.s3 import S3_CFG
 from libs.csm.rest.csm_rest_system_health import SystemHealth
 from libs.di.di_mgmt_ops import ManagementOPs
+from libs.s3.s3_multipart_engine import MultipartEngine
+from libs.s3.s3_multipart_engine import MultipartUploadState
 from libs.s3.s3_multipart_test_lib import S3MultipartTestLib
 from libs.s3.s3_restapi_test_lib import S3AccountOperationsRestAPI
 from libs.s3.s3_test_lib import S3TestLib
@@ -95,9 +98,8 @@ class HAK8s:
         :param bmc_obj: BMC object
         :return: bool
         """
-        poll = time.time() + max_timeout  # max timeout
-        while poll > time.time():
-            time.sleep(20)
+        def host_state():
+            """True in expected state, None not yet, False if the power state is unknown."""
             resp = system_utils.check_ping(host)
             if self.setup_type == "VM":
                 vm_name = host.split(".")[0]
@@ -127,10 +129,15 @@ class HAK8s:
                     exp_state = "on" in out
                 else:
                     exp_state = "off" in out
+            return True if resp == exp_resp and exp_state else None
 
-            if resp == exp_resp and exp_state:
-                return True
-        return False
+        # The power state change takes a while to show, the host still answers right after it
+        initial_delay = min(20, max_timeout)
+        time.sleep(initial_delay)
+        return bool(wait_until(host_state, timeout=max_timeout - initial_delay, interval=5,
+                               max_interval=20,
+                               fail_fast=lambda state: state is False, raise_on_timeout=False,
+                               name=f"{host} power state {exp_resp}"))
 
     def host_power_on(self, host: str, bmc_obj=None):
         """
@@ -399,42 +406,62 @@ class HAK8s:
             LOGGER.info("Creating a bucket with name : %s", bucket_name)
             res = s3_test_obj.create_bucket(bucket_name)
             if not res[0] or res[1] != bucket_name:
-                return res, "Failed in bucket creation"
+                return False, f"Failed in bucket creation: {res}"
             LOGGER.info("Created a bucket with name : %s", bucket_name)
+        part_size = self.mpu_part_size(file_size, total_parts)
+        if not part_size:
+            return False, f"File size {file_size}MB can not be split in {total_parts} parts"
         LOGGER.info("Initiating multipart upload")
-        res = s3_mp_test_obj.create_multipart_upload(bucket_name, object_name)
-        if not res[0]:
-            return res, "Failed in initiate multipart upload"
-        mpu_id = res[1]["UploadId"]
-        LOGGER.info("Multipart Upload initiated with mpu_id %s", mpu_id)
+        mpu_engine = MultipartEngine(s3_mp_test_obj,
+                                     workers=HA_CFG["s3_operation_data"]["mpu_workers"])
+        state = mpu_engine.initiate(bucket_name, object_name)
+        LOGGER.info("Multipart Upload initiated with mpu_id %s", state.upload_id)
         LOGGER.info("Uploading parts into bucket")
-        res = s3_mp_test_obj.upload_parts(mpu_id=mpu_id, bucket_name=bucket_name,
-                                          object_name=object_name, multipart_obj_size=file_size,
-                                          total_parts=total_parts,
-                                          multipart_obj_path=multipart_obj_path)
-        if not res[0]:
-            return res, "Failed in upload parts"
-        parts = res[1]
-        LOGGER.info("Uploaded parts into bucket: %s", parts)
-        LOGGER.info("Successfully uploaded object")
+        if os.path.exists(multipart_obj_path):
+            os.remove(multipart_obj_path)
+        system_utils.create_file(multipart_obj_path, file_size, b_size="1M")
+        try:
+            mpu_engine.upload(state, multipart_obj_path, part_size=part_size)
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.error("Multipart upload aborted: %s", error)
+            return False, f"Failed in upload parts: {state.failed}"
+        LOGGER.info("Uploaded parts into bucket: %s", state.parts())
+        LOGGER.info("Successfully uploaded object, stats: %s", state.stats())
 
         checksum = self.cal_compare_checksum(file_list=[multipart_obj_path], compare=False)[0]
 
         LOGGER.info("Listing parts of multipart upload")
-        res = s3_mp_test_obj.list_parts(mpu_id, bucket_name, object_name)
-        if not res[0] or len(res[1]["Parts"]) != len(parts):
-            return res, "Failed in list parts of multipart upload"
-        LOGGER.info("Listed parts of multipart upload: %s", res[1])
+        parts = state.parts()
+        mpu_engine.reconcile(state)
+        if state.parts() != parts:
+            return False, f"Failed in list parts of multipart upload: {state.parts()}"
+        LOGGER.info("Listed parts of multipart upload: %s", parts)
         LOGGER.info("Completing multipart upload")
-        res = s3_mp_test_obj.complete_multipart_upload(mpu_id, parts, bucket_name, object_name)
+        res = s3_mp_test_obj.complete_multipart_upload(state.upload_id, parts, bucket_name,
+                                                       object_name)
         if not res[0]:
-            return res, "Failed in completing multipart upload"
+            return False, f"Failed in completing multipart upload: {res[1]}"
+        if res[1].get("ETag") != state.expected_etag:
+            return False, f"Multipart ETag {res[1].get('ETag')} does not match the uploaded " \
+                          f"parts {state.expected_etag}"
         res = s3_test_obj.object_list(bucket_name)
         if object_name not in res[1]:
-            return res, "Failed in object listing"
+            return False, f"Failed in object listing: {res[1]}"
         LOGGER.info("Multipart upload completed")
         return True, s3_data, checksum
 
+    @staticmethod
+    def mpu_part_size(file_size, total_parts) -> int:
+        """
+        Part size in bytes of a file of file_size MB split in total_parts parts
+        :param file_size: Size of the file in MB
+        :param total_parts: Total parts to be uploaded
+        :return: part size, 0 if the file is too small for that many parts
+        """
+        if int(total_parts) <= 0:
+            return 0
+        return 1048576 * (int(file_size) // int(total_parts))
+
     def partial_multipart_upload(self, s3_data, bucket_name, object_name, part_numbers, **kwargs):
         """
         Helper function to do partial multipart upload
@@ -458,36 +485,37 @@ class HAK8s:
             s3_mp_test_obj = S3MultipartTestLib(access_key=access_key, secret_key=secret_key,
                                                 endpoint_url=S3_CFG["s3_url"])
 
+            part_size = self.mpu_part_size(multipart_obj_size, total_parts)
+            if not part_size:
+                return False, f"File size {multipart_obj_size}MB can not be split in " \
+                              f"{total_parts} parts"
+            # The upload is completed by a later call, keep it when parts fail.
+            mpu_engine = MultipartEngine(s3_mp_test_obj,
+                                         workers=HA_CFG["s3_operation_data"]["mpu_workers"],
+                                         abort_on_failure=False)
             if not remaining_upload:
                 LOGGER.info("Creating a bucket with name : %s", bucket_name)
                 res = s3_test_obj.create_bucket(bucket_name)
                 if not res[0] or res[1] != bucket_name:
-                    return res
+                    return False, f"Failed in bucket creation: {res}"
                 LOGGER.info("Created a bucket with name : %s", bucket_name)
                 LOGGER.info("Initiating multipart upload")
-                res = s3_mp_test_obj.create_multipart_upload(bucket_name, object_name)
-                if not res[0]:
-                    return res
-                mpu_id = res[1]["UploadId"]
+                state = mpu_engine.initiate(bucket_name, object_name)
+                mpu_id = state.upload_id
                 LOGGER.info("Multipart Upload initiated with mpu_id %s", mpu_id)
-
-            LOGGER.info("Creating parts of data")
-            parts = self.create_multiple_data_parts(multipart_obj_size=multipart_obj_size,
-                                                    multipart_obj_path=multipart_obj_path,
-                                                    total_parts=total_parts)
+            else:
+                LOGGER.info("Resuming multipart upload %s from the parts listed by S3", mpu_id)
+                state = mpu_engine.reconcile(MultipartUploadState(bucket_name, object_name,
+                                                                  mpu_id))
 
             LOGGER.info("Uploading parts %s", part_numbers)
-
-            for part in part_numbers:
-                resp = s3_mp_test_obj.upload_multipart(body=parts[part],
-                                                       bucket_name=bucket_name,
-                                                       object_name=object_name,
-                                                       upload_id=mpu_id,
-                                                       part_number=part)
-                p_etag = resp[1]
-                LOGGER.debug("Part : %s", str(p_etag))
-                parts_etag.append({"PartNumber": part, "ETag": p_etag["ETag"]})
-                LOGGER.info("Uploaded part %s", part)
+            try:
+                mpu_engine.upload(state, multipart_obj_path, part_numbers=part_numbers,
+                                  part_size=part_size)
+            except Exception:  # pylint: disable=broad-except
+                return False, f"Failed to upload parts: {state.failed}"
+            LOGGER.info("Uploaded parts %s, stats: %s", part_numbers, state.stats())
+            parts_etag = [part for part in state.parts() if part["PartNumber"] in part_numbers]
             return True, mpu_id, multipart_obj_path, parts_etag
         except CTException as error:
             LOGGER.exception("Error in %s: %s", HAK8s.partial_multipart_upload.__name__, error)
@@ -728,12 +756,8 @@ class HAK8s:
         :param compare: Flag to compare checksums of files
         :return: List of md5 content or bool for md5 comparison
         """
-        md5_list = []
-        for file in file_list:
-            cmd = common_cmd.MD5SUM.format("-t", file)
-            resp = run_local_cmd(cmd=cmd)
-            md5 = (resp[1].split())[0]
-            md5_list.append(md5.replace("b'", ""))
+        digests = CHECKSUM_SERVICE.digest_files(file_list)
+        md5_list = [digests[file]["md5"] for file in file_list]
 
         if not compare:
             return md5_list
@@ -746,16 +770,13 @@ class HAK8s:
         :param timeout: Timeout value
         :return: bool, response
         """
-        resp = False
         LOGGER.info("Polling cluster status")
         start_time = int(time.time())
-        while timeout > int(time.time()) - start_time:
-            time.sleep(60)
-            resp = self.check_cluster_status(pod_obj)
-            if resp[0]:
-                LOGGER.info("Cortx cluster is up")
-                break
-
+        resp = wait_until(lambda: self.check_cluster_status(pod_obj), timeout=timeout,
+                          interval=10, max_interval=60, success=lambda resp: resp[0],
+                          raise_on_timeout=False, name="cluster status")
+        if resp[0]:
+            LOGGER.info("Cortx cluster is up")
         LOGGER.debug("Time taken by cluster restart is %s seconds", int(time.time()) - start_time)
         return resp
 
@@ -977,12 +998,9 @@ class HAK8s:
                     if count >= bkts_to_del:
                         break
                     if not bkt_list and not bucket_list:
-                        while True:
-                            time.sleep(HA_CFG["common_params"]["5sec_delay"])
-                            bucket_list = s3_test_obj.bucket_list()[1]
-                            if len(bucket_list) > 0:
-                                time.sleep(HA_CFG["common_params"]["10sec_delay"])
-                                break
+                        bucket_list = wait_until(lambda: s3_test_obj.bucket_list()[1],
+                                                 interval=1, max_interval=5,
+                                                 name="buckets to delete")
 
             LOGGER.info("Deleted %s number of buckets.", count)
 
@@ -1603,8 +1621,9 @@ class HAK8s:
                     if not resp[0]:
                         return False, pod_info, f"Failed to set failure status for {pod}"
                     pod_info[pod]['status'] = 'failed'
-                    LOGGER.info("Sleeping for %s sec.", HA_CFG["common_params"]["30sec_delay"])
-                    time.sleep(HA_CFG["common_params"]["30sec_delay"])
+                    self.poll_to_get_resource_status(
+                        exp_sts="failed", rsc=rsc, rsc_id=pod_info[pod]['id'],
+                        timeout=HA_CFG["common_params"]["30sec_delay"])
             if validate_set:
                 LOGGER.info("Validating nodes/pods status is SET as expected.")
                 return self.get_validate_resource_status(rsc_info=pod_info)
@@ -1671,25 +1690,20 @@ class HAK8s:
         :param timeout: Poll for expected status till timeout
         :return: bool
         """
-        resp = self.system_health.get_resource_status(resource_id=rsc_id, resource=rsc)
-        if not resp[0]:
-            return False
-        status = resp[1]['status']
-        poll = time.time() + timeout
-        sleep_time = HA_CFG["common_params"]["2sec_delay"]
-        while status != exp_sts and poll > time.time():
-            LOGGER.info("Current %s status is %s. Sleeping for %s sec", rsc, status, sleep_time)
-            time.sleep(sleep_time)
+        def get_status():
             resp = self.system_health.get_resource_status(resource_id=rsc_id, resource=rsc)
-            if not resp[0]:
-                return False
-            status = resp[1]['status']
-            # Gradually increase in time by multiple of 2 to get node/pod status
-            sleep_time = sleep_time * 2
+            status = resp[1]['status'] if resp[0] else None
+            LOGGER.info("Current %s status is %s", rsc, status)
+            return status
+
+        # Gradually increase the delay by multiple of 2 to get node/pod status
+        status = wait_until(get_status, timeout=timeout,
+                            interval=HA_CFG["common_params"]["2sec_delay"], backoff=2,
+                            success=lambda status: status == exp_sts,
+                            fail_fast=lambda status: status is None, raise_on_timeout=False,
+                            name=f"{rsc} {rsc_id} status {exp_sts}")
         # Verify we got the expected status within Polling time
-        if status != exp_sts:
-            return False
-        return True
+        return status == exp_sts
 
     @staticmethod
     def get_rc_node(node_obj):
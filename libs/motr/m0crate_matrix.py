@@ -0,0 +1,348 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+
+"""
+Parallel m0crate workload matrix runner with structured results and baseline comparison
+"""
+import copy
+import itertools
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from commons import constants as common_const
+from commons.helpers.pods_helper import LogicalNode
+from commons.utils import config_utils
+from libs.motr import TEMP_PATH
+
+LOGGER = logging.getLogger(__name__)
+
+SIZE_UNITS = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+TIME_UNITS = {"ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1.0, "sec": 1.0, "": 1.0}
+# Metrics compared with a baseline: higher is better for throughput and IOPS, lower is
+# better for latency.
+HIGHER_IS_BETTER = ("throughput_mbps", "iops")
+LOWER_IS_BETTER = ("latency_avg_s",)
+SUMMARY_COLUMNS = ("runs", "failed", "throughput_mbps", "iops", "latency_avg_s", "elapsed_s")
+
+_LATENCY_RE = re.compile(r"(?:avg|average|mean)[\w /]{0,20}?(?:latency|time)[^\d\n]{0,10}"
+                         r"([\d.]+)\s*(ns|us|ms|sec|s)?\b", re.IGNORECASE)
+_TIME_RE = re.compile(r"\b(?:time|duration|elapsed)\b[^\d\n]{0,10}([\d.]+)\s*(ns|us|ms|sec|s)?\b",
+                      re.IGNORECASE)
+_BANDWIDTH_RE = re.compile(r"([\d.]+)\s*([kmg])i?b/s", re.IGNORECASE)
+_IOPS_RE = re.compile(r"(?:iops|ops/s(?:ec)?)[^\d\n]{0,5}([\d.]+)|([\d.]+)\s*(?:iops|ops/s)",
+                      re.IGNORECASE)
+_OPS_RE = re.compile(r"\b(?:total\s+)?ops\b[^\d\n/]{0,5}(\d+)", re.IGNORECASE)
+
+
+def size_bytes(size) -> int:
+    """Bytes of an m0crate size such as 4k, 10m or 1G."""
+    match = re.fullmatch(r"\s*(\d+)\s*([kmg]?)b?\s*", str(size), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size {size}")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).lower()]
+
+
+def expand_matrix(grid: dict) -> list:
+    """
+    Every combination of the workload parameters of a grid.
+
+    :param grid: m0crate WORKLOAD parameter to list of values, e.g.
+        {"BLOCK_SIZE": ["4k", "1m"], "NR_THREADS": [1, 16], "NR_OBJS": [10, 100]}.
+    :return: list of parameter dicts, in grid order.
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def config_id(params: dict) -> str:
+    """Stable name of a parameter combination, e.g. BLOCK_SIZE=4k,NR_THREADS=1."""
+    return ",".join(f"{key}={params[key]}" for key in sorted(params))
+
+
+def parse_m0crate_output(output: str) -> dict:
+    """
+    Throughput and latency figures printed by m0crate.
+
+    Lines are searched for an average op latency or time, a total time, a bandwidth in
+    KB/s, MB/s or GB/s, an IOPS or ops/s rate and an op count. Figures not printed are None.
+
+    :param output: m0crate stdout and stderr.
+    :return: dict of elapsed_s, ops, throughput_mbps, iops and latency_avg_s.
+    """
+    result = dict.fromkeys(("elapsed_s", "ops", "throughput_mbps", "iops", "latency_avg_s"))
+    for line in output.splitlines():
+        match = _LATENCY_RE.search(line)
+        if match:
+            result["latency_avg_s"] = float(match.group(1)) * TIME_UNITS[
+                (match.group(2) or "").lower()]
+        else:
+            match = _TIME_RE.search(line)
+            if match:
+                elapsed = float(match.group(1)) * TIME_UNITS[(match.group(2) or "").lower()]
+                result["elapsed_s"] = max(result["elapsed_s"] or 0.0, elapsed)
+        match = _BANDWIDTH_RE.search(line)
+        if match:
+            result["throughput_mbps"] = float(match.group(1)) * SIZE_UNITS[
+                match.group(2).lower()] / SIZE_UNITS["m"]
+        match = _IOPS_RE.search(line)
+        if match:
+            result["iops"] = float(match.group(1) or match.group(2))
+        match = _OPS_RE.search(line)
+        if match:
+            result["ops"] = int(match.group(1))
+    return result
+
+
+def _mean(values: list):
+    """Mean of the values that are not None, None if there is none."""
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def summarize(records: list) -> dict:
+    """
+    Per configuration summary of run records.
+
+    :param records: records of M0crateMatrixRunner.run.
+    :return: dict of config id to params, run and failure counts, mean throughput, IOPS,
+        latency and elapsed time of the passed runs and the minimum throughput.
+    """
+    summary = {}
+    for record in records:
+        summary.setdefault(record["config"], {"params": record["params"], "records": []})
+        summary[record["config"]]["records"].append(record)
+    for entry in summary.values():
+        runs = entry.pop("records")
+        passed = [run for run in runs if run["status"] == "PASS"]
+        entry.update(runs=len(runs), failed=len(runs) - len(passed),
+                     nodes=sorted({run["node"] for run in runs}))
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER + ("elapsed_s",):
+            entry[metric] = _mean([run[metric] for run in passed])
+        rates = [run["throughput_mbps"] for run in passed if run["throughput_mbps"] is not None]
+        entry["throughput_min_mbps"] = min(rates) if rates else None
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    """Summary as a text table, one row per configuration."""
+    def cell(value):
+        return "-" if value is None else f"{value:.4g}" if isinstance(value, float) else str(value)
+
+    rows = [("config",) + SUMMARY_COLUMNS]
+    rows += [(name,) + tuple(cell(entry[column]) for column in SUMMARY_COLUMNS)
+             for name, entry in sorted(summary.items())]
+    widths = [max(len(row[col]) for row in rows) for col in range(len(rows[0]))]
+    return "\n".join("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+                     for row in rows)
+
+
+def save_results(report: dict, path: str) -> str:
+    """Save a run report, or its summary alone to be used as a baseline, as JSON."""
+    with open(path, "w") as json_file:
+        json.dump(report, json_file, indent=2, sort_keys=True)
+    return path
+
+
+def load_baseline(path: str) -> dict:
+    """Summary of a report or baseline saved by save_results."""
+    with open(path) as json_file:
+        data = json.load(json_file)
+    return data.get("summary", data)
+
+
+def check_regression(summary: dict, baseline: dict, tolerance: float = 0.1) -> list:
+    """
+    Compare a summary with a baseline summary.
+
+    :param summary: summary of the current runs.
+    :param baseline: summary of the baseline runs, as returned by load_baseline.
+    :param tolerance: relative change allowed, e.g. 0.1 fails a throughput 10% below baseline
+        or a latency 10% above it.
+    :return: list of regressions, each a dict of config, metric, baseline, current and the
+        relative change. A configuration of the baseline without passed runs is a regression.
+    """
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        current = summary.get(name)
+        if not current or current["runs"] == current["failed"]:
+            regressions.append({"config": name, "metric": "runs", "baseline": base["runs"],
+                                "current": 0, "change": -1.0})
+            continue
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            if not base.get(metric) or current.get(metric) is None:
+                continue
+            change = (current[metric] - base[metric]) / base[metric]
+            if metric in HIGHER_IS_BETTER and change < -tolerance or \
+                    metric in LOWER_IS_BETTER and change > tolerance:
+                regressions.append({"config": name, "metric": metric, "baseline": base[metric],
+                                    "current": current[metric], "change": round(change, 4)})
+    for regression in regressions:
+        LOGGER.error("Regression of %s %s: %s against baseline %s", regression["config"],
+                     regression["metric"], regression["current"], regression["baseline"])
+    return regressions
+
+
+class M0crateMatrixRunner:
+    """
+    Run a matrix of m0crate workloads concurrently on all the motr client pods.
+
+    Every node has a worker thread with its own master node connection, taking the next
+    configuration to run from a shared queue, so every pod runs one m0crate at a time and the
+    configurations are spread over the pods as they finish. The source files the workloads
+    read are created once per node before the runs start.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, motr_obj, template_file: str, nodes: list = None, repeat: int = 1,
+                 work_dir: str = None):
+        """
+        :param motr_obj: MotrCoreK8s object of the cluster.
+        :param template_file: m0crate workload yaml the configurations are applied to, e.g.
+            config/motr/sample_m0crate.yaml.
+        :param nodes: cortx nodes whose client pods run workloads, default all.
+        :param repeat: runs of every configuration.
+        :param work_dir: local directory of the generated workload files.
+        """
+        self.motr_obj = motr_obj
+        self.template = config_utils.read_yaml(template_file)[1]
+        self.nodes = nodes or list(motr_obj.node_pod_dict)
+        self.repeat = repeat
+        self.work_dir = work_dir or os.path.join(TEMP_PATH, "m0crate_matrix")
+        self.records = []
+        self._lock = threading.Lock()
+
+    def workload(self, params: dict, node: str) -> dict:
+        """Workload yaml content of a configuration on the client of a node."""
+        m0cfg = copy.deepcopy(self.template)
+        node_enpts = self.motr_obj.get_cortx_node_endpoints(node)
+        m0cfg['MOTR_CONFIG']['MOTR_HA_ADDR'] = node_enpts['hax_ep']
+        m0cfg['MOTR_CONFIG']['PROF'] = self.motr_obj.profile_fid
+        m0cfg['MOTR_CONFIG']['PROCESS_FID'] = node_enpts[common_const.MOTR_CLIENT][0]['fid']
+        m0cfg['MOTR_CONFIG']['MOTR_LOCAL_ADDR'] = node_enpts[common_const.MOTR_CLIENT][0]['ep']
+        for spec in m0cfg['WORKLOAD_SPEC']:
+            spec['WORKLOAD'].update(params)
+        return m0cfg
+
+    def prepare(self, configs: list) -> None:
+        """Create the source files of the configurations on every node."""
+        for node in self.nodes:
+            source_files = {}
+            for params in configs:
+                for spec in self.workload(params, node)['WORKLOAD_SPEC']:
+                    source_files.setdefault(spec['WORKLOAD']['SOURCE_FILE'],
+                                            spec['WORKLOAD']['BLOCK_SIZE'])
+            for source_file, b_size in source_files.items():
+                count = size_bytes(source_file.split('/')[-1]) // size_bytes(b_size)
+                self.motr_obj.dd_cmd(str(b_size).upper(), str(max(count, 1)), source_file, node)
+
+    # pylint: disable=too-many-arguments
+    def run_config(self, params: dict, node: str, node_obj, index: int = 0,
+                   attempt: int = 0) -> dict:
+        """
+        Run one configuration on the client pod of a node.
+
+        :param params: workload parameters.
+        :param node: cortx node whose client pod runs the workload.
+        :param node_obj: master node connection of the calling thread.
+        :param index: job number, naming the workload file.
+        :param attempt: repetition of the configuration.
+        :return: record of the config, node, pod, status, wall time and parsed figures.
+        """
+        name = config_id(params)
+        workload = self.workload(params, node)
+        workload_file = os.path.join(self.work_dir, f"m0crate_matrix_{index}.yaml")
+        config_utils.write_yaml(workload_file, workload, backup=False, sort_keys=False)
+        remote_file = os.path.join(TEMP_PATH, os.path.basename(workload_file))
+        pod = self.motr_obj.node_pod_dict[node]
+        record = {"config": name, "params": params, "node": node, "pod": pod,
+                  "attempt": attempt}
+        start = time.perf_counter()
+        try:
+            output, error, ret = self.motr_obj.m0crate_exec(workload_file, remote_file, pod,
+                                                            node_obj=node_obj)
+        except Exception as exc:  # pylint: disable=broad-except
+            output, error, ret = "", str(exc), -1
+        record["wall_s"] = time.perf_counter() - start
+        record.update(parse_m0crate_output(output + "\n" + error))
+        failed = ret or any(error_str in error for error_str in ['error', 'ERROR', 'Error'])
+        record["status"] = "FAIL" if failed else "PASS"
+        record["message"] = error.strip()[-500:] if failed else ""
+        if record["elapsed_s"] is None:
+            record["elapsed_s"] = record["wall_s"]
+        # Bytes of the objects of the workload, when m0crate prints no bandwidth.
+        total = sum(size_bytes(spec['WORKLOAD']['IOSIZE']) * int(spec['WORKLOAD']['NR_OBJS'])
+                    for spec in workload['WORKLOAD_SPEC'])
+        if record["throughput_mbps"] is None and not failed and record["elapsed_s"]:
+            record["throughput_mbps"] = total / record["elapsed_s"] / SIZE_UNITS["m"]
+        if record["iops"] is None and record["ops"] and record["elapsed_s"]:
+            record["iops"] = record["ops"] / record["elapsed_s"]
+        LOGGER.info("m0crate %s on %s: %s in %.1fs, %s MB/s, avg latency %s", name, pod,
+                    record["status"], record["wall_s"], record["throughput_mbps"],
+                    record["latency_avg_s"])
+        os.remove(workload_file)
+        return record
+
+    def _worker(self, node: str, jobs: queue.Queue) -> None:
+        """Run configurations on one node until the queue is empty."""
+        motr_obj = self.motr_obj
+        node_obj = LogicalNode(hostname=motr_obj.master_node, username=motr_obj.master_uname,
+                               password=motr_obj.master_passwd)
+        try:
+            while True:
+                try:
+                    index, params, attempt = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                record = self.run_config(params, node, node_obj, index, attempt)
+                with self._lock:
+                    self.records.append(record)
+        finally:
+            node_obj.disconnect()
+
+    def run(self, grid: dict) -> dict:
+        """
+        Run every configuration of a grid repeat times, spread over the client pods.
+
+        :param grid: parameter grid, see expand_matrix.
+        :return: dict of the run records, the per configuration summary and the elapsed time.
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        configs = expand_matrix(grid)
+        self.prepare(configs)
+        jobs = queue.Queue()
+        for attempt in range(self.repeat):
+            for params in configs:
+                jobs.put((jobs.qsize(), params, attempt))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(self.nodes),
+                                thread_name_prefix="m0crate") as executor:
+            list(executor.map(lambda node: self._worker(node, jobs), self.nodes))
+        elapsed = time.perf_counter() - start
+        summary = summarize(self.records)
+        LOGGER.info("Ran %s m0crate configurations %s times on %s pods in %.1fs\n%s",
+                    len(configs), self.repeat, len(self.nodes), elapsed,
+                    format_summary(summary))
+        return {"records": list(self.records), "summary": summary, "elapsed": elapsed}
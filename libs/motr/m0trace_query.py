@@ -0,0 +1,287 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+
+"""
+Query engine over m0trace output: records parsed once into an index of FOP latency spans
+"""
+import bisect
+import logging
+import re
+from array import array
+from collections import namedtuple
+
+from commons.utils.perf_utils import latency_histogram
+from commons.utils.perf_utils import latency_stats
+from commons.utils.perf_utils import percentile
+
+LOGGER = logging.getLogger(__name__)
+
+NS_PER_SECOND = 10 ** 9
+# Lines of the read_m0trace_log grep: target fid and data/parity unit of every IO fop.
+BLOCK_FID_PATTERN = r"prepare io fops|UTyp"
+
+TraceEvent = namedtuple("TraceEvent", ["ts", "subsystem", "level", "func", "msg"])
+SpanRule = namedtuple("SpanRule", ["name", "start", "end"])
+
+# An rpc item is sent with its opcode and completed when its reply arrives; both trace points
+# name the item address, pairing them into a span. Rules are searched in "<func> <msg>".
+DEFAULT_RULES = (
+    SpanRule("rpc",
+             re.compile(r"(?:item_send|rpc__post_locked)\b.*?item[:=\s]+(?P<key>0x[0-9a-f]+)"
+                        r".*?(?:opcode|fop_type)[:=\s]+(?P<fop>\w+)"),
+             re.compile(r"(?:item_replied|reply_received|item_done)\b.*?"
+                        r"item[:=\s]+(?P<key>0x[0-9a-f]+)")),
+)
+
+
+def parse_timestamp(value: str) -> int:
+    """Nanoseconds of an m0trace timestamp, given in nanoseconds or as fractional seconds."""
+    value = value.strip()
+    if "." in value:
+        return int(float(value) * NS_PER_SECOND)
+    return int(value)
+
+
+def parse_records(lines):
+    """
+    Parse the YAML records printed by m0trace, one "key: value" line per field.
+
+    Records are separated by "---" lines or start again at a repeated field name. The msg
+    value loses its enclosing quotes.
+
+    :param lines: iterable of output lines, e.g. a file or a streamed command output.
+    :return: generator of dict per record.
+    """
+    record = {}
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.startswith("---"):
+            if record:
+                yield record
+            record = {}
+            continue
+        field, sep, value = line.partition(":")
+        field = field.strip()
+        if not sep or not field or " " in field:
+            continue
+        if field in record:
+            yield record
+            record = {}
+        value = value.strip()
+        if field == "msg" and len(value) > 1 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+        record[field] = value
+    if record:
+        yield record
+
+
+class M0TraceIndex:
+    """
+    Index of the events and FOP latency spans of one m0trace output, built in one pass.
+
+    Every record is matched against span rules: a start event opens a span under its rule and
+    key, e.g. the rpc item address, and the matching end event closes it with its latency. Spans
+    are kept per FOP type ordered by start time, so latency queries over a time window are two
+    bisections away and never scan the trace again. Events are kept only when they match the
+    keep pattern, as a full trace may not fit in memory.
+
+    Times are in seconds on the clock of the trace timestamps, i.e. since the epoch.
+    """
+
+    def __init__(self, rules: tuple = DEFAULT_RULES, keep: str = None, fop_names: dict = None):
+        """
+        :param rules: SpanRule tuples of name and compiled start and end patterns. Start
+            patterns have a "key" and a "fop" group, end patterns a "key" group.
+        :param keep: regex searched in "<func> <msg>" of the events to keep, None keeps all.
+        :param fop_names: names of FOP types as captured by the rules, e.g. opcode numbers.
+        """
+        self.rules = rules
+        self.keep = re.compile(keep) if keep else None
+        self.fop_names = fop_names or {}
+        self.records = 0
+        self.unmatched = 0
+        self.events = []
+        self._event_ts = array("q")
+        self._event_seq = array("q")
+        self._open = {}
+        self._pending = {}
+        self._starts = {}
+        self._latencies = {}
+
+    @classmethod
+    def from_lines(cls, lines, **kwargs):
+        """Build an index from m0trace output lines."""
+        index = cls(**kwargs)
+        index.feed(lines)
+        return index
+
+    def feed(self, lines) -> None:
+        """Parse output lines and add their records to the index."""
+        for record in parse_records(lines):
+            self.add(record)
+        self._build()
+        LOGGER.info("Indexed %s m0trace records: %s events kept, %s spans, %s unmatched",
+                    self.records, len(self.events),
+                    sum(len(starts) for starts in self._starts.values()),
+                    self.unmatched + len(self._open))
+
+    def add(self, record: dict) -> None:
+        """Add one parsed record; spans are queryable after the next feed or build."""
+        if "timestamp" not in record:
+            return
+        self.records += 1
+        ts_ns = parse_timestamp(record["timestamp"])
+        func, msg = record.get("func", ""), record.get("msg", "")
+        text = f"{func} {msg}"
+        if self.keep is None or self.keep.search(text):
+            self._event_ts.append(ts_ns)
+            self._event_seq.append(self.records)
+            self.events.append(TraceEvent(ts_ns / NS_PER_SECOND, record.get("subsystem"),
+                                          record.get("level"), func, msg))
+        for rule in self.rules:
+            match = rule.start.search(text)
+            if match:
+                fop = match.groupdict().get("fop") or rule.name
+                self._open[(rule.name, match.group("key"))] = (
+                    ts_ns, self.fop_names.get(fop, fop))
+                continue
+            match = rule.end.search(text)
+            if match:
+                started = self._open.pop((rule.name, match.group("key")), None)
+                if started is None:
+                    self.unmatched += 1
+                    continue
+                start_ns, fop = started
+                self._pending.setdefault(fop, []).append((start_ns, ts_ns - start_ns))
+
+    def build(self) -> None:
+        """Make the spans added since the last build queryable."""
+        self._build()
+
+    def _build(self) -> None:
+        """Merge the pending spans into the per FOP arrays and order events and spans."""
+        for fop, spans in self._pending.items():
+            if fop in self._starts:
+                spans.extend(zip(self._starts[fop], self._latencies[fop]))
+            spans.sort()
+            self._starts[fop] = array("q", (start for start, _ in spans))
+            self._latencies[fop] = array("q", (latency for _, latency in spans))
+        self._pending = {}
+        # Trace buffers of different threads may interleave out of timestamp order.
+        if any(self._event_ts[pos] > self._event_ts[pos + 1]
+               for pos in range(len(self._event_ts) - 1)):
+            order = sorted(range(len(self.events)), key=self._event_ts.__getitem__)
+            self.events = [self.events[pos] for pos in order]
+            self._event_ts = array("q", (self._event_ts[pos] for pos in order))
+            self._event_seq = array("q", (self._event_seq[pos] for pos in order))
+
+    @property
+    def fops(self) -> list:
+        """FOP types with at least one span."""
+        return sorted(self._starts)
+
+    def latencies(self, fop: str = None, start: float = None, end: float = None) -> list:
+        """
+        Latencies of the spans starting in a time window.
+
+        :param fop: FOP type, None for all.
+        :param start: window start in seconds, None for the trace start.
+        :param end: window end in seconds, excluded, None for the trace end.
+        :return: list of latencies in seconds.
+        """
+        result = []
+        for name in [fop] if fop is not None else self.fops:
+            starts = self._starts.get(name)
+            if not starts:
+                continue
+            low = 0 if start is None else bisect.bisect_left(starts, int(start * NS_PER_SECOND))
+            high = len(starts) if end is None else bisect.bisect_left(
+                starts, int(end * NS_PER_SECOND))
+            result.extend(latency / NS_PER_SECOND for latency in self._latencies[name][low:high])
+        return result
+
+    def stats(self, fop: str = None, start: float = None, end: float = None) -> dict:
+        """latency_stats of the spans starting in a time window, see latencies."""
+        return latency_stats(self.latencies(fop, start, end))
+
+    def percentile(self, pct: float, fop: str = None, start: float = None,
+                   end: float = None) -> float:
+        """Latency percentile in seconds of the spans starting in a time window."""
+        return percentile(sorted(self.latencies(fop, start, end)), pct)
+
+    def histogram(self, fop: str = None, start: float = None, end: float = None) -> dict:
+        """latency_histogram of the spans starting in a time window, see latencies."""
+        return latency_histogram(self.latencies(fop, start, end))
+
+    def summary(self, start: float = None, end: float = None) -> dict:
+        """Latency statistics and histogram per FOP type over a time window."""
+        return {fop: {"latency": self.stats(fop, start, end),
+                      "histogram": self.histogram(fop, start, end)} for fop in self.fops}
+
+    def query(self, start: float = None, end: float = None, subsystem: str = None,
+              func: str = None, pattern: str = None):
+        """
+        Kept events in a time window matching filters.
+
+        :param start: window start in seconds, None for the trace start.
+        :param end: window end in seconds, excluded, None for the trace end.
+        :param subsystem: exact subsystem, e.g. M0_TRACE_SUBSYS_RPC.
+        :param func: exact function name.
+        :param pattern: regex searched in the message.
+        :return: generator of TraceEvent in timestamp order.
+        """
+        low = 0 if start is None else bisect.bisect_left(self._event_ts,
+                                                         int(start * NS_PER_SECOND))
+        high = len(self._event_ts) if end is None else bisect.bisect_left(
+            self._event_ts, int(end * NS_PER_SECOND))
+        regex = re.compile(pattern) if pattern else None
+        for event in self.events[low:high]:
+            if subsystem is not None and event.subsystem != subsystem or \
+                    func is not None and event.func != func or \
+                    regex is not None and not regex.search(event.msg):
+                continue
+            yield event
+
+    def block_fids(self) -> dict:
+        """
+        Target fids of the data and parity units of IO fops, as in read_m0trace_log.
+
+        The events must have been kept, e.g. with keep=BLOCK_FID_PATTERN. A unit takes the last
+        tfid printed before it, so events are read in file order, not in timestamp order.
+
+        :return: dict of "DATA<n>" and "PARITY<n>" to fid, e.g. {"DATA0": "1:2"}.
+        """
+        tfids = []
+        fids = {}
+        counts = {"DATA": 0, "PARITY": 0}
+        regex = re.compile(BLOCK_FID_PATTERN)
+        for pos in sorted(range(len(self.events)), key=self._event_seq.__getitem__):
+            event = self.events[pos]
+            if not regex.search(event.msg):
+                continue
+            fields = event.msg.split(",")
+            line = fields[1] if len(fields) > 1 else event.msg
+            if "tfid" in line:
+                tfids.append(line)
+            for kind, tag in (("PARITY", "[P]"), ("DATA", "[D]")):
+                if tag in line and tfids:
+                    fids[f"{kind}{counts[kind]}"] = tfids.pop().split(" ")[-1][1:-1]
+                    counts[kind] += 1
+        return fids
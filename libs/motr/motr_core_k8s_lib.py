@@ -24,6 +24,7 @@ Python library contains methods which provides the services endpoints.
 import json
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from random import SystemRandom
 from string import Template
 
@@ -31,6 +32,8 @@ from commons.params import LOG_DIR, LATEST_LOG_FOLDER
 from libs.motr import TEMP_PATH
 from libs.motr import FILE_BLOCK_COUNT
 from libs.motr.layouts import BSIZE_LAYOUT_MAP
+from libs.motr.m0trace_query import BLOCK_FID_PATTERN
+from libs.motr.m0trace_query import M0TraceIndex
 from libs.ha.ha_common_libs_k8s import HAK8s
 from config import CMN_CFG
 from commons.utils import system_utils
@@ -200,17 +203,36 @@ class MotrCoreK8s():
         param: local_file_path: Absolute workload file(yaml) path on the client
         param: remote_file_path: Absolute workload file(yaml) path on the master node
         param: cortx_node: Node where the m0crate utility will run
+        return: m0crate output and error output
         """
         pod_node = self.get_node_pod_dict()[cortx_node]
-        result = self.node_obj.copy_file_to_remote(local_file_path, remote_file_path)
+        result, error1, ret = self.m0crate_exec(local_file_path, remote_file_path, pod_node)
+        if ret:
+            assert False, "Failed with return code {}, Please check the logs".format(ret)
+        assert not any((error_str in error1 for error_str in
+                        ['error', 'ERROR', 'Error'])), "Errors found in output {}".format(error1)
+        return result, error1
+
+    def m0crate_exec(self, local_file_path, remote_file_path, pod_node, node_obj=None):
+        """
+        Copy a workload file into the hax container of a client pod and run m0crate on it
+        param: local_file_path: Absolute workload file(yaml) path on the client
+        param: remote_file_path: Absolute workload file(yaml) path on the master node
+        param: pod_node: Client pod where the m0crate utility will run
+        param: node_obj: master node connection, default the shared one; threads running
+               m0crate concurrently pass their own
+        return: decoded m0crate output, error output and return code
+        """
+        node_obj = node_obj or self.node_obj
+        result = node_obj.copy_file_to_remote(local_file_path, remote_file_path)
         if not result[0]:
             raise Exception("Copy from {} to {} failed with error: {}".format(local_file_path,
                                                                               remote_file_path,
                                                                               result[1]))
         m0crate_run_cmd = f'm0crate -S {remote_file_path}'
-        result = self.node_obj.copy_file_to_container(remote_file_path, pod_node,
-                                                      remote_file_path,
-                                                      common_const.HAX_CONTAINER_NAME)
+        result = node_obj.copy_file_to_container(remote_file_path, pod_node,
+                                                 remote_file_path,
+                                                 common_const.HAX_CONTAINER_NAME)
         log.info(result)
         if not result[0]:
             raise Exception("Copy from {} to {} failed with error: \
@@ -218,14 +240,11 @@ class MotrCoreK8s():
                                         result[1]))
         cmd = common_cmd.K8S_POD_INTERACTIVE_CMD.format(pod_node, m0crate_run_cmd)
         result, error1, ret = system_utils.run_remote_cmd_wo_decision(cmd,
-                                                                      self.master_node,
-                                                                      self.master_uname,
-                                                                      self.master_passwd)
+                                                                      node_obj.hostname,
+                                                                      node_obj.username,
+                                                                      node_obj.password)
         log.info("%s , %s", result, error1)
-        if ret:
-            assert False, "Failed with return code {}, Please check the logs".format(ret)
-        assert not any((error_str in error1.decode("utf-8") for error_str in
-                        ['error', 'ERROR', 'Error'])), "Errors found in output {}".format(error1)
+        return result.decode("utf-8"), error1.decode("utf-8"), ret
 
     def dd_cmd(self, b_size, count, file, node):
         """
@@ -707,11 +726,8 @@ class MotrCoreK8s():
                 if isinstance(conn, LogicalNode):
                     conn.disconnect()
 
-    def dump_m0trace_log(self, filepath, node):
-        """ This method is used to parse the m0trace logs on all the data pods,
-        filepath: m0trace log path
-        node: client pod
-        """
+    def _latest_m0trace_file(self, node):
+        """Name of the latest m0trace file in the hax container of a pod."""
         list_trace = common_cmd.LIST_M0TRACE
         resp = self.node_obj.send_k8s_cmd(operation="exec", pod=str(self.node_pod_dict[node]),
                                           namespace=common_const.NAMESPACE,
@@ -719,6 +735,14 @@ class MotrCoreK8s():
                                                          f"-- {list_trace}", decode=True)
         latest_trace_file = resp.split("\n")[-1]
         log.debug("Resp: %s", latest_trace_file)
+        return latest_trace_file
+
+    def dump_m0trace_log(self, filepath, node):
+        """ This method is used to parse the m0trace logs on all the data pods,
+        filepath: m0trace log path
+        node: client pod
+        """
+        latest_trace_file = self._latest_m0trace_file(node)
         cmd = Template(common_cmd.M0TRACE).substitute(trace=latest_trace_file, file=filepath)
         resp = self.node_obj.send_k8s_cmd(operation="exec", pod=str(self.node_pod_dict[node]),
                                           namespace=common_const.NAMESPACE,
@@ -727,43 +751,64 @@ class MotrCoreK8s():
         log.info("Resp of trace: %s", resp)
         return filepath
 
+    def query_m0trace_log(self, node, **kwargs):
+        """
+        Index the latest m0trace of a pod for latency and event queries.
+        The m0trace output is streamed from the hax container and parsed in one pass, without
+        writing it to a file, e.g. index.percentile(99, "write", start, end).
+        :param node: node whose pod is traced.
+        :param kwargs: M0TraceIndex rules, keep and fop_names.
+        :return: M0TraceIndex of the trace.
+        """
+        latest_trace_file = self._latest_m0trace_file(node)
+        cmd = Template(common_cmd.M0TRACE_PRINT).substitute(trace=latest_trace_file)
+        cmd = common_cmd.KUBECTL_CMD.format(
+            "exec", self.node_pod_dict[node], common_const.NAMESPACE,
+            f"-c {common_const.HAX_CONTAINER_NAME} -- {cmd}")
+        return M0TraceIndex.from_lines(self.node_obj.stream_cmd(cmd), **kwargs)
+
     def read_m0trace_log(self, filepath):
         """
         This method reads the log and fetch tfid belongs to DATA and PARITY block
         returns dict of tfid with DATA and PARITY.
         """
-        tfid_list = []
-        checksum_dict = {}
-        data_blk = 0
-        parity_blk = 0
         local_path = os.path.join(LOG_DIR, LATEST_LOG_FOLDER, filepath)
-        self.master_node_list[0].copy_file_to_local(filepath, local_path)
-        cmd = Template(common_cmd.GREP_DP_BLOCK_FID).substitute(file=filepath)
-        resp = self.master_node_list[0].execute_cmd(cmd, read_lines=True)
-        log.debug("output of m0trace utility %s", resp)
-        lines = str(resp).split("\\n")
-        for line in lines:
-            if "tfid" in line:
-                tfid_list.append(line)  # append the target fid in the list.
-            if '[P]' in line:
-                if tfid_list:
-                    tfid = tfid_list.pop()
-                    tfid = tfid.split(" ")
-                    fid = tfid[-1][1:-1]  # fetch target fid and strip the <>
-                    dict_schema = {"PARITY"+str(parity_blk): fid}  # create dictionary
-                    checksum_dict.update(dict_schema)
-                    parity_blk=parity_blk+1
-            if "[D]" in line:
-                if tfid_list:
-                    tfid = tfid_list.pop()
-                    tfid = tfid.split(" ")
-                    fid = tfid[-1][1:-1]  # fetch target fid and strip the <>
-                    dict_schema = {"DATA"+str(data_blk): fid}  # create dictionary
-                    checksum_dict.update(dict_schema)
-                    data_blk=data_blk+1
+        resp = self.master_node_list[0].copy_file_to_local(filepath, local_path)
+        if resp[0]:
+            with open(local_path, encoding="utf-8", errors="replace") as trace:
+                index = M0TraceIndex.from_lines(trace, keep=BLOCK_FID_PATTERN)
+        else:
+            log.warning("Could not copy %s, reading it remotely: %s", filepath, resp[1])
+            index = M0TraceIndex.from_lines(
+                self.master_node_list[0].stream_cmd(common_cmd.CMD_RD_LOG.format(filepath)),
+                keep=BLOCK_FID_PATTERN)
+        checksum_dict = index.block_fids()
         log.debug("DICT is %s", checksum_dict)
         return checksum_dict
 
+    def _emap_list(self, pod, metadata_device, parse_size):
+        """
+        Copy the error_injection.py script on the motr container of a data pod and dump its emap
+        list to a file, on connections of its own so pods can be processed in parallel
+        """
+        node_obj = LogicalNode(hostname=self.master_node, username=self.master_uname,
+                               password=self.master_passwd)
+        try:
+            result = node_obj.copy_file_to_container(
+                "error_injection.py", pod, common_const.CONTAINER_PATH,
+                common_const.MOTR_CONTAINER_PREFIX+"-001")
+            if not result:
+                raise FileNotFoundError
+            # Run script to list emap and dump the output to the file
+            cmd = Template(common_cmd.EMAP_LIST).substitute(path=metadata_device, size=parse_size,
+                                                            file=f"{pod}-emap_list.txt")
+            node_obj.send_k8s_cmd(
+                operation="exec", pod=pod, namespace=common_const.NAMESPACE,
+                command_suffix=f"-c {common_const.MOTR_CONTAINER_PREFIX}-001 "
+                               f"-- {cmd}", decode=True)
+        finally:
+            node_obj.disconnect()
+
     # pylint: disable=too-many-locals
     def fetch_gob(self, metadata_device, parse_size, fid:dict):
         """
@@ -783,20 +828,12 @@ class MotrCoreK8s():
             else:                   # fetch the value from dict for parity block
                 fid_val = value[7:16]
                 p_fid.append(fid_val)
-        # Iterate over data pods to copy the error_injection.py script on motr container
+        # Copy the error_injection.py script on motr container and list emap on all the data
+        # pods at the same time
+        with ThreadPoolExecutor(max_workers=max(len(pod_list), 1)) as executor:
+            list(executor.map(lambda pod: self._emap_list(pod, metadata_device, parse_size),
+                              pod_list))
         for pod in pod_list:
-            result = self.master_node_list[0].copy_file_to_container(
-                "error_injection.py", pod, common_const.CONTAINER_PATH,
-                common_const.MOTR_CONTAINER_PREFIX+"-001")
-            if not result:
-                raise FileNotFoundError
-            # Run script to list emap and dump the output to the file
-            cmd = Template(common_cmd.EMAP_LIST).substitute(path=metadata_device, size=parse_size,
-                                                            file=f"{pod}-emap_list.txt")
-            self.node_obj.send_k8s_cmd(
-                operation="exec", pod=pod, namespace=common_const.NAMESPACE,
-                command_suffix=f"-c {common_const.MOTR_CONTAINER_PREFIX}-001 "
-                               f"-- {cmd}", decode=True)
             d_fid = [*set(d_fid)]
             p_fid = [*set(p_fid)]
             log.debug("lists of d_fid, p_fid %s \n %s", d_fid, p_fid)
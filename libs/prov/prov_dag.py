@@ -0,0 +1,399 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Dependency graph executor of deployment steps with timeouts, retries and a timeline."""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from commons.helpers.pods_helper import LogicalNode
+from commons.utils.wait_utils import wait_until
+
+LOGGER = logging.getLogger(__name__)
+
+PENDING, RUNNING, PASSED, FAILED, SKIPPED = "pending", "running", "passed", "failed", "skipped"
+
+
+class StepError(Exception):
+    """A step returned a failure response."""
+
+
+class StepTimeout(StepError):
+    """A step attempt did not finish within its timeout."""
+
+    def __init__(self, message: str, thread: threading.Thread = None):
+        super().__init__(message)
+        self.thread = thread
+
+
+class Step:
+    """Deployment step, its dependencies and execution record."""
+
+    # pylint: disable=too-many-arguments, too-many-instance-attributes
+    def __init__(self, name: str, func, deps: tuple = (), timeout: float = None,
+                 retries: int = 0, retry_delay: float = 0, check: bool = True):
+        """
+        Initialize the step.
+
+        :param name: unique step name.
+        :param func: callable without arguments.
+        :param deps: names of the steps which must pass first.
+        :param timeout: seconds per attempt, None waits forever.
+        :param retries: attempts after a failed one.
+        :param retry_delay: seconds between attempts.
+        :param check: a (False, response) return value fails the step.
+        """
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.check = check
+        self.status = PENDING
+        self.attempts = 0
+        self.start = None
+        self.end = None
+        self.result = None
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end of the step."""
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+    def record(self) -> dict:
+        """Timeline entry of the step, times relative to the run start."""
+        return {"name": self.name, "status": self.status, "attempts": self.attempts,
+                "start": self.start, "end": self.end, "duration": self.duration,
+                "deps": list(self.deps), "error": str(self.error) if self.error else None}
+
+
+def _call_with_timeout(func, timeout: float):
+    """Call func, raise StepTimeout when it runs longer than timeout."""
+    if timeout is None:
+        return func()
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = func()
+        except BaseException as error:  # pylint: disable=broad-except
+            outcome["error"] = error
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        # A thread can not be killed, the caller decides whether to wait for it.
+        raise StepTimeout(f"timed out after {timeout}s", thread)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+class DeployDag:
+    """
+    Run steps as soon as their dependencies passed, independent steps concurrently.
+
+    A failed step marks every step depending on it as skipped, with fail_fast no new step is
+    started once a step failed.
+    """
+
+    def __init__(self, workers: int = 8, fail_fast: bool = True):
+        """
+        Initialize the graph.
+
+        :param workers: steps running at the same time.
+        :param fail_fast: stop starting steps after a failure.
+        """
+        self.workers = workers
+        self.fail_fast = fail_fast
+        self.steps = {}
+        self.elapsed = 0.0
+        self.max_running = 0
+        self._running = 0
+        self._lock = threading.Lock()
+
+    # pylint: disable=too-many-arguments
+    def add(self, name: str, func, deps: tuple = (), timeout: float = None, retries: int = 0,
+            retry_delay: float = 0, check: bool = True) -> Step:
+        """Add a step, see Step for the parameters."""
+        if name in self.steps:
+            raise ValueError(f"Duplicate step {name}")
+        self.steps[name] = Step(name, func, deps, timeout, retries, retry_delay, check)
+        return self.steps[name]
+
+    def order(self) -> list:
+        """
+        Step names in a dependency respecting order.
+
+        :raises ValueError: on unknown dependencies or cycles.
+        """
+        for step in self.steps.values():
+            unknown = [dep for dep in step.deps if dep not in self.steps]
+            if unknown:
+                raise ValueError(f"Step {step.name} depends on unknown steps {unknown}")
+        ordered, done = [], set()
+        remaining = list(self.steps)
+        while remaining:
+            ready = [name for name in remaining if set(self.steps[name].deps) <= done]
+            if not ready:
+                raise ValueError(f"Dependency cycle between {remaining}")
+            ordered.extend(ready)
+            done.update(ready)
+            remaining = [name for name in remaining if name not in done]
+        return ordered
+
+    def _execute(self, step: Step, origin: float) -> None:
+        """Run the attempts of a step."""
+        with self._lock:
+            self._running += 1
+            self.max_running = max(self.max_running, self._running)
+        step.start = time.perf_counter() - origin
+        try:
+            for attempt in range(step.retries + 1):
+                step.attempts = attempt + 1
+                try:
+                    step.result = _call_with_timeout(step.func, step.timeout)
+                    if step.check and isinstance(step.result, tuple) and step.result and \
+                            step.result[0] is False:
+                        raise StepError(step.result[1] if len(step.result) > 1 else step.result)
+                    step.status, step.error = PASSED, None
+                    return
+                except Exception as error:  # pylint: disable=broad-except
+                    step.status, step.error = FAILED, error
+                    LOGGER.warning("Step %s attempt %s failed: %s", step.name, attempt + 1,
+                                   error)
+                    if attempt >= step.retries:
+                        break
+                    if isinstance(error, StepTimeout) and error.thread:
+                        # Never run two attempts of a step at once, give the timed out one
+                        # another timeout to finish and do not retry while it still runs.
+                        error.thread.join(step.timeout)
+                        if error.thread.is_alive():
+                            LOGGER.error("Step %s attempt %s still running, not retried",
+                                         step.name, attempt + 1)
+                            step.error = StepTimeout(f"{error}, attempt still running")
+                            break
+                    time.sleep(step.retry_delay)
+        finally:
+            step.end = time.perf_counter() - origin
+            with self._lock:
+                self._running -= 1
+
+    def _skip_dependents(self, name: str) -> None:
+        """Mark every pending step depending on a failed one as skipped."""
+        for step in self.steps.values():
+            if step.status == PENDING and name in step.deps:
+                step.status = SKIPPED
+                step.error = f"dependency {name} did not pass"
+                self._skip_dependents(step.name)
+
+    def run(self) -> dict:
+        """
+        Run the steps.
+
+        :return: report of the run, see report().
+        """
+        self.order()
+        origin = time.perf_counter()
+        failed = False
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="deploy") as pool:
+            running = {}
+            while True:
+                if not (failed and self.fail_fast):
+                    for step in self.steps.values():
+                        if step.status == PENDING and all(
+                                self.steps[dep].status == PASSED for dep in step.deps):
+                            step.status = RUNNING
+                            LOGGER.info("Starting step %s", step.name)
+                            running[pool.submit(self._execute, step, origin)] = step
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    future.result()
+                    LOGGER.info("Step %s %s in %.1fs", step.name, step.status, step.duration)
+                    if step.status == FAILED:
+                        failed = True
+                        self._skip_dependents(step.name)
+        for step in self.steps.values():
+            if step.status == PENDING:
+                step.status, step.error = SKIPPED, "run stopped after a failure"
+        self.elapsed = time.perf_counter() - origin
+        report = self.report()
+        LOGGER.info("Deployment steps %s in %.1fs, critical path %s",
+                    "passed" if report["passed"] else "failed", self.elapsed,
+                    " -> ".join(report["critical_path"]))
+        return report
+
+    def critical_path(self) -> list:
+        """
+        Chain of steps which determined the run time.
+
+        Starting from the step finishing last, each step is preceded by its dependency which
+        finished last, the one the step waited for.
+        """
+        ran = [step for step in self.steps.values() if step.end is not None]
+        if not ran:
+            return []
+        path = [max(ran, key=lambda step: step.end)]
+        while True:
+            deps = [self.steps[dep] for dep in path[-1].deps if self.steps[dep].end is not None]
+            if not deps:
+                return [step.name for step in reversed(path)]
+            path.append(max(deps, key=lambda step: step.end))
+
+    def report(self) -> dict:
+        """Pass status, elapsed time, concurrency, critical path and per step timeline."""
+        path = self.critical_path()
+        return {"passed": all(step.status == PASSED for step in self.steps.values()),
+                "elapsed": self.elapsed, "max_running": self.max_running,
+                "critical_path": path,
+                "critical_path_time": sum(self.steps[name].duration for name in path),
+                "timeline": sorted((step.record() for step in self.steps.values()),
+                                   key=lambda record: (record["start"] is None,
+                                                       record["start"] or 0))}
+
+
+def fake_step(name: str, duration: float, fail_times: int = 0, result=None):
+    """
+    Dry run step sleeping for duration, failing its first fail_times calls.
+
+    :return: callable returning (True, result) or (False, message).
+    """
+    calls = []
+
+    def step():
+        calls.append(time.perf_counter())
+        time.sleep(duration)
+        if len(calls) <= fail_times:
+            return False, f"{name} failed (dry run)"
+        return True, result if result is not None else name
+    step.calls = calls
+    return step
+
+
+def on_own_connection(node, func):
+    """
+    Call func with a new LogicalNode of the host of node, disconnected afterwards.
+
+    Host.execute_cmd replaces the SSH client of its node on every call, so steps running at the
+    same time on one host must not share a node object.
+    """
+    node_obj = LogicalNode(hostname=node.hostname, username=node.username,
+                           password=node.password)
+    try:
+        return func(node_obj)
+    finally:
+        node_obj.disconnect()
+
+
+# pylint: disable=too-many-arguments, too-many-locals
+def build_deploy_dag(deploy_lib, sol_file_path: str, master_node_list: list,
+                     worker_node_list: list, system_disk_dict: dict, git_tag: str = None,
+                     **kwargs) -> DeployDag:
+    """
+    Deployment steps of ProvDeployK8sCortxLib.deploy_cortx_cluster as a dependency graph.
+
+    Worker node prerequisites and image pulls of all workers run concurrently, the master
+    prepares its checkout at the same time, the deploy script starts once every worker is ready.
+    Steps of one host running at the same time use their own connections.
+
+    :param deploy_lib: ProvDeployK8sCortxLib object, only its config is used in a dry run.
+    :param sol_file_path: Local Solution file path.
+    :param master_node_list: List of all master nodes(Logical Node object).
+    :param worker_node_list: List of all worker nodes(Logical Node object).
+    :param system_disk_dict: system disk of each worker hostname.
+    :param git_tag: tag of service repo.
+    :keyword dry_run: use fake steps sleeping for fake_durations.
+    :keyword fake_durations: {step kind: seconds}, kinds are the step names without the
+        hostname suffix.
+    :keyword fake_failures: {step name: failing calls} of the dry run.
+    :keyword wait_pods: add a pod readiness step after the deploy script.
+    :keyword workers: steps running at the same time.
+    :keyword retries: retries of the steps safe to repeat.
+    :return: DeployDag, run its run() method.
+    """
+    cfg = deploy_lib.deploy_cfg
+    timeouts = cfg["timeout"]
+    dry_run = kwargs.get("dry_run", False)
+    durations = kwargs.get("fake_durations", {})
+    failures = kwargs.get("fake_failures", {})
+    retries = kwargs.get("retries", 1)
+    dag = DeployDag(workers=kwargs.get("workers", cfg.get("dag_workers", 8)))
+    master = master_node_list[0]
+    k8s_dir = cfg["k8s_dir"]
+
+    def add(name, func, deps=(), timeout=None, step_retries=0, check=True):
+        if dry_run:
+            kind = name.split(":")[0]
+            func = fake_step(name, durations.get(kind, 0.0), failures.get(name, 0))
+        dag.add(name, func, deps, timeout, step_retries, retry_delay=0 if dry_run else 10,
+                check=check)
+
+    ready = []
+    for node in worker_node_list:
+        host = node.hostname
+        add(f"prereq_vm:{host}", lambda node=node: deploy_lib.prereq_vm(node),
+            timeout=timeouts["pre-req"], step_retries=retries)
+        add(f"prereq_git:{host}", lambda node=node: deploy_lib.prereq_git(node, git_tag),
+            deps=(f"prereq_vm:{host}",), timeout=timeouts["pre-req"], step_retries=retries)
+        add(f"copy_sol:{host}",
+            lambda node=node: deploy_lib.copy_sol_file(node, sol_file_path, k8s_dir),
+            deps=(f"prereq_git:{host}",), step_retries=retries)
+        # system disk will be used mount /mnt/fs-local-volume on worker node
+        add(f"prereq_cortx:{host}",
+            lambda node=node: deploy_lib.execute_prereq_cortx(
+                node, k8s_dir, system_disk_dict[node.hostname]),
+            deps=(f"copy_sol:{host}",), timeout=timeouts["pre-req"] * 2)
+        # Runs next to the other steps of the node, on a connection of its own.
+        add(f"image_pull:{host}",
+            lambda node=node: on_own_connection(node, deploy_lib.pull_cortx_image),
+            deps=(f"prereq_vm:{host}",), timeout=timeouts.get("image_pull"),
+            step_retries=retries)
+        ready.extend([f"prereq_cortx:{host}", f"image_pull:{host}"])
+    add(f"prereq_git:{master.hostname}", lambda: deploy_lib.prereq_git(master, git_tag),
+        step_retries=retries)
+    add(f"copy_sol:{master.hostname}",
+        lambda: deploy_lib.copy_sol_file(master, sol_file_path, k8s_dir),
+        deps=(f"prereq_git:{master.hostname}",), step_retries=retries)
+    add("pre_check", lambda: deploy_lib.pre_check(master),
+        deps=(f"copy_sol:{master.hostname}",))
+    # The deploy script response is handed to the caller, a failed deploy is not a step error.
+    add("deploy", lambda: deploy_lib.deploy_cluster(master, k8s_dir),
+        deps=tuple(ready) + ("pre_check",), check=False)
+    if kwargs.get("wait_pods", False):
+
+        def pods_ready():
+            running = wait_until(lambda: deploy_lib.check_pods_status(master),
+                                 timeout=timeouts.get("pod_ready", 1200), interval=10,
+                                 raise_on_timeout=False, name="pods running")
+            return running, "All pods running" if running else "Pods are not running"
+        add("pod_readiness", pods_ready, deps=("deploy",))
+    return dag
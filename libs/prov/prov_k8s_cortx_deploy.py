@@ -31,7 +31,6 @@ import shutil
 import signal
 import string
 import time
-from threading import Thread
 from typing import List
 from string import Template
 import requests.exceptions
@@ -52,6 +51,7 @@ from config import S3_CFG
 from config import PROV_TEST_CFG
 from config import CMN_CFG
 from libs.csm.rest.csm_rest_s3user import RestS3user
+from libs.prov.prov_dag import build_deploy_dag
 from libs.prov.provisioner import Provisioner
 from libs.s3 import S3H_OBJ
 from libs.s3.s3_test_lib import S3TestLib
@@ -94,6 +94,7 @@ class ProvDeployK8sCortxLib:
         self.exclusive_pod_list = ["data-only", "server-pod"]
         self.patterns = "invalid release"
         self.local_sol_path = common_const.LOCAL_SOLUTION_PATH
+        self.deploy_timeline = None
 
     @staticmethod
     def setup_k8s_cluster(master_node_list: list, worker_node_list: list,
@@ -354,33 +355,17 @@ class ProvDeployK8sCortxLib:
         param: docker_password: Docker password
         param: git tag: tag of service repo
         namespace: defines the custom namespace for deployment of cortx stack on k8s
+        dry_run, wait_pods, workers, retries: see prov_dag.build_deploy_dag, the step
+        timeline of the run is kept in deploy_timeline
         return : True/False and resp
         """
-        git_tag = kwargs.get("git_tag")
-        namespace = kwargs.get("namespace", PROV_CFG["k8s_cortx_deploy"]["namespace"])
+        git_tag = kwargs.pop("git_tag", None)
+        namespace = kwargs.pop("namespace", PROV_CFG["k8s_cortx_deploy"]["namespace"])
         if len(master_node_list) == 0:
             return False, "Minimum one master node needed for deployment"
         if len(worker_node_list) == 0:
             return False, "Minimum one worker node needed for deployment"
 
-        def _operation_on_worker_node():
-            for node in worker_node_list:
-                pre_req_resp = self.prereq_vm(node)
-                assert_utils.assert_true(pre_req_resp[0], pre_req_resp[1])
-                system_disk = system_disk_dict[node.hostname]
-                self.prereq_git(node, git_tag)
-                self.copy_sol_file(node, sol_file_path, self.deploy_cfg["k8s_dir"])
-                # system disk will be used mount /mnt/fs-local-volume on worker node
-                self.execute_prereq_cortx(node, self.deploy_cfg["k8s_dir"], system_disk)
-
-            thread_list = []
-            for each in worker_node_list:
-                worker_thread = Thread(target=self.pull_cortx_image, args=(each,))
-                worker_thread.start()
-                thread_list.append(worker_thread)
-            for each in thread_list:
-                each.join()
-
         def _post_deploy_check(resp):
             if not resp[1]:
                 LOGGER.info("Setting the current namespace")
@@ -403,12 +388,15 @@ class ProvDeployK8sCortxLib:
                         lines = file.read()
                         LOGGER.debug(lines)
 
-        _operation_on_worker_node()
-        self.prereq_git(master_node_list[0], git_tag)
-        self.copy_sol_file(master_node_list[0], sol_file_path, self.deploy_cfg["k8s_dir"])
-        pre_check_resp = self.pre_check(master_node_list[0])
-        LOGGER.debug("pre-check result %s", pre_check_resp)
-        deploy_resp = self.deploy_cluster(master_node_list[0], self.deploy_cfg["k8s_dir"])
+        dag = build_deploy_dag(self, sol_file_path, master_node_list, worker_node_list,
+                               system_disk_dict, git_tag, **kwargs)
+        report = dag.run()
+        self.deploy_timeline = report
+        LOGGER.debug("Deployment step timeline %s", report["timeline"])
+        deploy_step = dag.steps["deploy"]
+        assert_utils.assert_true(deploy_step.result is not None,
+                                 f"Deployment steps failed: {report['timeline']}")
+        deploy_resp = deploy_step.result
         LOGGER.debug("Deploy script response %s", deploy_resp)
         _post_deploy_check(deploy_resp)
         return deploy_resp
@@ -0,0 +1,184 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Incremental alert watcher matching many expected alert strings in one pass over a log."""
+
+import codecs
+import logging
+import re
+import socket
+import time
+
+from commons import commands as common_commands
+from commons import constants as cmn_cons
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MultiPatternMatcher:
+    """Find which of many literal patterns occur in a text with a single regex scan."""
+
+    def __init__(self, patterns: list) -> None:
+        """
+        Build the matcher.
+
+        :param patterns: literal strings to look for, empty strings are ignored
+        """
+        self.patterns = [pattern for pattern in dict.fromkeys(patterns) if pattern]
+        # Longest alternative first so the lookahead reports the longest pattern at every
+        # position, the shorter ones occurring inside it are implied by that match.
+        ordered = sorted(self.patterns, key=len, reverse=True)
+        self._regex = re.compile("(?=({}))".format("|".join(map(re.escape, ordered)))) \
+            if ordered else None
+        self._implied = {pattern: {other for other in self.patterns if other in pattern}
+                         for pattern in self.patterns}
+
+    def search(self, text: str) -> set:
+        """
+        Scan the text once.
+
+        :param text: text to scan
+        :return: set of the patterns found in the text
+        """
+        found = set()
+        if self._regex is None:
+            return found
+        for match in self._regex.finditer(text):
+            found |= self._implied[match.group(1)]
+            if len(found) == len(self.patterns):
+                break
+        return found
+
+
+class AlertWatcher:
+    """Consume a log stream incrementally until every expected alert string is seen."""
+
+    def __init__(self, patterns: list, anchor: str = None) -> None:
+        """
+        Initialize the watcher.
+
+        :param patterns: alert strings expected in the log
+        :param anchor: only lines containing it are matched, e.g. the alert resource type
+        """
+        self.matcher = MultiPatternMatcher(patterns)
+        self.anchor = anchor
+        self.found = set()
+        self.bytes_read = 0
+        self._partial = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    @property
+    def missing(self) -> list:
+        """Expected patterns not seen yet, in the given order."""
+        return [pattern for pattern in self.matcher.patterns if pattern not in self.found]
+
+    @property
+    def done(self) -> bool:
+        """True once every expected pattern is seen."""
+        return len(self.found) == len(self.matcher.patterns)
+
+    def _match_lines(self, lines: list) -> None:
+        """Match the complete lines, keeping only the anchored ones."""
+        if self.anchor:
+            lines = [line for line in lines if self.anchor in line]
+        if lines:
+            self.found |= self.matcher.search("\n".join(lines))
+
+    def feed(self, data) -> bool:
+        """
+        Match the next chunk of the log, a line split across chunks is matched once complete.
+
+        :param data: bytes or str chunk
+        :return: True once every expected pattern is seen
+        """
+        if isinstance(data, bytes):
+            self.bytes_read += len(data)
+            data = self._decoder.decode(data)
+        lines = (self._partial + data).split("\n")
+        self._partial = lines.pop()
+        self._match_lines(lines)
+        return self.done
+
+    def flush(self) -> bool:
+        """Match the pending partial line."""
+        if self._partial:
+            self._match_lines([self._partial])
+            self._partial = ""
+        return self.done
+
+    def consume(self, chunks, timeout: float = None) -> bool:
+        """
+        Feed chunks until every pattern is seen, the chunks end or the deadline passes.
+
+        :param chunks: iterable of bytes/str chunks, None items mean no new data yet
+        :param timeout: seconds to wait at most, None to wait for the end of the chunks
+        :return: True when every expected pattern is seen
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for chunk in chunks:
+            if chunk and self.feed(chunk):
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        return self.flush()
+
+    @staticmethod
+    def channel_chunks(channel, poll: float = 1.0):
+        """
+        Yield the output of an SSH channel, None every poll seconds without output.
+
+        :param channel: paramiko channel running a command
+        :param poll: seconds to block waiting for output
+        """
+        channel.settimeout(poll)
+        while True:
+            try:
+                chunk = channel.recv(cmn_cons.BYTES_TO_READ)
+            except socket.timeout:
+                yield None
+                continue
+            if not chunk:
+                return
+            yield chunk
+
+    def tail(self, host, path: str, timeout: float, offset: int = 1,
+             poll: float = 1.0) -> bool:
+        """
+        Follow a remote file over one SSH channel until every pattern is seen or timeout.
+
+        :param host: connected or connectable commons.helpers.host.Host object
+        :param path: remote file path
+        :param timeout: seconds to wait at most
+        :param offset: byte offset (1 based) to start reading at, 1 reads the whole file
+        :param poll: seconds between deadline checks when the file is idle
+        :return: True when every expected pattern is seen
+        """
+        if host.host_obj is None or host.host_obj.get_transport() is None:
+            host.connect()
+        channel = host.host_obj.get_transport().open_session()
+        try:
+            channel.exec_command(common_commands.TAIL_FOLLOW_FILE_CMD.format(offset, path))
+            start = time.monotonic()
+            self.consume(self.channel_chunks(channel, poll), timeout)
+            LOGGER.info("Watched %s for %.1fs, %s bytes read, missing: %s", path,
+                        time.monotonic() - start, self.bytes_read, self.missing)
+        finally:
+            channel.close()
+        return self.done
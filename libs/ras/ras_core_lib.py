@@ -23,6 +23,7 @@ import ast
 import json
 import logging
 import os
+import re
 import time
 from typing import Tuple, Any, Union, List
 
@@ -32,8 +33,10 @@ from commons.helpers import node_helper
 from commons.helpers.controller_helper import ControllerLib
 from commons.helpers.health_helper import Health
 from commons.utils.system_utils import run_remote_cmd
+from commons.utils.wait_utils import wait_until
 from config import CMN_CFG
 from config import RAS_VAL
+from libs.ras.alert_watcher import AlertWatcher
 from libs.s3 import S3H_OBJ
 
 LOGGER = logging.getLogger(__name__)
@@ -521,16 +524,48 @@ class RASCoreLib:
 
         return False, time_str
 
+    def resource_pid(self, resource: str):
+        """
+        PID of the systemd unit running a pcs resource.
+
+        :param resource: resource name from pcs resource
+        :return: PID, None if stopped or the resource is not of class systemd
+        """
+        resp = self.health_obj.pcs_service_status(resource)
+        unit = re.search(r"class=systemd\s+type=([\w@.-]+)", resp[1])
+        if not resp[0] or not unit:
+            return None
+        return self.get_service_pid(unit.group(1))
+
     def restart_service(self, service_name: str) -> Tuple[bool, str]:
         """
         Function start and stop s3services using the systemctl command.
 
+        Waits until the resource runs under a new PID, the status alone is already "started"
+        before the restart.
         :param str service_name: Name of the service to be restarted
         :return: bool
         """
         LOGGER.info("Service to be restarted is: %s", service_name)
-        resp = self.health_obj.restart_pcs_resource(service_name)
-        time.sleep(60)
+        old_pid = self.resource_pid(service_name)
+        resp = self.health_obj.restart_pcs_resource(service_name, wait_time=0)
+        if not resp[0]:
+            return resp
+        if old_pid is None:
+            # No PID to compare, pcs restart only returns once the resource started again
+            LOGGER.info("No PID of %s before restart, waiting for started state", service_name)
+            status = wait_until(lambda: self.health_obj.pcs_service_status(service_name),
+                                timeout=60, interval=2, max_interval=10,
+                                success=lambda status: status[0], raise_on_timeout=False,
+                                name=f"{service_name} restart")
+            return resp if status[0] else (False, status[1])
+        new_pid = wait_until(lambda: self.resource_pid(service_name), timeout=60, interval=2,
+                             max_interval=10, success=lambda pid: pid not in (None, old_pid),
+                             raise_on_timeout=False, name=f"{service_name} restart")
+        if new_pid in (None, old_pid):
+            return False, f"{service_name} did not restart, PID {old_pid} -> {new_pid}"
+        LOGGER.info("Service %s restarted: Old PID:%s, New PID:%s", service_name, old_pid,
+                    new_pid)
         return resp
 
     def enable_disable_service(self, operation: str = None,
@@ -538,15 +573,24 @@ class RASCoreLib:
         """
         Function start and stop s3services using the pcs resource command.
 
+        Waits for the status to change to stopped on disable and to started on enable, the
+        call returns right away when the resource already is in the requested state.
         :param str operation: Operation to disable or enable the resource
         :param service: Service to be enabled/disabled
         :return: status of the service
         """
+        expected = operation == "enable"
+        resp = self.health_obj.pcs_service_status(service)
         command = common_commands.PCS_RESOURCE_DISABLE_ENABLE\
             .format(operation, service)
         self.node_utils.execute_cmd(cmd=command, read_lines=True)
-        time.sleep(30)
-        resp = self.health_obj.pcs_service_status(service)
+        if resp[0] == expected:
+            LOGGER.info("%s already is %sd", service, operation)
+            return resp
+        resp = wait_until(lambda: self.health_obj.pcs_service_status(service), timeout=30,
+                          interval=2, max_interval=10,
+                          success=lambda status: status[0] == expected,
+                          raise_on_timeout=False, name=f"{service} {operation}")
         return resp
 
     def alert_validation(self, string_list: list, restart: bool = True) -> \
@@ -563,69 +607,77 @@ class RASCoreLib:
         :rtype: Boolean, String
         """
         common_cfg = RAS_VAL["ras_sspl_alert"]
+        services = [common_cfg["service"]["sspl_service"],
+                    common_cfg["service"]["kafka_service"]]
         if restart:
-            LOGGER.info("Restarting sspl services and waiting some time")
+            LOGGER.info("Restarting sspl services")
             self.health_obj.restart_pcs_resource(
                 common_cfg["sspl_resource_id"])
 
-            LOGGER.info("Sleeping for 120 seconds after restarting sspl "
-                        "services")
-            time.sleep(common_cfg["sleep_val"])
-
         LOGGER.info("Checking status of sspl and kafka services")
-        resp = self.s3obj.get_s3server_service_status(
-            service=common_cfg["service"]["sspl_service"],
-            host=self.host, user=self.username, pwd=self.pwd)
-        if not resp[0]:
-            return resp
-        resp = self.s3obj.get_s3server_service_status(
-            service=common_cfg["service"]["kafka_service"],
-            host=self.host, user=self.username, pwd=self.pwd)
+        resp = self.wait_for_services(services, timeout=common_cfg["sleep_val"] if restart else 0)
         if not resp[0]:
             return resp
         LOGGER.info(
             "Verified sspl and kafka services are in running state")
-        time.sleep(common_cfg["sleep_val"])
-
-        LOGGER.info("Fetching sspl alert response")
-        cmd = common_commands.COPY_FILE_CMD.format(
-            common_cfg["file"]["screen_log"],
-            common_cfg["file"]["alert_log_file"])
 
-        self.node_utils.execute_cmd(
-            cmd=cmd, read_nbytes=cmn_cons.BYTES_TO_READ)
-        LOGGER.info("Successfully fetched the alert response")
-
-        LOGGER.debug("Reading the alert log file")
-        read_resp = self.node_utils.read_file(
-            filename=common_cfg["file"]["alert_log_file"],
-            local_path=common_cfg["file"]["temp_txt_file"])
-        LOGGER.debug(
-            "======================================================")
-        LOGGER.debug(read_resp)
-        LOGGER.debug(
-            "======================================================")
         LOGGER.info(
             "Checking if alerts are generated on message bus")
-        cmd = common_commands.EXTRACT_LOG_CMD.format(
-            common_cfg["file"]["alert_log_file"], string_list[0],
-            common_cfg["file"]["extracted_alert_file"])
-        LOGGER.debug(cmd)
-        self.node_utils.execute_cmd(cmd=cmd, read_nbytes=cmn_cons.BYTES_TO_READ)
-
-        resp = self.validate_alert_msg(
-            remote_file_path=common_cfg["file"]["extracted_alert_file"],
-            pattern_lst=string_list)
+        resp = self.wait_for_alerts(string_list, timeout=common_cfg["sleep_val"])
         if not resp[0]:
             return resp
 
         LOGGER.info("Fetched sspl alerts")
         return True, "Fetched alerts successfully"
 
+    def wait_for_services(self, services: list, timeout: int = 0,
+                          poll: int = 5) -> Tuple[bool, Any]:
+        """
+        Poll the services until all of them are running or the timeout passes.
+
+        :param services: names of the services
+        :param timeout: seconds to wait at most, 0 checks once
+        :param poll: seconds between checks
+        :return: status of the last failed service or the last service
+        """
+        def services_status():
+            for service in services:
+                resp = self.s3obj.get_s3server_service_status(
+                    service=service, host=self.host, user=self.username, pwd=self.pwd)
+                if not resp[0]:
+                    LOGGER.debug("Service %s is not running yet", service)
+                    break
+            return resp
+
+        return wait_until(services_status, timeout=timeout, interval=poll, backoff=1,
+                          jitter=0, success=lambda resp: resp[0], raise_on_timeout=False,
+                          name="services running")
+
+    def wait_for_alerts(self, pattern_lst: list, timeout: int,
+                        log_file: str = None) -> Tuple[bool, str]:
+        """
+        Tail the message bus log until every expected alert string is seen.
+
+        Only lines containing the first pattern (the resource type) are matched and all the
+        patterns are matched in one pass, returning as soon as the last one shows up.
+        :param pattern_lst: expected alert strings [resource_type, alert_type, ...]
+        :param timeout: seconds to wait at most
+        :param log_file: remote log, defaults to the sspl screen log
+        :return: True and the last pattern, False and the first missing pattern
+        """
+        log_file = log_file or RAS_VAL["ras_sspl_alert"]["file"]["screen_log"]
+        watcher = AlertWatcher(pattern_lst, anchor=pattern_lst[0])
+        watcher.tail(self.node_utils, log_file, timeout=timeout)
+        if not watcher.done:
+            LOGGER.info("Match not found : %s", watcher.missing)
+            return False, watcher.missing[0]
+        LOGGER.info("Match found : %s", pattern_lst)
+        return True, pattern_lst[-1]
+
     def validate_alert_msg(self, remote_file_path: str, pattern_lst: list) ->\
             Tuple[bool, str]:
         """
-        Function checks the list of alerts iteratively in the remote file
+        Function checks the list of alerts in the remote file in a single streamed pass
         and return boolean value.
 
         :param str remote_file_path: remote file
@@ -633,24 +685,18 @@ class RASCoreLib:
         :return: Boolean, response
         :rtype: tuple
         """
-        response = None
-        local_path = os.path.join(os.getcwd(), 'temp_file')
-
-        if os.path.exists(local_path):
-            os.remove(local_path)
-        _ = self.node_utils.copy_file_to_local(remote_path=remote_file_path,
-                                               local_path=local_path)
-        for pattern in pattern_lst:
-            if pattern in open(local_path, encoding="utf-8").read():
-                response = pattern
-            else:
-                LOGGER.info("Match not found : %s", pattern)
-                os.remove(local_path)
-                return False, pattern
-            LOGGER.info("Match found : %s", pattern)
-
-        os.remove(local_path)
-        return True, response
+        watcher = AlertWatcher(pattern_lst)
+        self.node_utils.connect_pysftp()
+        try:
+            with self.node_utils.pysftp_obj.open(remote_file_path, "rb") as remote:
+                watcher.consume(iter(lambda: remote.read(1048576), b""))
+        finally:
+            self.node_utils.disconnect()
+        if not watcher.done:
+            LOGGER.info("Match not found : %s", watcher.missing[0])
+            return False, watcher.missing[0]
+        LOGGER.info("Match found : %s", pattern_lst)
+        return True, pattern_lst[-1]
 
     def check_service_recovery(self, service, delay=40):
         """
@@ -668,19 +714,19 @@ class RASCoreLib:
         LOGGER.info("Successfully killed %s service on %s host", service,
                     self.host)
         LOGGER.info("Verify if the services stops")
-        time.sleep(10)
-        resp = self.s3obj.get_s3server_service_status(service, host=self.host,
-                                                      user=self.username,
-                                                      pwd=self.pwd)
+        resp = wait_until(lambda: self.s3obj.get_s3server_service_status(
+            service, host=self.host, user=self.username, pwd=self.pwd), timeout=10,
+            interval=1, max_interval=5, success=lambda resp: not resp[0],
+            raise_on_timeout=False, name=f"{service} stop")
         if not resp[0]:
             LOGGER.debug("Verified %s services stops", service)
         else:
             LOGGER.debug("Error: %s services did not stop", service)
 
-        # wait for some time for the service to come back
-        time.sleep(delay)
-        # verify service is restarted, we expect new PID for restarted service
-        new_pid = self.get_service_pid(service)
+        # wait for the service to come back, we expect new PID for restarted service
+        new_pid = wait_until(lambda: self.get_service_pid(service), timeout=delay, interval=2,
+                             max_interval=10, success=lambda pid: pid not in (None, old_pid),
+                             raise_on_timeout=False, name=f"{service} recovery")
 
         if old_pid != new_pid:
             LOGGER.info("Service %s recovery successful:Old PID:%s, New PID:%s", service, old_pid,
@@ -0,0 +1,197 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Run aws CLI commands in a long lived awscli worker instead of a subprocess per command."""
+
+import atexit
+import io
+import logging
+import multiprocessing
+import os
+import shlex
+import sys
+import threading
+
+from commons.utils.system_utils import local_cmd_response
+from commons.utils.system_utils import run_local_cmd
+
+LOGGER = logging.getLogger(__name__)
+
+# Commands using any of these need a shell and keep running in a subprocess.
+SHELL_TOKENS = ("|", "&", ";", ">", "<", "`", "$(")
+AWS_FILES = ("AWS_CONFIG_FILE", "AWS_SHARED_CREDENTIALS_FILE")
+# Set by awscli itself when the driver is created.
+AWS_DRIVER_ENV = ("AWS_DATA_PATH",)
+# Exit code reported when the worker died during a command
+WORKER_LOST = 255
+
+
+def fingerprint() -> tuple:
+    """AWS_* environment and aws file modification times the session depends on."""
+    env = tuple(sorted((key, value) for key, value in os.environ.items()
+                       if key.startswith("AWS_") and key not in AWS_DRIVER_ENV))
+    files = []
+    for var, default in zip(AWS_FILES, ("~/.aws/config", "~/.aws/credentials")):
+        path = os.path.expanduser(os.environ.get(var, default))
+        files.append(os.stat(path).st_mtime_ns if os.path.exists(path) else None)
+    return env, tuple(files)
+
+
+def serve(conn) -> None:
+    """
+    Worker loop running aws commands with the process wide stdout and stderr of the worker.
+
+    The driver is re-created when the AWS_* environment or the aws files changed.
+    :param conn: pipe end receiving (args, environ), None stops the worker
+    """
+    from awscli.clidriver import create_clidriver  # pylint: disable=C0415
+    driver, current = None, None
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        args, environ = request
+        environ.update((key, os.environ[key]) for key in AWS_DRIVER_ENV if key in os.environ)
+        os.environ.clear()
+        os.environ.update(environ)
+        new_session = driver is None or fingerprint() != current
+        if new_session:
+            driver = create_clidriver()
+            current = fingerprint()
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", write_through=True)
+        stderr = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", write_through=True)
+        sys.stdout, sys.stderr = stdout, stderr
+        try:
+            returncode = driver.main(args)
+        except SystemExit as error:
+            returncode = error.code if isinstance(error.code, int) else 1
+        finally:
+            sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        conn.send((returncode, stdout.buffer.getvalue(), stderr.buffer.getvalue(), new_session))
+
+
+class AwsCliDriver:
+    """
+    awscli driver kept alive across commands in a spawned worker process.
+
+    The botocore session and its loaded service models are reused until the AWS_* environment or
+    the aws config/credentials files change. Output is captured in the worker, the streams of
+    this process, which pytest swaps while logging, are never touched. Commands run one at a
+    time.
+    """
+
+    def __init__(self):
+        """Initialize the driver, the worker is started on first use."""
+        self.calls = 0
+        self.sessions = 0
+        self._worker = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint() -> tuple:
+        """AWS_* environment and aws file modification times the session depends on."""
+        return fingerprint()
+
+    def _get_worker(self):
+        """Pipe to the running worker, started when missing or dead."""
+        if self._worker is None or not self._worker.is_alive():
+            self._stop_worker()
+            context = multiprocessing.get_context("spawn")
+            self._conn, child = context.Pipe()
+            self._worker = context.Process(target=serve, args=(child,), name="awscli_driver",
+                                           daemon=True)
+            self._worker.start()
+            child.close()
+        return self._conn
+
+    def _stop_worker(self, timeout: float = 5) -> None:
+        """Stop the worker, killing it when it does not exit in time."""
+        if self._worker is None:
+            return
+        try:
+            self._conn.send(None)
+        except OSError:
+            pass
+        self._worker.join(timeout)
+        if self._worker.is_alive():
+            self._worker.kill()
+            self._worker.join()
+        self._conn.close()
+        self._worker = self._conn = None
+
+    def close(self) -> None:
+        """Stop the worker."""
+        with self._lock:
+            self._stop_worker()
+
+    def run(self, cmd: str) -> tuple:
+        """
+        Run an aws command line.
+
+        :param cmd: aws command line
+        :return: exit code, stdout bytes, stderr bytes
+        """
+        args = self.args(cmd)
+        if args is None:
+            raise ValueError(f"Not a plain aws command: {cmd}")
+        with self._lock:
+            conn = self._get_worker()
+            self.calls += 1
+            try:
+                conn.send((args, dict(os.environ)))
+                returncode, output, error, new_session = conn.recv()
+            except (EOFError, OSError) as err:
+                LOGGER.error("awscli worker exited while running %s: %s", cmd, err)
+                self._stop_worker()
+                return WORKER_LOST, b"", f"awscli worker exited: {err}".encode()
+            self.sessions += new_session
+        return returncode, output, error
+
+    @staticmethod
+    def args(cmd: str):
+        """Arguments after "aws", None if the command needs a shell."""
+        if any(token in cmd for token in SHELL_TOKENS):
+            return None
+        args = shlex.split(cmd)
+        if not args or os.path.basename(args[0]) != "aws":
+            return None
+        return args[1:]
+
+
+AWSCLI_DRIVER = AwsCliDriver()
+atexit.register(AWSCLI_DRIVER.close)
+
+
+def run_awscli_cmd(cmd: str, chk_stderr: bool = False, in_process: bool = False) -> tuple:
+    """
+    Run an aws command with the return semantics of run_local_cmd.
+
+    :param cmd: aws command line
+    :param chk_stderr: Check if stderr is none.
+    :param in_process: run in the awscli worker, commands needing a shell still use one
+    :return: bool, response.
+    """
+    if not in_process or AwsCliDriver.args(cmd) is None:
+        return run_local_cmd(cmd, chk_stderr=chk_stderr)
+    LOGGER.debug("In process command: %s", cmd)
+    returncode, output, error = AWSCLI_DRIVER.run(cmd)
+    return local_cmd_response(returncode, output, error, chk_stderr=chk_stderr)
@@ -52,8 +52,10 @@ class IAMRest:
         :param endpoint_url: endpoint url.
         :param iam_cert_path: iam certificate path.
         :param debug: debug mode.
+        :param endpoint_balancer: EndpointBalancer choosing the node of every request.
         """
         init_iam_connection = kwargs.get("init_iam_connection", True)
+        self.endpoint_balancer = kwargs.get("endpoint_balancer", None)
         debug = kwargs.get("debug", S3_CFG["debug"])
         self.use_ssl = kwargs.get("use_ssl", S3_CFG["use_ssl"])
         val_cert = kwargs.get("validate_certs", S3_CFG["validate_certs"])
@@ -78,6 +80,9 @@ class IAMRest:
                                                    aws_access_key_id=access_key,
                                                    aws_secret_access_key=secret_key,
                                                    endpoint_url=endpoint_url)
+                if self.endpoint_balancer:
+                    self.endpoint_balancer.attach(self.iam)
+                    self.endpoint_balancer.attach(self.iam_resource)
             else:
                 LOGGER.info("Skipped: create iam client, resource object with boto3.")
         except (ClientError, Exception) as error:
@@ -24,7 +24,7 @@ import logging
 
 from config.s3 import S3_CFG
 from commons import commands
-from commons.utils.system_utils import run_local_cmd
+from libs.s3.awscli_driver import run_awscli_cmd
 
 LOGGER = logging.getLogger(__name__)
 
@@ -32,10 +32,21 @@ LOGGER = logging.getLogger(__name__)
 class S3LibCmd:
     """Class containing methods to implement aws cmd functionality."""
 
-    def __init__(self):
-        """AWS cli constructor."""
+    def __init__(self, in_process: bool = None):
+        """
+        AWS cli constructor.
+
+        :param in_process: run aws commands inside this interpreter, defaults to the
+            awscli_in_process setting of the s3 config.
+        """
         self.cmd_endpoint_options = f" --endpoint-url {S3_CFG['s3_url']}" \
             f"{'' if S3_CFG['validate_certs'] else ' --no-verify-ssl'}"
+        self.in_process = S3_CFG.get("awscli_in_process", False) if in_process is None \
+            else in_process
+
+    def run_cmd(self, cmd: str) -> tuple:
+        """Run an aws command in a subprocess or in process, see run_local_cmd."""
+        return run_awscli_cmd(cmd, chk_stderr=True, in_process=self.in_process)
 
     def upload_object_cli(
             self,
@@ -52,7 +63,7 @@ class S3LibCmd:
         """
         cmd = commands.S3_UPLOAD_FILE_CMD.format(file_path, bucket_name, object_name)
         cmd += self.cmd_endpoint_options
-        response = run_local_cmd(cmd, chk_stderr=True)
+        response = self.run_cmd(cmd)
         LOGGER.debug("Response: %s", str(response))
 
         return response
@@ -72,7 +83,7 @@ class S3LibCmd:
         """
         cmd = commands.S3_UPLOAD_FOLDER_CMD.format(folder_path, bucket_name, profile_name)
         cmd += self.cmd_endpoint_options
-        response = run_local_cmd(cmd, chk_stderr=True)
+        response = self.run_cmd(cmd)
         LOGGER.debug("Response: %s", str(response))
 
         return response
@@ -94,7 +105,7 @@ class S3LibCmd:
             os.mkdir(folder_path)
         cmd = commands.S3_DOWNLOAD_BUCKET_CMD.format(bucket_name, folder_path, profile_name)
         cmd += self.cmd_endpoint_options
-        response = run_local_cmd(cmd, chk_stderr=True)
+        response = self.run_cmd(cmd)
         LOGGER.debug("Response: %s", str(response))
 
         return response
@@ -103,10 +114,21 @@ class S3LibCmd:
 class AWScliS3api:
     """Class including methods related to aws cli s3api operations."""
 
-    def __init__(self):
-        """AWS cli s3api constructor."""
+    def __init__(self, in_process: bool = None):
+        """
+        AWS cli s3api constructor.
+
+        :param in_process: run aws commands inside this interpreter, defaults to the
+            awscli_in_process setting of the s3 config.
+        """
         self.cmd_endpoint_options = f" --endpoint-url {S3_CFG['s3_url']}" \
             f"{'' if S3_CFG['validate_certs'] else ' --no-verify-ssl'}"
+        self.in_process = S3_CFG.get("awscli_in_process", False) if in_process is None \
+            else in_process
+
+    def run_cmd(self, cmd: str) -> tuple:
+        """Run an aws command in a subprocess or in process, see run_local_cmd."""
+        return run_awscli_cmd(cmd, chk_stderr=True, in_process=self.in_process)
 
     def create_bucket(self, bucket_name: str) -> tuple:
         """
@@ -118,7 +140,7 @@ class AWScliS3api:
         LOGGER.info("Create bucket: %s", bucket_name)
         cmd_create_bkt = commands.CMD_AWSCLI_CREATE_BUCKET.format(bucket_name)
         cmd_create_bkt += self.cmd_endpoint_options
-        _, output = run_local_cmd(cmd_create_bkt, chk_stderr=True)
+        _, output = self.run_cmd(cmd_create_bkt)
         if bucket_name in output:
             return True, output
 
@@ -137,7 +159,7 @@ class AWScliS3api:
         cmd_del_bkt = commands.CMD_AWSCLI_DELETE_BUCKET.format(bucket_name)
         cmd_del_bkt = " ".join([cmd_del_bkt, "--force"]) if force else cmd_del_bkt
         cmd_del_bkt += self.cmd_endpoint_options
-        _, output = run_local_cmd(cmd_del_bkt, chk_stderr=True)
+        _, output = self.run_cmd(cmd_del_bkt)
         if bucket_name in output:
             return True, output
 
@@ -152,7 +174,7 @@ class AWScliS3api:
         LOGGER.info("List buckets")
         bktlist = list()
         cmd_list_bkt = commands.CMD_AWSCLI_LIST_BUCKETS + self.cmd_endpoint_options
-        status, output = run_local_cmd(cmd_list_bkt, chk_stderr=True)
+        status, output = self.run_cmd(cmd_list_bkt)
         if status:
             bktlist = [bkt.split(-1) for bkt in output.split("\n") if bkt]
 
@@ -170,7 +192,7 @@ class AWScliS3api:
         LOGGER.info("Download s3 object.")
         dwn_object = commands.CMD_AWSCLI_DOWNLOAD_OBJECT.format(
             bucket_name, object_name, file_path) + self.cmd_endpoint_options
-        _, output = run_local_cmd(dwn_object, chk_stderr=True)
+        _, output = self.run_cmd(dwn_object)
 
         return os.path.exists(file_path), output
 
@@ -185,7 +207,7 @@ class AWScliS3api:
         LOGGER.info("Upload  directory to S3 bucket.")
         upload_dir = commands.CMD_AWSCLI_UPLOAD_DIR_TO_BUCKET.format(
             directory_path, bucket_name) + self.cmd_endpoint_options
-        status, output = run_local_cmd(upload_dir, chk_stderr=True)
+        status, output = self.run_cmd(upload_dir)
         upload_list = [out.split("\\r")[-1] for out in output.split("\\n") if out][:-1]
         LOGGER.info("Upload list: %s", upload_list)
 
@@ -210,11 +232,11 @@ class AWScliS3api:
                     options += " --{}".format(key)
             cmd_list_v2_objects = commands.CMD_AWSCLI_LIST_OBJECTS_V2_OPTIONS_BUCKETS.format(
                 bucket_name, options) + self.cmd_endpoint_options
-            status, output = run_local_cmd(cmd_list_v2_objects, chk_stderr=True)
+            status, output = self.run_cmd(cmd_list_v2_objects)
         else:
             cmd_list_v2_objects = commands.CMD_AWSCLI_LIST_OBJECTS_V2_BUCKETS.format(
                 bucket_name) + self.cmd_endpoint_options
-            status, output = run_local_cmd(cmd_list_v2_objects, chk_stderr=True)
+            status, output = self.run_cmd(cmd_list_v2_objects)
         output = ast.literal_eval(ast.literal_eval(output.strip('b'))) if output else output
         LOGGER.info("list-objects-v2: %s", output)
         if status:
@@ -31,6 +31,7 @@ from botocore.exceptions import ClientError
 
 from commons.constants import S3_ENGINE_RGW
 from config import S3_CFG, CMN_CFG
+from libs.s3.s3_purge_engine import BucketPurgeEngine
 
 LOGGER = logging.getLogger(__name__)
 
@@ -56,8 +57,10 @@ class S3Rest:
         :param region: region.
         :param aws_session_token: aws_session_token.
         :param debug: debug mode.
+        :param endpoint_balancer: EndpointBalancer choosing the node of every request.
         """
         init_s3_connection = kwargs.get("init_s3_connection", True)
+        self.endpoint_balancer = kwargs.get("endpoint_balancer", None)
         if S3_ENGINE_RGW == CMN_CFG["s3_engine"]:
             region = kwargs.get("region", "default")
         else:
@@ -95,6 +98,9 @@ class S3Rest:
                                               region_name=region,
                                               aws_session_token=aws_session_token,
                                               config=config)
+                if self.endpoint_balancer:
+                    self.endpoint_balancer.attach(self.s3_client)
+                    self.endpoint_balancer.attach(self.s3_resource)
             else:
                 LOGGER.info("Skipped: create s3 client, resource object with boto3.")
         except ClientError as error:
@@ -321,18 +327,20 @@ class S3Lib(S3Rest):
         """
         bucket = self.s3_resource.Bucket(bucket_name)
         if force:
-            self.object_list(bucket_name)
             LOGGER.info("This might cause data loss as you have opted for bucket deletion with "
                         "objects in it")
-            response = bucket.objects.all().delete()
+            response = self.purge_engine().purge(bucket_name, delete_bucket=False)
             LOGGER.debug("Objects deleted successfully from bucket %s, response: %s",
                          bucket_name, response)
-            self.object_list(bucket_name)
         response = bucket.delete()
         LOGGER.debug("Bucket '%s' deleted successfully. Response: %s", bucket_name, response)
 
         return response
 
+    def purge_engine(self) -> BucketPurgeEngine:
+        """Parallel, version aware purge engine using the s3 client of this object."""
+        return BucketPurgeEngine(self.s3_client, workers=S3_CFG.get("purge_workers", 16))
+
     def get_bucket_size(self, bucket_name: str = None) -> dict:
         """
         Get size of the s3 bucket.
@@ -0,0 +1,335 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Parallel, resumable multipart upload/copy engine with per part retry and statistics."""
+
+import base64
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from hashlib import md5
+
+from commons.utils import s3_utils
+from commons.utils.perf_utils import latency_stats
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MultipartUploadState:
+    """Resumable state of one multipart upload: uploaded part ETags, digests and timings."""
+
+    def __init__(self, bucket_name: str, object_name: str, upload_id: str = None):
+        """
+        Initialize the state.
+
+        :param bucket_name: Name of the bucket.
+        :param object_name: Name of the object.
+        :param upload_id: Multipart upload ID, None until initiated.
+        """
+        self.bucket_name = bucket_name
+        self.object_name = object_name
+        self.upload_id = upload_id
+        self.etags = {}
+        self.digests = {}
+        self.failed = {}
+        self.latencies = []
+        self.retries = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, part_number: int, etag: str, length: int, latency: float,
+               digest: bytes = None) -> None:
+        """Record a successfully uploaded part, thread safe."""
+        with self._lock:
+            self.etags[part_number] = etag
+            if digest is not None:
+                self.digests[part_number] = digest
+            self.failed.pop(part_number, None)
+            self.latencies.append(latency)
+            self.bytes += length
+
+    def add_retry(self) -> None:
+        """Count one part retry, thread safe."""
+        with self._lock:
+            self.retries += 1
+
+    def fail(self, part_number: int, error: Exception) -> None:
+        """Record the last error of a part, thread safe."""
+        with self._lock:
+            self.failed[part_number] = error
+
+    def reconcile(self, listed: dict) -> None:
+        """
+        Align the recorded ETags with {part_number: etag} listed by S3.
+
+        Parts missing or changed on the server are dropped so they are uploaded again, parts
+        unknown to the state are adopted.
+        """
+        with self._lock:
+            for num in list(self.etags):
+                if self.etags[num] != listed.get(num):
+                    self.etags.pop(num)
+                    self.digests.pop(num, None)
+            for num, etag in listed.items():
+                self.etags.setdefault(num, etag)
+
+    def parts(self) -> list:
+        """Sorted part list for complete_multipart_upload."""
+        return [{"PartNumber": num, "ETag": self.etags[num]} for num in sorted(self.etags)]
+
+    @property
+    def expected_etag(self) -> str:
+        """Expected multipart ETag from the digests of the parts uploaded in this pass."""
+        if not self.digests or set(self.digests) != set(self.etags):
+            return None
+        return s3_utils.get_multipart_etag_from_digests(self.digests)
+
+    def stats(self) -> dict:
+        """Throughput and per part latency summary."""
+        return {"parts": len(self.etags), "failed": len(self.failed), "retries": self.retries,
+                "bytes": self.bytes, "elapsed": self.elapsed,
+                "throughput_mbps": self.bytes / 1048576 / self.elapsed if self.elapsed else 0.0,
+                "latency": latency_stats(self.latencies)}
+
+    def save(self, path: str) -> str:
+        """Persist the state as json so an interrupted upload can be resumed."""
+        with open(path, "w", encoding="utf-8") as file_obj:
+            json.dump({"bucket_name": self.bucket_name, "object_name": self.object_name,
+                       "upload_id": self.upload_id,
+                       "etags": self.etags,
+                       "digests": {num: dig.hex() for num, dig in self.digests.items()}},
+                      file_obj)
+        return path
+
+    @classmethod
+    def load(cls, path: str):
+        """Load a state saved with save()."""
+        with open(path, encoding="utf-8") as file_obj:
+            data = json.load(file_obj)
+        state = cls(data["bucket_name"], data["object_name"], data["upload_id"])
+        state.etags = {int(num): etag for num, etag in data["etags"].items()}
+        state.digests = {int(num): bytes.fromhex(dig) for num, dig in data["digests"].items()}
+        return state
+
+
+class MultipartEngine:
+    """Uploads or copies multipart parts over a bounded thread pool."""
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, mpu_obj, workers: int = 8, max_retries: int = 3, backoff: float = 1.0,
+                 abort_on_failure: bool = True):
+        """
+        Initialize the engine.
+
+        :param mpu_obj: Multipart/S3MultipartTestLib object whose s3_client is used.
+        :param workers: Parts in flight at once, also bounds memory for generator sources.
+        :param max_retries: Retries of a failed part before giving up on it.
+        :param backoff: Initial retry delay in seconds, doubled per retry.
+        :param abort_on_failure: Abort the upload when a part fails, else keep it to be resumed.
+        """
+        self.s3_client = mpu_obj.s3_client
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.abort_on_failure = abort_on_failure
+
+    def initiate(self, bucket_name: str, object_name: str) -> MultipartUploadState:
+        """Create a multipart upload and return its empty state."""
+        response = self.s3_client.create_multipart_upload(Bucket=bucket_name, Key=object_name)
+        LOGGER.info("Multipart Upload initiated with mpu_id %s", response["UploadId"])
+        return MultipartUploadState(bucket_name, object_name, response["UploadId"])
+
+    def reconcile(self, state: MultipartUploadState) -> MultipartUploadState:
+        """
+        Align the recorded ETags with the parts S3 actually holds, e.g. after a pod restart.
+        """
+        listed = {}
+        kwargs = {"Bucket": state.bucket_name, "Key": state.object_name,
+                  "UploadId": state.upload_id}
+        while True:
+            response = self.s3_client.list_parts(**kwargs)
+            for part in response.get("Parts", []):
+                listed[part["PartNumber"]] = part["ETag"]
+            if not response.get("IsTruncated"):
+                break
+            kwargs["PartNumberMarker"] = response["NextPartNumberMarker"]
+        state.reconcile(listed)
+        LOGGER.info("Reconciled upload %s: %s parts present", state.upload_id, len(state.etags))
+        return state
+
+    def _with_retry(self, part_number: int, state: MultipartUploadState, call):
+        """Run call() retrying with exponential backoff, raising the last error."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return call()
+            except Exception as error:  # pylint: disable=broad-except
+                LOGGER.warning("Part %s attempt %s failed: %s", part_number, attempt + 1, error)
+                state.fail(part_number, error)
+                if attempt == self.max_retries:
+                    raise
+                state.add_retry()
+                time.sleep(self.backoff * 2 ** attempt)
+        return None
+
+    def _upload_part(self, state: MultipartUploadState, part_number: int, part) -> None:
+        """Upload one LazyPart or bytes part and record it."""
+        if isinstance(part, s3_utils.LazyPart):
+            digest, length = part.md5_digest(), part.length
+        else:
+            digest, length = md5(part).digest(), len(part)  # nosec - s3 ETag based on md5.
+        content_md5 = base64.b64encode(digest).decode("utf-8")
+
+        def call():
+            body = part.body() if isinstance(part, s3_utils.LazyPart) else part
+            start = time.perf_counter()
+            response = self.s3_client.upload_part(
+                Body=body, Bucket=state.bucket_name, Key=state.object_name,
+                UploadId=state.upload_id, PartNumber=part_number, ContentMD5=content_md5)
+            return response, time.perf_counter() - start
+
+        response, latency = self._with_retry(part_number, state, call)
+        state.record(part_number, response["ETag"], length, latency, digest)
+
+    def _run(self, state: MultipartUploadState, tasks) -> MultipartUploadState:
+        """
+        Run (func, args) tasks with at most workers in flight, pulling tasks lazily.
+
+        The first failed task stops the pass: no further task is started, the queued ones are
+        cancelled, the upload is aborted if abort_on_failure is set and the error is raised.
+        """
+        slots = threading.BoundedSemaphore(self.workers)
+        failed = threading.Event()
+        start = time.perf_counter()
+
+        def run_task(func, args):
+            try:
+                func(*args)
+            except Exception:
+                failed.set()
+                raise
+            finally:
+                slots.release()
+
+        futures = []
+        error = None
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for func, args in tasks:
+                slots.acquire()  # pylint: disable=consider-using-with
+                if failed.is_set():
+                    break
+                futures.append(executor.submit(run_task, func, args))
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                try:
+                    future.result()
+                except Exception as exc:  # pylint: disable=broad-except
+                    if error is None:
+                        error = exc
+                        for pending in futures:
+                            pending.cancel()
+        state.elapsed += time.perf_counter() - start
+        LOGGER.info("Multipart %s/%s stats: %s", state.bucket_name, state.object_name,
+                    state.stats())
+        if error is not None:
+            if self.abort_on_failure:
+                self.abort(state)
+            raise error
+        return state
+
+    def upload(self, state: MultipartUploadState, source, part_numbers: list = None,
+               part_size: int = 5242880) -> MultipartUploadState:
+        """
+        Upload the parts missing from the state.
+
+        :param state: State from initiate(), load() or a previous pass.
+        :param source: File path, dict of {part_number: LazyPart/bytes} or an iterable of bytes
+            chunks (one per part, numbered from 1); generator parts are held in memory only while
+            in flight so memory stays bounded by workers x part size.
+        :param part_numbers: Only upload these part numbers.
+        :param part_size: Part size when source is a file path.
+        :return: Updated state, the error of the first failed part is raised.
+        """
+        file_source = None
+        if isinstance(source, str):
+            file_source = s3_utils.MultipartFileSource(source)
+            source = file_source.split([part_size] * (-(-file_source.size // part_size)))
+        items = source.items() if isinstance(source, dict) else enumerate(source, 1)
+        wanted = set(part_numbers) if part_numbers else None
+        tasks = ((self._upload_part, (state, num, part)) for num, part in items
+                 if num not in state.etags and (wanted is None or num in wanted))
+        try:
+            return self._run(state, tasks)
+        finally:
+            if file_source:
+                file_source.close()
+
+    def _copy_part(self, state: MultipartUploadState, part_number: int, copy_source: str,
+                   byte_range: tuple) -> None:
+        """Copy one byte range of the source object as a part and record it."""
+
+        def call():
+            start = time.perf_counter()
+            response = self.s3_client.upload_part_copy(
+                Bucket=state.bucket_name, Key=state.object_name, UploadId=state.upload_id,
+                PartNumber=part_number, CopySource=copy_source,
+                CopySourceRange=f"bytes={byte_range[0]}-{byte_range[1]}")
+            return response, time.perf_counter() - start
+
+        response, latency = self._with_retry(part_number, state, call)
+        state.record(part_number, response["CopyPartResult"]["ETag"],
+                     byte_range[1] - byte_range[0] + 1, latency)
+
+    def copy(self, state: MultipartUploadState, copy_source: str, source_size: int,
+             part_size: int = 5242880) -> MultipartUploadState:
+        """
+        Server side copy of an object into the multipart upload with ranged part copies.
+
+        :param state: State from initiate(), load() or a previous pass.
+        :param copy_source: "bucket/key" of the source object.
+        :param source_size: Size of the source object in bytes.
+        :param part_size: Bytes per copied part.
+        :return: Updated state, the error of the first failed part is raised.
+        """
+        tasks = ((self._copy_part, (state, num, copy_source,
+                                    (offset, min(offset + part_size, source_size) - 1)))
+                 for num, offset in enumerate(range(0, source_size, part_size), 1)
+                 if num not in state.etags)
+        return self._run(state, tasks)
+
+    def abort(self, state: MultipartUploadState) -> None:
+        """Abort the upload, S3 drops its uploaded parts."""
+        LOGGER.error("Aborting multipart upload %s of %s/%s, failed parts %s", state.upload_id,
+                     state.bucket_name, state.object_name, sorted(state.failed))
+        self.s3_client.abort_multipart_upload(Bucket=state.bucket_name, Key=state.object_name,
+                                              UploadId=state.upload_id)
+
+    def complete(self, state: MultipartUploadState) -> dict:
+        """Complete the upload with every recorded part."""
+        if state.failed:
+            raise RuntimeError(f"Parts {sorted(state.failed)} failed to upload, "
+                               f"resume before completing")
+        return self.s3_client.complete_multipart_upload(
+            Bucket=state.bucket_name, Key=state.object_name, UploadId=state.upload_id,
+            MultipartUpload={"Parts": state.parts()})
@@ -38,6 +38,7 @@ from commons.utils.system_utils import create_file
 from config.s3 import S3_CFG
 from libs.s3 import ACCESS_KEY, SECRET_KEY
 from libs.s3.s3_multipart import Multipart
+from libs.s3.s3_multipart_engine import MultipartEngine
 
 LOGGER = logging.getLogger(__name__)
 
@@ -142,21 +143,20 @@ class S3MultipartTestLib(Multipart):
                 if os.path.exists(multipart_obj_path):
                     os.remove(multipart_obj_path)
                 create_file(multipart_obj_path, multipart_obj_size, b_size=b_size)
-            with open(multipart_obj_path, "rb") as file_pointer:
-                i = 1
-                while True:
-                    data = file_pointer.read(1048576 * single_part_size)
-                    LOGGER.info("data_len %s", str(len(data)))
-                    if not data:
-                        break
+            # Parts are streamed from a memory mapping, no part is held in memory.
+            with s3_utils.MultipartFileSource(multipart_obj_path) as source:
+                part_length = 1048576 * single_part_size
+                lengths = [part_length] * (-(-source.size // part_length) if part_length else 0)
+                for i, lazy_part in source.split(lengths).items():
+                    LOGGER.info("data_len %s", str(lazy_part.length))
                     part = super().upload_part(
-                        data, bucket_name, object_name, upload_id=mpu_id, part_number=i)
+                        lazy_part.body(), bucket_name, object_name, upload_id=mpu_id,
+                        part_number=i)
                     LOGGER.debug("Part : %s", str(part))
                     parts.append({"PartNumber": i, "ETag": part["ETag"]})
-                    uploaded_bytes += len(data)
+                    uploaded_bytes += lazy_part.length
                     LOGGER.debug("%s of %s uploaded %.2f%%", uploaded_bytes, multipart_obj_size *
                                  1048576, cal_percent(uploaded_bytes, multipart_obj_size * 1048576))
-                    i += 1
             LOGGER.info(parts)
 
             return True, parts
@@ -208,6 +208,9 @@ class S3MultipartTestLib(Multipart):
         :param upload_id: Multipart Upload ID.
         :param bucket_name: Name of the bucket.
         :param object_name: Name of the object.
+        :keyword parts: {part_number: [data, content_md5]} or {part_number: LazyPart} from
+            s3_utils get_*_parts(lazy=True), lazy parts keep memory bounded by
+            parallel_thread x part size.
         :return: (Boolean, List of uploaded parts).
         """
         try:
@@ -215,14 +218,17 @@ class S3MultipartTestLib(Multipart):
             parallel_thread = kwargs.get("parallel_thread", 5)
             gevent_pool = GeventPool(parallel_thread)
             part_number_list = list(parts.keys())
+            upload_part = super().upload_part
+
+            def upload(part, part_number):
+                # Lazy parts read and hash their data here, not in the dispatch loop.
+                return upload_part(part[0], bucket_name, object_name, upload_id=upload_id,
+                                   part_number=part_number, content_md5=part[1])
 
             for part_number in part_number_list:
                 part = parts.get(part_number, None)
                 gevent_pool.wait_available()
-                gevent_pool.spawn(super().upload_part,
-                                  part[0], bucket_name,
-                                  object_name, upload_id=upload_id,
-                                  part_number=part_number, content_md5=part[1])
+                gevent_pool.spawn(upload, part, part_number)
             gevent_pool.join_group()
             response = self.list_parts(upload_id, bucket_name, object_name)
             return response
@@ -238,7 +244,7 @@ class S3MultipartTestLib(Multipart):
         :param upload_id: Multipart Upload ID.
         :param bucket_name: Name of the bucket.
         :param object_name: Name of the object.
-        # :param chunks: No. of parts to be uploaded with details.
+        :keyword parts: {part_number: [data, content_md5]} or {part_number: LazyPart}.
         :return: (Boolean, List of uploaded parts).
         """
         try:
@@ -256,6 +262,36 @@ class S3MultipartTestLib(Multipart):
             LOGGER.exception(ERR_MSG, S3MultipartTestLib.upload_parts_sequential.__name__, error)
             raise CTException(err.S3_CLIENT_ERROR, error.args[0]) from error
 
+    def upload_parts_engine(self, bucket_name: str = None, object_name: str = None,
+                            source=None, **kwargs) -> tuple:
+        """
+        Upload parts with the parallel, resumable MultipartEngine.
+
+        :param bucket_name: Name of the bucket.
+        :param object_name: Name of the object.
+        :param source: File path, {part_number: LazyPart/bytes} or an iterable of part bytes.
+        :keyword state: MultipartUploadState to resume, a new upload is initiated if not given.
+        :keyword part_numbers: Only upload these part numbers.
+        :keyword part_size: Part size in bytes when source is a file path.
+        :keyword workers: Parts in flight at once.
+        :keyword abort_on_failure: Abort the upload when a part fails, default True.
+        :keyword complete: Complete the upload once every part is uploaded.
+        :return: (Boolean, MultipartUploadState).
+        """
+        try:
+            engine = MultipartEngine(self, workers=kwargs.get("workers", 8),
+                                     max_retries=kwargs.get("max_retries", 3),
+                                     abort_on_failure=kwargs.get("abort_on_failure", True))
+            state = kwargs.get("state") or engine.initiate(bucket_name, object_name)
+            engine.upload(state, source, part_numbers=kwargs.get("part_numbers"),
+                          part_size=kwargs.get("part_size", 5242880))
+            if kwargs.get("complete", False):
+                engine.complete(state)
+            return not state.failed, state
+        except BaseException as error:
+            LOGGER.exception(ERR_MSG, S3MultipartTestLib.upload_parts_engine.__name__, error)
+            raise CTException(err.S3_CLIENT_ERROR, error) from error
+
     def upload_multipart(self, body: str = None, bucket_name: str = None, object_name: str = None,
                          **kwargs) -> tuple:
         """
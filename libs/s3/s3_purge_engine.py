@@ -0,0 +1,246 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Parallel, version aware bucket purge engine with throttling retries and statistics."""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from botocore.exceptions import ClientError
+
+LOGGER = logging.getLogger(__name__)
+
+# Error codes answered by a busy server, the request is retried after a backoff.
+THROTTLE_CODES = ("SlowDown", "Throttling", "ThrottlingException", "RequestLimitExceeded",
+                  "ServiceUnavailable", "InternalError", "503")
+
+
+class PurgeState:
+    """Counters of the purge of one bucket."""
+
+    def __init__(self, bucket_name: str):
+        """
+        Initialize the state.
+
+        :param bucket_name: Name of the bucket.
+        """
+        self.bucket_name = bucket_name
+        self.counters = {"versions": 0, "delete_markers": 0, "deleted": 0, "batches": 0,
+                         "uploads_aborted": 0, "retries": 0, "failed": 0}
+        self.errors = []
+        self.elapsed = 0.0
+        self.futures = []
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: int = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self.counters[name] += value
+
+    def submit(self, executor, func, *args) -> None:
+        """Track a task working for this bucket."""
+        future = executor.submit(func, *args)
+        with self._lock:
+            self.futures.append(future)
+
+    def stats(self) -> dict:
+        """Counters, elapsed time and objects deleted per second."""
+        with self._lock:
+            return dict(self.counters, bucket=self.bucket_name, elapsed=self.elapsed,
+                        objects_per_sec=self.counters["deleted"] / self.elapsed
+                        if self.elapsed else 0.0, errors=list(self.errors))
+
+
+class BucketPurgeEngine:
+    """
+    Empty and delete buckets, versions, delete markers and multipart uploads included.
+
+    Object versions and multipart uploads of a bucket are listed concurrently, every listed
+    page is deleted as delete_objects batches of up to 1000 keys on a shared worker pool, so
+    deletion overlaps listing and many buckets are purged at once.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, s3_client, workers: int = 16, batch_size: int = 1000,
+                 max_retries: int = 5, backoff: float = 0.5):
+        """
+        Initialize the engine.
+
+        :param s3_client: boto3 S3 client of the bucket owner.
+        :param workers: parallel delete_objects and abort requests.
+        :param batch_size: keys per delete_objects request, at most 1000.
+        :param max_retries: retries of a throttled request.
+        :param backoff: initial retry delay in seconds, doubled per retry.
+        """
+        self.s3_client = s3_client
+        self.workers = workers
+        self.batch_size = min(batch_size, 1000)
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def _retry(self, state: PurgeState, func, **kwargs):
+        """Call func, retrying throttled requests with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return func(**kwargs)
+            except ClientError as error:
+                code = error.response.get("Error", {}).get("Code")
+                if code not in THROTTLE_CODES or attempt == self.max_retries:
+                    raise
+                state.add("retries")
+                LOGGER.debug("%s throttled (%s), retry %s", func.__name__, code, attempt + 1)
+                time.sleep(self.backoff * 2 ** attempt)
+        return None
+
+    def _delete_batch(self, state: PurgeState, keys: list) -> None:
+        """Delete a batch of keys, re-sending keys the server answered with a throttle error."""
+        for attempt in range(self.max_retries + 1):
+            resp = self._retry(state, self.s3_client.delete_objects, Bucket=state.bucket_name,
+                               Delete={"Objects": keys, "Quiet": True})
+            errors = resp.get("Errors", []) if resp else []
+            state.add("deleted", len(keys) - len(errors))
+            retry = [{"Key": err["Key"], "VersionId": err["VersionId"]} if err.get("VersionId")
+                     else {"Key": err["Key"]} for err in errors
+                     if err.get("Code") in THROTTLE_CODES]
+            failed = [err for err in errors if err.get("Code") not in THROTTLE_CODES]
+            if failed:
+                state.add("failed", len(failed))
+                with state._lock:  # pylint: disable=protected-access
+                    state.errors.extend(failed)
+            if not retry:
+                return
+            if attempt == self.max_retries:
+                state.add("failed", len(retry))
+                return
+            state.add("retries")
+            time.sleep(self.backoff * 2 ** attempt)
+            keys = retry
+
+    def _list_versions(self, state: PurgeState, executor) -> None:
+        """List versions and delete markers page by page, submitting delete batches."""
+        kwargs = {"Bucket": state.bucket_name}
+        while True:
+            resp = self._retry(state, self.s3_client.list_object_versions, **kwargs)
+            versions = resp.get("Versions", [])
+            markers = resp.get("DeleteMarkers", [])
+            state.add("versions", len(versions))
+            state.add("delete_markers", len(markers))
+            keys = [{"Key": obj["Key"], "VersionId": obj["VersionId"]}
+                    for obj in versions + markers]
+            for start in range(0, len(keys), self.batch_size):
+                state.add("batches")
+                state.submit(executor, self._delete_batch, state,
+                             keys[start:start + self.batch_size])
+            if not resp.get("IsTruncated"):
+                return
+            kwargs.update(KeyMarker=resp["NextKeyMarker"])
+            if resp.get("NextVersionIdMarker"):
+                kwargs.update(VersionIdMarker=resp["NextVersionIdMarker"])
+
+    def _abort(self, state: PurgeState, key: str, upload_id: str) -> None:
+        """Abort one multipart upload."""
+        self._retry(state, self.s3_client.abort_multipart_upload, Bucket=state.bucket_name,
+                    Key=key, UploadId=upload_id)
+        state.add("uploads_aborted")
+
+    def _list_uploads(self, state: PurgeState, executor) -> None:
+        """List multipart uploads page by page, submitting aborts."""
+        kwargs = {"Bucket": state.bucket_name}
+        while True:
+            resp = self._retry(state, self.s3_client.list_multipart_uploads, **kwargs)
+            for upload in resp.get("Uploads", []):
+                state.submit(executor, self._abort, state, upload["Key"], upload["UploadId"])
+            if not resp.get("IsTruncated"):
+                return
+            kwargs.update(KeyMarker=resp["NextKeyMarker"],
+                          UploadIdMarker=resp["NextUploadIdMarker"])
+
+    def _purge(self, state: PurgeState, executor, delete_bucket: bool) -> dict:
+        """Empty, then optionally delete, one bucket."""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="purge_list") as listers:
+            listings = [listers.submit(self._list_versions, state, executor),
+                        listers.submit(self._list_uploads, state, executor)]
+        for listing in listings:
+            listing.result()
+        for future in state.futures:
+            future.result()
+        if delete_bucket:
+            self._retry(state, self.s3_client.delete_bucket, Bucket=state.bucket_name)
+        state.elapsed = time.perf_counter() - start
+        stats = state.stats()
+        LOGGER.info("Purged %s: %s objects in %.2fs, %.1f objects/s", state.bucket_name,
+                    stats["deleted"], stats["elapsed"], stats["objects_per_sec"])
+        return stats
+
+    def purge(self, bucket_name: str, delete_bucket: bool = True) -> dict:
+        """
+        Delete every version, delete marker and multipart upload of a bucket.
+
+        :param bucket_name: Name of the bucket.
+        :param delete_bucket: delete the emptied bucket.
+        :return: purge statistics.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="purge") as pool:
+            return self._purge(PurgeState(bucket_name), pool, delete_bucket)
+
+    def purge_buckets(self, bucket_names: list, delete_bucket: bool = True) -> dict:
+        """
+        Purge many buckets at once on a shared worker pool.
+
+        :param bucket_names: Names of the buckets.
+        :param delete_bucket: delete the emptied buckets.
+        :return: dict of bucket name to statistics, or to the exception raised for it.
+        """
+        results = {}
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="purge") as pool, \
+                ThreadPoolExecutor(max_workers=min(len(bucket_names), self.workers) or 1,
+                                   thread_name_prefix="purge_bucket") as buckets:
+            futures = {bucket: buckets.submit(self._purge, PurgeState(bucket), pool,
+                                              delete_bucket) for bucket in bucket_names}
+            wait(futures.values())
+        for bucket, future in futures.items():
+            try:
+                results[bucket] = future.result()
+            except Exception as error:  # pylint: disable=broad-except
+                LOGGER.error("Purging %s failed: %s", bucket, error)
+                results[bucket] = error
+        elapsed = time.perf_counter() - start
+        deleted = sum(res["deleted"] for res in results.values() if isinstance(res, dict))
+        LOGGER.info("Purged %s buckets: %s objects in %.2fs, %.1f objects/s", len(bucket_names),
+                    deleted, elapsed, deleted / elapsed if elapsed else 0.0)
+        return results
+
+    def bucket_size(self, bucket_name: str) -> int:
+        """
+        Total size of the current objects of a bucket from paginated listings.
+
+        :param bucket_name: Name of the bucket.
+        :return: size in bytes.
+        """
+        total, kwargs = 0, {"Bucket": bucket_name}
+        while True:
+            resp = self.s3_client.list_objects_v2(**kwargs)
+            total += sum(obj["Size"] for obj in resp.get("Contents", []))
+            if not resp.get("IsTruncated"):
+                return total
+            kwargs["ContinuationToken"] = resp["NextContinuationToken"]
@@ -0,0 +1,267 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Session pool of pre-created S3 accounts and buckets leased to tests."""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+
+from botocore.exceptions import ClientError
+
+from commons.constants import Rest
+from commons.utils.perf_utils import latency_stats
+from libs.csm.rest.csm_rest_s3user import RestS3user
+from libs.s3.s3_purge_engine import BucketPurgeEngine
+from libs.s3.s3_test_lib import S3TestLib
+
+LOGGER = logging.getLogger(__name__)
+
+PooledAccount = namedtuple("PooledAccount", ["account_name", "access_key", "secret_key",
+                                             "buckets", "s3_obj", "pooled"])
+
+
+def rest_create_account(account_name: str, password: str) -> tuple:
+    """Create an S3 account through CSM REST, return its access and secret key."""
+    resp = RestS3user().create_an_account(account_name, password)
+    if resp.status_code != Rest.SUCCESS_STATUS_FOR_POST:
+        raise RuntimeError(f"Failed to create S3 account {account_name}: {resp.text}")
+    details = json.loads(resp.text)
+    return details["access_key"], details["secret_key"]
+
+
+def rest_delete_account(account_name: str) -> None:
+    """Delete an S3 account through CSM REST."""
+    resp = RestS3user().delete_s3_account_user(account_name)
+    if resp.status_code != Rest.SUCCESS_STATUS:
+        raise RuntimeError(f"Failed to delete S3 account {account_name}: {resp.text}")
+
+
+def purge_bucket(s3_client, bucket_name: str) -> int:
+    """
+    Delete every object version, delete marker and multipart upload of a bucket.
+
+    :param s3_client: boto3 S3 client of the bucket owner
+    :param bucket_name: Name of the bucket
+    :return: number of deleted keys and versions
+    """
+    return BucketPurgeEngine(s3_client).purge(bucket_name, delete_bucket=False)["deleted"]
+
+
+class S3ResourcePool:
+    """
+    Create accounts with buckets in parallel up front, lease them and scrub them on return.
+
+    A lease taken while the pool is empty waits up to lease_timeout and then creates an account
+    on demand, which joins the pool once released. Returned accounts are scrubbed in the
+    background: extra buckets are deleted, pool buckets are emptied and get their policy, ACL and
+    tags reset, a bucket with versioning turned on is re-created since versioning can not be
+    turned off. An account failing its scrub is deleted and replaced.
+    """
+
+    # pylint: disable=too-many-instance-attributes, too-many-arguments
+    def __init__(self, size: int, buckets_per_account: int = 1, workers: int = 8,
+                 prefix: str = "pool", password: str = None, lease_timeout: float = 0,
+                 create_account=rest_create_account, delete_account=rest_delete_account,
+                 client_factory=None):
+        """
+        Initialize the pool.
+
+        :param size: number of accounts created at start
+        :param buckets_per_account: empty buckets created per account
+        :param workers: parallel account creation, scrub and deletion
+        :param prefix: prefix of account and bucket names
+        :param password: password of the accounts
+        :param lease_timeout: seconds a lease waits for a free account before creating one
+        :param create_account: callable(account_name, password) returning (access, secret) key
+        :param delete_account: callable(account_name)
+        :param client_factory: callable(access_key, secret_key) returning an object with an
+            s3_client attribute, defaults to S3TestLib
+        """
+        self.size = size
+        self.buckets_per_account = buckets_per_account
+        self.prefix = prefix
+        self.password = password
+        self.lease_timeout = lease_timeout
+        self.create_account = create_account
+        self.delete_account = delete_account
+        self.client_factory = client_factory or (
+            lambda access_key, secret_key: S3TestLib(access_key=access_key,
+                                                     secret_key=secret_key))
+        self.counters = {"leases": 0, "hits": 0, "misses": 0, "created": 0, "scrubbed": 0,
+                         "scrub_failures": 0, "deleted": 0, "delete_failures": 0}
+        self.lease_waits = []
+        self.scrub_times = []
+        self.accounts = {}
+        self._free = queue.Queue()
+        self._scrubs = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="s3_pool")
+        self._stamp = time.strftime("%Y%m%d%H%M%S")
+
+    def _new_account(self, pooled: bool = True) -> PooledAccount:
+        """Create an account with its empty buckets."""
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+        name = f"{self.prefix}{seq}{self._stamp}"
+        access_key, secret_key = self.create_account(name, self.password)
+        s3_obj = self.client_factory(access_key, secret_key)
+        buckets = [f"{self.prefix}-{seq}-{index}-{self._stamp}".lower()
+                   for index in range(self.buckets_per_account)]
+        for bucket in buckets:
+            s3_obj.s3_client.create_bucket(Bucket=bucket)
+        account = PooledAccount(name, access_key, secret_key, buckets, s3_obj, pooled)
+        with self._lock:
+            self.accounts[name] = account
+            self.counters["created"] += 1
+        LOGGER.debug("Created pool account %s with buckets %s", name, buckets)
+        return account
+
+    def start(self):
+        """Create the accounts of the pool in parallel."""
+        start = time.perf_counter()
+        futures = [self._executor.submit(self._new_account) for _ in range(self.size)]
+        for future in futures:
+            try:
+                self._free.put(future.result())
+            except Exception as error:  # pylint: disable=broad-except
+                LOGGER.error("Failed to create pool account: %s", error)
+        LOGGER.info("Created %s pool accounts in %.1fs", self._free.qsize(),
+                    time.perf_counter() - start)
+        return self
+
+    def lease(self) -> PooledAccount:
+        """
+        Take a scrubbed account, or create one when none frees up within lease_timeout.
+
+        :return: PooledAccount
+        """
+        start = time.perf_counter()
+        try:
+            account = self._free.get(timeout=self.lease_timeout) if self.lease_timeout \
+                else self._free.get_nowait()
+            hit = True
+        except queue.Empty:
+            LOGGER.info("S3 account pool exhausted, creating an account on demand")
+            account = self._new_account(pooled=False)
+            hit = False
+        with self._lock:
+            self.counters["leases"] += 1
+            self.counters["hits" if hit else "misses"] += 1
+            self.lease_waits.append(time.perf_counter() - start)
+        return account
+
+    def release(self, account: PooledAccount) -> None:
+        """Scrub the account in the background and put it back in the pool."""
+        with self._lock:
+            self._scrubs = [future for future in self._scrubs if not future.done()]
+            self._scrubs.append(self._executor.submit(self._recycle, account))
+
+    def _recycle(self, account: PooledAccount) -> None:
+        """Scrub an account back into the pool, replace it if the scrub fails."""
+        start = time.perf_counter()
+        try:
+            self.scrub(account)
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.warning("Scrubbing %s failed, replacing it: %s", account.account_name, error)
+            with self._lock:
+                self.counters["scrub_failures"] += 1
+            self._remove(account)
+            try:
+                account = self._new_account()
+            except Exception as create_error:  # pylint: disable=broad-except
+                LOGGER.error("Failed to replace pool account: %s", create_error)
+                return
+        with self._lock:
+            self.counters["scrubbed"] += 1
+            self.scrub_times.append(time.perf_counter() - start)
+        self._free.put(account)
+
+    def scrub(self, account: PooledAccount) -> None:
+        """Reset the buckets of an account to their freshly created state."""
+        s3_client = account.s3_obj.s3_client
+        owned = [bucket["Name"] for bucket in s3_client.list_buckets().get("Buckets", [])]
+        for bucket in owned:
+            if bucket not in account.buckets:
+                purge_bucket(s3_client, bucket)
+                s3_client.delete_bucket(Bucket=bucket)
+        for bucket in account.buckets:
+            if bucket not in owned:
+                s3_client.create_bucket(Bucket=bucket)
+                continue
+            purge_bucket(s3_client, bucket)
+            if s3_client.get_bucket_versioning(Bucket=bucket).get("Status"):
+                s3_client.delete_bucket(Bucket=bucket)
+                s3_client.create_bucket(Bucket=bucket)
+                continue
+            try:
+                s3_client.delete_bucket_policy(Bucket=bucket)
+            except ClientError as error:
+                if error.response["Error"]["Code"] != "NoSuchBucketPolicy":
+                    raise
+            s3_client.delete_bucket_tagging(Bucket=bucket)
+            s3_client.put_bucket_acl(Bucket=bucket, ACL="private")
+
+    def _remove(self, account: PooledAccount) -> None:
+        """Delete the buckets and the account."""
+        try:
+            s3_client = account.s3_obj.s3_client
+            for bucket in s3_client.list_buckets().get("Buckets", []):
+                purge_bucket(s3_client, bucket["Name"])
+                s3_client.delete_bucket(Bucket=bucket["Name"])
+            self.delete_account(account.account_name)
+            deleted = True
+        except Exception as error:  # pylint: disable=broad-except
+            LOGGER.error("Failed to delete pool account %s: %s", account.account_name, error)
+            deleted = False
+        with self._lock:
+            self.accounts.pop(account.account_name, None)
+            self.counters["deleted" if deleted else "delete_failures"] += 1
+
+    def close(self) -> dict:
+        """
+        Wait for pending scrubs and delete every account of the pool in parallel.
+
+        :return: pool statistics
+        """
+        with self._lock:
+            scrubs = list(self._scrubs)
+        wait(scrubs)
+        with self._lock:
+            accounts = list(self.accounts.values())
+        wait([self._executor.submit(self._remove, account) for account in accounts])
+        self._executor.shutdown(wait=True)
+        stats = self.stats()
+        LOGGER.info("S3 account pool stats: %s", stats)
+        return stats
+
+    def stats(self) -> dict:
+        """Hit rate, lease wait and scrub time of the pool."""
+        with self._lock:
+            return dict(self.counters, free=self._free.qsize(),
+                        hit_rate=self.counters["hits"] / self.counters["leases"]
+                        if self.counters["leases"] else 0.0,
+                        lease_wait=latency_stats(self.lease_waits),
+                        scrub=latency_stats(self.scrub_times))
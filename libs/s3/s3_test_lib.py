@@ -389,13 +389,9 @@ class S3TestLib(S3Lib):
         :param bucket_name: Name of the bucket.
         :return: (Boolean, size of bucket in int)
         """
-        total_size = 0
         try:
             LOGGER.info("Getting bucket size")
-            bucket = super().get_bucket_size(bucket_name)
-            for each_object in bucket.objects.all():
-                total_size += each_object.size
-                LOGGER.info(each_object.size)
+            total_size = self.purge_engine().bucket_size(bucket_name)
             LOGGER.info("Total size: %s", total_size)
         except (ClientError, Exception) as error:
             LOGGER.error("Error in %s: %s",
@@ -459,15 +455,14 @@ class S3TestLib(S3Lib):
         """
         LOGGER.info("Deleting multiple empty/non-empty buckets")
         response_dict = {"Deleted": [], "CouldNotDelete": []}
-        for bucket in bucket_list:
-            response = self.delete_bucket(bucket, True)
-            if response[0]:
+        for bucket, response in self.purge_engine().purge_buckets(bucket_list).items():
+            if isinstance(response, dict):
                 response_dict["Deleted"].append(bucket)
             else:
                 LOGGER.error(
                     "Error in %s: %s",
                     S3TestLib.delete_multiple_buckets.__name__,
-                    response[1])
+                    response)
                 response_dict["CouldNotDelete"].append(bucket)
         if response_dict["CouldNotDelete"]:
             LOGGER.error("Failed to delete bucket")
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""
+Benchmark per call latency of aws CLI commands run as subprocesses and in the awscli worker.
+
+Example:
+    python3 -m scripts.awscli_bench.awscli_bench --iterations 20
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from commons import commands
+from commons.utils.perf_utils import latency_stats
+from libs.s3.awscli_driver import AWSCLI_DRIVER
+from libs.s3.awscli_driver import run_awscli_cmd
+from scripts.awscli_bench.s3_stub_server import S3StubServer
+
+LOGGER = logging.getLogger(__name__)
+
+MODES = {"subprocess": False, "in_process": True}
+
+
+def benchmark(endpoint_url, iterations, file_path):
+    """
+    Time mb, cp and ls calls in both modes.
+
+    :param endpoint_url: S3 endpoint.
+    :param iterations: calls per operation and mode.
+    :param file_path: file uploaded by cp.
+    :return: dict of mode to dict of operation to latency stats.
+    """
+    options = f" --endpoint-url {endpoint_url}"
+    results = {}
+    for mode, in_process in MODES.items():
+        samples = {"mb": [], "cp": [], "ls": []}
+        for index in range(iterations):
+            bucket = f"bench-{mode.replace('_', '-')}-{index}"
+            calls = {"mb": commands.CMD_AWSCLI_CREATE_BUCKET.format(bucket),
+                     "cp": commands.S3_UPLOAD_FILE_CMD.format(file_path, bucket, "obj"),
+                     "ls": commands.CMD_AWSCLI_LIST_OBJECTS.format(bucket)}
+            for operation, cmd in calls.items():
+                start = time.perf_counter()
+                resp = run_awscli_cmd(cmd + options, chk_stderr=True, in_process=in_process)
+                samples[operation].append(time.perf_counter() - start)
+                assert resp[0], resp[1]
+        results[mode] = {operation: latency_stats(values) for operation, values in samples.items()}
+    return results
+
+
+def main():
+    """Parse arguments and run the benchmark against a local stub endpoint."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10,
+                        help="calls per operation and mode")
+    parser.add_argument("--size", type=int, default=1024, help="bytes uploaded by cp")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    # The stub does not check signatures, any key works.
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with tempfile.NamedTemporaryFile() as upload, S3StubServer() as server:
+        upload.write(os.urandom(args.size))
+        upload.flush()
+        results = benchmark(server.endpoint_url, args.iterations, upload.name)
+    print(f"{'operation':<10} {'mode':<11} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    for operation in ("mb", "cp", "ls"):
+        for mode in MODES:
+            stats = results[mode][operation]
+            print(f"{operation:<10} {mode:<11} {stats['p50'] * 1000:>8.1f} "
+                  f"{stats['p95'] * 1000:>8.1f} {stats['mean'] * 1000:>8.1f}")
+    LOGGER.info("In process calls %s, sessions created %s", AWSCLI_DRIVER.calls,
+                AWSCLI_DRIVER.sessions)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Local stand-in S3 endpoint: path style bucket and object calls, no authentication."""
+
+import hashlib
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import unquote
+from urllib.parse import urlparse
+from xml.sax.saxutils import escape
+
+LOGGER = logging.getLogger(__name__)
+
+XMLNS = "http://s3.amazonaws.com/doc/2006-03-01/"
+LAST_MODIFIED = "2022-01-01T00:00:00.000Z"
+
+
+class S3StubHandler(BaseHTTPRequestHandler):
+    """Request handler for ListBuckets, bucket create/delete and object put/get/list."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    buckets = None
+    lock = None
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Route the access log to the module logger."""
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+    def _reply(self, status, body=b"", headers=None):
+        """Send a response, keeping the connection alive."""
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status, code):
+        """Send an S3 error document."""
+        self._reply(status, f"<Error><Code>{code}</Code><Message>{code}</Message></Error>"
+                    .encode(), {"Content-Type": "application/xml"})
+
+    def _route(self):
+        """Bucket, key and query of the request."""
+        url = urlparse(self.path)
+        bucket, _, key = unquote(url.path).lstrip("/").partition("/")
+        return bucket, key, {name: values[0] for name, values in parse_qs(url.query).items()}
+
+    def _list_objects(self, bucket, query):
+        """ListObjectsV2 with prefix and delimiter."""
+        prefix, delimiter = query.get("prefix", ""), query.get("delimiter")
+        contents, prefixes = [], set()
+        for key in sorted(self.buckets[bucket]):
+            if not key.startswith(prefix):
+                continue
+            rest = key[len(prefix):]
+            if delimiter and delimiter in rest:
+                prefixes.add(prefix + rest.split(delimiter)[0] + delimiter)
+                continue
+            body = self.buckets[bucket][key]
+            contents.append(f"<Contents><Key>{escape(key)}</Key>"
+                            f"<LastModified>{LAST_MODIFIED}</LastModified>"
+                            f"<ETag>&quot;{hashlib.md5(body).hexdigest()}&quot;</ETag>"
+                            f"<Size>{len(body)}</Size><StorageClass>STANDARD</StorageClass>"
+                            f"</Contents>")
+        common = "".join(f"<CommonPrefixes><Prefix>{escape(item)}</Prefix></CommonPrefixes>"
+                         for item in sorted(prefixes))
+        return (f'<ListBucketResult xmlns="{XMLNS}"><Name>{bucket}</Name>'
+                f"<Prefix>{escape(prefix)}</Prefix><KeyCount>{len(contents)}</KeyCount>"
+                f"<MaxKeys>1000</MaxKeys><IsTruncated>false</IsTruncated>"
+                f"{''.join(contents)}{common}</ListBucketResult>").encode()
+
+    def _handle(self):
+        """Dispatch a request."""
+        bucket, key, query = self._route()
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        xml = {"Content-Type": "application/xml"}
+        with self.lock:
+            if not bucket:
+                names = "".join(f"<Bucket><Name>{name}</Name><CreationDate>{LAST_MODIFIED}"
+                                f"</CreationDate></Bucket>" for name in sorted(self.buckets))
+                return self._reply(200, f'<ListAllMyBucketsResult xmlns="{XMLNS}"><Owner><ID>'
+                                   f"stub</ID></Owner><Buckets>{names}</Buckets>"
+                                   f"</ListAllMyBucketsResult>".encode(), xml)
+            if not key:
+                if self.command == "PUT":
+                    if bucket in self.buckets:
+                        return self._error(409, "BucketAlreadyOwnedByYou")
+                    self.buckets[bucket] = {}
+                    return self._reply(200, headers={"Location": f"/{bucket}"})
+                if bucket not in self.buckets:
+                    return self._error(404, "NoSuchBucket")
+                if self.command == "DELETE":
+                    if self.buckets[bucket]:
+                        return self._error(409, "BucketNotEmpty")
+                    del self.buckets[bucket]
+                    return self._reply(204)
+                if self.command == "GET":
+                    return self._reply(200, self._list_objects(bucket, query), xml)
+                return self._reply(200)
+            if bucket not in self.buckets:
+                return self._error(404, "NoSuchBucket")
+            objects = self.buckets[bucket]
+            if self.command == "PUT":
+                objects[key] = body
+                return self._reply(200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+            if key not in objects:
+                return self._error(404, "NoSuchKey")
+            if self.command == "DELETE":
+                del objects[key]
+                return self._reply(204)
+            return self._reply(200, objects[key],
+                               {"ETag": f'"{hashlib.md5(objects[key]).hexdigest()}"',
+                                "Last-Modified": "Sat, 01 Jan 2022 00:00:00 GMT"})
+
+    do_GET = do_PUT = do_DELETE = do_HEAD = _handle  # pylint: disable=invalid-name
+
+
+class S3StubServer:
+    """Threaded S3 stand-in server running in the background of the current process."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """
+        Initialize the server, port 0 picks a free port.
+
+        :param host: address to bind.
+        :param port: port to bind.
+        """
+        self.buckets = {}
+        handler = type("BoundS3StubHandler", (S3StubHandler,),
+                       {"buckets": self.buckets, "lock": threading.Lock()})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def endpoint_url(self):
+        """http URL of the server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Start serving in a daemon thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        LOGGER.info("S3 stub server listening on %s", self.endpoint_url)
+        return self
+
+    def stop(self):
+        """Stop serving and release the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,128 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+
+"""
+Benchmark md5sum/openssl subprocesses against the in process checksum service.
+
+Example:
+    python3 -m scripts.checksum_bench.checksum_bench --small-count 2000 --large-count 2 \
+        --large-size 2048
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from commons.utils.checksum_utils import RACY_SECONDS
+from commons.utils.checksum_utils import ChecksumService
+from commons.utils.file_factory import write_file
+
+LOGGER = logging.getLogger(__name__)
+
+MODES = ("md5sum", "openssl", "serial", "pool", "md5_sha256", "cached")
+
+
+def timed(func, *args):
+    """Seconds taken by func(*args)."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def md5sum(paths):
+    """One md5sum process per file, as HA cal_compare_checksum used to."""
+    for path in paths:
+        subprocess.run(["md5sum", "-t", path], check=True, capture_output=True)
+
+
+def openssl(paths):
+    """One shell pipeline per file, as calculate_checksum used to."""
+    for path in paths:
+        subprocess.run(f"openssl md5 -binary {path} | base64", shell=True,  # nosec
+                       check=True, capture_output=True)
+
+
+def make_files(work_dir, name, count, size):
+    """Create count random files of size bytes, wait until they are old enough to be cached."""
+    paths = []
+    for index in range(count):
+        path = os.path.join(work_dir, f"{name}{index}")
+        write_file(path, size, seed=None)
+        paths.append(path)
+    time.sleep(RACY_SECONDS)
+    return paths
+
+
+def benchmark(paths, workers):
+    """
+    Digest the files with every mode.
+
+    :param paths: files to digest.
+    :param workers: processes of the pool modes.
+    :return: dict of mode to seconds.
+    """
+    serial = ChecksumService(workers=1, cache_size=0)
+    pool = ChecksumService(workers=workers, cache_size=0)
+    cached = ChecksumService(workers=workers)
+    cached.digest_files(paths)
+    return {"md5sum": timed(md5sum, paths),
+            "openssl": timed(openssl, paths),
+            "serial": timed(serial.digest_files, paths),
+            "pool": timed(pool.digest_files, paths),
+            "md5_sha256": timed(pool.digest_files, paths, ("md5", "sha256")),
+            "cached": timed(cached.digest_files, paths)}
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--small-count", type=int, default=2000, help="number of small files")
+    parser.add_argument("--small-size", type=int, default=64, help="small file size in KB")
+    parser.add_argument("--large-count", type=int, default=2, help="number of large files")
+    parser.add_argument("--large-size", type=int, default=2048, help="large file size in MB")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="pool processes")
+    parser.add_argument("--dir", default=None, help="work directory")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    work_dir = tempfile.mkdtemp(prefix="checksum_bench_", dir=args.dir)
+    results = {}
+    try:
+        for name, count, size in (("small", args.small_count, args.small_size * 1024),
+                                  ("large", args.large_count, args.large_size * 1024 ** 2)):
+            if not count:
+                continue
+            paths = make_files(work_dir, name, count, size)
+            results[name] = (count * size, benchmark(paths, args.workers))
+            for path in paths:
+                os.remove(path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(f"{'files':>6} {'unit':>5} " + " ".join(f"{mode:>10}" for mode in MODES))
+    for name, (nbytes, times) in results.items():
+        print(f"{name:>6} {'s':>5} " + " ".join(f"{times[mode]:>10.3f}" for mode in MODES))
+        print(f"{name:>6} {'MB/s':>5} " + " ".join(
+            f"{nbytes / 1024 ** 2 / times[mode]:>10.1f}" for mode in MODES))
+
+
+if __name__ == "__main__":
+    main()
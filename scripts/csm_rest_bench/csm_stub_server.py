@@ -0,0 +1,305 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Local stand-in of the CSM REST server used to exercise the CSM REST libs offline."""
+
+import argparse
+import json
+import logging
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import urlparse
+
+LOGGER = logging.getLogger(__name__)
+
+LOGIN_ENDPOINT = "/api/v2/login"
+LOGOUT_ENDPOINT = "/api/v2/logout"
+# Collection endpoints and the payload field identifying a resource in them.
+COLLECTIONS = {
+    "/api/v2/csm/users": "id",
+    "/api/v2/system/users": "id",
+    "/api/v2/iam/users": "uid",
+    "/api/v2/s3/iam/users": "user_name",
+    "/api/v2/iam_users": "user_name",
+    "/api/v2/s3_accounts": "account_name",
+}
+LIST_KEYS = {"id": "users", "uid": "users", "user_name": "iam_users",
+             "account_name": "s3_accounts"}
+
+
+class CsmStubState:
+    """In memory resources, sessions and fault knobs shared by request handlers."""
+
+    def __init__(self, latency=0.0, login_latency=0.0, throttle_every=0):
+        """
+        Initialize the stub state.
+
+        :param latency: seconds every request is delayed by.
+        :param login_latency: additional seconds a login request is delayed by.
+        :param throttle_every: answer every Nth resource request with 429, 0 disables.
+        """
+        self.latency = latency
+        self.login_latency = login_latency
+        self.throttle_every = throttle_every
+        self.lock = threading.Lock()
+        self.sessions = set()
+        self.resources = {endpoint: {} for endpoint in COLLECTIONS}
+        self.counters = {"login": 0, "logout": 0, "requests": 0, "resource_requests": 0,
+                         "throttled": 0, "connections": 0}
+
+    def count(self, name):
+        """Increment a request counter."""
+        with self.lock:
+            self.counters[name] += 1
+            return self.counters[name]
+
+
+class CsmStubHandler(BaseHTTPRequestHandler):
+    """Request handler emulating the CSM login and user management endpoints."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    state = None
+
+    def setup(self):
+        """Count accepted connections to make connection reuse visible."""
+        super().setup()
+        self.state.count("connections")
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Route the access log to the module logger."""
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+    def _reply(self, status, body=None, headers=None):
+        """Send a JSON response, keeping the connection alive."""
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        """Read and decode the JSON request body."""
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw) if raw else {}
+        except ValueError:
+            return None
+
+    def _route(self):
+        """Resolve the request path into a collection endpoint and resource name."""
+        path = urlparse(self.path).path.rstrip("/")
+        if path in COLLECTIONS:
+            return path, None
+        endpoint, _, name = path.rpartition("/")
+        if endpoint in COLLECTIONS:
+            return endpoint, name
+        return None, None
+
+    def _authorized(self):
+        """Check the bearer token of the request against live sessions."""
+        with self.state.lock:
+            return self.headers.get("Authorization") in self.state.sessions
+
+    def _handle(self, method):
+        """Dispatch a request to login/logout or a resource collection."""
+        state = self.state
+        state.count("requests")
+        if state.latency:
+            time.sleep(state.latency)
+        path = urlparse(self.path).path.rstrip("/")
+        body = self._body() if method in ("POST", "PATCH", "PUT") else {}
+        if body is None:
+            return self._reply(400, {"error_code": "4099",
+                                     "message": "Invalid request message received."})
+        if path == LOGIN_ENDPOINT and method == "POST":
+            if state.login_latency:
+                time.sleep(state.login_latency)
+            state.count("login")
+            if not body.get("username") or not body.get("password"):
+                return self._reply(401, {"message": "Invalid credentials"})
+            token = f"Bearer {uuid.uuid4().hex}"
+            with state.lock:
+                state.sessions.add(token)
+            return self._reply(200, {}, {"Authorization": token})
+        if not self._authorized():
+            return self._reply(401, {"message": "Invalid authentication credentials"})
+        if path == LOGOUT_ENDPOINT and method == "POST":
+            state.count("logout")
+            with state.lock:
+                state.sessions.discard(self.headers.get("Authorization"))
+            return self._reply(200, {})
+        endpoint, name = self._route()
+        if endpoint is None:
+            return self._reply(404, {"message": "Not found"})
+        if state.throttle_every and \
+                state.count("resource_requests") % state.throttle_every == 0:
+            state.count("throttled")
+            return self._reply(429, {"message": "Too many requests"}, {"Retry-After": "0"})
+        return self._resource(method, endpoint, name, body)
+
+    def _resource(self, method, endpoint, name, body):
+        """Create, list, read, update or delete a resource of a collection."""
+        key = COLLECTIONS[endpoint]
+        with self.state.lock:
+            items = self.state.resources[endpoint]
+            if method == "POST" and name is None:
+                if key == "id":
+                    body["id"] = uuid.uuid4().hex
+                    if any(item.get("username") == body.get("username")
+                           for item in items.values()):
+                        return self._reply(409, {"message": "User already exists"})
+                if not body.get(key):
+                    return self._reply(400, {"message": f"Missing {key}"})
+                if body[key] in items:
+                    return self._reply(409, {"message": "Resource already exists"})
+                resource = {k: v for k, v in body.items() if k != "password"}
+                resource.setdefault("created_time", time.time())
+                items[body[key]] = resource
+                return self._reply(201, resource)
+            if method == "GET" and name is None:
+                return self._reply(200, {LIST_KEYS[key]: list(items.values())})
+            # Users are addressed either by their id or by their username
+            name = name if name in items else next(
+                (ident for ident, item in items.items() if item.get("username") == name), None)
+            if name is None:
+                return self._reply(404, {"message": "Resource not found"})
+            if method == "GET":
+                return self._reply(200, items[name])
+            if method in ("PATCH", "PUT"):
+                items[name].update({k: v for k, v in body.items()
+                                    if k not in ("password", "current_password")})
+                return self._reply(200, items[name])
+            if method == "DELETE":
+                del items[name]
+                return self._reply(200, {"message": "Deleted"})
+        return self._reply(405, {"message": "Method not allowed"})
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle GET."""
+        self._handle("GET")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle POST."""
+        self._handle("POST")
+
+    def do_PATCH(self):  # pylint: disable=invalid-name
+        """Handle PATCH."""
+        self._handle("PATCH")
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        """Handle PUT."""
+        self._handle("PUT")
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        """Handle DELETE."""
+        self._handle("DELETE")
+
+
+class CsmStubServer:
+    """Threaded CSM stand-in server running in the background of the current process."""
+
+    def __init__(self, host="127.0.0.1", port=0, **kwargs):
+        """
+        Initialize the server, port 0 picks a free port.
+
+        :param host: address to bind.
+        :param port: port to bind.
+        :param kwargs: fault knobs passed to CsmStubState.
+        """
+        self.state = CsmStubState(**kwargs)
+        handler = type("BoundCsmStubHandler", (CsmStubHandler,), {"state": self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        """Bound address."""
+        return self.httpd.server_address[0]
+
+    @property
+    def port(self):
+        """Bound port."""
+        return self.httpd.server_address[1]
+
+    def rest_config(self, config):
+        """
+        Point a CSM REST config at this server.
+
+        :param config: CSM_REST_CFG style dict, updated in place.
+        :return: updated config.
+        """
+        config.update({"mgmt_vip": self.host, "port": self.port, "secure": False})
+        return config
+
+    def start(self):
+        """Start serving in a daemon thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        LOGGER.info("CSM stub server listening on %s:%s", self.host, self.port)
+        return self
+
+    def stop(self):
+        """Stop serving and release the socket."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    """Run the stand-in server in the foreground."""
+    parser = argparse.ArgumentParser(description="Local stand-in CSM REST server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=28080)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="seconds added to every request")
+    parser.add_argument("--login_latency", type=float, default=0.0,
+                        help="seconds added to every login")
+    parser.add_argument("--throttle_every", type=int, default=0,
+                        help="answer every Nth resource request with 429")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    server = CsmStubServer(args.host, args.port, latency=args.latency,
+                           login_latency=args.login_latency,
+                           throttle_every=args.throttle_every)
+    LOGGER.info("Serving CSM stub on %s:%s", server.host, server.port)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
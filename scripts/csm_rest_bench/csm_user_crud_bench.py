@@ -0,0 +1,112 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""
+Benchmark CSM user CRUD ops/sec with and without session reuse and login token caching.
+
+Example:
+    python3 -m scripts.csm_rest_bench.csm_user_crud_bench --iterations 100 --stub
+"""
+
+import argparse
+import logging
+import time
+
+from config import CSM_REST_CFG
+from commons.constants import Rest as const
+from libs.csm.rest.csm_rest_csmuser import RestCsmUser
+from libs.csm.rest.csm_rest_test_lib import LOGIN_TOKEN_CACHE
+from scripts.csm_rest_bench.csm_stub_server import CsmStubServer
+
+LOGGER = logging.getLogger(__name__)
+
+# Mode name: (session_reuse, token_cache_ttl)
+MODES = {"before": (False, 0), "after": (True, const.TOKEN_CACHE_TTL)}
+
+
+def run_crud(csm_user, iterations):
+    """
+    Create, read, update and delete one CSM user per iteration.
+
+    :param csm_user: RestCsmUser object.
+    :param iterations: number of users to cycle through.
+    :return: tuple of operations performed and elapsed seconds.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        resp = csm_user.create_csm_user(user_type="valid", user_role="monitor")
+        assert resp.status_code == const.SUCCESS_STATUS_FOR_POST, resp.text
+        user_id, username = resp.json()["id"], resp.json()["username"]
+        assert csm_user.list_csm_single_user(
+            request_type="get", expect_status_code=const.SUCCESS_STATUS, user=username)
+        resp = csm_user.edit_csm_user(user=username, role="manage")
+        assert resp.status_code == const.SUCCESS_STATUS, resp.text
+        resp = csm_user.delete_csm_user(user_id)
+        assert resp.status_code == const.SUCCESS_STATUS, resp.text
+    return iterations * 4, time.perf_counter() - start
+
+
+def benchmark(iterations, modes=("before", "after")):
+    """
+    Run the CRUD loop once per mode.
+
+    :param iterations: number of users to cycle through per mode.
+    :param modes: modes to compare, keys of MODES.
+    :return: dict of mode to ops/sec.
+    """
+    results = {}
+    for mode in modes:
+        session_reuse, ttl = MODES[mode]
+        CSM_REST_CFG["session_reuse"] = session_reuse
+        LOGIN_TOKEN_CACHE.ttl = ttl
+        LOGIN_TOKEN_CACHE.invalidate()
+        csm_user = RestCsmUser()
+        ops, elapsed = run_crud(csm_user, iterations)
+        csm_user.restapi.close()
+        results[mode] = ops / elapsed
+        LOGGER.info("%-6s: %d ops in %.2fs, %.1f ops/sec", mode, ops, elapsed, results[mode])
+    if "before" in results and "after" in results:
+        LOGGER.info("Speedup: %.2fx", results["after"] / results["before"])
+    return results
+
+
+def main():
+    """Parse arguments and run the benchmark against the target or a local stub."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50,
+                        help="users created/read/updated/deleted per mode")
+    parser.add_argument("--stub", action="store_true",
+                        help="run against a local stand-in CSM server instead of the target")
+    parser.add_argument("--login_latency", type=float, default=0.05,
+                        help="seconds the stub spends per login, mimics password hashing")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if not args.stub:
+        benchmark(args.iterations)
+        return
+    with CsmStubServer(login_latency=args.login_latency) as server:
+        server.rest_config(CSM_REST_CFG)
+        benchmark(args.iterations)
+        LOGGER.info("Stub counters: %s", server.state.counters)
+
+
+if __name__ == "__main__":
+    main()
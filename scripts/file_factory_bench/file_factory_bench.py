@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""
+Benchmark dd against the in process file factory, cold (generated) and warm (cached copy).
+
+Example:
+    python3 -m scripts.file_factory_bench.file_factory_bench --sizes 1 16 256 1024 5120
+"""
+
+import argparse
+import logging
+import os
+import shlex
+import shutil
+import subprocess
+import tempfile
+import time
+
+from commons import commands
+from commons.utils.file_factory import FileFactory
+
+LOGGER = logging.getLogger(__name__)
+
+MODES = ("dd_urandom", "dd_zero", "random_cold", "random_warm", "zero_cold", "zero_warm")
+
+
+def timed(func, *args):
+    """Seconds taken by func(*args)."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def benchmark(sizes, work_dir):
+    """
+    Create one file per size and mode.
+
+    :param sizes: file sizes in MB.
+    :param work_dir: directory of the files and of the cache.
+    :return: dict of size to dict of mode to seconds.
+    """
+    factory = FileFactory(os.path.join(work_dir, "cache"), budget=2 * max(sizes) * 1024 ** 2)
+    results = {}
+    for size in sizes:
+        target = os.path.join(work_dir, f"file_{size}M")
+        nbytes = size * 1024 ** 2
+
+        def run_dd(dev, size=size, target=target):
+            subprocess.run(shlex.split(commands.CREATE_FILE.format(dev, target, "1M", size)),
+                           check=True, capture_output=True)
+
+        results[size] = {
+            "dd_urandom": timed(run_dd, "/dev/urandom"),
+            "dd_zero": timed(run_dd, "/dev/zero"),
+            "random_cold": timed(factory.create, target, nbytes, size, "random"),
+            "random_warm": timed(factory.create, target, nbytes, size, "random"),
+            "zero_cold": timed(factory.create, target, nbytes, 0, "zero"),
+            "zero_warm": timed(factory.create, target, nbytes, 0, "zero")}
+        os.remove(target)
+        LOGGER.info("%6d MB: %s", size, ", ".join(
+            f"{mode} {secs:.3f}s" for mode, secs in results[size].items()))
+    LOGGER.info("Factory stats: %s", factory.stats())
+    return results
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 16, 256, 1024, 5120],
+                        help="file sizes in MB")
+    parser.add_argument("--dir", default=None,
+                        help="work directory, on the file system the tests write to")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    work_dir = tempfile.mkdtemp(prefix="file_factory_bench_", dir=args.dir)
+    try:
+        results = benchmark(args.sizes, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(f"{'size MB':>8} " + " ".join(f"{mode:>12}" for mode in MODES))
+    for size, times in results.items():
+        print(f"{size:>8} " + " ".join(f"{times[mode]:>12.3f}" for mode in MODES))
+
+
+if __name__ == "__main__":
+    main()
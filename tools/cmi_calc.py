@@ -21,15 +21,21 @@
 import argparse
 import configparser
 import json
+import logging
 import sys
+import threading
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
 
 import requests
-from jira import JIRA
 
+from jira_db_sync import JiraSource
 from report import jira_api
 
+LOGGER = logging.getLogger(__name__)
+
 config = configparser.ConfigParser()
 config.read('config.ini')
 try:
@@ -65,48 +71,71 @@ bug_priority_weights = {
 }
 
 
-def get_selective_tests_for_feature(tp_id: str, feature: str, status: str, username: str,
-                                    password: str):
-    """Search tests in given test plan, feature and test status"""
-    jira_url = "https://jts.seagate.com/"
-    options = {'server': jira_url}
-    jira = JIRA(options, basic_auth=(username, password))
-    if status:
-        query = f'issue in testPlanTests(\'{tp_id}\',\'{status}\') AND "Test Domain" = "{feature}"'
-    else:
-        query = f'issue in testPlanTests(\'{tp_id}\') AND "Test Domain" = "{feature}"'
-    issues = jira.search_issues(query, maxResults=300)
-    return issues
-
-
-def get_failed_tests_details(tp_id: str, username: str, password: str):
-    """Return all failed tests with/without mapped Bug ID"""
-    test_executions = jira_api.get_test_executions_from_test_plan(tp_id, username, password)
-    tests = []
-    for test_execution in test_executions:
-        tests.extend(jira_api.get_test_from_test_execution(test_execution["key"],
-                                                           username, password))
-    tests = [test for test in tests if test["status"] == "FAIL"]
+# "Test Domain" field of tests, holding the feature.
+TEST_DOMAIN_FIELD = "customfield_21087"
+
+
+def get_plan_tests_by_feature(source: JiraSource, tp_id: str, executor=None) -> dict:
+    """
+    Keys of the tests of a test plan grouped by feature and latest status
+
+    One Xray listing gives the status of every test, one paged JQL search their feature.
+    """
+    statuses = {test["key"]: test["latestStatus"] for test in source.plan_tests(tp_id)}
+    issues = source.search(f"issue in testPlanTests('{tp_id}')", [TEST_DOMAIN_FIELD], executor)
+    tests = defaultdict(lambda: defaultdict(list))
+    for issue in issues:
+        domain = issue["fields"].get(TEST_DOMAIN_FIELD)
+        if domain:
+            tests[domain["value"]][statuses.get(issue["key"])].append(issue["key"])
     return tests
 
 
-def get_bug_priority_count(total_failed_tests, feature_tests, username, password) -> defaultdict:
+def get_failed_tests_details(source: JiraSource, tp_id: str, executor=None):
+    """Return all failed tests with/without mapped Bug ID, test executions read concurrently"""
+    test_executions = [te["key"] for te in source.test_executions(tp_id)]
+    results = executor.map(source.tests, test_executions) if executor else \
+        map(source.tests, test_executions)
+    return [test for tests in results for test in tests if test["status"] == "FAIL"]
+
+
+class DefectPriorityResolver:
+    """Priority of defects, each defect fetched once in bulk JQL queries and cached."""
+
+    def __init__(self, source: JiraSource):
+        self.source = source
+        self.cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, keys, executor=None) -> dict:
+        """Return priority name by defect key, fetching only keys not cached yet"""
+        keys = set(keys)
+        with self._lock:
+            missing = sorted(keys - set(self.cache))
+        if missing:
+            fields = self.source.issues(missing, ["priority"], executor)
+            with self._lock:
+                self.cache.update({key: value["priority"]["name"]
+                                   for key, value in fields.items()})
+        return {key: self.cache[key] for key in keys}
+
+
+def get_bug_priority_count(total_failed_tests, feature_tests, priorities) -> defaultdict:
     """Return count of Blocker/Critical/Major.. and not mapped failures in given feature"""
-    feature_tests = [str(test) for test in feature_tests]
+    feature_tests = set(feature_tests)
     count = defaultdict(int)
     count["Unmapped"] = 0
     for failed_test in total_failed_tests:
         if failed_test["key"] in feature_tests and "defects" not in failed_test:
             count["unmapped"] += 1
         elif failed_test["key"] in feature_tests and "defects" in failed_test:
-            defects = [jira_api.get_issue_details(defect["key"], username, password)
-                       for defect in failed_test["defects"]]
-            for defect in defects:
-                count[defect.fields.priority.name] += 1
+            for defect in failed_test["defects"]:
+                count[priorities[defect["key"]]] += 1
     return count
 
 
-def calculate_cmi(tp_id: str, username, password) -> float:
+def calculate_cmi(tp_id: str, username, password, source: JiraSource = None,
+                  workers: int = 8) -> float:
     """
     Summary: Calculate CMI for given test plan ID
 
@@ -117,18 +146,23 @@ def calculate_cmi(tp_id: str, username, password) -> float:
         ]
         where, failed_tests = fail_tests_without_bugs +
                              Σ over bug_priority ( bug_priority_weight * fail_test_with_priority)
+        Tests are fetched once for the test plan and grouped by feature and status in memory,
+        linked defects are deduplicated and their priorities fetched concurrently.
     """
-    # Total failed test for given build
-    total_failed_tests = get_failed_tests_details(tp_id, username, password)
+    source = source or JiraSource(username, password)
+    start, remote_calls = time.perf_counter(), source.requests
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        plan_tests = get_plan_tests_by_feature(source, tp_id, executor)
+        # Total failed test for given build
+        total_failed_tests = get_failed_tests_details(source, tp_id, executor)
+        priorities = DefectPriorityResolver(source).resolve(
+            [defect["key"] for test in total_failed_tests for defect in test.get("defects", [])],
+            executor)
     features_cmi = 0
     for feature, feature_weight in features_weights.items():
-        total_tests = get_selective_tests_for_feature(tp_id, feature, "", username, password)
-        pass_tests = get_selective_tests_for_feature(tp_id, feature, "PASS", username, password)
-        blocked_tests = get_selective_tests_for_feature(tp_id, feature, "BLOCKED", username,
-                                                        password)
-        aborted_tests = get_selective_tests_for_feature(tp_id, feature, "ABORTED", username,
-                                                        password)
-        count = get_bug_priority_count(total_failed_tests, total_tests, username, password)
+        tests = plan_tests.get(feature, {})
+        total_tests = [key for keys in tests.values() for key in keys]
+        count = get_bug_priority_count(total_failed_tests, total_tests, priorities)
         scaled_failures = + (
                 count["Blocker"] * bug_priority_weights["Blocker"] +
                 count["Critical"] * bug_priority_weights["Critical"] +
@@ -137,9 +171,12 @@ def calculate_cmi(tp_id: str, username, password) -> float:
                 count["Trivial"] * bug_priority_weights["Trivial"]
         )
         failed_tests = count["Unmapped"] + scaled_failures
-        scaled_tests = len(pass_tests) - failed_tests - len(blocked_tests) - len(aborted_tests)
+        scaled_tests = len(tests.get("PASS", [])) - failed_tests - \
+            len(tests.get("BLOCKED", [])) - len(tests.get("ABORTED", []))
         if total_tests:
             features_cmi += (feature_weight / len(total_tests)) * scaled_tests
+    LOGGER.info("CMI of %s: %s JIRA calls, %s defects, %.2fs", tp_id,
+                source.requests - remote_calls, len(priorities), time.perf_counter() - start)
     return features_cmi
 
 
@@ -173,8 +210,10 @@ def main():
     """Calculate CMI for given build."""
     parser = argparse.ArgumentParser()
     parser.add_argument('tp', help='Testplan for current build')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent JIRA requests')
 
     test_plans = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
     tp_id = test_plans.tp
     username, password = jira_api.get_username_password()
     test_plan = jira_api.get_issue_details(tp_id, username, password)
@@ -191,7 +230,7 @@ def main():
               f"Test Plan Label/Environment is empty for this test plan")
     deploy = 1
     box_index = 1
-    raw_cmi = calculate_cmi(tp_id, username, password)
+    raw_cmi = calculate_cmi(tp_id, username, password, workers=test_plans.workers)
     scaled_cmi = raw_cmi * 100 / sum(features_weights.values())
     cmi = deploy * box_index * scaled_cmi
     save_cmi_in_database(cmi, test_plan_label, build_type, build_no)
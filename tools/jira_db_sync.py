@@ -0,0 +1,420 @@
+# -*- coding: utf-8 -*-
+# !/usr/bin/python
+"""Incremental sync of test results of JIRA test plans into the reports database."""
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+
+# Basic algorithm
+# for each test plan:
+#     Fetch plan and test execution fields with JQL, only TEs updated since the watermark
+#     Fetch tests of those TEs concurrently
+#     Search DB once for all latest entries of the plan
+#     Fetch JIRA fields in bulk only for tests without a DB entry
+#     Send new, superseded and defect updates to the DB in bulk batches
+#     Save the watermark
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http import HTTPStatus
+
+import requests
+
+LOGGER = logging.getLogger("db_update.sync")
+
+JIRA_URL = "https://jts.seagate.com/"
+PLAN_FIELDS = {"platformType": "customfield_22982", "serverType": "customfield_22983",
+               "enclosureType": "customfield_22984", "buildType": "customfield_22981",
+               "buildNo": "customfield_22980"}
+TEST_FIELDS = ["summary", "labels", "customfield_21087", "customfield_22881",
+               "customfield_22882", "customfield_20981"]
+
+
+class SyncError(Exception):
+    """JIRA or DB request failed."""
+
+
+class JiraSource:
+    """JIRA and Xray requests of the sync, sharing one HTTP session."""
+
+    def __init__(self, username: str, password: str, jira_url: str = JIRA_URL,
+                 session=None, page_size: int = 100):
+        """
+        Args:
+            username (str): JIRA Username
+            password (str): JIRA Password
+            jira_url (str): JIRA server URL
+            session: requests.Session like object, a new session by default
+            page_size (int): issues per JQL page and tests per Xray page
+        """
+        self.jira_url = jira_url.rstrip("/") + "/"
+        self.session = session or requests.Session()
+        self.session.auth = (username, password)
+        self.page_size = page_size
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _get(self, path: str, params: dict):
+        """GET a JIRA REST path, return the decoded JSON."""
+        with self._lock:
+            self.requests += 1
+        response = self.session.request("GET", self.jira_url + path, params=params)
+        if response.status_code != HTTPStatus.OK:
+            raise SyncError(f"GET {path} {params} failed: {response.status_code} {response.text}")
+        return response.json()
+
+    def search(self, jql: str, fields: list, executor=None) -> list:
+        """
+        Issues matching a JQL query, pages after the first fetched concurrently.
+
+        Args:
+            jql (str): JQL query
+            fields (list): fields to return
+            executor: ThreadPoolExecutor fetching the pages
+
+        Returns:
+            list of {"key": ..., "fields": {...}}
+        """
+        params = {"jql": jql, "fields": ",".join(fields), "maxResults": self.page_size}
+        first = self._get("rest/api/2/search", dict(params, startAt=0))
+        starts = range(len(first["issues"]), first["total"], self.page_size)
+        pages = [lambda start=start: self._get("rest/api/2/search", dict(params, startAt=start))
+                 for start in starts]
+        if executor:
+            pages = list(executor.map(lambda page: page(), pages))
+        else:
+            pages = [page() for page in pages]
+        return first["issues"] + [issue for page in pages for issue in page["issues"]]
+
+    def issues(self, keys: list, fields: list, executor=None) -> dict:
+        """
+        Fields of many issues, one JQL query per page_size keys.
+
+        Returns:
+            dict of issue key to fields
+        """
+        chunks = [keys[start:start + self.page_size]
+                  for start in range(0, len(keys), self.page_size)]
+
+        def fetch(chunk):
+            return self.search(f"key in ({','.join(chunk)})", fields)
+        results = executor.map(fetch, chunks) if executor else map(fetch, chunks)
+        return {issue["key"]: issue["fields"] for chunk in results for issue in chunk}
+
+    def test_executions(self, test_plan: str) -> list:
+        """Test executions of a test plan as returned by Xray."""
+        return self._get(f"rest/raven/1.0/api/testplan/{test_plan}/testexecution", {})
+
+    def _pages(self, path: str, params: dict) -> list:
+        """Items of every page of an Xray list."""
+        items, page = [], 1
+        while True:
+            response = self._get(path, dict(params, limit=self.page_size, page=page))
+            if not response:
+                return items
+            items.extend(response)
+            page += 1
+
+    def tests(self, test_execution: str) -> list:
+        """Tests of a test execution with status, defects and comment, all Xray pages."""
+        return self._pages(f"rest/raven/1.0/api/testexec/{test_execution}/test",
+                           {"detailed": "true"})
+
+    def plan_tests(self, test_plan: str) -> list:
+        """Tests of a test plan with their latest status, all Xray pages."""
+        return self._pages(f"rest/raven/1.0/api/testplan/{test_plan}/test", {})
+
+
+class RestDb:
+    """Reports database REST server requests of the sync."""
+
+    def __init__(self, hostname: str, db_username: str, db_password: str, session=None):
+        """
+        Args:
+            hostname (str): REST server URL ending with reportsdb/
+            db_username (str): DB Username
+            db_password (str): DB Password
+            session: requests.Session like object, a new session by default
+        """
+        self.hostname = hostname
+        self.credentials = {"db_username": db_username, "db_password": db_password}
+        self.session = session or requests.Session()
+        self.requests = 0
+
+    def _request(self, request: str, endpoint: str, payload: dict):
+        """Send a request, return the response."""
+        self.requests += 1
+        return self.session.request(request, self.hostname + endpoint,
+                                    headers={'Content-Type': 'application/json'},
+                                    data=json.dumps(dict(payload, **self.credentials)))
+
+    def search(self, query: dict) -> list:
+        """Entries matching a query, empty when there is none."""
+        response = self._request("GET", "search", {"query": query})
+        if response.status_code == HTTPStatus.OK:
+            return response.json()["result"]
+        if response.status_code == HTTPStatus.NOT_FOUND and "No results" in response.text:
+            return []
+        raise SyncError(f"search {query} failed: {response.status_code} {response.text}")
+
+    def bulk(self, operations: list) -> dict:
+        """Apply insert and update operations in order in one request."""
+        response = self._request("POST", "bulk", {"operations": operations})
+        if response.status_code != HTTPStatus.OK:
+            raise SyncError(f"bulk of {len(operations)} operations failed: "
+                            f"{response.status_code} {response.text}")
+        return response.json()
+
+
+class Watermark:
+    """Last successful sync time of every test plan, kept in a JSON file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.times = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as state:
+                self.times = json.load(state)
+
+    def get(self, test_plan: str):
+        """Last sync time of a test plan, None when never synced."""
+        value = self.times.get(test_plan)
+        return datetime.fromisoformat(value) if value else None
+
+    def set(self, test_plan: str, value: datetime) -> None:
+        """Save the last sync time of a test plan."""
+        self.times[test_plan] = value.isoformat()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as state:
+            json.dump(self.times, state, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def _value(field) -> str:
+    """Value of a JIRA select field in raw JSON."""
+    return field["value"] if field else "None"
+
+
+class JiraDbSync:
+    """
+    Sync test results of JIRA test plans into the reports database.
+
+    Only test executions updated since the last sync of the plan are fetched. Existing latest
+    entries of the plan are looked up with one search, JIRA fields are fetched in bulk only for
+    tests without an entry, and only new or changed results are written, in bulk batches.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, source: JiraSource, database: RestDb, watermark: Watermark = None,
+                 workers: int = 8, batch_size: int = 500, overlap_minutes: int = 60):
+        """
+        Args:
+            source (JiraSource): JIRA requests
+            database (RestDb): reports database requests
+            watermark (Watermark): last sync times, every TE is fetched when None
+            workers (int): concurrent JIRA requests
+            batch_size (int): DB operations per bulk request
+            overlap_minutes (int): minutes re-read before the watermark for clock skew
+        """
+        self.source = source
+        self.database = database
+        self.watermark = watermark
+        self.workers = workers
+        self.batch_size = batch_size
+        self.overlap_minutes = overlap_minutes
+
+    def _updated_since(self, test_plan: str, full: bool) -> str:
+        """JQL clause selecting issues updated since the watermark, empty for a full sync."""
+        last = None if full or not self.watermark else self.watermark.get(test_plan)
+        if last is None:
+            return ""
+        minutes = int((datetime.now() - last).total_seconds() // 60) + self.overlap_minutes
+        # Relative dates do not depend on the time zone of the JIRA user.
+        return f' AND updated >= "-{minutes}m"'
+
+    @staticmethod
+    def _new_entry(test_plan: str, plan: dict, te_info: dict, test: dict,
+                   fields: dict) -> dict:
+        """DB entry of a test without a previous entry."""
+        return {
+            # Framework/Unknown data
+            "clientHostname": "", "noOfNodes": 0, "OSVersion": "", "nodesHostname": [""],
+            "testTags": [""], "testType": "", "testExecutionTime": 0, "healthCheckResult": "",
+            # Data from JIRA
+            "testStartTime": test["startedOn"],
+            "logPath": test.get("comment", "None"),
+            "testResult": test["status"],
+            "platformType": plan["platformType"],
+            "serverType": plan["serverType"],
+            "enclosureType": plan["enclosureType"],
+            "testName": fields["summary"],
+            "testID": test["key"],
+            "testIDLabels": fields["labels"],
+            "testPlanID": test_plan,
+            "testExecutionID": te_info["key"],
+            "testPlanLabel": plan["label"],
+            "testExecutionLabel": te_info["label"],
+            "testTeam": te_info["team"],
+            "buildType": plan["buildType"],
+            "buildNo": plan["buildNo"],
+            "executionType": _value(fields["customfield_20981"]),
+            "feature": _value(fields["customfield_21087"]),
+            "latest": True,
+            "drID": fields["customfield_22882"] or ["None"],
+            "featureID": fields["customfield_22881"] or ["None"],
+        }
+
+    @staticmethod
+    def _superseding_entry(plan: dict, test: dict, row: dict) -> dict:
+        """DB entry replacing a previous entry whose result changed."""
+        entry = {key: row[key] for key in (
+            "testTags", "testType", "testName", "testID", "testIDLabels", "testPlanID",
+            "testExecutionID", "testPlanLabel", "testExecutionLabel", "testTeam", "buildType",
+            "executionType", "feature", "drID", "featureID") if key in row}
+        entry.update({
+            # Unknown data
+            "clientHostname": "", "noOfNodes": 0, "OSVersion": "", "nodesHostname": [""],
+            "testExecutionTime": 0, "healthCheckResult": "",
+            # Data from JIRA
+            "testStartTime": test["startedOn"],
+            "logPath": test.get("comment", "None"),
+            "testResult": test["status"],
+            "platformType": plan["platformType"],
+            "serverType": plan["serverType"],
+            "enclosureType": plan["enclosureType"],
+            "buildNo": plan["buildNo"],
+            "latest": True,
+        })
+        entry.setdefault("drID", ["None"])
+        entry.setdefault("featureID", ["None"])
+        return entry
+
+    def _plan(self, test_plan: str) -> dict:
+        """Build fields and label of a test plan, SyncError if a required field is empty."""
+        fields = self.source.issues([test_plan], list(PLAN_FIELDS.values()) + ["labels"])
+        fields = fields[test_plan]
+        missing = [key for key, field in PLAN_FIELDS.items() if not fields.get(field)]
+        if missing:
+            LOGGER.error("Test Plan %s has %s field empty.", test_plan, ", ".join(missing))
+            raise SyncError(f"Test Plan {test_plan} has {', '.join(missing)} field empty")
+        plan = {key: fields[field][0] for key, field in PLAN_FIELDS.items()}
+        plan["label"] = fields["labels"][0] if fields["labels"] else "None"
+        return plan
+
+    def _test_executions(self, test_plan: str, full: bool, executor) -> list:
+        """Label and team of test executions of the plan updated since the watermark."""
+        keys = [te["key"] for te in self.source.test_executions(test_plan)]
+        if not keys:
+            return []
+        since = self._updated_since(test_plan, full)
+        issues = []
+        for start in range(0, len(keys), self.source.page_size):
+            chunk = keys[start:start + self.source.page_size]
+            issues.extend(self.source.search(f"key in ({','.join(chunk)}){since}",
+                                             ["labels", "components"], executor))
+        return [{"key": issue["key"],
+                 "label": issue["fields"]["labels"][0] if issue["fields"]["labels"] else "None",
+                 "team": issue["fields"]["components"][0]["name"]
+                 if issue["fields"]["components"] else "CortxQA"} for issue in issues]
+
+    # pylint: disable=too-many-locals
+    def _operations(self, test_plan: str, plan: dict, runs: list, rows: dict,
+                    executor) -> tuple:
+        """DB operations of the changed results and their counters."""
+        counters = {"tests": 0, "created": 0, "superseded": 0, "defects_updated": 0,
+                    "unchanged": 0, "todo": 0}
+        missing = sorted({test["key"] for te_info, test in runs if test["status"] != "TODO"
+                          and (test_plan, te_info["key"], test["key"]) not in rows})
+        fields = self.source.issues(missing, TEST_FIELDS, executor) if missing else {}
+        operations = []
+        for te_info, test in runs:
+            counters["tests"] += 1
+            if test["status"] == "TODO":
+                counters["todo"] += 1
+                continue
+            row_filter = {"buildNo": plan["buildNo"], "testExecutionID": te_info["key"],
+                          "testID": test["key"], "latest": True}
+            defects = sorted(defect["key"] for defect in test.get("defects", [])) \
+                if "fail" in test["status"].lower() else []
+            row = rows.get((test_plan, te_info["key"], test["key"]))
+            if row is None:
+                entry = self._new_entry(test_plan, plan, te_info, test, fields[test["key"]])
+                counters["created"] += 1
+            elif row["testResult"].lower() != test["status"].lower():
+                entry = self._superseding_entry(plan, test, row)
+                operations.append({"filter": row_filter, "update": {"$set": {"latest": False}}})
+                counters["superseded"] += 1
+            else:
+                if defects and sorted(row.get("issueIDs", [])) != defects:
+                    operations.append({"filter": row_filter,
+                                       "update": {"$set": {"issueIDs": defects}}})
+                    counters["defects_updated"] += 1
+                else:
+                    counters["unchanged"] += 1
+                continue
+            if defects:
+                entry["issueIDs"] = defects
+            elif "fail" in test["status"].lower():
+                LOGGER.warning("Failure is not mapped to any BUG in JIRA TEST - %s, Test "
+                               "Execution - %s, Test Plan = %s", test["key"], te_info["key"],
+                               test_plan)
+            operations.append({"insert": entry})
+        return operations, counters
+
+    def sync_plan(self, test_plan: str, full: bool = False) -> dict:
+        """
+        Sync one test plan.
+
+        Args:
+            test_plan (str): Test plan ID
+            full (bool): ignore the watermark and compare every test execution
+
+        Returns:
+            counters of tests, created, superseded, defects_updated, unchanged and requests
+        """
+        started = datetime.now()
+        jira_requests, db_requests = self.source.requests, self.database.requests
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="db_sync") as pool:
+            plan = self._plan(test_plan)
+            test_executions = self._test_executions(test_plan, full, pool)
+            tests = pool.map(lambda te_info: self.source.tests(te_info["key"]), test_executions)
+            runs = [(te_info, test) for te_info, te_tests in zip(test_executions, tests)
+                    for test in te_tests]
+            rows = {}
+            if runs:
+                rows = {(row["testPlanID"], row["testExecutionID"], row["testID"]): row
+                        for row in self.database.search({"testPlanID": test_plan,
+                                                         "buildNo": plan["buildNo"],
+                                                         "latest": True})}
+            operations, counters = self._operations(test_plan, plan, runs, rows, pool)
+        for start in range(0, len(operations), self.batch_size):
+            self.database.bulk(operations[start:start + self.batch_size])
+        if self.watermark:
+            self.watermark.set(test_plan, started)
+        counters.update(test_executions=len(test_executions), operations=len(operations),
+                        jira_requests=self.source.requests - jira_requests,
+                        db_requests=self.database.requests - db_requests,
+                        elapsed=(datetime.now() - started).total_seconds())
+        LOGGER.info("Synced test plan %s: %s", test_plan, counters)
+        return counters
+
+    def sync(self, test_plans: list, full: bool = False) -> dict:
+        """Sync test plans one after the other, return their counters by plan."""
+        return {test_plan: self.sync_plan(test_plan, full) for test_plan in test_plans}
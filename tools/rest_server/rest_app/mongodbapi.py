@@ -19,7 +19,9 @@
 
 from http import HTTPStatus
 
+from pymongo import InsertOne
 from pymongo import MongoClient
+from pymongo import UpdateMany
 from pymongo.errors import PyMongoError
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure
 
@@ -240,3 +242,31 @@ def aggregate(data: list,
         tests = pymongo_db[collection]
         result = tests.aggregate(data)
         return True, result
+
+
+@pymongo_exception
+def bulk_write(operations: list,
+               uri: str,
+               db_name: str,
+               collection: str
+               ) -> (bool, str):
+    """
+    Apply insert and update operations in order in one round trip
+
+    Args:
+        operations: {"insert": document} or {"filter": query, "update": update} items
+        uri: URI of MongoDB database
+        db_name: Database name
+        collection: Collection name in database
+
+    Returns:
+        On failure returns http status code and message
+        On success returns bulk write result
+    """
+    requests = [InsertOne(operation["insert"]) if "insert" in operation else
+                UpdateMany(operation["filter"], operation["update"]) for operation in operations]
+    with MongoClient(uri) as client:
+        pymongo_db = client[db_name]
+        tests = pymongo_db[collection]
+        result = tests.bulk_write(requests, ordered=True)
+        return True, result
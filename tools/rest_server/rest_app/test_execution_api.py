@@ -206,6 +206,46 @@ class Update(Resource):
         return flask.Response(status=update_result[1][0], response=update_result[1][1])
 
 
+@api.route("/bulk", doc={"description": "Insert and update test execution entries in order"})
+@api.response(200, "Success")
+@api.response(400, "Bad Request: Missing parameters. Do not retry.")
+@api.response(401, "Unauthorized: Wrong db_username/db_password.")
+@api.response(403, "Forbidden: User does not have permission for operation.")
+@api.response(503, "Service Unavailable: Unable to connect to mongoDB.")
+class Bulk(Resource):
+    """Bulk endpoint"""
+
+    @staticmethod
+    def post():
+        """Apply insert and update operations in one round trip."""
+        json_data = flask.request.get_json()
+        if not json_data:
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="Body is empty")
+        if not validations.check_user_pass(json_data):
+            return flask.Response(status=HTTPStatus.BAD_REQUEST,
+                                  response="db_username/db_password missing in request body")
+
+        # Validate operations, formats of inserted documents as in create
+        validate_result = validations.validate_bulk_request(json_data)
+        if not validate_result[0]:
+            return flask.Response(status=validate_result[1][0],
+                                  response=validate_result[1][1])
+
+        # Build MongoDB URI using username and password
+        uri = read_config.MONGODB_URI.format(quote_plus(json_data["db_username"]),
+                                             quote_plus(json_data["db_password"]),
+                                             read_config.db_hostname)
+
+        bulk_result = mongodbapi.bulk_write(json_data["operations"], uri, read_config.db_name,
+                                            read_config.results_collection)
+        if bulk_result[0]:
+            return flask.jsonify({"inserted": bulk_result[1].inserted_count,
+                                  "matched": bulk_result[1].matched_count,
+                                  "modified": bulk_result[1].modified_count})
+        return flask.Response(status=bulk_result[1][0], response=bulk_result[1][1])
+
+
 @api.route("/distinct", doc={"description": "Get distinct values for given key"})
 @api.response(200, "Success")
 @api.response(400, "Bad Request: Missing parameters. Do not retry.")
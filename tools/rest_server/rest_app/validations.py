@@ -278,6 +278,42 @@ def validate_update_request(json_data: dict) -> (bool, tuple):
     return True, None
 
 
+def validate_bulk_request(json_data: dict) -> (bool, tuple):
+    """
+    Validate format of operations in bulk request, insert documents are checked as in create
+
+    Args:
+        json_data: Data from request
+
+    Returns:
+        On failure returns http status code and message
+        On success returns True
+    """
+    if not isinstance(json_data.get("operations"), list) or not json_data["operations"]:
+        return False, (HTTPStatus.BAD_REQUEST, "Please provide operations key as list")
+    for operation in json_data["operations"]:
+        if not isinstance(operation, dict):
+            return False, (HTTPStatus.BAD_REQUEST, f"{operation} should be dictionary")
+        if "insert" in operation:
+            response = check_db_keys(operation["insert"])
+            if not response[0]:
+                return False, (HTTPStatus.BAD_REQUEST,
+                               f"Unknown fields given or mandatory fields missing "
+                               f"{response[1]}")
+            validate_result = validate_mandatory_db_fields(operation["insert"])
+            if not validate_result[0]:
+                return validate_result
+            operation["insert"]["testStartTime"] = validate_result[1]
+            validate_result = validate_extra_db_fields(operation["insert"])
+            if not validate_result[0]:
+                return validate_result
+        else:
+            validate_result = validate_update_request(operation)
+            if not validate_result[0]:
+                return validate_result
+    return True, None
+
+
 def check_add_cmi_request_fields(json_data: dict):
     """
     Check if all fields present in request
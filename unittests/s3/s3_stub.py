@@ -0,0 +1,372 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""In-memory stand-in for the subset of the boto3 S3 client used by the unittests."""
+
+import base64
+import threading
+import uuid
+from hashlib import md5
+
+from botocore.exceptions import ClientError
+
+from commons.utils import s3_utils
+
+
+def client_error(code: str, operation: str) -> ClientError:
+    """Build a botocore ClientError with the given error code."""
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+class S3StubClient:
+    """Thread safe in-memory S3 client with bucket and multipart upload support."""
+
+    def __init__(self, fail_parts: dict = None, page_size: int = 1000, throttle: dict = None):
+        """
+        Initialize the stub.
+
+        :param fail_parts: {part_number: count} of upload_part calls failing before success.
+        :param page_size: Max parts, objects or versions returned per list page.
+        :param throttle: {operation: count} of calls answered with SlowDown, the delete_objects
+            count throttles that many keys inside successful responses instead.
+        """
+        self.s3_client = self
+        self.objects = {}
+        self.versions = {}
+        self.buckets = {}
+        self.uploads = {}
+        self.fail_parts = dict(fail_parts or {})
+        self.page_size = page_size
+        self.throttle = dict(throttle or {})
+        self._seqs = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _count(self, operation: str) -> None:
+        """Count one call of the operation."""
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            if operation != "delete_objects" and self.throttle.get(operation):
+                self.throttle[operation] -= 1
+                raise client_error("SlowDown", operation)
+
+    def _versioned(self, bucket: str) -> bool:
+        """Whether versioning is enabled on the bucket, call with the lock held."""
+        return self.buckets.get(bucket, {}).get("Versioning") == "Enabled"
+
+    def _sync(self, bucket: str, key: str) -> None:
+        """Refresh the latest object view of a key, call with the lock held."""
+        versions = self.versions.get((bucket, key))
+        if not versions:
+            self.versions.pop((bucket, key), None)
+            self.objects.pop((bucket, key), None)
+        elif versions[-1]["Body"] is None:
+            self.objects.pop((bucket, key), None)
+        else:
+            self.objects[(bucket, key)] = versions[-1]["Body"]
+
+    def _add_version(self, bucket: str, key: str, body) -> str:
+        """Store a version or delete marker (body None), call with the lock held."""
+        versions = self.versions.setdefault((bucket, key), [])
+        if self._versioned(bucket):
+            version_id = uuid.uuid4().hex
+        else:
+            version_id = "null"
+            versions[:] = [ver for ver in versions if ver["VersionId"] != "null"]
+        self._seqs[(bucket, key, version_id)] = len(self._seqs)
+        versions.append({"VersionId": version_id, "Body": body})
+        self._sync(bucket, key)
+        return version_id
+
+    def _delete_key(self, bucket: str, key: str, version_id: str = None) -> None:
+        """Delete a version, or the key as an unversioned delete, call with the lock held."""
+        if version_id is None:
+            if self._versioned(bucket):
+                self._add_version(bucket, key, None)
+                return
+            version_id = "null"
+        versions = self.versions.get((bucket, key), [])
+        versions[:] = [ver for ver in versions if ver["VersionId"] != version_id]
+        self._sync(bucket, key)
+
+    def put_object(self, Bucket, Key, Body=b""):  # pylint: disable=invalid-name
+        """Store an object."""
+        self._count("put_object")
+        body = Body if isinstance(Body, bytes) else Body.read()
+        with self._lock:
+            version_id = self._add_version(Bucket, Key, body)
+        return {"ETag": f'"{md5(body).hexdigest()}"',  # nosec - s3 ETag based on md5.
+                "VersionId": version_id}
+
+    def delete_object(self, Bucket, Key, VersionId=None):  # pylint: disable=invalid-name
+        """Delete an object, adding a delete marker in a versioned bucket."""
+        self._count("delete_object")
+        with self._lock:
+            self._delete_key(Bucket, Key, VersionId)
+
+    def get_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        """Return the stored object body."""
+        self._count("get_object")
+        if (Bucket, Key) not in self.objects:
+            raise client_error("NoSuchKey", "GetObject")
+        return {"Body": self.objects[(Bucket, Key)]}
+
+    def head_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        """Return the size and ETag of a stored object."""
+        self._count("head_object")
+        if (Bucket, Key) not in self.objects:
+            raise client_error("404", "HeadObject")
+        body = self.objects[(Bucket, Key)]
+        return {"ContentLength": len(body),
+                "ETag": f'"{md5(body).hexdigest()}"'}  # nosec - s3 ETag based on md5.
+
+    def copy_object(self, Bucket, Key, CopySource):  # pylint: disable=invalid-name
+        """Copy an object server side, CopySource a dict or "bucket/key" string."""
+        self._count("copy_object")
+        if isinstance(CopySource, dict):
+            src_bucket, src_key = CopySource["Bucket"], CopySource["Key"]
+        else:
+            src_bucket, src_key = CopySource.lstrip("/").split("/", 1)
+        if (src_bucket, src_key) not in self.objects:
+            raise client_error("NoSuchKey", "CopyObject")
+        with self._lock:
+            body = self.objects[(src_bucket, src_key)]
+            self._add_version(Bucket, Key, body)
+        return {"CopyObjectResult": {
+            "ETag": f'"{md5(body).hexdigest()}"'}}  # nosec - s3 ETag based on md5.
+
+    def create_multipart_upload(self, Bucket, Key):  # pylint: disable=invalid-name
+        """Start a multipart upload."""
+        self._count("create_multipart_upload")
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self.uploads[upload_id] = {"Bucket": Bucket, "Key": Key, "Parts": {}}
+        return {"UploadId": upload_id, "Bucket": Bucket, "Key": Key}
+
+    def _store_part(self, upload_id, part_number, body):
+        """Store a part and return its ETag."""
+        if upload_id not in self.uploads:
+            raise client_error("NoSuchUpload", "UploadPart")
+        etag = f'"{md5(body).hexdigest()}"'  # nosec - s3 ETag based on md5.
+        with self._lock:
+            self.uploads[upload_id]["Parts"][part_number] = (etag, body)
+        return etag
+
+    def upload_part(self, Body, Bucket, Key, UploadId, PartNumber,  # pylint: disable=invalid-name
+                    ContentMD5=None):
+        """Upload one part, failing while fail_parts asks for it."""
+        # pylint: disable=unused-argument
+        self._count("upload_part")
+        with self._lock:
+            if self.fail_parts.get(PartNumber):
+                self.fail_parts[PartNumber] -= 1
+                raise client_error("InternalError", "UploadPart")
+        body = Body if isinstance(Body, bytes) else Body.read()
+        if ContentMD5 and base64.b64encode(md5(body).digest()).decode() != ContentMD5:
+            raise client_error("BadDigest", "UploadPart")  # nosec - s3 ETag based on md5.
+        return {"ETag": self._store_part(UploadId, PartNumber, body)}
+
+    def upload_part_copy(self, Bucket, Key, UploadId, PartNumber,  # pylint: disable=invalid-name
+                         CopySource, CopySourceRange=None):
+        """Copy a byte range of an object as a part."""
+        # pylint: disable=unused-argument
+        self._count("upload_part_copy")
+        src_bucket, src_key = CopySource.split("/", 1)
+        body = self.get_object(src_bucket, src_key)["Body"]
+        if CopySourceRange:
+            start, end = CopySourceRange.split("=")[1].split("-")
+            body = body[int(start):int(end) + 1]
+        return {"CopyPartResult": {"ETag": self._store_part(UploadId, PartNumber, body)}}
+
+    def list_parts(self, Bucket, Key, UploadId,  # pylint: disable=invalid-name
+                   PartNumberMarker=0):
+        """List one page of uploaded parts."""
+        # pylint: disable=unused-argument
+        self._count("list_parts")
+        parts = self.uploads[UploadId]["Parts"]
+        numbers = [num for num in sorted(parts) if num > PartNumberMarker]
+        page = numbers[:self.page_size]
+        response = {"Parts": [{"PartNumber": num, "ETag": parts[num][0],
+                               "Size": len(parts[num][1])} for num in page],
+                    "IsTruncated": len(numbers) > self.page_size}
+        if response["IsTruncated"]:
+            response["NextPartNumberMarker"] = page[-1]
+        return response
+
+    def drop_parts(self, upload_id: str, part_numbers: list) -> None:
+        """Lose uploaded parts, as an interrupted upload would."""
+        with self._lock:
+            for num in part_numbers:
+                self.uploads[upload_id]["Parts"].pop(num, None)
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId,  # pylint: disable=invalid-name
+                                  MultipartUpload):
+        """Assemble the listed parts into the object."""
+        self._count("complete_multipart_upload")
+        stored = self.uploads.pop(UploadId)["Parts"]
+        digests, body = {}, b""
+        for part in MultipartUpload["Parts"]:
+            etag, data = stored[part["PartNumber"]]
+            if etag != part["ETag"]:
+                raise client_error("InvalidPart", "CompleteMultipartUpload")
+            digests[part["PartNumber"]] = md5(data).digest()  # nosec - s3 ETag based on md5.
+            body += data
+        with self._lock:
+            self._add_version(Bucket, Key, body)
+        return {"Bucket": Bucket, "Key": Key,
+                "ETag": s3_utils.get_multipart_etag_from_digests(digests)}
+
+    def create_bucket(self, Bucket):  # pylint: disable=invalid-name
+        """Create an empty bucket."""
+        self._count("create_bucket")
+        with self._lock:
+            if Bucket in self.buckets:
+                raise client_error("BucketAlreadyOwnedByYou", "CreateBucket")
+            self.buckets[Bucket] = {"Policy": None, "ACL": "private", "Tags": [],
+                                    "Versioning": None}
+        return {"Location": f"/{Bucket}"}
+
+    def delete_bucket(self, Bucket):  # pylint: disable=invalid-name
+        """Delete an empty bucket."""
+        self._count("delete_bucket")
+        with self._lock:
+            if any(bucket == Bucket for bucket, _ in self.versions):
+                raise client_error("BucketNotEmpty", "DeleteBucket")
+            if self.buckets.pop(Bucket, None) is None:
+                raise client_error("NoSuchBucket", "DeleteBucket")
+
+    def list_buckets(self):
+        """List the buckets."""
+        self._count("list_buckets")
+        return {"Buckets": [{"Name": name} for name in sorted(self.buckets)]}
+
+    def _bucket(self, name, operation):
+        """Settings of an existing bucket."""
+        if name not in self.buckets:
+            raise client_error("NoSuchBucket", operation)
+        return self.buckets[name]
+
+    def put_bucket_policy(self, Bucket, Policy):  # pylint: disable=invalid-name
+        """Set the bucket policy."""
+        self._count("put_bucket_policy")
+        self._bucket(Bucket, "PutBucketPolicy")["Policy"] = Policy
+
+    def delete_bucket_policy(self, Bucket):  # pylint: disable=invalid-name
+        """Remove the bucket policy."""
+        self._count("delete_bucket_policy")
+        bucket = self._bucket(Bucket, "DeleteBucketPolicy")
+        if bucket["Policy"] is None:
+            raise client_error("NoSuchBucketPolicy", "DeleteBucketPolicy")
+        bucket["Policy"] = None
+
+    def put_bucket_acl(self, Bucket, ACL):  # pylint: disable=invalid-name
+        """Set a canned bucket ACL."""
+        self._count("put_bucket_acl")
+        self._bucket(Bucket, "PutBucketAcl")["ACL"] = ACL
+
+    def put_bucket_tagging(self, Bucket, Tagging):  # pylint: disable=invalid-name
+        """Set the bucket tags."""
+        self._count("put_bucket_tagging")
+        self._bucket(Bucket, "PutBucketTagging")["Tags"] = Tagging["TagSet"]
+
+    def delete_bucket_tagging(self, Bucket):  # pylint: disable=invalid-name
+        """Remove the bucket tags."""
+        self._count("delete_bucket_tagging")
+        self._bucket(Bucket, "DeleteBucketTagging")["Tags"] = []
+
+    def put_bucket_versioning(self, Bucket, VersioningConfiguration):  # pylint: disable=C0103
+        """Enable or suspend versioning."""
+        self._count("put_bucket_versioning")
+        self._bucket(Bucket, "PutBucketVersioning")["Versioning"] = \
+            VersioningConfiguration["Status"]
+
+    def get_bucket_versioning(self, Bucket):  # pylint: disable=invalid-name
+        """Versioning status, no Status key if never enabled."""
+        self._count("get_bucket_versioning")
+        status = self._bucket(Bucket, "GetBucketVersioning")["Versioning"]
+        return {"Status": status} if status else {}
+
+    def list_multipart_uploads(self, Bucket):  # pylint: disable=invalid-name
+        """List the uploads in progress."""
+        self._count("list_multipart_uploads")
+        return {"Uploads": [{"Key": upload["Key"], "UploadId": upload_id}
+                            for upload_id, upload in list(self.uploads.items())
+                            if upload["Bucket"] == Bucket]}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):  # pylint: disable=invalid-name
+        """Drop an upload in progress."""
+        # pylint: disable=unused-argument
+        self._count("abort_multipart_upload")
+        with self._lock:
+            self.uploads.pop(UploadId, None)
+
+    def list_object_versions(self, Bucket, KeyMarker=None,  # pylint: disable=invalid-name
+                             VersionIdMarker=None):
+        """List one page of versions and delete markers, newest first per key."""
+        self._count("list_object_versions")
+        with self._lock:
+            # Markers are positions, the marker version may have been deleted since.
+            after = self._seqs.get((Bucket, KeyMarker, VersionIdMarker), -1)
+            entries = [(key, ver["VersionId"], ver["Body"] is None)
+                       for (bucket, key), versions in sorted(self.versions.items())
+                       if bucket == Bucket for ver in reversed(versions)
+                       if KeyMarker is None or key > KeyMarker or
+                       (key == KeyMarker and
+                        self._seqs[(bucket, key, ver["VersionId"])] < after)]
+        page = entries[:self.page_size]
+        response = {"Versions": [{"Key": key, "VersionId": vid} for key, vid, marker in page
+                                 if not marker],
+                    "DeleteMarkers": [{"Key": key, "VersionId": vid}
+                                      for key, vid, marker in page if marker],
+                    "IsTruncated": len(entries) > self.page_size}
+        if response["IsTruncated"]:
+            response.update(NextKeyMarker=page[-1][0], NextVersionIdMarker=page[-1][1])
+        return response
+
+    def list_objects_v2(self, Bucket, ContinuationToken=None):  # pylint: disable=invalid-name
+        """List one page of the current objects."""
+        self._count("list_objects_v2")
+        with self._lock:
+            keys = sorted((key, len(body)) for (bucket, key), body in self.objects.items()
+                          if bucket == Bucket and (not ContinuationToken or
+                                                   key > ContinuationToken))
+        page = keys[:self.page_size]
+        response = {"Contents": [{"Key": key, "Size": size} for key, size in page],
+                    "KeyCount": len(page), "IsTruncated": len(keys) > self.page_size}
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1][0]
+        return response
+
+    def delete_objects(self, Bucket, Delete):  # pylint: disable=invalid-name
+        """Delete up to 1000 objects or versions, throttling keys as asked."""
+        self._count("delete_objects")
+        if len(Delete["Objects"]) > 1000:
+            raise client_error("MalformedXML", "DeleteObjects")
+        deleted, errors = [], []
+        with self._lock:
+            for obj in Delete["Objects"]:
+                if self.throttle.get("delete_objects"):
+                    self.throttle["delete_objects"] -= 1
+                    errors.append(dict(obj, Code="SlowDown", Message="SlowDown"))
+                    continue
+                self._delete_key(Bucket, obj["Key"], obj.get("VersionId"))
+                deleted.append(obj)
+        response = {"Deleted": deleted}
+        if errors:
+            response["Errors"] = errors
+        return response
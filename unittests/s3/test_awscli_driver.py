@@ -0,0 +1,99 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test in process aws CLI runs against a local S3 stub endpoint."""
+
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from libs.s3.awscli_driver import AWSCLI_DRIVER
+from libs.s3.awscli_driver import AwsCliDriver
+from libs.s3.awscli_driver import run_awscli_cmd
+from libs.s3.s3_awscli import AWScliS3api
+from libs.s3.s3_awscli import S3LibCmd
+from scripts.awscli_bench.s3_stub_server import S3StubServer
+
+
+class TestAwsCliDriver:
+    """Test aws CLI driver class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Start the stub endpoint with fake credentials."""
+        cls.log = logging.getLogger(__name__)
+        cls.saved_env = dict(os.environ)
+        os.environ.update(AWS_ACCESS_KEY_ID="test", AWS_SECRET_ACCESS_KEY="test",
+                          AWS_DEFAULT_REGION="us-east-1")
+        cls.server = S3StubServer().start()
+        cls.options = f" --endpoint-url {cls.server.endpoint_url}"
+        cls.root = tempfile.mkdtemp()
+        cls.file_path = os.path.join(cls.root, "upload.txt")
+        with open(cls.file_path, "w", encoding="utf-8") as upload:
+            upload.write("data" * 256)
+
+    @classmethod
+    def teardown_class(cls):
+        """Stop the stub endpoint."""
+        cls.server.stop()
+        shutil.rmtree(cls.root)
+        os.environ.clear()
+        os.environ.update(cls.saved_env)
+
+    def test_same_response_as_subprocess(self):
+        """Both modes return the same status and output, errors included."""
+        for in_process in (False, True):
+            bucket = f"same-{int(in_process)}"
+            resp = [run_awscli_cmd(cmd + self.options, chk_stderr=True, in_process=in_process)
+                    for cmd in (f"aws s3 mb s3://{bucket}", f"aws s3 ls s3://{bucket}",
+                                "aws s3 ls s3://missing-bucket")]
+            self.log.info("in_process=%s: %s", in_process, resp)
+            assert resp[0] == (True, f"b'make_bucket: {bucket}\\n'")
+            assert resp[1] == (True, "b''")
+            assert not resp[2][0] and "NoSuchBucket" in resp[2][1]
+
+    def test_awscli_libs_in_process(self):
+        """The awscli libs run in process when asked to and re-create the session on change."""
+        s3api = AWScliS3api(in_process=True)
+        s3cmd = S3LibCmd(in_process=True)
+        s3api.cmd_endpoint_options = s3cmd.cmd_endpoint_options = self.options
+        calls, sessions = AWSCLI_DRIVER.calls, AWSCLI_DRIVER.sessions
+        assert s3api.create_bucket("lib-bucket")[0]
+        assert s3cmd.upload_object_cli("lib-bucket", "obj1", self.file_path)[0]
+        status, output = s3api.run_cmd("aws s3 ls s3://lib-bucket" + self.options)
+        assert status and output.endswith(" 1024 obj1\\n'")
+        os.environ["AWS_SECRET_ACCESS_KEY"] = "rotated"
+        download = os.path.join(self.root, "download.txt")
+        assert s3api.download_object("lib-bucket", "obj1", download)[0]
+        assert AWSCLI_DRIVER.calls == calls + 4 and AWSCLI_DRIVER.sessions == sessions + 1
+        assert AwsCliDriver.args("aws s3 ls | grep bucket") is None
+        assert run_awscli_cmd("echo done", in_process=True) == (True, "b'done\\n'")
+
+    def test_concurrent_commands(self):
+        """Commands from several threads get their own output while the test keeps logging."""
+        def make_bucket(index):
+            self.log.info("Creating bucket %s", index)
+            print(f"noise {index}")
+            return run_awscli_cmd(f"aws s3 mb s3://thread-{index}{self.options}",
+                                  chk_stderr=True, in_process=True)
+
+        with ThreadPoolExecutor(4) as executor:
+            resp = list(executor.map(make_bucket, range(8)))
+        assert resp == [(True, f"b'make_bucket: thread-{index}\\n'") for index in range(8)]
@@ -0,0 +1,77 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the bucket purge engine against an in-memory versioned S3 client."""
+
+import logging
+
+from libs.s3.s3_purge_engine import BucketPurgeEngine
+from unittests.s3.s3_stub import S3StubClient
+
+
+class TestBucketPurgeEngine:
+    """Test bucket purge engine class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    @staticmethod
+    def versioned_bucket(client, bucket, keys=30):
+        """Bucket holding two versions and a delete marker per key plus uploads in progress."""
+        client.create_bucket(Bucket=bucket)
+        client.put_bucket_versioning(Bucket=bucket, VersioningConfiguration={"Status": "Enabled"})
+        for index in range(keys):
+            client.put_object(Bucket=bucket, Key=f"obj{index:03d}", Body=b"v1")
+            client.put_object(Bucket=bucket, Key=f"obj{index:03d}", Body=b"v2")
+            client.delete_object(Bucket=bucket, Key=f"obj{index:03d}")
+        for index in range(3):
+            client.create_multipart_upload(Bucket=bucket, Key=f"mpu{index}")
+
+    def test_purge_versioned_bucket_with_throttling(self):
+        """Versions, delete markers and uploads go away despite throttled requests."""
+        client = S3StubClient(page_size=7, throttle={"delete_objects": 5,
+                                                     "list_object_versions": 2,
+                                                     "abort_multipart_upload": 1})
+        self.versioned_bucket(client, "bkt")
+        client.put_object(Bucket="bkt", Key="live", Body=b"12345")
+        assert not client.objects.get(("bkt", "obj000"))
+        engine = BucketPurgeEngine(client, workers=4, batch_size=4, backoff=0.001)
+        assert engine.bucket_size("bkt") == 5
+        stats = engine.purge("bkt")
+        self.log.info("Stats: %s", stats)
+        assert stats["versions"] == 61 and stats["delete_markers"] == 30
+        assert stats["deleted"] == 91 and stats["uploads_aborted"] == 3
+        assert stats["retries"] >= 4 and stats["failed"] == 0 and stats["objects_per_sec"] > 0
+        assert not client.versions and not client.uploads and "bkt" not in client.buckets
+
+    def test_purge_many_buckets(self):
+        """Buckets are purged together, a failing bucket is reported without stopping others."""
+        client = S3StubClient(page_size=50)
+        for index in range(4):
+            self.versioned_bucket(client, f"bkt{index}", keys=100)
+        client.create_bucket(Bucket="plain")
+        for index in range(10):
+            client.put_object(Bucket="plain", Key=f"obj{index}", Body=b"data")
+        engine = BucketPurgeEngine(client, workers=8)
+        results = engine.purge_buckets(["bkt0", "bkt1", "bkt2", "bkt3", "plain", "missing"])
+        assert all(results[f"bkt{index}"]["deleted"] == 300 for index in range(4))
+        assert results["plain"]["deleted"] == 10 and results["plain"]["delete_markers"] == 0
+        assert isinstance(results["missing"], Exception)
+        assert not client.versions and not client.buckets
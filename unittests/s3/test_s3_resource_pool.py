@@ -0,0 +1,106 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the S3 account and bucket pool against in-memory S3 accounts."""
+
+import logging
+import threading
+import time
+
+from libs.s3.s3_resource_pool import S3ResourcePool
+from unittests.s3.s3_stub import S3StubClient
+
+
+class TestS3ResourcePool:
+    """Test S3 resource pool class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def setup_method(self):
+        """Fake account service, one in-memory S3 client per account."""
+        self.accounts = {}
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.create_latency = 0.05
+
+    def create_account(self, name, password):
+        """Create a fake account after the account service latency."""
+        time.sleep(self.create_latency)
+        with self.lock:
+            self.accounts[name] = password
+        return f"AK{name}", f"SK{name}"
+
+    def delete_account(self, name):
+        """Delete a fake account."""
+        with self.lock:
+            del self.accounts[name]
+
+    def client_factory(self, access_key, secret_key):  # pylint: disable=unused-argument
+        """In-memory S3 client of an account."""
+        return self.clients.setdefault(access_key, S3StubClient(page_size=2))
+
+    def pool(self, size, **kwargs):
+        """Pool using the fakes."""
+        return S3ResourcePool(size, create_account=self.create_account,
+                              delete_account=self.delete_account,
+                              client_factory=self.client_factory, password="pwd", **kwargs)
+
+    def test_parallel_start_and_close(self):
+        """Accounts and buckets are created in parallel and all deleted at close."""
+        start = time.perf_counter()
+        pool = self.pool(8, buckets_per_account=2, workers=8).start()
+        assert time.perf_counter() - start < 8 * self.create_latency / 2
+        assert len(self.accounts) == 8 and pool.stats()["free"] == 8
+        assert all(len(client.buckets) == 2 for client in self.clients.values())
+        stats = pool.close()
+        assert not self.accounts and stats["deleted"] == 8
+        assert all(not client.buckets for client in self.clients.values())
+
+    def test_lease_scrub_and_fallback(self):
+        """Returned accounts are scrubbed and reused, an empty pool creates on demand."""
+        pool = self.pool(1, buckets_per_account=2, workers=2)
+        pool.start()
+        account = pool.lease()
+        client = account.s3_obj.s3_client
+        bucket = account.buckets[0]
+        for index in range(5):
+            client.put_object(Bucket=bucket, Key=f"obj{index}", Body=b"data")
+        client.put_bucket_policy(Bucket=bucket, Policy="{}")
+        client.put_bucket_acl(Bucket=bucket, ACL="public-read")
+        client.put_bucket_versioning(Bucket=account.buckets[1],
+                                     VersioningConfiguration={"Status": "Enabled"})
+        client.create_bucket(Bucket="extra")
+        client.create_multipart_upload(Bucket=bucket, Key="mpu")
+        extra = pool.lease()
+        assert not extra.pooled and len(self.accounts) == 2
+        pool.release(account)
+        pool.release(extra)
+        pool.lease_timeout = 5
+        assert pool.lease() in (account, extra) and pool.lease() in (account, extra)
+        assert sorted(client.buckets) == sorted(account.buckets) and not client.objects
+        assert not client.uploads and client.buckets[bucket]["Policy"] is None
+        assert client.buckets[bucket]["ACL"] == "private"
+        assert client.get_bucket_versioning(Bucket=account.buckets[1]) == {}
+        stats = pool.close()
+        self.log.info("Stats: %s", stats)
+        assert stats["leases"] == 4 and stats["hits"] == 3 and stats["misses"] == 1
+        assert stats["hit_rate"] == 0.75 and stats["scrub"]["count"] == 2
+        assert not self.accounts
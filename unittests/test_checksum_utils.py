@@ -0,0 +1,92 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Test the in process checksum service against hashlib and the checksum tools."""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import zlib
+
+import pytest
+
+from commons.utils import checksum_utils
+from commons.utils.checksum_utils import ChecksumService
+from commons.utils.checksum_utils import hash_file
+from commons.utils.system_utils import calculate_checksum
+from commons.utils.system_utils import run_local_cmd
+
+
+class TestChecksumUtils:
+    """Test checksum utils class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Create test files."""
+        cls.log = logging.getLogger(__name__)
+        cls.root = tempfile.mkdtemp()
+        cls.paths = []
+        for index, size in enumerate((0, 1, 4095, 1 << 20, (5 << 20) + 3)):
+            path = os.path.join(cls.root, f"file{index}")
+            with open(path, "wb") as out_file:
+                out_file.write(os.urandom(size))
+            cls.paths.append(path)
+
+    @classmethod
+    def teardown_class(cls):
+        """Remove test files."""
+        shutil.rmtree(cls.root)
+
+    def test_digests_match_tools(self):
+        """One pass digests equal hashlib and zlib, calculate_checksum prints as the tools do."""
+        for path in self.paths:
+            with open(path, "rb") as in_file:
+                data = in_file.read()
+            digests = hash_file(path, ("md5", "SHA-256", "crc32"), buf_size=1 << 20)
+            assert digests == {"md5": hashlib.md5(data).hexdigest(),  # nosec
+                               "SHA-256": hashlib.sha256(data).hexdigest(),
+                               "crc32": f"{zlib.crc32(data):08x}"}
+        if checksum_utils.crc32c_lib is None:
+            with pytest.raises(ValueError):
+                hash_file(self.paths[0], ("crc32c",))
+        path = self.paths[3]
+        assert calculate_checksum(path) == \
+            run_local_cmd(f"openssl md5 -binary {path} | base64")
+        assert calculate_checksum(path, binary_bz64=False, options="-t") == \
+            run_local_cmd(f"md5sum -t {path}")
+        assert calculate_checksum(path, binary_bz64=False, options="-b") == \
+            run_local_cmd(f"md5sum -b {path}")
+        assert calculate_checksum(path, hash_algo="SHA-512") == run_local_cmd(f"sha512sum {path}")
+        assert calculate_checksum(path, filter_resp=True)[1] == \
+            run_local_cmd(f"openssl md5 -binary {path} | base64")[1][2:-3]
+
+    def test_parallel_digests_and_cache(self, monkeypatch):
+        """Files are digested by the pool, cached until modified."""
+        monkeypatch.setattr(checksum_utils, "RACY_SECONDS", 0)
+        service = ChecksumService(workers=2, batch_bytes=1 << 20)
+        expected = {path: hash_file(path, ("md5", "sha1")) for path in self.paths}
+        assert service.digest_files(self.paths, ("md5", "sha1")) == expected
+        assert service.stats() == {"hits": 0, "misses": 5, "cached": 5}
+        assert service.digest_files(self.paths, ("md5",)) == \
+            {path: {"md5": digests["md5"]} for path, digests in expected.items()}
+        assert service.stats()["hits"] == 5
+        with open(self.paths[1], "wb") as out_file:
+            out_file.write(b"x")
+        assert service.digest(self.paths[1]) == {"md5": hashlib.md5(b"x").hexdigest()}  # nosec
+        assert service.stats() == {"hits": 5, "misses": 6, "cached": 6}
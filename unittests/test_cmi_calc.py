@@ -0,0 +1,142 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the Code Maturity Index calculation against a fake JIRA server."""
+
+import importlib
+import logging
+import os
+import re
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+FEATURES = ["High Availability", "Security", "Performance", "Data Integrity"]
+PRIORITIES = ["Blocker", "Critical", "Major", "Minor", "Trivial"]
+
+
+def response(data):
+    """requests.Response stand-in."""
+    return SimpleNamespace(status_code=200, json=lambda: data, text="")
+
+
+class FakeJira:
+    """Xray test plan and JQL search endpoints over an in-memory test plan."""
+
+    def __init__(self):
+        self.auth = None
+        self.calls = 0
+        self.tests = {}
+        self.runs = defaultdict(list)
+        self.priorities = {}
+        for index in range(120):
+            status = ("PASS", "PASS", "FAIL", "BLOCKED", "ABORTED", "TODO")[index % 6]
+            self.tests[f"TEST-{index}"] = (FEATURES[index % 4] if index % 10 else None, status)
+            for te_index in range(1 + index % 2):
+                run = {"key": f"TEST-{index}", "status": status}
+                if status == "FAIL" and index % 4:
+                    # Failures share a few defects, one failure has no defect key at all.
+                    run["defects"] = [{"key": f"BUG-{index % 7}"}, {"key": f"BUG-{index % 3}"}]
+                elif status == "FAIL" and index != 8:
+                    run["defects"] = []
+                self.runs[f"TE-{te_index}"].append(run)
+        for index in range(7):
+            self.priorities[f"BUG-{index}"] = PRIORITIES[index % 5]
+
+    def request(self, method, url, params=None, **_):
+        """Serve a GET request."""
+        assert method == "GET"
+        self.calls += 1
+        start = (params.get("page", 1) - 1) * params.get("limit", 0)
+        if url.endswith("testplan/TP-1/test"):
+            tests = [{"key": key, "latestStatus": status}
+                     for key, (_, status) in self.tests.items()]
+            return response(tests[start:start + params["limit"]])
+        if url.endswith("testplan/TP-1/testexecution"):
+            return response([{"key": key} for key in sorted(self.runs)])
+        test_execution = re.search(r"testexec/([^/]+)/test$", url)
+        if test_execution:
+            return response(self.runs[test_execution.group(1)][start:start + params["limit"]])
+        if params["jql"] == "issue in testPlanTests('TP-1')":
+            issues = [{"key": key, "fields": {"customfield_21087":
+                                              {"value": feature} if feature else None}}
+                      for key, (feature, _) in self.tests.items()]
+        else:
+            keys = re.match(r"key in \(([^)]*)\)$", params["jql"]).group(1).split(",")
+            issues = [{"key": key, "fields": {"priority": {"name": self.priorities[key]}}}
+                      for key in keys]
+        return response({"issues": issues[params["startAt"]:
+                                          params["startAt"] + params["maxResults"]],
+                         "total": len(issues)})
+
+    def legacy_cmi(self, features_weights, bug_priority_weights) -> tuple:
+        """CMI and JIRA calls of the per feature, per defect algorithm."""
+        failed = [run for runs in self.runs.values() for run in runs if run["status"] == "FAIL"]
+        features_cmi, calls = 0, 1 + len(self.runs)
+        for feature, feature_weight in features_weights.items():
+            calls += 4
+            tests = {key: status for key, (test_feature, status) in self.tests.items()
+                     if test_feature == feature}
+            count = defaultdict(int)
+            for run in failed:
+                if run["key"] in tests and "defects" in run:
+                    for defect in run["defects"]:
+                        calls += 1
+                        count[self.priorities[defect["key"]]] += 1
+            failed_tests = sum(count[name] * weight for name, weight
+                               in bug_priority_weights.items())
+            statuses = list(tests.values())
+            scaled = statuses.count("PASS") - failed_tests - statuses.count("BLOCKED") - \
+                statuses.count("ABORTED")
+            if tests:
+                features_cmi += feature_weight / len(tests) * scaled
+        return features_cmi, calls
+
+
+class TestCmiCalc:
+    """Test CMI calculation class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    @pytest.fixture
+    def cmi_calc(self, monkeypatch):
+        """cmi_calc imported as the script is run, from the tools directory."""
+        monkeypatch.chdir(TOOLS_DIR)
+        monkeypatch.syspath_prepend(TOOLS_DIR)
+        return importlib.import_module("cmi_calc")
+
+    def test_cmi_matches_formula_with_fewer_calls(self, cmi_calc):
+        """Bulk fetched tests and deduplicated defects give the same CMI in fewer calls."""
+        fake = FakeJira()
+        source = cmi_calc.JiraSource("jira", "secret", session=fake, page_size=25)
+        cmi = cmi_calc.calculate_cmi("TP-1", "jira", "secret", source=source, workers=4)
+        expected, legacy_calls = fake.legacy_cmi(cmi_calc.features_weights,
+                                                 cmi_calc.bug_priority_weights)
+        self.log.info("CMI %s in %s calls, legacy %s calls", cmi, fake.calls, legacy_calls)
+        assert cmi == pytest.approx(expected) and cmi != 0
+        assert fake.calls < legacy_calls / 3
+        resolver = cmi_calc.DefectPriorityResolver(source)
+        assert resolver.resolve(["BUG-1", "BUG-2"]) == {"BUG-1": "Critical", "BUG-2": "Major"}
+        calls = fake.calls
+        assert resolver.resolve(["BUG-2", "BUG-1"])["BUG-1"] == "Critical"
+        assert fake.calls == calls
@@ -0,0 +1,102 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test bulk CSM/IAM user provisioning against a local CSM stub."""
+
+import logging
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from email.utils import format_datetime
+
+from config import CMN_CFG
+from config import CSM_REST_CFG
+from libs.csm.rest.csm_rest_bulk_ops import RestBulkOps
+from libs.csm.rest.csm_rest_bulk_ops import retry_after_seconds
+from libs.csm.rest.csm_rest_test_lib import LOGIN_TOKEN_CACHE
+from scripts.csm_rest_bench.csm_stub_server import CsmStubServer
+
+
+class TestCsmRestBulkOps:
+    """Test bulk CSM/IAM user provisioning class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Start a throttling CSM stub and point the REST config at it."""
+        cls.log = logging.getLogger(__name__)
+        cls.saved_cfg = {key: CSM_REST_CFG.get(key)
+                         for key in ("mgmt_vip", "port", "secure", "csm_admin_user")}
+        cls.saved_nodes = CMN_CFG.get("nodes")
+        cls.server = CsmStubServer(throttle_every=7).start()
+        cls.server.rest_config(CSM_REST_CFG)
+        # The stub accepts any credentials, the target config may not be there.
+        CSM_REST_CFG["csm_admin_user"] = {"username": "admin", "password": "Seagate@1"}
+        CMN_CFG["nodes"] = []
+        LOGIN_TOKEN_CACHE.invalidate()
+        cls.bulk_obj = RestBulkOps()
+        cls.bulk_obj.bulk_backoff = 0.01
+
+    @classmethod
+    def teardown_class(cls):
+        """Stop the stub and restore the REST config."""
+        cls.bulk_obj.restapi.close()
+        cls.server.stop()
+        CSM_REST_CFG.update(cls.saved_cfg)
+        if cls.saved_nodes is None:
+            CMN_CFG.pop("nodes", None)
+        else:
+            CMN_CFG["nodes"] = cls.saved_nodes
+        LOGIN_TOKEN_CACHE.invalidate()
+
+    def test_bulk_csm_user_lifecycle(self):
+        """Test create, list and delete of CSM users with throttling retries."""
+        result = self.bulk_obj.bulk_create_csm_users(50, workers=8)
+        assert result.ok, result.failed
+        stats = result.stats()
+        self.log.info("Create stats: %s", stats)
+        assert stats["succeeded"] == 50 and stats["retries"] > 0
+        assert stats["latency"]["count"] == 50 + stats["retries"]
+        listed = self.bulk_obj.bulk_list_users("csm")
+        assert set(result.succeeded).issubset(listed)
+        result = self.bulk_obj.bulk_delete_csm_users(list(result.succeeded), workers=8)
+        assert result.ok, result.failed
+        assert not set(result.succeeded) & set(self.bulk_obj.bulk_list_users("csm"))
+
+    def test_bulk_delete_missing_users(self):
+        """Test deleting unknown users is reported as failures, not raised."""
+        result = self.bulk_obj.bulk_delete_csm_users(["missing1", "missing2"])
+        assert sorted(result.failed) == ["missing1", "missing2"]
+        assert result.failed["missing1"].status_code == 404
+
+    def test_bulk_rate_limit(self):
+        """Test the rate limit bounds the request rate."""
+        result = self.bulk_obj.bulk_create_csm_users(10, workers=10, rate=50)
+        assert result.ok, result.failed
+        assert result.elapsed >= (10 + result.retries - 1) / 50.0 * 0.9
+        self.bulk_obj.bulk_delete_csm_users(list(result.succeeded))
+
+    def test_retry_after_header(self):
+        """Test Retry-After given in seconds or as HTTP-date, bounded by the maximum."""
+        assert retry_after_seconds("2", 0.5) == 2.0
+        assert retry_after_seconds(None, 0.5) == 0.5
+        assert retry_after_seconds("3600", 0.5, maximum=60) == 60
+        assert retry_after_seconds("soon", 0.5) == 0.5
+        date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        assert 25 <= retry_after_seconds(date, 0.5) <= 30
+        past = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=30), usegmt=True)
+        assert retry_after_seconds(past, 0.5) == 0.0
@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test CSM REST session reuse and login token caching against a local CSM stub."""
+
+import logging
+import time
+
+from commons.constants import Rest as const
+from config import CMN_CFG
+from config import CSM_REST_CFG
+from libs.csm.rest.csm_rest_core_lib import LoginTokenCache
+from libs.csm.rest.csm_rest_core_lib import RestClient
+from libs.csm.rest.csm_rest_test_lib import LOGIN_TOKEN_CACHE
+from libs.csm.rest.csm_rest_test_lib import RestTestLib
+from scripts.csm_rest_bench.csm_stub_server import CsmStubServer
+
+
+class UsersRestLib(RestTestLib):
+    """RestTestLib with one authenticated call counting its attempts."""
+
+    calls = 0
+
+    @RestTestLib.authenticate_and_login
+    def list_users(self):
+        """List CSM users with the login token header."""
+        self.calls += 1
+        return self.restapi.rest_call("get", endpoint="/api/v2/system/users",
+                                      headers=self.headers)
+
+
+class TestCsmRestSession:
+    """Test CSM REST session and token cache class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Start the CSM stub server."""
+        cls.log = logging.getLogger(__name__)
+        cls.server = CsmStubServer().start()
+        cls.config = cls.server.rest_config({"jsonfile": "rest_call.json"})
+
+    @classmethod
+    def teardown_class(cls):
+        """Stop the CSM stub server."""
+        cls.server.stop()
+
+    def test_token_cache_expiry_and_invalidation(self):
+        """Test token cache hit, payload change, expiry and invalidation."""
+        cache = LoginTokenCache(ttl=0.2)
+        cache.put("admin", "payload", "token1")
+        assert cache.get("admin", "payload") == "token1"
+        assert cache.get("admin", "new password") is None
+        cache.invalidate(token="token1")
+        assert cache.get("admin", "payload") is None
+        cache.put("admin", "payload", "token2")
+        time.sleep(0.3)
+        assert cache.get("admin", "payload") is None
+        assert (cache.hits, cache.misses) == (1, 3)
+
+    def test_disabled_token_cache(self):
+        """Test ttl 0 never serves a token."""
+        cache = LoginTokenCache(ttl=0)
+        cache.put("admin", "payload", "token")
+        assert cache.get("admin", "payload") is None
+
+    def test_session_reuses_connection(self):
+        """Test pooled session sends all calls over one connection."""
+        connections = self.server.state.counters["connections"]
+        client = RestClient(dict(self.config, session_reuse=True))
+        resp = client.rest_call("post", endpoint="/api/v2/login",
+                                data='{"username": "admin", "password": "pw"}')
+        assert resp.status_code == const.SUCCESS_STATUS
+        headers = {"Authorization": resp.headers["Authorization"]}
+        for _ in range(5):
+            resp = client.rest_call("get", endpoint="/api/v2/system/users", headers=headers)
+            assert resp.status_code == const.SUCCESS_STATUS
+        client.close()
+        assert self.server.state.counters["connections"] - connections == 1
+
+    def test_stale_token_rejected(self):
+        """Test a logged out token is answered with 401 so callers can refresh it."""
+        client = RestClient(dict(self.config))
+        resp = client.rest_call("post", endpoint="/api/v2/login",
+                                data='{"username": "admin", "password": "pw"}')
+        headers = {"Authorization": resp.headers["Authorization"]}
+        client.rest_call("post", endpoint="/api/v2/logout", headers=headers)
+        resp = client.rest_call("get", endpoint="/api/v2/system/users", headers=headers)
+        assert resp.status_code == const.UNAUTHORIZED
+        client.close()
+
+    def test_expired_cached_token_relogin(self):
+        """Test a cached token rejected with 401 triggers one login and one retry."""
+        saved_cfg = {key: CSM_REST_CFG.get(key)
+                     for key in ("mgmt_vip", "port", "secure", "csm_admin_user")}
+        saved_nodes = CMN_CFG.get("nodes")
+        self.server.rest_config(CSM_REST_CFG)
+        CSM_REST_CFG["csm_admin_user"] = {"username": "admin", "password": "Seagate@1"}
+        CMN_CFG["nodes"] = []
+        LOGIN_TOKEN_CACHE.invalidate()
+        try:
+            rest_obj = UsersRestLib()
+            assert rest_obj.list_users().status_code == const.SUCCESS_STATUS
+            assert rest_obj.calls == 1
+            # The session expires on the server while its token is still cached.
+            with self.server.state.lock:
+                self.server.state.sessions.clear()
+            logins = self.server.state.counters["login"]
+            resp = rest_obj.list_users()
+            assert resp.status_code == const.SUCCESS_STATUS
+            assert self.server.state.counters["login"] - logins == 1
+            assert rest_obj.calls == 3
+            rest_obj.restapi.close()
+        finally:
+            CSM_REST_CFG.update(saved_cfg)
+            if saved_nodes is None:
+                CMN_CFG.pop("nodes", None)
+            else:
+                CMN_CFG["nodes"] = saved_nodes
+            LOGIN_TOKEN_CACHE.invalidate()
@@ -0,0 +1,104 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the DTM overwrite and copy engines."""
+
+import logging
+import threading
+import time
+
+from libs.dtm.dtm_bulk_ops import CopyEngine
+from libs.dtm.dtm_bulk_ops import OverwriteEngine
+from libs.dtm.dtm_bulk_ops import PayloadPool
+from unittests.s3.s3_stub import S3StubClient
+
+
+class SlowS3Client(S3StubClient):
+    """Stub taking some time per request and corrupting the copies of chosen keys."""
+
+    def __init__(self, latency: float = 0.01):
+        super().__init__()
+        self.latency = latency
+        self.corrupt_copies = set()
+
+    def put_object(self, Bucket, Key, Body=b""):  # pylint: disable=invalid-name
+        time.sleep(self.latency)
+        return super().put_object(Bucket=Bucket, Key=Key, Body=Body)
+
+    def copy_object(self, Bucket, Key, CopySource):  # pylint: disable=invalid-name
+        time.sleep(self.latency)
+        resp = super().copy_object(Bucket=Bucket, Key=Key, CopySource=CopySource)
+        if Key in self.corrupt_copies:
+            resp["CopyObjectResult"]["ETag"] = '"0"'
+        return resp
+
+
+class TestDTMBulkOps:
+    """Test DTM bulk operation engines class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_overwrite_engine(self):
+        """Keys are overwritten in parallel, every write verified, a stop event ends the run."""
+        client = SlowS3Client()
+        client.create_bucket(Bucket="dtm-bkt")
+        payloads = PayloadPool(max_size=64 * 1024, count=4, min_size=1024)
+        assert len({digest for _, digest in payloads.payloads}) == 4
+        keys = [f"obj-{num}" for num in range(8)]
+        start = time.monotonic()
+        report = OverwriteEngine(client, "dtm-bkt", payloads, iterations=5,
+                                 workers=8).run(keys)
+        elapsed = time.monotonic() - start
+        self.log.info("Report: %s", report)
+        assert report["completed"] == 8 and not report["failed"] and not report["mismatches"]
+        assert report["ops"]["put"]["latency"]["count"] == 40
+        assert report["ops"]["get"]["latency"]["count"] == 40
+        assert sum(report["ops"]["put"]["histogram"].values()) == 40
+        # 40 puts of 10ms on 8 workers.
+        assert elapsed < 0.4 * 0.75
+
+        stop = threading.Event()
+        engine = OverwriteEngine(client, "dtm-bkt", payloads, iterations=1000, workers=4,
+                                 stop_event=stop).start(keys)
+        time.sleep(0.1)
+        stop.set()
+        start = time.monotonic()
+        report = engine.wait()
+        assert time.monotonic() - start < 0.1
+        assert report["stopped"] and report["pending"] == 4 and not report["failed"]
+        assert report["ops"]["put"]["latency"]["count"] < 4000
+
+    def test_copy_engine(self):
+        """Copies are verified against their source, failures and mismatches reported."""
+        client = SlowS3Client()
+        for bucket in ("src-bkt", "dst-bkt"):
+            client.create_bucket(Bucket=bucket)
+        keys = [f"obj-{num}" for num in range(20)]
+        for key in keys:
+            client.put_object(Bucket="src-bkt", Key=key, Body=key.encode() * 100)
+        client.corrupt_copies.add("obj-3")
+        start = time.monotonic()
+        report = CopyEngine(client, "src-bkt", "dst-bkt", workers=10).run(keys + ["missing"])
+        assert time.monotonic() - start < 0.21 * 0.5
+        assert report["completed"] == 20 and list(report["failed"]) == ["missing"]
+        assert [mismatch["key"] for mismatch in report["mismatches"]] == ["obj-3"]
+        assert report["ops"]["copy"]["latency"]["count"] == 20
+        assert client.objects[("dst-bkt", "obj-7")] == b"obj-7" * 100
@@ -0,0 +1,108 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the streaming DTM workload and its unavailability report."""
+
+import logging
+import threading
+import time
+
+from botocore.exceptions import EndpointConnectionError
+
+from libs.dtm.dtm_workload import CHECKSUM_MISMATCH
+from libs.dtm.dtm_workload import READ
+from libs.dtm.dtm_workload import WRITE
+from libs.dtm.dtm_workload import StreamingWorkload
+from unittests.s3.s3_stub import S3StubClient
+
+
+class RestartingS3Client(S3StubClient):
+    """Stub failing every request while its server process is down."""
+
+    def __init__(self, latency: float = 0.002):
+        super().__init__()
+        self.latency = latency
+        self.down = threading.Event()
+        self.corrupt = set()
+
+    def _serve(self):
+        time.sleep(self.latency)
+        if self.down.is_set():
+            raise EndpointConnectionError(endpoint_url="http://s3.seagate.com")
+
+    def put_object(self, Bucket, Key, Body=b""):  # pylint: disable=invalid-name
+        self._serve()
+        return super().put_object(Bucket=Bucket, Key=Key, Body=Body)
+
+    def get_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        self._serve()
+        resp = super().get_object(Bucket=Bucket, Key=Key)
+        if Key in self.corrupt:
+            resp = {"Body": b"x" + resp["Body"][1:]}
+        return resp
+
+
+class TestDTMWorkload:
+    """Test streaming DTM workload class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_unavailability_window(self):
+        """The report measures the outage of a restart from the requests around it."""
+        client = RestartingS3Client()
+        client.create_bucket(Bucket="dtm-bkt")
+        workload = StreamingWorkload(client, "dtm-bkt", writers=2, readers=2, obj_size=1024,
+                                     keys_per_writer=5)
+        with workload:
+            time.sleep(0.3)
+            workload.timeline.mark("kill m0d", fault=True)
+            client.down.set()
+            time.sleep(0.5)
+            client.down.clear()
+            workload.timeline.mark("m0d restarted")
+            time.sleep(0.3)
+            report = workload.stop()
+        self.log.info("Report: %s", report)
+        fault = report["faults"][0]
+        assert report["mismatches"] == [] and report["objects"]
+        assert set(report["errors"]) == {"EndpointConnectionError"}
+        assert fault["errors"] == report["errors"]["EndpointConnectionError"]
+        assert 0.45 <= fault["unavailable_seconds"] <= 0.7
+        # Requests in flight at the kill fail too, the first one started before it.
+        assert fault["time"] - 0.05 < fault["first_error"] < fault["time"] + 0.05
+        assert fault["recovery_seconds"] - fault["events"][0]["time"] + fault["time"] < 0.2
+        assert fault["by_op"][READ]["errors"] and fault["by_op"][WRITE]["errors"]
+        assert fault["latency"]["before"]["count"] and fault["latency"]["after"]["count"]
+
+    def test_checksum_verification(self):
+        """Reads racing overwrites pass, corrupted data is reported as it is read."""
+        client = RestartingS3Client(latency=0)
+        client.create_bucket(Bucket="dtm-bkt")
+        workload = StreamingWorkload(client, "dtm-bkt", writers=2, readers=4, obj_size=256,
+                                     keys_per_writer=2)
+        with workload:
+            time.sleep(0.5)
+            assert not workload.mismatches
+            client.corrupt.add("dtm-stream-w0-0")
+            time.sleep(0.3)
+            report = workload.stop()
+        assert report["errors"].get(CHECKSUM_MISMATCH)
+        assert {mismatch["key"] for mismatch in report["mismatches"]} == {"dtm-stream-w0-0"}
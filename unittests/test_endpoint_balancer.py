@@ -0,0 +1,124 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the endpoint balancer policies and its routing of boto3 requests."""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import boto3
+from botocore.config import Config
+
+from commons.utils.endpoint_balancer import EndpointBalancer
+
+LIST_BUCKETS = (b'<?xml version="1.0" encoding="UTF-8"?><ListAllMyBucketsResult>'
+                b'<Owner><ID>id</ID></Owner><Buckets></Buckets></ListAllMyBucketsResult>')
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    """Answer ListBuckets after the delay of the server, or fail when it is broken."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serve a request."""
+        server = self.server
+        with server.lock:
+            server.requests += 1
+        time.sleep(server.delay)
+        status, body = (500, b"") if server.broken else (200, LIST_BUCKETS)
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Keep the test output quiet."""
+
+
+class TestEndpointBalancer:
+    """Test endpoint balancer class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_policies_ejection_and_fork(self):
+        """Requests avoid busy and slow endpoints, failing endpoints are ejected for a while."""
+        balancer = EndpointBalancer(["n1", "n2", "n3"], policy="least_outstanding",
+                                    eject_after=2, eject_seconds=0.2)
+        tokens = [balancer.acquire() for _ in range(6)]
+        assert [stats["in_flight"] for stats in balancer.stats()] == [2, 2, 2]
+        for token in tokens:
+            balancer.release(token)
+        round_robin = EndpointBalancer(["n1", "n2", "n3"], policy="round_robin")
+        assert sorted(round_robin.choose() for _ in range(3)) == ["n1", "n2", "n3"]
+        p2c = EndpointBalancer(["fast1", "fast2", "slow"], policy="p2c")
+        for endpoint in p2c.endpoints:
+            endpoint.ewma = 0.5 if endpoint.host == "slow" else 0.01
+        assert "slow" not in {p2c.choose() for _ in range(200)}
+        for _ in range(2):
+            balancer.release((balancer.endpoints[0], time.monotonic(), os.getpid()), False)
+        assert balancer.stats()[0]["ejected"] and balancer.stats()[0]["ejections"] == 1
+        assert "n1" not in {balancer.choose() for _ in range(50)}
+        time.sleep(0.25)
+        balancer.endpoints[1].in_flight = balancer.endpoints[2].in_flight = 5
+        assert balancer.choose() == "n1"
+        balancer.endpoints[0].in_flight = 3
+        pid = os.fork()
+        if pid == 0:
+            # The child must not inherit in flight requests nor a held lock.
+            os._exit(0 if balancer.stats()[0]["in_flight"] == 0 and balancer.choose() else 1)
+        assert os.waitpid(pid, 0)[1] == 0
+
+    def test_boto3_requests_routed_by_latency(self):
+        """A boto3 client spreads requests to the fast nodes and ejects the broken one."""
+        servers = []
+        for delay, broken in ((0.005, False), (0.005, False), (0.1, False), (0.0, True)):
+            server = ThreadingHTTPServer(("127.0.0.1", 0), FakeS3Handler)
+            server.delay, server.broken, server.requests = delay, broken, 0
+            server.lock = threading.Lock()
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            servers.append(server)
+        try:
+            hosts = [f"127.0.0.1:{server.server_address[1]}" for server in servers]
+            balancer = EndpointBalancer(hosts, policy="p2c", eject_seconds=60)
+            client = boto3.client("s3", endpoint_url="http://s3.seagate.com",
+                                  aws_access_key_id="AK", aws_secret_access_key="SK",
+                                  region_name="us-east-1",
+                                  config=Config(retries={"max_attempts": 4, "mode": "standard"}))
+            balancer.attach(client)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: client.list_buckets(), range(200)))
+            report = balancer.distribution()
+            stats = {stats["host"]: stats for stats in balancer.stats()}
+            self.log.info("Stats %s", stats)
+            assert all(resp["ResponseMetadata"]["HTTPStatusCode"] == 200 for resp in results)
+            assert sum(server.requests for server in servers) == report["requests"]
+            assert stats[hosts[3]]["ejected"] and stats[hosts[3]]["errors"] <= 4
+            assert stats[hosts[2]]["requests"] < stats[hosts[0]]["requests"] / 2
+            assert all(stats["in_flight"] == 0 for stats in stats.values())
+            assert report["hot_spot_ratio"] > 1
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
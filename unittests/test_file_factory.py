@@ -0,0 +1,113 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the cached in process test file factory."""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+
+from commons.utils import file_factory
+from commons.utils import system_utils
+from commons.utils.file_factory import FileFactory
+
+MB = 1024 ** 2
+
+
+def md5sum(path):
+    """md5 hexdigest of a file."""
+    with open(path, "rb") as in_file:
+        return hashlib.md5(in_file.read()).hexdigest()
+
+
+class TestFileFactory:
+    """Test file factory class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def setup_method(self):
+        """Create a factory with a 4 MB budget."""
+        self.root = tempfile.mkdtemp()
+        self.factory = FileFactory(os.path.join(self.root, "cache"), budget=4 * MB)
+
+    def teardown_method(self):
+        """Remove the directories."""
+        shutil.rmtree(self.root)
+
+    def test_cached_copies_and_checksums(self):
+        """Same key gives the same content in private files, the checksum matches the data."""
+        first, checksum = self.factory.create(os.path.join(self.root, "a"), MB + 5, seed=7)
+        second, checksum2 = self.factory.create(os.path.join(self.root, "b"), MB + 5, seed=7)
+        other, checksum3 = self.factory.create(os.path.join(self.root, "c"), MB + 5, seed=8)
+        assert checksum == checksum2 == md5sum(first) and checksum3 == md5sum(other) != checksum
+        assert os.stat(first).st_ino != os.stat(second).st_ino and os.path.getsize(first) == MB + 5
+        assert os.access(first, os.W_OK) and os.stat(first).st_nlink == 1
+        zero, zero_sum = self.factory.create(os.path.join(self.root, "z"), 3 * MB, pattern="zero")
+        assert zero_sum == md5sum(zero) == hashlib.md5(bytes(3 * MB)).hexdigest()
+        assert os.stat(zero).st_blocks * 512 < MB
+        unique, unique_sum = self.factory.create(os.path.join(self.root, "u"), MB, seed=None)
+        assert unique_sum == md5sum(unique) != self.factory.create(unique, MB, seed=None)[1]
+        stats = self.factory.stats()
+        self.log.info("Stats: %s", stats)
+        assert stats["hits"] == 1 and stats["misses"] == 2
+
+    def test_modified_entry_regenerated(self):
+        """Writing a handed out file leaves the entry intact, a modified entry is regenerated."""
+        path, checksum = self.factory.create(os.path.join(self.root, "a"), MB, seed=1)
+        with open(path, "r+b") as out_file:
+            out_file.write(b"corrupt")
+        path, checksum2 = self.factory.create(os.path.join(self.root, "b"), MB, seed=1)
+        assert checksum2 == checksum == md5sum(path)
+        assert self.factory.stats()["misses"] == 1
+        cached = os.path.join(self.factory.cache_dir, self.factory.key(MB, 1, "random"))
+        os.chmod(cached, 0o644)
+        with open(cached, "r+b") as out_file:
+            out_file.write(b"corrupt")
+        path, checksum3 = self.factory.create(os.path.join(self.root, "c"), MB, seed=1)
+        assert checksum3 == checksum == md5sum(path)
+        assert self.factory.stats()["misses"] == 2
+
+    def test_eviction_by_budget(self):
+        """Least recently used random entries are evicted beyond the disk budget."""
+        for seed in range(3):
+            self.factory.get(MB + MB // 2, seed)
+        self.factory.get(MB + MB // 2, 1)
+        self.factory.get(MB + MB // 2, 3)
+        assert sorted(name for name in os.listdir(self.factory.cache_dir)
+                      if not name.endswith(".md5")) == ["random-1572864-1", "random-1572864-3"]
+        assert self.factory.stats()["evictions"] == 2
+
+    def test_create_file(self):
+        """create_file serves /dev/zero and seeded /dev/urandom files from the session cache."""
+        file_factory.FILE_FACTORY = self.factory
+        try:
+            path = os.path.join(self.root, "obj")
+            resp = system_utils.create_file(path, 2, b_size="1M")
+            assert resp == (True, hashlib.md5(bytes(2 * MB)).hexdigest())
+            first = system_utils.create_file(path, 1, "/dev/urandom", "1M")[1]
+            assert system_utils.create_file(path, 1, "/dev/urandom", "1M")[1] != first
+            seeded = system_utils.create_file(path, 1024, "/dev/urandom", "1K", seed=3)[1]
+            assert system_utils.create_file(path, 1, "/dev/urandom", "1M", seed=3)[1] == seeded
+            assert md5sum(path) == seeded
+        finally:
+            file_factory.FILE_FACTORY = None
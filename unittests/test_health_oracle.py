@@ -0,0 +1,91 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the cached per test cluster health verdict."""
+
+import logging
+
+import pytest
+
+from commons.utils.health_oracle import HealthOracle
+
+
+class TestHealthOracle:
+    """Test health oracle class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def setup_method(self):
+        """Count the checks run by a fresh oracle."""
+        self.calls = {"health": 0, "storage": 0}
+        self.used_percent = 50.0
+        self.healthy = True
+        self.oracle = HealthOracle(self._fake_health, self._fake_storage, ttl=60,
+                                   storage_threshold=98.0, storage_margin=5.0,
+                                   destructive_marks=("ha", "disk_failure"))
+
+    def _fake_health(self):
+        """Fake cluster health check."""
+        self.calls["health"] += 1
+        assert self.healthy, "cluster unhealthy"
+
+    def _fake_storage(self):
+        """Fake storage check."""
+        self.calls["storage"] += 1
+        assert self.used_percent < 98.0, "cluster full"
+        return self.used_percent
+
+    def test_verdict_cached_and_invalidated(self):
+        """Checks are skipped within the TTL and re-run after destructive or failed tests."""
+        assert self.oracle.check() and not self.oracle.check()
+        self.oracle.observe(["s3", "regression"])
+        assert not self.oracle.check()
+        self.oracle.observe(["ha", "lc"])
+        assert self.oracle.check()
+        self.oracle.observe(["s3"], failed=True)
+        assert self.oracle.check()
+        stats = self.oracle.stats()
+        self.log.info("Stats: %s", stats)
+        assert self.calls == {"health": 3, "storage": 3}
+        assert stats["performed"] == 3 and stats["skipped"] == 2 and stats["invalidated"] == 2
+
+    def test_storage_rechecked_near_threshold(self):
+        """Storage is skipped while far from the threshold and re-checked once close to it."""
+        self.oracle.ttl = 0
+        self.oracle.check()
+        self.oracle.check()
+        assert self.calls == {"health": 2, "storage": 1}
+        self.oracle.storage_at -= 3600
+        self.used_percent = 95.0
+        self.oracle.check()
+        self.oracle.check()
+        assert self.calls == {"health": 4, "storage": 3}
+        self.used_percent = 99.0
+        self.oracle.check()
+        assert self.oracle.used_percent is None and self.oracle.stats()["storage_skipped"] == 1
+
+    def test_unhealthy_not_cached(self):
+        """An unhealthy cluster raises and is checked again next time."""
+        self.healthy = False
+        for _ in range(2):
+            with pytest.raises(AssertionError):
+                self.oracle.check()
+        assert self.calls == {"health": 2, "storage": 0}
@@ -0,0 +1,196 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the incremental JIRA to reports DB sync against fake JIRA and DB servers."""
+
+import json
+import logging
+import re
+from datetime import datetime
+from datetime import timedelta
+from types import SimpleNamespace
+
+from tools.jira_db_sync import JiraDbSync
+from tools.jira_db_sync import JiraSource
+from tools.jira_db_sync import RestDb
+from tools.jira_db_sync import SyncError
+from tools.jira_db_sync import Watermark
+
+
+def response(data, status=200, text=""):
+    """requests.Response stand-in."""
+    return SimpleNamespace(status_code=status, json=lambda: data, text=text)
+
+
+class FakeJira:
+    """JIRA search and Xray test plan endpoints over in-memory issues."""
+
+    def __init__(self):
+        self.auth = None
+        self.issues = {}
+        self.plans = {}
+        self.runs = {}
+        self.calls = []
+
+    def request(self, method, url, params=None, **_):
+        """Serve a GET request."""
+        assert method == "GET"
+        self.calls.append(url)
+        if url.endswith("rest/api/2/search"):
+            match = re.match(r"key in \(([^)]*)\)(?: AND updated >= \"-(\d+)m\")?$",
+                             params["jql"])
+            since = datetime.now() - timedelta(minutes=int(match.group(2))) \
+                if match.group(2) else None
+            fields = params["fields"].split(",")
+            issues = [{"key": key, "fields": {field: self.issues[key]["fields"].get(field)
+                                              for field in fields}}
+                      for key in match.group(1).split(",")
+                      if since is None or self.issues[key]["updated"] >= since]
+            start = params["startAt"]
+            return response({"issues": issues[start:start + params["maxResults"]],
+                             "total": len(issues)})
+        plan = re.search(r"testplan/([^/]+)/testexecution$", url)
+        if plan:
+            return response([{"key": key} for key in self.plans[plan.group(1)]])
+        test_execution = re.search(r"testexec/([^/]+)/test$", url).group(1)
+        start = (params["page"] - 1) * params["limit"]
+        return response(self.runs[test_execution][start:start + params["limit"]])
+
+
+class FakeReportsDb:
+    """Search and bulk endpoints of the reports DB REST server over in-memory documents."""
+
+    def __init__(self):
+        self.documents = []
+        self.calls = []
+
+    @staticmethod
+    def matches(document, query):
+        """Document has every field of the query."""
+        return all(document.get(key) == value for key, value in query.items())
+
+    def request(self, method, url, data=None, **_):
+        """Serve a request."""
+        endpoint = url.rsplit("/", 1)[-1]
+        payload = json.loads(data)
+        assert payload.pop("db_username") == "user" and payload.pop("db_password") == "pass"
+        self.calls.append(endpoint)
+        if endpoint == "search" and method == "GET":
+            found = [dict(doc) for doc in self.documents if self.matches(doc, payload["query"])]
+            return response({"result": found}) if found else \
+                response(None, 404, f"No results for query {payload}")
+        assert endpoint == "bulk" and method == "POST"
+        for operation in payload["operations"]:
+            if "insert" in operation:
+                self.documents.append(dict(operation["insert"]))
+                continue
+            for document in self.documents:
+                if self.matches(document, operation["filter"]):
+                    document.update(operation["update"]["$set"])
+        return response({"inserted": 0, "matched": 0, "modified": 0})
+
+
+class TestJiraDbSync:
+    """Test JIRA DB sync class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    @staticmethod
+    def jira_fixture():
+        """Test plan with two test executions of ten tests each."""
+        jira = FakeJira()
+        old = datetime.now() - timedelta(days=2)
+        jira.issues["TP-1"] = {"updated": old, "fields": {
+            "customfield_22980": ["515"], "customfield_22981": ["main"],
+            "customfield_22982": ["VM"], "customfield_22983": ["HPE"],
+            "customfield_22984": ["5U84"], "labels": ["Regular"]}}
+        jira.plans["TP-1"] = ["TE-1", "TE-2"]
+        for index, te_key in enumerate(("TE-1", "TE-2")):
+            jira.issues[te_key] = {"updated": old, "fields": {
+                "labels": [f"label{index}"], "components": [{"name": "CFT"}]}}
+            jira.runs[te_key] = []
+            for test in range(10):
+                key = f"TEST-{index * 10 + test}"
+                status = "TODO" if key == "TEST-0" else "FAIL" if test % 4 == 1 else "PASS"
+                jira.runs[te_key].append({
+                    "key": key, "status": status, "startedOn": "2022-05-01T10:00:00",
+                    "defects": [{"key": f"BUG-{test}"}] if status == "FAIL" else []})
+                jira.issues[key] = {"updated": old, "fields": {
+                    "summary": f"test {key}", "labels": ["io"],
+                    "customfield_21087": {"value": "S3 Operations"},
+                    "customfield_22881": None, "customfield_22882": ["DR-1"],
+                    "customfield_20981": {"value": "Automated"}}}
+        return jira
+
+    def test_full_then_incremental_sync(self, tmp_path):
+        """A rerun only reads updated test executions and only writes changed results."""
+        jira, reports_db = self.jira_fixture(), FakeReportsDb()
+        sync = JiraDbSync(JiraSource("jira", "secret", session=jira, page_size=4),
+                          RestDb("http://reports/reportsdb/", "user", "pass", reports_db),
+                          Watermark(str(tmp_path / "state.json")), workers=4, batch_size=8)
+        first = sync.sync_plan("TP-1")
+        self.log.info("First sync %s", first)
+        assert first["created"] == 19 and first["todo"] == 1 and first["test_executions"] == 2
+        assert reports_db.calls == ["search", "bulk", "bulk", "bulk"]
+        assert len(reports_db.documents) == 19
+        failed = [doc for doc in reports_db.documents if doc["testResult"] == "FAIL"]
+        assert failed and all(doc["issueIDs"] for doc in failed)
+        assert reports_db.documents[0]["testPlanLabel"] == "Regular"
+        assert reports_db.documents[0]["executionType"] == "Automated"
+
+        # TEST-11 fails now, TEST-15 stays failed with another bug, TE-1 is not touched.
+        jira.runs["TE-2"][1]["defects"] = [{"key": "BUG-9"}]
+        jira.runs["TE-2"][4].update(status="FAIL", defects=[{"key": "BUG-4"}])
+        jira.issues["TE-2"]["updated"] = datetime.now()
+        jira.calls.clear()
+        reports_db.calls.clear()
+        second = JiraDbSync(sync.source, sync.database,
+                            Watermark(str(tmp_path / "state.json"))).sync_plan("TP-1")
+        self.log.info("Second sync %s", second)
+        assert second["test_executions"] == 1 and second["tests"] == 10
+        assert second["superseded"] == 1 and second["defects_updated"] == 1
+        assert second["unchanged"] == 8 and second["created"] == 0
+        assert not [url for url in jira.calls if "TE-1" in url]
+        assert reports_db.calls == ["search", "bulk"]
+        test_14 = [doc for doc in reports_db.documents if doc["testID"] == "TEST-14"]
+        assert [doc["latest"] for doc in test_14] == [False, True]
+        assert test_14[1]["issueIDs"] == ["BUG-4"] and test_14[1]["testName"] == "test TEST-14"
+        assert [doc["issueIDs"] for doc in reports_db.documents
+                if doc["testID"] == "TEST-11"] == [["BUG-9"]]
+
+        reports_db.calls.clear()
+        third = sync.sync_plan("TP-1")
+        assert third["operations"] == 0 and reports_db.calls == ["search"]
+        assert sync.sync_plan("TP-1", full=True)["unchanged"] == 19
+
+    def test_plan_missing_fields(self, tmp_path):
+        """A test plan with empty required fields is rejected before anything is written."""
+        jira, reports_db = self.jira_fixture(), FakeReportsDb()
+        jira.issues["TP-1"]["fields"].update(customfield_22980=None, customfield_22983=[])
+        sync = JiraDbSync(JiraSource("jira", "secret", session=jira),
+                          RestDb("http://reports/reportsdb/", "user", "pass", reports_db),
+                          Watermark(str(tmp_path / "state.json")))
+        try:
+            sync.sync_plan("TP-1")
+            assert False, "missing fields not detected"
+        except SyncError as error:
+            assert "serverType, buildNo" in str(error)
+        assert not reports_db.calls and not reports_db.documents
@@ -0,0 +1,141 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Test time window extraction of plain, rotated and gzip logs through a local SFTP stand-in."""
+
+import gzip
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from datetime import timedelta
+from types import SimpleNamespace
+
+from commons.helpers.log_extractor import LogWindowExtractor
+from commons.helpers.log_extractor import RemoteLogCollector
+
+BASE = datetime(2022, 12, 12, 10, 0, 0)
+
+
+class LocalSFTP:
+    """paramiko SFTPClient subset reading local files, counting opened files."""
+
+    def __init__(self, root):
+        self.root = root
+        self.opened = []
+
+    def listdir_attr(self, path):
+        """Attributes of the directory entries."""
+        return [SimpleNamespace(filename=entry.name, st_size=entry.stat().st_size,
+                                st_mtime=entry.stat().st_mtime)
+                for entry in os.scandir(self.root + path)]
+
+    def open(self, path, mode):
+        """Open a file."""
+        self.opened.append(path)
+        return open(self.root + path, mode)
+
+
+def log_lines(start, count, fmt="%Y-%m-%d %H:%M:%S"):
+    """One line per second with a stack trace line every 10 lines."""
+    lines = []
+    for index in range(count):
+        lines.append(f"{(start + timedelta(seconds=index)).strftime(fmt)} INFO event "
+                     f"{index} {'x' * 60}\n")
+        if index % 10 == 0:
+            lines.append(f"    trace of event {index}\n")
+    return "".join(lines).encode()
+
+
+class TestLogExtractor:
+    """Test log extractor class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def setup_method(self):
+        """Work directory."""
+        self.root = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        """Remove the work directory."""
+        shutil.rmtree(self.root)
+
+    def test_binary_search_window(self):
+        """Only the window is read, continuation lines stay with their entry."""
+        data = log_lines(BASE, 20000)
+        start, end = BASE + timedelta(seconds=10000), BASE + timedelta(seconds=10099)
+        expected = [line + b"\n" for line in data.split(b"\n")
+                    if line.startswith(b"    trace") or
+                    line and start <= datetime.strptime(line[:19].decode(),
+                                                        "%Y-%m-%d %H:%M:%S") <= end]
+        expected = b"".join(expected[expected.index(
+            f"{start:%Y-%m-%d %H:%M:%S}".encode() + b" INFO event 10000 " + b"x" * 60 + b"\n"):
+            expected.index(b"    trace of event 10100\n")])
+        out = io.BytesIO()
+        stats = LogWindowExtractor(start, end, chunk_size=16384).extract(
+            io.BytesIO(data), len(data), out)
+        self.log.info("Stats: %s", stats)
+        assert out.getvalue() == expected and stats["lines"] == 110
+        assert stats["transferred"] < len(data) / 10
+        for window in ((BASE - timedelta(days=1), BASE), (BASE + timedelta(days=1),) * 2):
+            out = io.BytesIO()
+            stats = LogWindowExtractor(*window).extract(io.BytesIO(data), len(data), out)
+            assert stats["lines"] == (2 if window[1] == BASE else 0)
+        syslog = log_lines(BASE, 100, "%b %d %H:%M:%S")
+        out = io.BytesIO()
+        LogWindowExtractor(BASE + timedelta(seconds=98), BASE + timedelta(hours=1)).extract(
+            io.BytesIO(syslog), len(syslog), out)
+        assert out.getvalue().startswith(b"Dec 12 10:01:38 INFO event 98 ")
+
+    def test_collect_rotated_logs_from_nodes(self):
+        """Rotated and gzip copies are extracted per node, old rotations are not opened."""
+        sessions = {}
+        for node in ("node1", "node2"):
+            log_dir = os.path.join(self.root, node, "var", "log")
+            os.makedirs(log_dir)
+            for name, offset in (("s3.log.2.gz", -20000), ("s3.log.1.gz", -10000),
+                                 ("s3.log", 0)):
+                data = log_lines(BASE + timedelta(seconds=offset), 10000)
+                with (gzip.open if name.endswith(".gz") else open)(
+                        os.path.join(log_dir, name), "wb") as log_file:
+                    log_file.write(data)
+                stamp = (BASE + timedelta(seconds=offset + 9999)).timestamp()
+                os.utime(os.path.join(log_dir, name), (stamp, stamp))
+            sessions[node] = LocalSFTP(os.path.join(self.root, node))
+        dest = os.path.join(self.root, "out")
+        window = LogWindowExtractor(BASE - timedelta(seconds=50), BASE + timedelta(seconds=5),
+                                    chunk_size=65536)
+        collector = RemoteLogCollector(
+            window, dest, session_factory=lambda node, user, pwd: (sessions[node], time.time))
+        report = collector.collect([("node1", "root", "pwd"), ("node2", "root", "pwd")],
+                                   ["/var/log/s3.log"], prefix="TEST-1_")
+        self.log.info("Report: %s", {key: report[key] for key in ("size", "transferred")})
+        assert sessions["node1"].opened == ["/var/log/s3.log.1.gz", "/var/log/s3.log"]
+        assert sorted(os.listdir(dest)) == sorted(f"TEST-1_{node}_s3.log{ext}" for node in
+                                                  ("node1", "node2") for ext in ("", ".1"))
+        lines = {stats["path"]: stats["lines"] for stats in report["files"]
+                 if stats["node"] == "node1"}
+        assert lines == {"/var/log/s3.log.1.gz": 55, "/var/log/s3.log": 7}
+        with open(os.path.join(dest, "TEST-1_node2_s3.log")) as log_file:
+            assert log_file.readline().startswith("2022-12-12 10:00:00 INFO event 0 ")
+        assert report["saved_pct"] > 50
@@ -0,0 +1,111 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test background batched log shipping against a local directory target."""
+
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+
+from commons.utils.log_shipper import LogShipper
+
+
+class TestLogShipper:
+    """Test log shipper class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def setup_method(self):
+        """Create local logs and an empty target directory."""
+        self.root = tempfile.mkdtemp()
+        self.target = os.path.join(self.root, "nfs")
+        self.logs = []
+        for index in range(5):
+            path = os.path.join(self.root, f"TEST-{index}.log")
+            with open(path, "w", encoding="utf-8") as log_file:
+                log_file.write(f"test {index} log line\n" * 1000)
+            self.logs.append(path)
+
+    def teardown_method(self):
+        """Remove the directories."""
+        shutil.rmtree(self.root)
+
+    def archive_members(self, url):
+        """Read the member pointed to by a log URL."""
+        archive, member = url.split("#")
+        with tarfile.open(archive) as tar:
+            return tar.extractfile(member).read().decode()
+
+    def test_batches_and_urls(self):
+        """Logs are shipped in batch archives reachable through the returned URLs."""
+        shipper = LogShipper(self.target, run_path="run1", batch_size=2, batch_seconds=60)
+        start = time.perf_counter()
+        urls = [shipper.submit(path, f"TEST-{index}/ts", remove=index == 4)
+                for index, path in enumerate(self.logs)]
+        assert time.perf_counter() - start < 0.5
+        assert shipper.flush(timeout=10)
+        stats = shipper.close(timeout=10)
+        self.log.info("Stats: %s", stats)
+        assert sorted(os.listdir(os.path.join(self.target, "run1"))) == \
+            ["batch-00000.tar.gz", "batch-00001.tar.gz", "batch-00002.tar.gz"]
+        for index, url in enumerate(urls):
+            assert self.archive_members(url) == f"test {index} log line\n" * 1000
+        assert not os.path.exists(self.logs[4]) and os.path.exists(self.logs[3])
+        assert stats["shipped"] == 5 and stats["batches"] == 3 and stats["queue_depth"] == 0
+        assert 0 < stats["bytes_shipped"] < sum(os.path.getsize(path) for path in self.logs[:4])
+        assert stats["latency"]["count"] == 5
+
+    def test_retry_then_fallback(self):
+        """Failed transfers are retried and kept in the fallback directory when exhausted."""
+        attempts = []
+
+        def flaky_mount():
+            attempts.append(1)
+            return len(attempts) > 2, "nfs unreachable"
+
+        fallback = os.path.join(self.root, "local")
+        shipper = LogShipper(self.target, run_path="run2", mount=flaky_mount,
+                             fallback_dir=fallback, batch_size=10, batch_seconds=0.1,
+                             max_retries=3, backoff=0.01)
+        url = shipper.submit(self.logs[0], "TEST-0")
+        assert shipper.flush(timeout=10)
+        assert self.archive_members(url).startswith("test 0")
+        shipper.mount = lambda: (False, "nfs down")
+        shipper.submit(self.logs[1], "TEST-1")
+        stats = shipper.close(timeout=10)
+        assert os.listdir(os.path.join(fallback, "run2")) == ["batch-00001.tar.gz"]
+        assert stats["retries"] == 5 and stats["failed_batches"] == 1 and stats["shipped"] == 1
+
+    def test_close_timeout(self):
+        """Close returns after the timeout while a slow transfer keeps running."""
+        shipper = LogShipper(self.target, run_path="run3",
+                             mount=lambda: time.sleep(1) or (True, ""),
+                             batch_size=1, batch_seconds=0.1)
+        shipper.submit(self.logs[0], "TEST-0")
+        start = time.perf_counter()
+        shipper.close(timeout=0.2)
+        assert time.perf_counter() - start < 0.9
+        assert os.path.isdir(shipper._staging)  # pylint: disable=protected-access
+        shipper._thread.join(5)  # pylint: disable=protected-access
+        assert os.listdir(os.path.join(self.target, "run3")) == ["batch-00000.tar.gz"]
@@ -0,0 +1,112 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Test the parallel m0crate matrix runner."""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from libs.motr.m0crate_matrix import M0crateMatrixRunner
+from libs.motr.m0crate_matrix import check_regression
+from libs.motr.m0crate_matrix import expand_matrix
+from libs.motr.m0crate_matrix import format_summary
+from libs.motr.m0crate_matrix import load_baseline
+from libs.motr.m0crate_matrix import parse_m0crate_output
+from libs.motr.m0crate_matrix import save_results
+
+TEMPLATE = os.path.join(os.getcwd(), "config/motr/m0crate_workload_batch_test_22954_file1.yaml")
+
+
+class FakeMotr:
+    """MotrCoreK8s of two client pods whose m0crate takes 0.2s and prints its figures."""
+
+    def __init__(self):
+        self.node_pod_dict = {"node1": "cortx-client-1", "node2": "cortx-client-2"}
+        self.master_node, self.master_uname, self.master_passwd = "master", "root", "pass"
+        self.profile_fid = "0x7000000000000001:0xfe"
+        self.dd_files = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def get_cortx_node_endpoints(self, node):
+        """Endpoints of the client of a node."""
+        return {"hax_ep": f"inet:tcp:{node}@2001",
+                "motr_client": [{"fid": "0x7200000000000001:0x2b", "ep": f"inet:tcp:{node}@5001"}]}
+
+    def dd_cmd(self, b_size, count, file, node):
+        """Record the source files created."""
+        self.dd_files.append((node, file, b_size, count))
+
+    def m0crate_exec(self, local_file_path, remote_file_path, pod_node, node_obj=None):
+        """Run for 0.2s, with a bandwidth depending on the block size."""
+        assert os.path.exists(local_file_path) and node_obj is not None
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.2)
+        with self._lock:
+            self.active -= 1
+        with open(local_file_path) as workload:
+            bsize = "1m" if "BLOCK_SIZE: 1m" in workload.read() else "4k"
+        return "", (f"Total ops: 10\nTotal time: 0.2 sec\nAvg op time: 20 ms\n"
+                    f"Bandwidth: {200 if bsize == '1m' else 20}.0 MB/s\n"), 0
+
+
+class TestM0crateMatrix:
+    """Test m0crate matrix class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_parse_output(self):
+        """m0crate figures are parsed with their units."""
+        result = parse_m0crate_output("I/O workload\nTotal time: 1500 ms\nAvg op time: 250 us\n"
+                                      "Total ops: 600\nBandwidth: 2048 KB/s, 400 ops/s\n")
+        assert result == {"elapsed_s": 1.5, "ops": 600, "throughput_mbps": 2.0, "iops": 400.0,
+                          "latency_avg_s": 0.00025}
+        assert parse_m0crate_output("nothing") == dict.fromkeys(result)
+        assert len(expand_matrix({"BLOCK_SIZE": ["4k", "1m"], "NR_THREADS": [1, 4, 16]})) == 6
+
+    def test_matrix_run_and_regression(self):
+        """Configurations run concurrently on all pods and are compared with a baseline."""
+        motr = FakeMotr()
+        runner = M0crateMatrixRunner(motr, TEMPLATE, work_dir=tempfile.mkdtemp())
+        report = runner.run({"BLOCK_SIZE": ["4k", "1m"], "NR_THREADS": [1, 4]})
+        assert motr.max_active == 2 and report["elapsed"] < 0.7
+        assert len(report["records"]) == 4
+        assert {record["node"] for record in report["records"]} == {"node1", "node2"}
+        assert all(record["status"] == "PASS" for record in report["records"])
+        assert {file for _, file, _, _ in motr.dd_files} == {"/tmp/128M"}
+        summary = report["summary"]
+        assert summary["BLOCK_SIZE=1m,NR_THREADS=4"]["throughput_mbps"] == 200.0
+        assert summary["BLOCK_SIZE=4k,NR_THREADS=1"]["latency_avg_s"] == 0.02
+        self.log.info("\n%s", format_summary(summary))
+        path = save_results(report, os.path.join(runner.work_dir, "baseline.json"))
+        baseline = load_baseline(path)
+        assert not check_regression(summary, baseline)
+        baseline["BLOCK_SIZE=1m,NR_THREADS=4"]["throughput_mbps"] = 250.0
+        baseline["BLOCK_SIZE=64k,NR_THREADS=1"] = dict(baseline["BLOCK_SIZE=4k,NR_THREADS=1"])
+        regressions = check_regression(summary, baseline, tolerance=0.1)
+        assert [(reg["config"], reg["metric"]) for reg in regressions] == [
+            ("BLOCK_SIZE=1m,NR_THREADS=4", "throughput_mbps"),
+            ("BLOCK_SIZE=64k,NR_THREADS=1", "runs")]
@@ -0,0 +1,106 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Test the m0trace query engine."""
+
+import logging
+
+from libs.motr.m0trace_query import BLOCK_FID_PATTERN
+from libs.motr.m0trace_query import M0TraceIndex
+
+BASE_NS = 1650000000 * 10 ** 9
+
+
+def record(num: int, ts_ns: int, func: str, msg: str, subsystem: str = "RPC") -> str:
+    """One m0trace YAML record."""
+    return (f"---\nrecord_num: {num}\ntimestamp:  {ts_ns}\nstack_addr: 7ffc1234\n"
+            f"subsystem:  M0_TRACE_SUBSYS_{subsystem}\nlevel:      M0_DEBUG\n"
+            f"func:       {func}\nfile:       rpc/item.c\nline:       100\n"
+            f'msg:        "{msg}"\n')
+
+
+def io_trace(count: int = 100) -> list:
+    """Write fops of 1..count ms sent every 10ms and interleaved read fops of 5ms."""
+    text = []
+    for seq in range(count):
+        sent = BASE_NS + seq * 10 ** 7
+        text.append(record(4 * seq, sent, "m0_rpc_item_send",
+                           f"item: 0x{seq:x}a0 opcode: 42 size: 4096"))
+        text.append(record(4 * seq + 1, sent + 10 ** 6, "m0_rpc_item_send",
+                           f"item: 0x{seq:x}b0 opcode: 41"))
+        text.append(record(4 * seq + 2, sent + 6 * 10 ** 6, "m0_rpc_item_replied",
+                           f"item: 0x{seq:x}b0 rc=0"))
+        text.append(record(4 * seq + 3, sent + (seq + 1) * 10 ** 6, "m0_rpc_item_replied",
+                           f"item: 0x{seq:x}a0 rc=0"))
+    return "".join(text).splitlines(keepends=True)
+
+
+class TestM0TraceQuery:
+    """Test m0trace query class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_fop_latency_window(self):
+        """Spans pair sends and replies per item, queried per FOP type and time window."""
+        index = M0TraceIndex.from_lines(io_trace(), fop_names={"42": "write", "41": "read"})
+        assert index.fops == ["read", "write"]
+        assert index.records == 400 and index.unmatched == 0
+        assert index.stats("write")["count"] == 100
+        assert abs(index.stats("read")["max"] - 0.005) < 1e-9
+        assert abs(index.percentile(99, "write") - 0.099) < 1e-9
+        # Writes 50..59 start in [0.5s, 0.6s) after the trace start.
+        start = BASE_NS / 10 ** 9 + 0.5
+        window = index.latencies("write", start, start + 0.1)
+        assert [round(lat * 1000) for lat in window] == list(range(51, 61))
+        assert abs(index.percentile(99, "write", start, start + 0.1) - 0.060) < 1e-9
+        assert len(index.latencies(start=start, end=start + 0.1)) == 20
+        histogram = index.histogram("read")
+        assert histogram["<=5ms"] == 100 and sum(histogram.values()) == 100
+        assert index.summary()["write"]["latency"]["count"] == 100
+        self.log.info("Write p99 %s", index.percentile(99, "write"))
+
+    def test_event_queries(self):
+        """Kept events are filtered by time and fields, block fids read as before."""
+        index = M0TraceIndex.from_lines(io_trace(10))
+        start = BASE_NS / 10 ** 9
+        replies = list(index.query(start=start, end=start + 0.05, func="m0_rpc_item_replied"))
+        assert len(replies) == 10 and replies[0].msg == "item: 0x0a0 rc=0"
+        assert not list(index.query(pattern="opcode: 43"))
+        assert len(list(index.query(subsystem="M0_TRACE_SUBSYS_RPC"))) == 40
+        lines = "".join([
+            record(1, BASE_NS + 2, "ioreq_iomap", "prepare io fops, tfid <1:21>", "CLIENT"),
+            record(0, BASE_NS, "noise", "irrelevant, tfid <9:9>", "CLIENT"),
+            record(2, BASE_NS + 3, "pargrp_iomap", "UTyp, [D] unit 0", "CLIENT"),
+            record(3, BASE_NS + 4, "ioreq_iomap", "prepare io fops, tfid <1:22>", "CLIENT"),
+            record(4, BASE_NS + 5, "pargrp_iomap", "UTyp, [P] unit 1", "CLIENT"),
+        ]).splitlines(keepends=True)
+        index = M0TraceIndex.from_lines(lines, keep=BLOCK_FID_PATTERN)
+        assert len(index.events) == 4 and index.events[0].ts == BASE_NS / 10 ** 9 + 2e-9
+        assert index.block_fids() == {"DATA0": "1:21", "PARITY0": "1:22"}
+        # Units pair with the tfid printed before them in the file, whatever the timestamps.
+        lines = "".join([
+            record(0, BASE_NS + 5, "ioreq_iomap", "prepare io fops, tfid <1:21>", "CLIENT"),
+            record(1, BASE_NS + 1, "pargrp_iomap", "UTyp, [D] unit 0", "CLIENT"),
+            record(2, BASE_NS + 2, "ioreq_iomap", "prepare io fops, tfid <1:22>", "CLIENT"),
+            record(3, BASE_NS + 3, "pargrp_iomap", "UTyp, [P] unit 1", "CLIENT"),
+        ]).splitlines(keepends=True)
+        index = M0TraceIndex.from_lines(lines, keep=BLOCK_FID_PATTERN)
+        assert index.events[-1].msg == "prepare io fops, tfid <1:21>"
+        assert index.block_fids() == {"DATA0": "1:21", "PARITY0": "1:22"}
@@ -0,0 +1,118 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the system metrics collector on the local /proc and on recorded frames."""
+
+import csv
+import logging
+import os
+import time
+
+from commons.utils.metrics_collector import MetricsCollector
+from commons.utils.metrics_collector import NodeSampler
+from commons.utils.metrics_collector import POD
+from commons.utils.metrics_collector import PROCESS
+
+POD_UID = "0c8e1d3a-5b7f-4e2a-9c1d-2f3b4a5c6d7e"
+
+
+def frame(stamp: float, cpu: tuple, disk: tuple, net: tuple, procs: list) -> list:
+    """Sampler script output of one frame."""
+    user, idle = cpu
+    lines = [f"@frame {stamp}", f"cpu  {user} 0 0 {idle} 0 0 0 0 0 0",
+             "MemTotal:       1000 kB", "MemAvailable:    250 kB", "@disk",
+             f"   8       0 sda 10 0 {disk[0]} 0 10 0 {disk[1]} 0 0 0 0",
+             f"   8       1 sda1 10 0 {disk[0]} 0 10 0 {disk[1]} 0 0 0 0", "@net",
+             "    lo: 999 0 0 0 0 0 0 0 999 0 0 0 0 0 0 0",
+             f"  eth0: {net[0]} 0 0 0 0 0 0 0 {net[1]} 0 0 0 0 0 0 0"]
+    for pid, comm, ticks, io_bytes in procs:
+        lines += [f"@proc {pid} ({comm}) S 1 1 1 0 -1 0 0 0 0 0 {ticks} 0 0 0 20 0 1 0 1 1 "
+                  "256 0", f"@io read_bytes: {io_bytes} write_bytes: {io_bytes * 2} ",
+                  f"@cg 0::/kubepods.slice/kubepods-burstable.slice/kubepods-burstable-pod"
+                  f"{POD_UID.replace('-', '_')}.slice/cri-containerd-1.scope"]
+    return lines + ["@end"]
+
+
+class RecordedShell:
+    """Replay recorded sampler output."""
+
+    def __init__(self, lines: list):
+        self._lines = lines
+
+    def lines(self):
+        """Recorded lines."""
+        return iter(self._lines)
+
+    def close(self):
+        """Nothing to stop."""
+
+
+class TestMetricsCollector:
+    """Test metrics collector class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_recorded_frames(self):
+        """Rates, pod totals and the ring buffer are derived from the raw counters."""
+        lines = ["@hz 100 4096"]
+        for step in range(5):
+            lines += frame(100.0 + step, (50 * step, 100 + 50 * step), (0, 1000 * step),
+                           (4096 * step, 2048 * step),
+                           [(10, "m0d", 20 * step, 512 * step), (11, "hax", 5 * step, 0)])
+        sampler = NodeSampler("ssc-vm-1", RecordedShell(lines), capacity=3)
+        sampler.start()
+        sampler.stop()
+        series = sampler.snapshot()
+        node = series[("node", "ssc-vm-1")]
+        assert node.count == 3 and node.column("time") == [102.0, 103.0, 104.0]
+        aggregate = node.aggregate()
+        assert aggregate["cpu_pct"]["p95"] == 50.0 and aggregate["mem_used_pct"]["max"] == 75.0
+        assert aggregate["disk_write_bps"]["p50"] == 512000.0
+        assert aggregate["net_rx_bps"]["max"] == 4096.0 and aggregate["net_tx_bps"]["max"] == 2048
+        m0d = series[(PROCESS, "m0d:10")].aggregate()
+        assert m0d["cpu_pct"]["p50"] == 20.0 and m0d["rss_bytes"]["max"] == 256 * 4096
+        assert m0d["read_bps"]["p50"] == 512.0 and m0d["write_bps"]["p50"] == 1024.0
+        pod = series[(POD, POD_UID)].aggregate()
+        assert pod["cpu_pct"]["p50"] == 25.0 and pod["rss_bytes"]["p50"] == 2 * 256 * 4096
+
+    def test_local_sampling(self, tmp_path):
+        """The local /proc is sampled over one shell and exported."""
+        collector = MetricsCollector(pattern="python", interval=0.1, capacity=100).start()
+        end = time.monotonic() + 1.0
+        while time.monotonic() < end:
+            sum(range(10000))
+        aggregates = collector.stop()
+        self.log.info("Aggregates: %s", aggregates)
+        node = aggregates["localhost"]["node"]["localhost"]
+        assert node["samples"] >= 3 and 0 < node["cpu_pct"]["max"] <= 100
+        assert node["mem_used_bytes"]["p50"] > 0
+        own = aggregates["localhost"][PROCESS][f"{self.own_comm()}:{os.getpid()}"]
+        assert own["cpu_pct"]["max"] > 10 and own["rss_bytes"]["p50"] > 0
+        with open(collector.to_csv(os.path.join(tmp_path, "metrics.csv"))) as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        assert len(rows) == sum(entity["samples"] for scopes in aggregates.values()
+                                for entities in scopes.values() for entity in entities.values())
+
+    @staticmethod
+    def own_comm() -> str:
+        """Process name of the test process."""
+        with open(f"/proc/{os.getpid()}/comm") as comm:
+            return comm.read().strip()
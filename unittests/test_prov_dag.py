@@ -0,0 +1,125 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+"""Test the deployment step graph executor with dry run steps."""
+
+import logging
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+from libs.prov.prov_dag import DeployDag
+from libs.prov.prov_dag import build_deploy_dag
+from libs.prov.prov_dag import fake_step
+from libs.prov.prov_dag import on_own_connection
+
+DEPLOY_CFG = {"k8s_dir": "/root/deploy-scripts/k8_cortx_cloud/",
+              "timeout": {"pre-req": 5, "deploy": 5, "image_pull": 5, "pod_ready": 5}}
+
+
+class TestProvDag:
+    """Test deployment step graph class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_retries_timeouts_and_skips(self):
+        """Failed attempts are retried, a timed out or failing step skips its dependents."""
+        dag = DeployDag(workers=4, fail_fast=False)
+        flaky = fake_step("flaky", 0.01, fail_times=2)
+        dag.add("flaky", flaky, retries=2)
+        dag.add("slow", fake_step("slow", 1), timeout=0.1)
+        dag.add("after_slow", fake_step("after_slow", 0), deps=("slow",))
+        dag.add("after_flaky", fake_step("after_flaky", 0), deps=("flaky",))
+        dag.add("broken", lambda: 1 / 0)
+        report = dag.run()
+        steps = {record["name"]: record for record in report["timeline"]}
+        assert not report["passed"] and len(flaky.calls) == 3
+        assert steps["flaky"]["status"] == "passed" and steps["flaky"]["attempts"] == 3
+        assert steps["after_flaky"]["status"] == "passed"
+        assert steps["slow"]["status"] == "failed" and "timed out" in steps["slow"]["error"]
+        assert steps["after_slow"]["status"] == "skipped"
+        assert "division by zero" in steps["broken"]["error"]
+        cyclic = DeployDag()
+        cyclic.add("a", fake_step("a", 0), deps=("b",))
+        cyclic.add("b", fake_step("b", 0), deps=("a",))
+        try:
+            cyclic.run()
+            assert False, "cycle not detected"
+        except ValueError as error:
+            assert "cycle" in str(error)
+
+    def test_timed_out_attempt_not_overlapped(self):
+        """A retry starts after the timed out attempt ended, a hung attempt is not retried."""
+        dag = DeployDag(workers=2, fail_fast=False)
+        late = fake_step("late", 0.15, fail_times=1)
+        hung = fake_step("hung", 1)
+        dag.add("late", late, timeout=0.1, retries=1)
+        dag.add("hung", hung, timeout=0.1, retries=2)
+        report = dag.run()
+        steps = {record["name"]: record for record in report["timeline"]}
+        assert len(late.calls) == 2 and late.calls[1] - late.calls[0] >= 0.15
+        assert steps["late"]["status"] == "failed" and steps["late"]["attempts"] == 2
+        assert len(hung.calls) == 1 and steps["hung"]["attempts"] == 1
+        assert "still running" in steps["hung"]["error"]
+
+    def test_dry_run_deploy_ordering_and_critical_path(self):
+        """Workers are prepared concurrently, deploy waits for all of them."""
+        workers = [SimpleNamespace(hostname=f"worker{index}") for index in range(3)]
+        master = SimpleNamespace(hostname="master")
+        durations = {"prereq_vm": 0.05, "prereq_git": 0.05, "copy_sol": 0.01,
+                     "prereq_cortx": 0.1, "image_pull": 0.3, "pre_check": 0.01,
+                     "deploy": 0.1, "pod_readiness": 0.05}
+        dag = build_deploy_dag(SimpleNamespace(deploy_cfg=DEPLOY_CFG), "solution.yaml",
+                               [master], workers, {}, "v0.1", dry_run=True, wait_pods=True,
+                               fake_durations=durations, workers=16,
+                               fake_failures={"image_pull:worker1": 1})
+        start = time.perf_counter()
+        report = dag.run()
+        elapsed = time.perf_counter() - start
+        self.log.info("Critical path %s in %.2fs, run %.2fs", report["critical_path"],
+                      report["critical_path_time"], elapsed)
+        steps = {record["name"]: record for record in report["timeline"]}
+        assert report["passed"] and report["max_running"] >= 6
+        for worker in workers:
+            assert steps["deploy"]["start"] >= steps[f"prereq_cortx:{worker.hostname}"]["end"]
+            assert steps["deploy"]["start"] >= steps[f"image_pull:{worker.hostname}"]["end"]
+            assert steps[f"image_pull:{worker.hostname}"]["start"] < \
+                steps[f"prereq_git:{worker.hostname}"]["end"]
+        assert steps["image_pull:worker1"]["attempts"] == 2
+        assert report["critical_path"] == ["prereq_vm:worker1", "image_pull:worker1",
+                                           "deploy", "pod_readiness"]
+        sequential = sum(durations[name.split(":")[0]] * record["attempts"]
+                         for name, record in steps.items())
+        assert elapsed < sequential / 2
+        assert abs(report["critical_path_time"] - elapsed) < 0.2
+        assert dag.steps["deploy"].result == (True, "deploy")
+
+    def test_image_pull_on_own_connection(self):
+        """Image pulls get a node object of their own, closed once the pull is done."""
+        worker = SimpleNamespace(hostname="worker0", username="root", password="pass")
+        deploy_lib = mock.Mock(deploy_cfg=DEPLOY_CFG)
+        with mock.patch("libs.prov.prov_dag.LogicalNode") as logical_node:
+            dag = build_deploy_dag(deploy_lib, "solution.yaml", [SimpleNamespace(
+                hostname="master")], [worker], {"worker0": "/dev/sdb"})
+            dag.steps["image_pull:worker0"].func()
+            assert on_own_connection(worker, lambda node: node) is logical_node.return_value
+        logical_node.assert_called_with(hostname="worker0", username="root", password="pass")
+        deploy_lib.pull_cortx_image.assert_called_once_with(logical_node.return_value)
+        assert logical_node.return_value.disconnect.call_count == 2
@@ -0,0 +1,71 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the streaming multi pattern RAS alert watcher."""
+
+import logging
+import time
+
+from libs.ras.alert_watcher import AlertWatcher
+from libs.ras.alert_watcher import MultiPatternMatcher
+
+ALERT = '{"resource_type": "node:fru:fan", "alert_type": "fault", "severity": "critical"}\n'
+
+
+class TestAlertWatcher:
+    """Test alert watcher class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_matcher_overlapping_patterns(self):
+        """Patterns that are prefixes or substrings of each other are all found."""
+        matcher = MultiPatternMatcher(["fault", "fault_resolved", "resolved", "missing", ""])
+        assert matcher.search("alert_type: fault_resolved") == \
+            {"fault", "fault_resolved", "resolved"}
+        assert matcher.search("no alert here") == set()
+        assert MultiPatternMatcher([]).search("anything") == set()
+
+    def test_feed_split_chunks_with_anchor(self):
+        """Lines split across chunks are matched once, unanchored lines are ignored."""
+        watcher = AlertWatcher(["node:fru:fan", "fault", "critical"], anchor="node:fru:fan")
+        data = ('{"resource_type": "node:fru:psu", "alert_type": "fault"}\n' + ALERT).encode()
+        for index in range(0, len(data), 7):
+            watcher.feed(data[index:index + 7])
+        assert watcher.done and watcher.missing == []
+        watcher = AlertWatcher(["node:fru:fan", "missing"], anchor="node:fru:fan")
+        assert not watcher.consume([ALERT.encode()]) and watcher.missing == ["missing"]
+
+    def test_consume_deadline(self):
+        """Consumption stops early once all patterns are seen or at the deadline."""
+        def idle_stream(chunks):
+            yield from chunks
+            while True:
+                time.sleep(0.01)
+                yield None
+
+        start = time.monotonic()
+        watcher = AlertWatcher(["fault", "critical"])
+        assert watcher.consume(idle_stream([ALERT[:30], ALERT[30:]]), timeout=5)
+        assert time.monotonic() - start < 1
+        watcher = AlertWatcher(["fault", "fault_resolved"])
+        assert not watcher.consume(idle_stream([ALERT]), timeout=0.2)
+        assert watcher.missing == ["fault_resolved"]
+        assert 0.2 <= time.monotonic() - start < 2
@@ -0,0 +1,122 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test disk failure plans and the SNS repair progress tracker."""
+
+import csv
+import logging
+import os
+import threading
+import time
+
+from libs.durability.repair_progress import RepairProgressTracker
+from libs.durability.repair_progress import STATE_IDLE
+from libs.durability.repair_progress import STATE_STARTED
+from libs.durability.repair_progress import fail_disks_concurrently
+from libs.durability.repair_progress import parse_sns_status
+from libs.durability.repair_progress import resolve_failure_plan
+
+ALL_DISKS = {f"disk{num}": [f"ssc-vm-{node}.colo.seagate.com", f"cvg-0{cvg}", f"/dev/sd{dev}"]
+             for num, (node, cvg, dev) in enumerate(
+                 [(node, cvg, dev) for node in (1, 2, 3) for cvg in (1, 2) for dev in "ab"],
+                 start=1)}
+
+
+class FakeRepair:
+    """SNS repair of 1000 degraded bytes, 100 bytes per sample, stalling for a while."""
+
+    def __init__(self, stall_samples: int = 0):
+        self.pending = 1000
+        self.calls = 0
+        self.stall_samples = stall_samples
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls == 3 and self.stall_samples:
+            self.stall_samples -= 1
+            self.calls -= 1
+        elif self.calls > 1:
+            self.pending = max(self.pending - 100, 0)
+        state = "M0_SNS_CM_STATUS_STARTED" if self.pending else "M0_SNS_CM_STATUS_IDLE"
+        status = parse_sns_status(f'[{{"fid": "0x7200000000000001:0x1", "status": "{state}", '
+                                  f'"progress": {100 - self.pending // 10}}}]')
+        return status, {"critical": 0, "damaged": 0, "degraded": self.pending,
+                        "healthy": 5000 - self.pending}
+
+
+class TestRepairProgress:
+    """Test repair progress class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_failure_plan(self):
+        """Disks are chosen per plan without reuse and failed at the same time."""
+        resp = resolve_failure_plan(ALL_DISKS, [{"node": "vm-1", "cvg": "cvg-01", "count": 2},
+                                                {"count": 3, "distinct_cvg": True}])
+        assert resp[0], resp[1]
+        chosen = list(resp[1].values())
+        assert len(chosen) == 5 and len({tuple(disk) for disk in chosen}) == 5
+        assert sorted(disk[2] for disk in chosen[:2]) == ["/dev/sda", "/dev/sdb"]
+        assert all(disk[:2] == ["ssc-vm-1.colo.seagate.com", "cvg-01"] for disk in chosen[:2])
+        assert len({tuple(disk[:2]) for disk in chosen[2:]}) == 3
+        resp = resolve_failure_plan(ALL_DISKS, [{"node": "vm-2", "count": 3,
+                                                 "distinct_cvg": True}])
+        assert not resp[0] and "only 2 available" in resp[1]
+
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def fail(node, cvg, device):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.1)
+            with lock:
+                running[0] -= 1
+            if device == "/dev/sdb" and cvg == "cvg-02" and node.startswith("ssc-vm-3"):
+                raise IOError("hctl failed")
+            return {"status": "failed"}
+
+        start = time.monotonic()
+        resp = fail_disks_concurrently(ALL_DISKS, fail, workers=12)
+        assert time.monotonic() - start < 0.5 and peak[0] == 12
+        assert not resp[0] and isinstance(resp[1]["disk12"], IOError)
+
+    def test_repair_tracking(self, tmp_path):
+        """Throughput, ETA, stalls and completion are derived from the sampled series."""
+        tracker = RepairProgressTracker(FakeRepair(stall_samples=4), interval=0.05,
+                                        stall_seconds=0.12, window=3, build="2.0.0-100")
+        summary = tracker.start().wait(timeout=10)
+        self.log.info("Summary: %s", {key: value for key, value in summary.items()
+                                      if key != "samples"})
+        samples = summary["samples"]
+        assert summary["completed"] and summary["state"] == STATE_IDLE
+        assert summary["repaired_bytes"] == 1000 and summary["pending_bytes"] == 0
+        assert len(summary["stalls"]) == 1 and summary["stalls"][0]["pending_bytes"] == 900
+        assert any(sample["stalled"] for sample in samples)
+        assert not samples[-1]["stalled"] and samples[-2]["state"] == STATE_STARTED
+        running = [sample for sample in samples[1:-1] if not sample["stalled"]]
+        assert all(sample["throughput_bps"] and sample["eta_seconds"] is not None
+                   for sample in running)
+        assert 0 < summary["mean_throughput_bps"] <= summary["peak_throughput_bps"] <= 100 / 0.04
+        path = tracker.to_csv(os.path.join(tmp_path, "repair.csv"))
+        with open(path) as csv_file:
+            rows = list(csv.DictReader(csv_file))
+        assert len(rows) == len(samples) and rows[-1]["pending_bytes"] == "0"
@@ -0,0 +1,141 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test the sharded test runner on a fake test directory run with pytest."""
+
+import logging
+import os
+import time
+
+from core.sharded_runner import PYTEST
+from core.sharded_runner import ResultPublisher
+from core.sharded_runner import ShardedTestRunner
+from core.sharded_runner import parse_xunit
+from core.sharded_runner import pytest_selector
+from core.sharded_runner import spec_key
+
+TEST_MODULE = '''
+import os
+import time
+
+def record(name):
+    with open(os.path.join(os.environ["RESULTS_DIR"], name), "w") as result:
+        result.write(os.environ["BUCKET_PREFIX"])
+    time.sleep(0.2)
+
+{tests}
+class TestGroup:
+    def test_in_class(self):
+        record("{module}.TestGroup.test_in_class")
+'''
+
+
+class TestShardedRunner:
+    """Test sharded runner class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    @staticmethod
+    def fake_tests(tmp_path):
+        """Two test modules of the s3tests layout, one failing test."""
+        package = tmp_path / "s3tests_fake" / "functional"
+        package.mkdir(parents=True)
+        specs = []
+        for module in ("test_s3", "test_iam"):
+            tests = ""
+            for index in range(5):
+                name = f"{module}_{index}"
+                tests += f"def {name}():\n    record('{module}.{name}')\n"
+                tests += "    assert False, 'boom'\n\n" if name == "test_s3_3" else "\n"
+                specs.append(f"s3tests_fake.functional.{module}:{name}")
+            specs.append(f"s3tests_fake.functional.{module}:TestGroup.test_in_class")
+            (package / f"{module}.py").write_text(TEST_MODULE.format(tests=tests,
+                                                                     module=module))
+        (tmp_path / "results").mkdir()
+        return specs
+
+    def runner(self, tmp_path, workers, batch_size, publisher=None):
+        """Runner of the fake tests giving every worker its own bucket prefix."""
+        return ShardedTestRunner(
+            str(tmp_path), str(tmp_path / f"reports_{workers}_{batch_size}"), workers=workers,
+            batch_size=batch_size, runner=PYTEST, timeout=120, publisher=publisher,
+            env_factory=lambda slot: {"BUCKET_PREFIX": f"w{slot}-",
+                                      "RESULTS_DIR": str(tmp_path / "results")})
+
+    def test_sharded_run_is_faster_than_serial(self, tmp_path):
+        """Parallel batches give the serial results, isolated per worker, in less time."""
+        assert spec_key("a.b:C.test") == spec_key("a/b.py::C::test") == "a.b.C.test"
+        assert pytest_selector("a.b:C.test") == "a/b.py::C::test"
+        specs = self.fake_tests(tmp_path)
+        serial = self.runner(tmp_path, 1, 1).run(specs)
+        published = []
+
+        def publish(batches):
+            time.sleep(0.3)
+            published.extend(batches)
+        publisher = ResultPublisher(publish)
+        sharded = self.runner(tmp_path, 4, 3, publisher).run(specs)
+        publisher.close()
+        self.log.info("Serial %.1fs, sharded %.1fs, estimated speedup %.1fx",
+                      serial["elapsed"], sharded["elapsed"], sharded["speedup"])
+        statuses = {spec: result["status"] for spec, result in sharded["results"].items()}
+        assert statuses == {spec: result["status"] for spec, result in serial["results"].items()}
+        assert [spec for spec, status in statuses.items() if status == "FAIL"] == \
+            ["s3tests_fake.functional.test_s3:test_s3_3"]
+        assert "boom" in sharded["results"]["s3tests_fake.functional.test_s3:test_s3_3"]["message"]
+        assert sharded["elapsed"] < serial["elapsed"] / 2 and sharded["speedup"] > 1.5
+        assert len(sharded["batches"]) == 4 and len(published) == 4
+        assert publisher.calls <= 4 and not publisher.errors
+        for batch in sharded["batches"]:
+            cases = parse_xunit(batch["xunit"])
+            assert len(cases) == len(batch["results"])
+            for name in cases:
+                with open(os.path.join(tmp_path, "results", name.split("functional.")[1])) \
+                        as result:
+                    assert result.read() == f"w{batch['slot']}-"
+        assert len({batch["slot"] for batch in sharded["batches"]}) > 1
+
+    def test_missing_results_fail(self, tmp_path):
+        """Tests absent from the report, such as unknown tests, are failed."""
+        specs = self.fake_tests(tmp_path)[:2] + ["s3tests_fake.functional.test_s3:test_nope"]
+        report = self.runner(tmp_path, 2, 2).run(specs)
+        assert report["passed"] == 2 and report["failed"] == 1
+        assert "No result" in report["results"][specs[2]]["message"]
+
+    def test_skips_and_stale_reports(self, tmp_path):
+        """Skipped tests are reported as SKIP and reports of earlier runs are not reused."""
+        package = tmp_path / "s3tests_fake" / "functional"
+        package.mkdir(parents=True)
+        (package / "test_skip.py").write_text(
+            "import pytest\n\n\ndef test_skipped():\n    pytest.skip('no target')\n\n\n"
+            "def test_passed():\n    pass\n")
+        specs = ["s3tests_fake.functional.test_skip:test_skipped",
+                 "s3tests_fake.functional.test_skip:test_passed"]
+        runner = self.runner(tmp_path, 1, 2)
+        report = runner.run(specs)
+        assert report["passed"] == 1 and report["skipped"] == 1 and not report["failed"]
+        assert report["results"][specs[0]]["message"] == "no target"
+        # Killed before writing its report, on the report file of the run above.
+        (package / "test_skip.py").write_text("import time\n\ntime.sleep(60)\n")
+        runner.timeout = 2
+        results = runner.run_batch(0, specs)["results"]
+        assert all(result["status"] == "FAIL" for result in results.values())
+        assert "No result" in results[specs[0]]["message"]
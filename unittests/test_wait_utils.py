@@ -0,0 +1,100 @@
+#
+# Copyright (c) 2022 Seagate Technology LLC and/or its Affiliates
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU Affero General Public License for more details.
+# You should have received a copy of the GNU Affero General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+#
+# For any questions about this software or licensing,
+# please email opensource@seagate.com or cortx-questions@seagate.com.
+#
+
+"""Test condition based waits and the sleep accounting plugin."""
+
+import logging
+import time
+from itertools import islice
+from types import SimpleNamespace
+
+import pytest
+
+from commons.sleep_accounting import SleepAccounting
+from commons.utils.wait_utils import WaitAbortedError
+from commons.utils.wait_utils import WaitTimeoutError
+from commons.utils.wait_utils import backoff_delays
+from commons.utils.wait_utils import wait_until
+
+
+class TestWaitUtils:
+    """Test wait utils class."""
+
+    @classmethod
+    def setup_class(cls):
+        """Setup class."""
+        cls.log = logging.getLogger(__name__)
+
+    def test_backoff_delays(self):
+        """Delays grow exponentially within the jitter and stop at max_interval."""
+        assert list(islice(backoff_delays(1, 2, 5, 0), 5)) == [1, 2, 4, 5, 5]
+        for delay, base in zip(backoff_delays(1, 2, 8, 0.1), [1, 2, 4, 8, 8]):
+            assert base * 0.9 <= delay <= base * 1.1
+
+    def test_wait_until_met(self):
+        """The wait returns as soon as the condition holds, retrying listed exceptions."""
+        polls = []
+
+        def probe():
+            polls.append(1)
+            if len(polls) == 1:
+                raise ConnectionError("not yet")
+            return len(polls) >= 3 and "ready"
+
+        start = time.monotonic()
+        assert wait_until(probe, timeout=5, interval=0.01, retry_exceptions=(ConnectionError,)) \
+            == "ready"
+        assert len(polls) == 3 and time.monotonic() - start < 1
+
+    def test_wait_until_timeout_and_abort(self):
+        """A missed deadline raises or returns the last result, fail fast aborts at once."""
+        start = time.monotonic()
+        with pytest.raises(WaitTimeoutError) as error:
+            wait_until(lambda: 0, timeout=0.2, interval=0.05)
+        assert error.value.last == 0 and 0.2 <= time.monotonic() - start < 1
+        assert wait_until(lambda: (False, "down"), timeout=0.1, interval=0.05,
+                          success=lambda resp: resp[0], raise_on_timeout=False) == \
+            (False, "down")
+        start = time.monotonic()
+        with pytest.raises(WaitAbortedError):
+            wait_until(lambda: "failed", timeout=10, fail_fast=lambda sts: sts == "failed",
+                       success=lambda sts: sts == "online")
+        assert time.monotonic() - start < 1
+
+    def test_sleep_accounting(self):
+        """Sleeps are charged to the running test and to the caller of wait_until."""
+        plugin = SleepAccounting()
+        plugin.install()
+        try:
+            item = SimpleNamespace(nodeid="test_slow")
+            hook = plugin.pytest_runtest_protocol(item, None)
+            next(hook)
+            time.sleep(0.05)
+            wait_until(lambda: False, timeout=0.1, interval=0.02, raise_on_timeout=False)
+            with pytest.raises(StopIteration):
+                next(hook)
+            time.sleep(0.01)
+        finally:
+            plugin.uninstall()
+        assert time.sleep is not plugin.sleep
+        report = plugin.report()
+        self.log.info("Report: %s", report)
+        test = report["tests"][0]
+        assert test["nodeid"] == "test_slow" and 0.14 <= test["sleep"] <= test["duration"]
+        assert all("test_wait_utils.py" in site for site in test["sites"])
+        assert "wait_until_met" not in str(report) and len(report["sites"]) == 3
@@ -119,3 +119,30 @@ class TestS3Utils:
         resp = s3_utils.get_unaligned_parts(self.fpath, total_parts=total_parts, random=True)
         self.log.info(resp.keys())
         self.log.info("ENDED: get aligned parts.")
+
+    @pytest.mark.parametrize("get_parts", [s3_utils.get_aligned_parts,
+                                           s3_utils.get_unaligned_parts])
+    def test_get_lazy_parts(self, get_parts):
+        """Test lazy parts cover the file and match eager parts checksums and ETag."""
+        self.log.info("STARTED: get lazy parts.")
+        resp = system_utils.create_file(self.fpath, count=30)
+        assert_utils.assert_true(resp[0], resp[1])
+        open_fds = len(os.listdir("/proc/self/fd"))
+        parts = get_parts(self.fpath, total_parts=5, lazy=True)
+        source = next(iter(parts.values())).source
+        # Lazy parts own no descriptor, every part read opens and closes the file.
+        assert_utils.assert_equal(len(os.listdir("/proc/self/fd")), open_fds)
+        assert_utils.assert_equal(sum(part.length for part in parts.values()), source.size)
+        for future in source.prefetch_md5(parts):
+            future.result()
+        with open(self.fpath, "rb") as file_obj:
+            for part in parts.values():
+                file_obj.seek(part.offset)
+                data = file_obj.read(part.length)
+                assert_utils.assert_equal(part[0].read(), data)
+                assert_utils.assert_equal(part[1], s3_utils.calc_contentmd5(data))
+        eager = {num: [part[0].read(), part[1]] for num, part in parts.items()}
+        assert_utils.assert_equal(s3_utils.get_multipart_etag(parts),
+                                  s3_utils.get_multipart_etag(eager))
+        source.close()
+        self.log.info("ENDED: get lazy parts.")